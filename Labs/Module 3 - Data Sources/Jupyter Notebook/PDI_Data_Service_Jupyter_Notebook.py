@@ -37,23 +37,29 @@ import jaydebeapi
 # In[ ]:
 
 
-conn = jaydebeapi.connect(jclassname="org.pentaho.di.trans.dataservice.jdbc.ThinDriver",
-url = "jdbc:pdi://localhost:8080/kettle?webappname=pentaho", driver_args= ['admin', 'password'],jars=jdbc_jars)
+#Get the connection pool of the PDI server (see pdi_dataservice.py): the JVM is started once per kernel with the
+#client jars, and later queries reuse its connections instead of connecting again
+from pdi_dataservice import fetch, get_pool, write_parquet
+pool = get_pool(url = "jdbc:pdi://localhost:8080/kettle?webappname=pentaho", user='admin', password='password', jdbc_dir=jdbc_dir)
 
 
 # In[ ]:
 
 
-curs = conn.cursor()
-curs.execute("SELECT * FROM PDI_Data_Service_JupyterNotebook")
-cols = [desc[0] for desc in curs.description]
-records = curs.fetchall()
+#Read only the columns the model needs: the column list (and filters or a row limit, if given) is part of the SQL, so
+#the server does not send the other columns. The result is read in chunks of 10,000 rows into typed columns and
+#cached as Parquet for an hour: running the notebook again does not run the data service transformation again.
+#Change version (or pass ttl=0) to read fresh data. Without pyarrow the result is not cached.
+df = fetch("PDI_Data_Service_JupyterNotebook", columns=["temperature", "pressure", "rpm", "failure"],
+           version="1", pool=pool)
 
 
 # In[ ]:
 
 
-df = pd.DataFrame(records, columns = cols)
+#Optionally keep the result as a Parquet file (needs pyarrow); it is written chunk by chunk as well
+#with pool.connection() as conn:
+#    write_parquet(conn, "SELECT * FROM PDI_Data_Service_JupyterNotebook", "PDI_Data_Service_JupyterNotebook.parquet")
 
 
 # In[ ]:
@@ -70,13 +76,12 @@ import pandas as pd
 import numpy as np
 from sklearn.tree import DecisionTreeClassifier
 from sklearn import tree
-from sklearn.externals import joblib
 import os
 
 
 # extract training columns and class column
-X=df.iloc[:,[2,3,4]].values
-Y=df.iloc[:,[5]].values
+X=df[["temperature", "pressure", "rpm"]].values
+Y=df[["failure"]].values
 
 print(X)
 print(Y)
@@ -92,9 +97,9 @@ print(Y)
 
 dt = tree.DecisionTreeClassifier(class_weight=None, criterion='gini', max_depth=None,
             max_features=None, max_leaf_nodes=None,
-            min_impurity_decrease=0.0, min_impurity_split=None,
+            min_impurity_decrease=0.0,
             min_samples_leaf=1, min_samples_split=2,
-            min_weight_fraction_leaf=0.0, presort=False, random_state=None,
+            min_weight_fraction_leaf=0.0, random_state=None,
             splitter='best')
 
 dt.fit(X,Y)
@@ -106,23 +111,16 @@ dt.fit(X,Y)
 # In[ ]:
 
 
-#mke a temp, pressure and rpm failure prediction
+#make temp, pressure and rpm failure predictions: all rows are scored in one call (see failure_scoring.py)
+from failure_scoring import FEATURES, Scorer, save_model
 
-#temp failure > 150
-prediction = dt.predict([[151, 500,1406]]) 
-print(prediction) 
-
-#pressure failure > 600
-prediction = dt.predict([[145, 601,1406]]) 
-print(prediction) 
-
-#rpm failure predction > 1500
-prediction = dt.predict([[140, 500,1502]]) 
-print(prediction) 
-
-#no failure prediction
-prediction = dt.predict([[140, 450,1402]]) 
-print(prediction) 
+samples = pd.DataFrame([[151, 500, 1406],   #temp failure > 150
+                        [145, 601, 1406],   #pressure failure > 600
+                        [140, 500, 1502],   #rpm failure prediction > 1500
+                        [140, 450, 1402]],  #no failure prediction
+                       columns=FEATURES)
+samples['prediction'] = Scorer(dt).predict(samples)
+print(samples)
 
 
 # In[ ]:
@@ -168,7 +166,12 @@ Image('/home/demouser/tree.png')
 
 #Next step can be to utilize model management via outputting model to file
 
-# save the model
-filename='file:///home/demouser/utils/JupyterNotebook/decisiontreeclassifier_jupyter.model'
-joblib.dump(dt,filename)
+# save the model with its feature names; failure_scoring.py loads it once and scores batches of rows,
+# e.g. for PDI:  python failure_scoring.py --model <file> serve --port 8765
+filename='/home/demouser/utils/JupyterNotebook/decisiontreeclassifier_jupyter.model'
+save_model(dt, filename)
+
+# load it back (memory-mapped) and score the whole data set in one call
+scorer = Scorer.load(filename)
+print(pd.Series(scorer.predict(df)).value_counts())
 
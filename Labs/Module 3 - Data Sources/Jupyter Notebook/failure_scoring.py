@@ -0,0 +1,256 @@
+"""
+Batch scoring with the failure-prediction decision tree of the Jupyter lab.
+
+PDI_Data_Service_Jupyter_Notebook trains a DecisionTreeClassifier on
+temperature, pressure and rpm and saves it with save_model(). This module
+loads the saved model once and scores many rows per call:
+
+    scorer = Scorer.load(MODEL_PATH)
+    scorer.predict(df)                      # DataFrame with the feature columns
+    scorer.predict([[151, 500, 1406], [140, 450, 1402]])
+
+The model is loaded once per process (a Scorer, or the service below)
+rather than for every prediction. The file is written uncompressed, so
+load() can open it with mmap_mode="r": NumPy arrays in it are mapped
+instead of read (scikit-learn still copies the node arrays of a tree when
+it restores it, so for a single decision tree this mainly saves reading).
+
+For PDI, the module runs as a small HTTP service:
+
+    python failure_scoring.py --model decisiontreeclassifier_jupyter.model serve --port 8765
+
+POST /score takes a batch of rows and returns one prediction per row:
+
+    {"rows": [{"temperature": 151, "pressure": 500, "rpm": 1406}, ...]}
+    -> {"predictions": ["yes", ...], "rows": 1}
+
+Rows may also be lists in FEATURES order, and the list may be called
+"data" (the default block name of PDI's JSON Output step). To score
+thousands of rows per request, let a JSON Output step write blocks of
+rows ("Nr. rows in a block") and send each block with the REST Client
+step, instead of calling the service once per row. Files are scored with
+
+    python failure_scoring.py --model ... score sensors.csv --output scored.csv
+"""
+
+import argparse
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Columns the model is trained on, in order
+FEATURES = ("temperature", "pressure", "rpm")
+
+# Where the lab notebook saves the model
+MODEL_PATH = "/home/demouser/utils/JupyterNotebook/decisiontreeclassifier_jupyter.model"
+
+DEFAULT_PORT = 8765
+# Rows per chunk when scoring a CSV file
+CHUNK_SIZE = 100000
+
+
+def save_model(model, path=MODEL_PATH, features=FEATURES):
+    """
+    Save a trained model with its feature names.
+
+    Args:
+        model: Fitted scikit-learn classifier
+        path (str): Model file
+        features (tuple): Columns the model was trained on, in order
+    """
+    # Uncompressed, so load() can memory-map the arrays
+    joblib.dump({"model": model, "features": list(features)}, path)
+
+
+def to_matrix(data, features=FEATURES):
+    """
+    Convert a batch of rows to the feature matrix of the model.
+
+    Args:
+        data: DataFrame (columns selected by name), 2-D array or list of
+              rows, or a list of dicts with the feature names as keys
+        features (tuple): Feature columns
+
+    Returns:
+        numpy.ndarray: float64 array, one row per input row
+    """
+    if isinstance(data, pd.DataFrame):
+        return data[list(features)].to_numpy(dtype=np.float64)
+    if not len(data):
+        return np.empty((0, len(features)))
+    if isinstance(data[0], dict):
+        return np.array([[row[name] for name in features] for row in data], dtype=np.float64)
+    matrix = np.asarray(data, dtype=np.float64)
+    if matrix.ndim != 2 or matrix.shape[1] != len(features):
+        raise ValueError(f"Expected rows of {len(features)} values ({', '.join(features)})")
+    return matrix
+
+
+class Scorer:
+    """
+    A loaded model and its features.
+
+    Attributes:
+        model: Fitted classifier
+        features (tuple): Feature columns in training order
+        path (str): Model file, if loaded from one
+    """
+
+    def __init__(self, model, features=FEATURES, path=None):
+        self.model = model
+        self.features = tuple(features)
+        self.path = path
+
+    @classmethod
+    def load(cls, path=MODEL_PATH, mmap_mode="r"):
+        """
+        Load a model saved by save_model() (or a bare joblib-dumped model).
+
+        Args:
+            path (str): Model file
+            mmap_mode (str): joblib memory-map mode, None to read into memory
+
+        Returns:
+            Scorer: Loaded model
+        """
+        saved = joblib.load(path, mmap_mode=mmap_mode)
+        if isinstance(saved, dict):
+            return cls(saved["model"], saved.get("features", FEATURES), path)
+        return cls(saved, FEATURES, path)
+
+    def predict(self, data):
+        """
+        Predict the class of every row of a batch in one call.
+
+        Args:
+            data: Rows, see to_matrix()
+
+        Returns:
+            numpy.ndarray: Predicted class per row
+        """
+        matrix = to_matrix(data, self.features)
+        if not len(matrix):
+            return np.array([], dtype=self.model.classes_.dtype)
+        return self.model.predict(matrix)
+
+    def predict_proba(self, data):
+        """
+        Predict the class probabilities of every row of a batch.
+
+        Args:
+            data: Rows, see to_matrix()
+
+        Returns:
+            pandas.DataFrame: One column per class (model.classes_)
+        """
+        matrix = to_matrix(data, self.features)
+        probabilities = self.model.predict_proba(matrix) if len(matrix) else np.empty((0, len(self.model.classes_)))
+        return pd.DataFrame(probabilities, columns=self.model.classes_)
+
+    def score_csv(self, input_path, output_path, chunk_size=CHUNK_SIZE, column="prediction"):
+        """
+        Add a prediction column to a CSV file, chunk by chunk.
+
+        Args:
+            input_path (str): CSV with the feature columns
+            output_path (str): CSV to write
+            chunk_size (int): Rows per chunk
+            column (str): Name of the prediction column
+
+        Returns:
+            int: Rows scored
+        """
+        rows = 0
+        for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunk_size)):
+            chunk[column] = self.predict(chunk)
+            chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(chunk)
+        return rows
+
+
+def create_server(scorer, port=DEFAULT_PORT, host="0.0.0.0"):
+    """
+    Create the HTTP scoring service of a Scorer (start it with serve_forever()).
+
+    Args:
+        scorer (Scorer): Loaded model
+        port (int): TCP port
+        host (str): Interface to listen on
+
+    Returns:
+        ThreadingHTTPServer: Server
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self.reply(404, {"error": "not found"})
+                return
+            self.reply(200, {"model": scorer.path, "features": list(scorer.features),
+                             "classes": [str(c) for c in scorer.model.classes_]})
+
+        def do_POST(self):
+            if self.path.split("?")[0] != "/score":
+                self.reply(404, {"error": "not found"})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                rows = request if isinstance(request, list) else request.get("rows", request.get("data"))
+                if rows is None:
+                    raise ValueError('expected {"rows": [...]}')
+                predictions = scorer.predict(rows)
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                self.reply(400, {"error": f"{type(e).__name__}: {e}"})
+                return
+            self.reply(200, {"predictions": predictions.tolist(), "rows": len(predictions)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Score sensor rows with the failure-prediction model")
+    parser.add_argument("--model", default=MODEL_PATH, help=f"Model file [{MODEL_PATH}]")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Run the HTTP scoring service")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"HTTP port [{DEFAULT_PORT}]")
+    score = commands.add_parser("score", help="Add predictions to a CSV file")
+    score.add_argument("input", help="CSV with the columns " + ", ".join(FEATURES))
+    score.add_argument("--output", required=True, help="Scored CSV")
+    score.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"Rows per chunk [{CHUNK_SIZE}]")
+    args = parser.parse_args()
+
+    scorer = Scorer.load(args.model)
+    if args.command == "score":
+        rows = scorer.score_csv(args.input, args.output, args.chunk_size)
+        logging.info(f"Scored {rows} row(s) into {args.output}")
+        return
+
+    server = create_server(scorer, args.port)
+    logging.info(f"Scoring {', '.join(scorer.features)} with {args.model} on port {args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,616 @@
+"""
+Client for PDI Data Services (Pentaho Thin JDBC driver) in notebooks and scripts.
+
+PDI_Data_Service_Jupyter_Notebook shows the steps one by one: build the
+CLASSPATH from the pdi-dataservice-client folder, connect with jaydebeapi
+and read the whole result with fetchall(). fetchall() turns every row into
+a Python tuple first, so a data service with millions of rows needs the
+rows and the DataFrame built from them in memory at the same time.
+
+This module reads a result in chunks instead:
+
+    conn = connect()
+    for df in read_frames(conn, "SELECT * FROM PDI_Data_Service_JupyterNotebook"):
+        ...                                 # one DataFrame per chunk
+    df = read_dataframe(conn, sql)          # all chunks, concatenated
+    write_parquet(conn, sql, "result.parquet")
+
+Each chunk of fetchmany() rows is transposed into one NumPy array per
+column, typed from the JDBC column types in cursor.description (integers
+with NULLs become nullable Int64, dates and timestamps datetime64), so
+memory use of read_frames() and write_parquet() depends on the chunk
+size, not on the size of the result. write_parquet() needs pyarrow.
+
+Connecting is the expensive part of a short query: the JVM has to start
+and the driver has to talk to the PDI server before the first row. The
+JVM is therefore started once per process (with the jar list read once),
+and connections are kept in a pool per server and user:
+
+    with connection() as conn:              # from the default pool
+        df = read_dataframe(conn, sql)
+    df = query(sql)                         # the same in one call
+
+A pooled connection is checked before it is handed out (JDBC isValid(),
+or isClosed() if the driver does not implement it), and replaced if the
+server dropped it.
+
+Every query runs the transformation behind the data service. fetch()
+keeps that to what an experiment needs, and to one run per experiment:
+
+    df = fetch("PDI_Data_Service_JupyterNotebook",
+               columns=["temperature", "pressure", "rpm", "failure"],
+               where=[("temperature", ">", 100)], limit=100000, version="2018-09")
+
+- The column list, the filters and the row limit are written into the SQL
+  (build_sql()), so the server only sends those columns and rows.
+- sample keeps a random fraction of the rows; the data service SQL has no
+  sampling clause, so this is done chunk by chunk while reading (it saves
+  memory, not transfer; combine it with limit).
+- The result is cached as a Parquet file in CACHE_DIR, keyed by the SQL,
+  the sample and the version string. A cached result is used until it is
+  older than ttl seconds; change version (e.g. to the date the service
+  transformation changed) to read fresh data right away. Without pyarrow
+  the cache is skipped and every call reads from the server.
+"""
+
+import atexit
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import json
+import numbers
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Pentaho installation and the data service endpoint used in the lab
+JDBC_DIR = "/opt/pentaho/design-tools/data-integration/Data Service JDBC Driver/pdi-dataservice-client"
+DRIVER_CLASS = "org.pentaho.di.trans.dataservice.jdbc.ThinDriver"
+URL = "jdbc:pdi://localhost:8080/kettle?webappname=pentaho"
+
+# Rows per fetchmany() call and per DataFrame
+CHUNK_SIZE = 10000
+
+# Result cache of fetch(), and seconds a cached result is used
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pdi_dataservice")
+CACHE_TTL = 3600
+
+# Operators build_sql() accepts in filters
+OPERATORS = ("=", "<>", "!=", "<", "<=", ">", ">=", "LIKE", "IN", "IS NULL", "IS NOT NULL")
+
+# Connections per pool, and seconds a checkout waits for the server's answer
+POOL_SIZE = 4
+VALIDATION_TIMEOUT = 5
+
+_jvm_lock = threading.Lock()
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def jdbc_jars(jdbc_dir=JDBC_DIR):
+    """
+    List the jar files of the data service client (read once per folder).
+
+    Args:
+        jdbc_dir (str): pdi-dataservice-client folder of the PDI installation
+
+    Returns:
+        tuple: Jar paths, sorted
+    """
+    return tuple(sorted(os.path.join(jdbc_dir, name) for name in os.listdir(jdbc_dir)
+                        if os.path.isfile(os.path.join(jdbc_dir, name))))
+
+
+def start_jvm(jdbc_dir=JDBC_DIR):
+    """
+    Start the JVM with the data service client on the class path, once per process.
+
+    jaydebeapi would start it on the first connect() as well, but a JVM can
+    only be started once, so it is started here with the jars of the
+    driver. Later calls return right away.
+
+    Args:
+        jdbc_dir (str): pdi-dataservice-client folder
+    """
+    import jpype
+
+    with _jvm_lock:
+        if not jpype.isJVMStarted():
+            # convertStrings: Java strings arrive as Python str, as with jaydebeapi's own start
+            jpype.startJVM(jpype.getDefaultJVMPath(), "-Djava.class.path=" + os.pathsep.join(jdbc_jars(jdbc_dir)),
+                           convertStrings=True)
+
+
+def connect(url=URL, user="admin", password="password", jdbc_dir=JDBC_DIR):
+    """
+    Open a new connection to the PDI server's data services (see connection()
+    for pooled connections).
+
+    Args:
+        url (str): Thin driver URL (jdbc:pdi://<host>:<port>/kettle?webappname=pentaho)
+        user (str): PDI server user
+        password (str): Password
+        jdbc_dir (str): pdi-dataservice-client folder
+
+    Returns:
+        jaydebeapi.Connection: DB-API connection
+    """
+    import jaydebeapi
+
+    start_jvm(jdbc_dir)
+    return jaydebeapi.connect(DRIVER_CLASS, url, [user, password], list(jdbc_jars(jdbc_dir)))
+
+
+def is_healthy(conn, timeout=VALIDATION_TIMEOUT):
+    """
+    Check that a connection can still be used.
+
+    Args:
+        conn (jaydebeapi.Connection): Connection to check
+        timeout (int): Seconds to wait for the server
+
+    Returns:
+        bool: False if the connection is closed or the server dropped it
+    """
+    try:
+        return bool(conn.jconn.isValid(timeout))
+    except Exception:
+        # Drivers without JDBC 4 validation
+        try:
+            return not conn.jconn.isClosed()
+        except Exception:
+            return False
+
+
+class ConnectionPool:
+    """
+    Reusable connections to one data service server and user.
+
+    Up to size connections are open at a time; connection() waits for a free
+    one when all are in use. Idle connections are checked by is_healthy()
+    before they are handed out again.
+
+    Usage:
+        pool = ConnectionPool(url, "admin", "password")
+        with pool.connection() as conn:
+            df = read_dataframe(conn, sql)
+    """
+
+    def __init__(self, url=URL, user="admin", password="password", jdbc_dir=JDBC_DIR, size=POOL_SIZE):
+        self.url = url
+        self.user = user
+        self.password = password
+        self.jdbc_dir = jdbc_dir
+        # Most recently returned first: its connection is the least likely to have timed out
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.closed = False
+
+    def checkout(self):
+        """Get a healthy idle connection, or open a new one."""
+        while True:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                return connect(self.url, self.user, self.password, self.jdbc_dir)
+            if is_healthy(conn):
+                return conn
+            close_quietly(conn)
+
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        """
+        Borrow a connection for the duration of a with block.
+
+        Args:
+            timeout (float): Seconds to wait for a free connection (None = no limit)
+
+        Yields:
+            jaydebeapi.Connection: Connection, returned to the pool afterwards
+        """
+        if self.closed:
+            raise RuntimeError("The connection pool is closed")
+        if not self.slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No free data service connection within {timeout}s")
+        try:
+            conn = self.checkout()
+        except BaseException:
+            self.slots.release()
+            raise
+        try:
+            yield conn
+        finally:
+            if self.closed:
+                close_quietly(conn)
+            else:
+                self.idle.put(conn)
+            self.slots.release()
+
+    def close(self):
+        """Close the idle connections; connections in use are closed when they are returned."""
+        self.closed = True
+        while True:
+            try:
+                close_quietly(self.idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def get_pool(url=URL, user="admin", password="password", jdbc_dir=JDBC_DIR):
+    """
+    Get the process-wide pool of a server and user, created on first use.
+
+    Args:
+        url (str): Thin driver URL
+        user (str): PDI server user
+        password (str): Password (used when the pool is created)
+        jdbc_dir (str): pdi-dataservice-client folder
+
+    Returns:
+        ConnectionPool: Shared pool
+    """
+    with _pools_lock:
+        pool = _pools.get((url, user))
+        if pool is None:
+            pool = _pools[(url, user)] = ConnectionPool(url, user, password, jdbc_dir)
+        return pool
+
+
+def connection(timeout=None, **server):
+    """
+    Borrow a connection from the pool of get_pool(**server).
+
+    Usage:
+        with connection() as conn:
+            df = read_dataframe(conn, sql)
+    """
+    return get_pool(**server).connection(timeout)
+
+
+def query(sql, chunk_size=CHUNK_SIZE, **server):
+    """
+    Run a query on a pooled connection and return its whole result.
+
+    Args:
+        sql (str): SQL query on a data service
+        chunk_size (int): Rows per fetch
+        **server: url, user, password and jdbc_dir for get_pool()
+
+    Returns:
+        pandas.DataFrame: Result
+    """
+    with connection(**server) as conn:
+        return read_dataframe(conn, sql, chunk_size)
+
+
+@atexit.register
+def close_pools():
+    """Close the connections of all pools (run at interpreter exit)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def column_kinds(description):
+    """
+    Map the columns of a result to the kinds of arrays they are read into.
+
+    jaydebeapi reports the JDBC type of a column as one of its type objects
+    (NUMBER, FLOAT, DECIMAL, DATE, DATETIME, ...); values arrive as Python
+    ints, floats and strings (dates and timestamps as ISO strings).
+
+    Args:
+        description (list): cursor.description
+
+    Returns:
+        list: "int", "float", "datetime", "bytes" or "object" per column
+    """
+    import jaydebeapi
+
+    kinds = {id(jaydebeapi.NUMBER): "int", id(jaydebeapi.FLOAT): "float", id(jaydebeapi.DECIMAL): "float",
+             id(jaydebeapi.DATE): "datetime", id(jaydebeapi.DATETIME): "datetime", id(jaydebeapi.BINARY): "bytes"}
+    return [kinds.get(id(column[1]), "object") for column in description]
+
+
+def to_array(values, kind):
+    """
+    Convert the values of one column of a chunk.
+
+    Args:
+        values (tuple): Column values, None for NULL
+        kind (str): Kind from column_kinds()
+
+    Returns:
+        array-like: NumPy array or pandas extension array
+    """
+    if kind == "float":
+        # NumPy turns None into NaN for float arrays
+        return np.array(values, dtype=np.float64)
+    data = np.array(values, dtype=object)
+    if kind == "int":
+        mask = np.equal(data, None)
+        data[mask] = 0
+        return pd.arrays.IntegerArray(data.astype(np.int64), mask)
+    if kind == "datetime":
+        return pd.to_datetime(data, errors="coerce")
+    return data
+
+
+def iter_frames(cursor, chunk_size=CHUNK_SIZE, sample=None, seed=None):
+    """
+    Read the result of an executed cursor as DataFrames of up to chunk_size rows.
+
+    Args:
+        cursor: DB-API cursor after execute()
+        chunk_size (int): Rows per DataFrame
+        sample (float): Fraction of the rows to keep, each row with this
+                        probability (None = all rows)
+        seed (int): Random seed of the sample, for repeatable samples
+
+    Yields:
+        pandas.DataFrame: Next chunk of the result (an empty one with the
+        columns of the result if it has no rows)
+    """
+    names = [column[0] for column in cursor.description]
+    kinds = column_kinds(cursor.description)
+    rng = np.random.default_rng(seed) if sample is not None else None
+
+    def frame(rows):
+        # Transpose the rows into one tuple of values per column
+        columns = zip(*rows) if rows else [()] * len(names)
+        return pd.DataFrame({name: to_array(values, kind) for name, kind, values in zip(names, kinds, columns)})
+
+    chunks = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            if not chunks:
+                yield frame([])
+            return
+        if rng is not None:
+            rows = [row for row, keep in zip(rows, rng.random(len(rows)) < sample) if keep]
+            if not rows:
+                continue
+        yield frame(rows)
+        chunks += 1
+
+
+def read_frames(conn, sql, chunk_size=CHUNK_SIZE, sample=None, seed=None):
+    """
+    Run a query and yield its result in chunks (see iter_frames()).
+
+    Args:
+        conn: Connection from connect()
+        sql (str): SQL query on a data service
+        chunk_size (int): Rows per DataFrame
+        sample (float): Fraction of the rows to keep (None = all)
+        seed (int): Random seed of the sample
+
+    Yields:
+        pandas.DataFrame: Next chunk of the result
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql)
+        yield from iter_frames(cursor, chunk_size, sample, seed)
+    finally:
+        cursor.close()
+
+
+def read_dataframe(conn, sql, chunk_size=CHUNK_SIZE, sample=None, seed=None):
+    """
+    Run a query and return its whole result.
+
+    Args:
+        conn: Connection from connect()
+        sql (str): SQL query on a data service
+        chunk_size (int): Rows per fetch
+        sample (float): Fraction of the rows to keep (None = all)
+        seed (int): Random seed of the sample
+
+    Returns:
+        pandas.DataFrame: Result, typed like the chunks of read_frames()
+    """
+    frames = list(read_frames(conn, sql, chunk_size, sample, seed))
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def arrow_schema(description):
+    """
+    Get the Parquet (Arrow) schema of a result from its JDBC column types.
+
+    Args:
+        description (list): cursor.description
+
+    Returns:
+        pyarrow.Schema: Schema every chunk is written with
+    """
+    import pyarrow as pa
+
+    types = {"int": pa.int64(), "float": pa.float64(), "datetime": pa.timestamp("ns"),
+             "bytes": pa.binary(), "object": pa.string()}
+    return pa.schema([(column[0], types[kind]) for column, kind in zip(description, column_kinds(description))])
+
+
+def write_parquet(conn, sql, path, chunk_size=CHUNK_SIZE, sample=None, seed=None):
+    """
+    Run a query and write its result to a Parquet file, one row group per chunk.
+
+    Args:
+        conn: Connection from connect()
+        sql (str): SQL query on a data service
+        path (str): Parquet file to write
+        chunk_size (int): Rows per fetch and row group
+        sample (float): Fraction of the rows to keep (None = all)
+        seed (int): Random seed of the sample
+
+    Returns:
+        int: Rows written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql)
+        schema = arrow_schema(cursor.description)
+        with pq.ParquetWriter(path, schema) as writer:
+            for df in iter_frames(cursor, chunk_size, sample, seed):
+                writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+                rows += len(df)
+    finally:
+        cursor.close()
+    return rows
+
+
+def quote_identifier(name):
+    """Quote a column or data service name for the Thin driver's SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def quote_value(value):
+    """Write a Python value as an SQL literal (strings quoted, None as NULL)."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, numbers.Number):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_sql(service, columns=None, where=None, order_by=None, limit=None):
+    """
+    Build a SELECT on a data service with the projection, filters and limit in the SQL.
+
+    Args:
+        service (str): Data service name
+        columns (list): Columns to read (None = all)
+        where: Filters, combined with AND: a dict {column: value} (None
+               matches NULL, a list or tuple matches any of its values) or a
+               list of (column, operator, value) tuples with an operator from
+               OPERATORS (the value is left out for IS NULL / IS NOT NULL)
+        order_by (list): Columns to sort by; "-column" sorts descending
+        limit (int): Largest number of rows
+
+    Returns:
+        str: SQL query
+    """
+    sql = "SELECT " + (", ".join(quote_identifier(column) for column in columns) if columns else "*")
+    sql += " FROM " + quote_identifier(service)
+
+    if isinstance(where, dict):
+        where = [(column, "IS NULL" if value is None else "IN" if isinstance(value, (list, tuple)) else "=",
+                  value) for column, value in where.items()]
+    conditions = []
+    for condition in where or []:
+        column, operator = condition[0], condition[1].upper()
+        if operator not in OPERATORS:
+            raise ValueError(f"Unsupported operator {condition[1]!r}, expected one of {', '.join(OPERATORS)}")
+        if operator in ("IS NULL", "IS NOT NULL"):
+            conditions.append(f"{quote_identifier(column)} {operator}")
+        elif operator == "IN":
+            values = ", ".join(quote_value(value) for value in condition[2])
+            conditions.append(f"{quote_identifier(column)} IN ({values})")
+        else:
+            conditions.append(f"{quote_identifier(column)} {operator} {quote_value(condition[2])}")
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+
+    if order_by:
+        sql += " ORDER BY " + ", ".join(quote_identifier(column[1:]) + " DESC" if column.startswith("-")
+                                        else quote_identifier(column) for column in order_by)
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return sql
+
+
+def fetch(service, columns=None, where=None, order_by=None, limit=None, sample=None, seed=None,
+          version=None, ttl=CACHE_TTL, cache_dir=CACHE_DIR, pool=None, chunk_size=CHUNK_SIZE, **server):
+    """
+    Read from a data service with pushdown (see build_sql()) and a Parquet result cache.
+
+    Args:
+        service (str): Data service name
+        columns, where, order_by, limit: See build_sql()
+        sample (float): Fraction of the rows to keep (None = all)
+        seed (int): Random seed of the sample (cached samples need one to
+                    be the same sample on every run)
+        version (str): Version of the data service; part of the cache key
+        ttl (float): Seconds a cached result is used (None = until version
+                     changes, 0 = refresh now)
+        cache_dir (str): Cache folder (None = no cache; not used either when
+                         pyarrow is not installed)
+        pool (ConnectionPool): Pool to read from (default: get_pool(**server))
+        chunk_size (int): Rows per fetch
+        **server: url, user, password and jdbc_dir for get_pool()
+
+    Returns:
+        pandas.DataFrame: Result
+    """
+    sql = build_sql(service, columns, where, order_by, limit)
+    pool = pool or get_pool(**server)
+    if cache_dir is None or importlib.util.find_spec("pyarrow") is None:
+        with pool.connection() as conn:
+            return read_dataframe(conn, sql, chunk_size, sample, seed)
+
+    key = json.dumps({"sql": sql, "sample": sample, "seed": seed, "version": version}, sort_keys=True)
+    path = os.path.join(cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".parquet")
+    if os.path.exists(path) and (ttl is None or time.time() - os.path.getmtime(path) < ttl):
+        return read_cached(path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with pool.connection() as conn:
+            write_parquet(conn, sql, temp_path, chunk_size, sample, seed)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return read_cached(path)
+
+
+def read_cached(path):
+    """Read a cached result with the column types of read_dataframe() (nullable Int64 integers)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path, memory_map=True).to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+
+def clear_cache(cache_dir=CACHE_DIR, older_than=None):
+    """
+    Delete cached results.
+
+    Args:
+        cache_dir (str): Cache folder
+        older_than (float): Only results older than this many seconds (None = all)
+
+    Returns:
+        int: Files deleted
+    """
+    deleted = 0
+    if not os.path.isdir(cache_dir):
+        return deleted
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.endswith(".parquet") and (older_than is None or time.time() - os.path.getmtime(path) > older_than):
+            os.remove(path)
+            deleted += 1
+    return deleted
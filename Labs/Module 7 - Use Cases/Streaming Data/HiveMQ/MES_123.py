@@ -1,43 +1,34 @@
-import paho.mqtt.client as mqtt
-import json
-import random
-import time
+import argparse
+import os
+import sys
+
+# Shared simulator helpers live in "Streaming Data/sensorsim"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from sensorsim import models, mqtt_load
 
 # MQTT broker configuration
 broker_address = "localhost"
 broker_port = 1883
 topic = "industrial_robot/sensor_data"
 
-# Robot ID
-robot_id = "MES_123"
-
-# Connect to MQTT broker
-client = mqtt.Client()
-client.connect(broker_address, broker_port)
-
-# Generate and publish data continuously
-while True:
-    # Generate random sensor data
-    temperature = round(random.uniform(20, 30), 2)  # Temperature in Celsius
-    loading_factor = round(random.uniform(0, 1), 2)  # Loading factor (0-1)
-    force_torque = round(random.uniform(-10, 10), 2)  # Force-torque readings (Nm)
-    vibration = round(random.uniform(0, 1), 2)  # Vibration (0-1)
-    position = [round(random.uniform(-100, 100), 2) for i in range(3)]  # Position (x, y, z) in mm
-    lidar_detection = random.choice(["obstacle", "none"])  # LIDAR detection
-
-    # Create JSON payload
-    message = {
-        "robot_id": robot_id,
-        "temperature": temperature,
-        "loading_factor": loading_factor,
-        "force_torque": force_torque,
-        "vibration": vibration,
-        "position": position,
-        "lidar_detection": lidar_detection
-    }
-
-    # Publish JSON payload to MQTT broker
-    client.publish(topic, json.dumps(message))
-
-    # Wait for 1 second before generating the next data
-    time.sleep(1)
\ No newline at end of file
+# Robot ID (further simulated robots are numbered MES_124, MES_125, ...)
+robot_prefix = "MES_"
+robot_number = 123
+
+# Messages per second over all robots
+publish_rate = 1
+
+
+# Sensor readings of one robot (generated in NumPy batches, see sensorsim/models.py)
+robot_model = models.industrial_robot()
+
+
+if __name__ == '__main__':
+    # Defaults simulate the single robot MES_123 at 1 message/second;
+    # e.g. --devices 500 --rate 20000 --qos 1 --processes 4 --profile drift --format avro for a load test
+    parser = argparse.ArgumentParser(description="Simulate industrial robots publishing sensor data to MQTT")
+    mqtt_load.add_arguments(parser, topic=topic, device_prefix=robot_prefix, first_device=robot_number,
+                            rate=publish_rate, schema="industrial_robot.avsc")
+    parser.set_defaults(broker=broker_address, port=broker_port)
+
+    mqtt_load.run(parser.parse_args(), robot_model)
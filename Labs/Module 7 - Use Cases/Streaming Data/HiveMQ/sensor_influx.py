@@ -1,9 +1,16 @@
 import paho.mqtt.client as mqtt
+import argparse
+import os
 import random
+import sys
 import time, datetime
-from influxdb_client import InfluxDBClient, Point, WritePrecision
+from influxdb_client import InfluxDBClient, Point, WritePrecision, WriteOptions
 from influxdb_client.client.write_api import SYNCHRONOUS
 
+# Shared simulator helpers live in "Streaming Data/sensorsim"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from sensorsim import encoding
+
 # InfluxDB 2 credentials
 influx_url = "http://localhost:8086"
 influx_token = "59unbLyQ7lyQjHeu1fgVfCwRrqI5HgoaNLac7n-px7-hL2hQ7x4BByyjKx6JavSu07t2ffLpJVHfdsdsyCniew=="
@@ -17,34 +24,171 @@ mqtt_username = 'mosquitto'
 mqtt_password = 'mosquitto'
 mqtt_topic = "sensors/temperature-humidity"
 
-# Create InfluxDB client and write API
-influx_client = InfluxDBClient(url=influx_url, token=influx_token, org=influx_org)
-write_api = influx_client.write_api(write_options=SYNCHRONOUS)
+# Seconds between samples (use 0 to generate as fast as possible)
+sample_interval = 3
+
+# InfluxDB batching: points are buffered and written by a background thread,
+# so the MQTT publish path never waits for an HTTP round-trip
+batch_size = 5000          # Points per write request
+flush_interval = 1000      # Write a partial batch after this many ms
+jitter_interval = 0        # Random delay (ms) added to flushes, spreads load of many writers
+retry_interval = 5000      # First retry delay (ms) after a failed write
+max_retries = 5            # Retries before a batch is dropped
+max_retry_delay = 30000    # Upper bound (ms) for the exponential backoff
+exponential_base = 2       # Backoff multiplier per retry
+
+# Measurement and tag written by this sensor
+measurement = "temperature-humidity"
+sensor_tag = "DHT22"
+
+
+# Count what the background writer did with our batches
+class WriteStats:
+    def __init__(self):
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+
+    @staticmethod
+    def points(data):
+        # Batches arrive as line protocol, one point per line
+        if isinstance(data, bytes):
+            return data.count(b"\n") + 1
+        return data.count("\n") + 1
+
+    def success(self, conf, data):
+        self.written += self.points(data)
 
-# Create MQTT client and connect to broker
-mqtt_client = mqtt.Client()
-mqtt_client.username_pw_set(mqtt_username, mqtt_password)
-mqtt_client.connect(mqtt_broker, mqtt_port)
+    def error(self, conf, data, exception):
+        self.failed += self.points(data)
+        print(f"InfluxDB write failed: {exception}")
 
-# Generate and publish sensor data every 10 seconds
-while True:
-    # Generate random temperature and humidity values between 20 and 30
-    temperature = round(random.uniform(20, 30), 2)
-    humidity = round(random.uniform(20, 30), 2)
+    def retry(self, conf, data, exception):
+        self.retries += 1
+        print(f"InfluxDB write retry: {exception}")
 
-    # Create InfluxDB point and write to database
-    point = Point("temperature-humidity") \
-        .tag("sensor", "DHT22") \
+
+# Create InfluxDB write API, batching (default) or one synchronous request per point
+def create_write_api(influx_client, args, stats):
+    if args.sync:
+        return influx_client.write_api(write_options=SYNCHRONOUS)
+
+    write_options = WriteOptions(batch_size=args.batch_size,
+                                 flush_interval=args.flush_interval,
+                                 jitter_interval=args.jitter_interval,
+                                 retry_interval=retry_interval,
+                                 max_retries=max_retries,
+                                 max_retry_delay=max_retry_delay,
+                                 exponential_base=exponential_base)
+    return influx_client.write_api(write_options=write_options,
+                                   success_callback=stats.success,
+                                   error_callback=stats.error,
+                                   retry_callback=stats.retry)
+
+
+# Create the InfluxDB record for one sample
+def create_record(temperature, humidity, line_protocol):
+    if line_protocol:
+        # Fast path: line protocol string, no Point object to build and serialize
+        return f"{measurement},sensor={sensor_tag} temperature={temperature},humidity={humidity} {time.time_ns()}"
+
+    return Point(measurement) \
+        .tag("sensor", sensor_tag) \
         .field("temperature", temperature) \
         .field("humidity", humidity) \
         .time(datetime.datetime.utcnow(), WritePrecision.NS)
-    write_api.write(influx_bucket, influx_org, point)
 
-    # Publish sensor data to MQTT broker
-    mqtt_client.publish(mqtt_topic, f"temperature={temperature},humidity={humidity}")
-    
-    # Print message to Terminal
-    print(f"temperature={temperature},humidity={humidity}")
 
-    # Wait 3 seconds before generating and publishing the next data point
-    time.sleep(3)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Publish temperature/humidity samples to MQTT and InfluxDB")
+    parser.add_argument('--interval', type=float, default=sample_interval,
+                        help=f"Seconds between samples, 0 = as fast as possible [{sample_interval}]")
+    parser.add_argument('--count', type=int, default=0,
+                        help="Stop after this many samples, 0 = run forever [0]")
+    parser.add_argument('--batch-size', type=int, default=batch_size,
+                        help=f"Points per InfluxDB write request [{batch_size}]")
+    parser.add_argument('--flush-interval', type=int, default=flush_interval,
+                        help=f"Write a partial batch after this many ms [{flush_interval}]")
+    parser.add_argument('--jitter-interval', type=int, default=jitter_interval,
+                        help=f"Random delay in ms added to each flush [{jitter_interval}]")
+    parser.add_argument('--line-protocol', action='store_true',
+                        help="Write line protocol strings instead of Point objects (faster)")
+    parser.add_argument('--sync', action='store_true',
+                        help="Write every point synchronously (original behavior, slow)")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Do not print every sample, print a rate summary every 5 seconds instead")
+    # MQTT payload: "temperature=..,humidity=.." text (original) or JSON/MessagePack/Avro
+    encoding.add_arguments(parser, schema="temperature_humidity.avsc",
+                           formats=(encoding.TEXT_FORMAT,) + encoding.FORMATS)
+    return parser.parse_args()
+
+
+def run():
+    args = parse_args()
+    stats = WriteStats()
+    codec = encoding.create_codec(args)
+
+    # Create InfluxDB client and write API
+    influx_client = InfluxDBClient(url=influx_url, token=influx_token, org=influx_org)
+    write_api = create_write_api(influx_client, args, stats)
+
+    # Create MQTT client and connect to broker
+    mqtt_client = mqtt.Client()
+    mqtt_client.username_pw_set(mqtt_username, mqtt_password)
+    mqtt_client.connect(mqtt_broker, mqtt_port)
+    # Network loop in a background thread, so publish() does not block on the socket
+    mqtt_client.loop_start()
+
+    samples = 0
+    started = time.monotonic()
+    next_sample = started
+    next_report = started + 5
+
+    try:
+        # Generate and publish sensor data
+        while args.count == 0 or samples < args.count:
+            # Generate random temperature and humidity values between 20 and 30
+            temperature = round(random.uniform(20, 30), 2)
+            humidity = round(random.uniform(20, 30), 2)
+
+            # Hand the sample to the InfluxDB writer (buffered unless --sync)
+            write_api.write(influx_bucket, influx_org, create_record(temperature, humidity, args.line_protocol),
+                            write_precision=WritePrecision.NS)
+
+            # Publish sensor data to MQTT broker
+            sample = {"temperature": temperature, "humidity": humidity}
+            payload = codec.encode(sample)
+            mqtt_client.publish(mqtt_topic, payload)
+            samples += 1
+
+            now = time.monotonic()
+            if not args.quiet:
+                # Print message to Terminal
+                print(encoding.printable(codec, sample, payload))
+            elif now >= next_report:
+                print(f"{samples} samples, {samples / (now - started):.0f}/s, "
+                      f"InfluxDB written={stats.written} failed={stats.failed} retries={stats.retries}")
+                next_report = now + 5
+
+            # Wait until the next sample is due (keeps the rate even if publishing took time)
+            if args.interval > 0:
+                next_sample += args.interval
+                delay = next_sample - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Flush the points still buffered before exiting
+        write_api.close()
+        influx_client.close()
+        mqtt_client.loop_stop()
+        mqtt_client.disconnect()
+
+    elapsed = time.monotonic() - started
+    print(f"Sent {samples} samples in {elapsed:.1f}s ({samples / elapsed if elapsed else 0:.0f}/s), "
+          f"InfluxDB written={stats.written} failed={stats.failed} retries={stats.retries}")
+
+
+if __name__ == '__main__':
+    run()
@@ -1,9 +1,20 @@
 # python 3.10
 
+import argparse
+import os
+import queue
 import random
+import sys
+import time
 
 from paho.mqtt import client as mqtt_client
 
+# Shared simulator helpers live in "Streaming Data/sensorsim"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from sensorsim import encoding, ingest, tracing
+from sensorsim.recording import RecordingWriter
+from sensorsim.mqtt_load import create_client
+
 # MQTT settings
 broker = 'localhost'
 port = 1883
@@ -13,34 +24,154 @@ client_id = f'subscribe-{random.randint(0, 100)}'
 # username = 'emqx'
 # password = 'public'
 
+# Messages buffered between the MQTT network thread and the writer;
+# when the writer falls behind, further messages are dropped (and counted)
+queue_size = 100000
+
+
+# Count received and dropped messages (updated on the MQTT network thread)
+class ReceiveStats:
+    def __init__(self):
+        self.received = 0
+        self.dropped = 0
+
+
 # Connect to MQTT broker
-def connect_mqtt() -> mqtt_client:
+def connect_mqtt(args) -> mqtt_client:
     def on_connect(client, userdata, flags, rc):
         if rc == 0:
             print("Connected to MQTT Broker!")
+            # (Re)subscribe on every connect, so a reconnect restores the subscription
+            client.subscribe(subscription_topic(args), qos=args.qos)
         else:
             print("Failed to connect, return code %d\n", rc)
 
-    # client = mqtt_client.Client(client_id)
-    client = mqtt_client.Client(client_id=client_id, callback_api_version=mqtt_client.CallbackAPIVersion.VERSION1)
-    # client.username_pw_set(username, password)
+    # A unique client ID per process, several processes can share a subscription
+    client = create_client(f'{client_id}-{os.getpid()}')
+    if args.username:
+        client.username_pw_set(args.username, args.password)
     client.on_connect = on_connect
-    client.connect(broker, port)
+    client.connect(args.broker, args.port)
     return client
 
-# Subscribe sensor data
-def subscribe(client: mqtt_client):
+
+# Shared subscriptions ($share/<group>/<topic>) split the messages of a topic between the group members
+def subscription_topic(args):
+    if args.share:
+        return f"$share/{args.share}/{args.topic}"
+    return args.topic
+
+
+# Subscribe sensor data: on_message only queues the message, the ingest worker decodes and stores it
+def subscribe(client: mqtt_client, buffer, stats):
     def on_message(client, userdata, msg):
-        print(f"Received `{msg.payload.decode()}` from `{msg.topic}` topic")
+        stats.received += 1
+        try:
+            buffer.put_nowait((time.time(), msg.topic, msg.payload))
+        except queue.Full:
+            stats.dropped += 1
 
-    client.subscribe(topic)
     client.on_message = on_message
 
+
+# Print rates, drops and the writer backlog, plus latency and loss of traced messages
+def report(stats, worker, buffer, previous):
+    now = time.monotonic()
+    rate = (stats.received - previous[1]) / (now - previous[0]) if now > previous[0] else 0.0
+    print(f"received={stats.received} rate={rate:.0f}/s written={worker.written} dropped={stats.dropped} "
+          f"decode-errors={worker.errors} queued={buffer.qsize()}")
+    if worker.tracer.traced:
+        print(f"  trace: {worker.tracer.summary()}")
+    return now, stats.received
+
+
+# Prometheus metrics page: subscriber counters and the trace statistics
+def metrics(stats, worker):
+    return worker.tracer.prometheus({
+        "sensorsim_messages_received_total": ("Messages received from the broker", stats.received),
+        "sensorsim_messages_dropped_total": ("Messages dropped because the writer fell behind", stats.dropped),
+        "sensorsim_messages_written_total": ("Messages written to the store", worker.written),
+        "sensorsim_decode_errors_total": ("Payloads that could not be decoded", worker.errors),
+    })
+
+
 # Main function
 def run():
-    client = connect_mqtt()
-    subscribe(client)
-    client.loop_forever()
+    # Defaults print every message like the original script; e.g.
+    # --quiet --store sqlite --output sensor_data.db --share plant --qos 1
+    # in several processes to split the topic between them; add --format msgpack or
+    # --format avro --schema industrial_robot.avsc to match the publishing simulator;
+    # --metrics-port 9105 exports the end-to-end latency and loss of the traced messages to Prometheus
+    parser = argparse.ArgumentParser(description="Subscribe to sensor data and store it in batches")
+    parser.add_argument('--broker', default=broker, help=f"MQTT broker host [{broker}]")
+    parser.add_argument('--port', type=int, default=port, help=f"MQTT broker port [{port}]")
+    parser.add_argument('--username', help="MQTT username")
+    parser.add_argument('--password', help="MQTT password")
+    parser.add_argument('--topic', default=topic, help=f"Topic filter [{topic}]")
+    parser.add_argument('--share', metavar='GROUP',
+                        help="Join the shared subscription $share/GROUP/<topic>, run several subscribers "
+                             "with the same group to split the messages")
+    parser.add_argument('--qos', type=int, choices=[0, 1, 2], default=0, help="Subscription QoS [0]")
+    parser.add_argument('--store', choices=ingest.STORES, default="none",
+                        help="Write messages to SQLite, CSV or Parquet [none]")
+    parser.add_argument('--output',
+                        help="Output file, '{pid}' is replaced by the process ID "
+                             "[sensor_data.db, sensor_data.csv or sensor_data.parquet]")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Rows per write [5000]")
+    parser.add_argument('--flush-interval', type=float, default=1.0,
+                        help="Write a partial batch after this many seconds [1]")
+    parser.add_argument('--record', metavar='FILE',
+                        help="Also append the raw messages to a recording for replay.py, "
+                             "'{pid}' is replaced by the process ID")
+    parser.add_argument('--queue-size', type=int, default=queue_size,
+                        help=f"Buffered messages before dropping [{queue_size}]")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Serve Prometheus metrics (rates, drops, end-to-end latency, gaps) on "
+                             "http://<host>:PORT/metrics")
+    parser.add_argument('--report-interval', type=float, default=5.0,
+                        help="Seconds between rate reports, 0 = no reports [5]")
+    parser.add_argument('--print', dest='print_messages', action='store_true', default=True,
+                        help="Print every message (default)")
+    parser.add_argument('--quiet', dest='print_messages', action='store_false',
+                        help="Do not print every message")
+    # Payload decoder, must match the --format of the publishing simulator
+    encoding.add_arguments(parser, formats=encoding.FORMATS + (encoding.TEXT_FORMAT,))
+    args = parser.parse_args()
+    if args.output is None and args.store != "none":
+        args.output = "sensor_data" + ingest.EXTENSIONS[args.store]
+    codec = encoding.create_codec(args)
+
+    buffer = queue.Queue(maxsize=args.queue_size)
+    stats = ReceiveStats()
+    recorder = None
+    if args.record:
+        recorder = RecordingWriter(args.record.replace("{pid}", str(os.getpid())), args.format, source=args.topic)
+    worker = ingest.IngestWorker(buffer, ingest.open_store(args.store, args.output), batch_size=args.batch_size,
+                                 flush_interval=args.flush_interval, decode=codec.decode,
+                                 print_messages=args.print_messages, recorder=recorder,
+                                 tracer=tracing.TraceStats())
+    worker.start()
+    if args.metrics_port:
+        tracing.MetricsServer(args.metrics_port, lambda: metrics(stats, worker)).start()
+
+    client = connect_mqtt(args)
+    subscribe(client, buffer, stats)
+    client.loop_start()
+
+    previous = (time.monotonic(), 0)
+    try:
+        while worker.is_alive():
+            time.sleep(args.report_interval or 1.0)
+            if args.report_interval:
+                previous = report(stats, worker, buffer, previous)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.loop_stop()
+        client.disconnect()
+        worker.stop()
+        print("Final:")
+        report(stats, worker, buffer, previous)
 
 if __name__ == '__main__':
-    run()
\ No newline at end of file
+    run()
@@ -1,35 +1,33 @@
-import pika
-import random
-import time
-import json
+import argparse
+import os
+import sys
+
+# Shared simulator helpers live in "Streaming Data/sensorsim"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from sensorsim import amqp_load, models
 
 # RabbitMQ settings
 rabbitmq_host = 'localhost'
 port = 5672
 queue_name = 'tv_room'
 
-# Generate random sensor data
-def generate_sensor_data():
-    return {
-        'temperature': random.uniform(20.0, 100.0),
-        'pressure': random.uniform(800.0, 1200.0),
-        'humidity': random.uniform(30.0, 80.0)
-    }
+# Messages per second
+publish_rate = 1
 
-# Publish sensor data to RabbitMQ
-def publish_sensor_data():
-    connection = pika.BlockingConnection(pika.ConnectionParameters(host=rabbitmq_host, port=port))
-    channel = connection.channel()
-    channel.queue_declare(queue=queue_name)
+# TV room sensor readings (generated in NumPy blocks, see sensorsim/models.py)
+tv_room_model = models.tv_room()
 
-    while True:
-        sensor_data = generate_sensor_data()
-        message = json.dumps(sensor_data)
-        channel.basic_publish(exchange='', routing_key=queue_name, body=message)
-        print(f"Sent sensor data: {message}")
-        time.sleep(1)
+# Publish sensor data to RabbitMQ (with publisher confirms, see sensorsim/amqp_load.py)
+def publish_sensor_data():
+    # Defaults publish and print one message per second, like the original loop;
+    # e.g. --rate 0 --connections 4 --channels 2 --window 2000 --durable --lazy --quiet
+    # to load-test the RabbitMQ consumer step in PDI
+    parser = argparse.ArgumentParser(description="Publish simulated TV room sensor data to RabbitMQ")
+    amqp_load.add_arguments(parser, queue=queue_name, rate=publish_rate, print_messages=True,
+                            schema="tv_room.avsc")
+    parser.set_defaults(host=rabbitmq_host, port=port)
 
-    connection.close()
+    amqp_load.run(parser.parse_args(), tv_room_model)
 
 if __name__ == '__main__':
     publish_sensor_data()
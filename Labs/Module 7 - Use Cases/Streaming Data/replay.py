@@ -0,0 +1,136 @@
+# python 3.10
+# Note: requires numpy, plus paho-mqtt, pika or confluent-kafka for the replay target
+# pip3 install numpy paho-mqtt pika confluent-kafka
+
+import argparse
+import os
+import sys
+import time
+
+# Shared simulator helpers live in "Streaming Data/sensorsim"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from sensorsim import encoding, models, recording
+from sensorsim.sinks import create_sink
+
+
+# Write a seeded recording of a simulator's devices (no broker needed)
+def generate(args):
+    model = models.load_model(args.model)
+    model.profile = args.profile
+    model.fault_rate = args.fault_rate
+    model.seed = args.seed
+    model.trace = args.trace
+    codec = encoding.codec_for(args.format, args.schema or models.SCHEMAS.get(args.model))
+    devices = [f"{args.device_prefix}{args.first_device + number}" for number in range(args.devices)]
+    topic = args.topic or models.TOPICS.get(args.model, args.model)
+
+    started = time.monotonic()
+    # With --start the file is identical on every run (the creation time is the start)
+    meta = {"created": args.start} if args.start is not None else {}
+    with recording.RecordingWriter(args.output, args.format, model=args.model, seed=args.seed, **meta) as writer:
+        count = recording.generate(writer, model, devices, args.interval, args.duration, topic, codec,
+                                   start=args.start)
+    elapsed = time.monotonic() - started
+    print(f"Wrote {count} {args.format} messages ({args.duration:g}s of {args.devices} device(s)) to {args.output} "
+          f"in {elapsed:.1f}s, {os.path.getsize(args.output)} bytes")
+
+
+# Print the size and time range of a recording
+def info(args):
+    with recording.RecordingReader(args.recording) as reader:
+        timestamps = reader.timestamps()
+        print(f"{args.recording}: {reader.meta}")
+        if timestamps:
+            span = timestamps[-1] - timestamps[0]
+            print(f"{len(timestamps)} messages over {span:.1f}s "
+                  f"({len(timestamps) / span if span else 0:.0f} msg/s)")
+
+
+# Publish a recording to MQTT, RabbitMQ or Kafka
+def replay(args):
+    config = {"type": args.to, "username": args.username, "password": args.password, "qos": args.qos}
+    if args.to == "mqtt":
+        config.update(broker=args.host, port=args.port or 1883)
+    elif args.to == "amqp":
+        config.update(host=args.host, port=args.port or 5672, username=args.username or "guest",
+                      password=args.password or "guest")
+    else:
+        config.update(bootstrap_servers=args.bootstrap_servers)
+    sink = create_sink(args.to, config)
+
+    with recording.RecordingReader(args.recording) as reader:
+        sink.open()
+        speed = f"{args.speed:g}x" if args.speed > 0 else "max speed"
+        print(f"Replaying {args.recording} ({reader.meta['format']}) to {args.to} at {speed}")
+        started = time.monotonic()
+        try:
+            sent, failed, lateness = recording.replay(reader, sink, speed=args.speed, topic=args.topic,
+                                                      loops=args.loops, batch_size=args.batch_size,
+                                                      report_interval=args.report_interval)
+        finally:
+            sink.close()
+        elapsed = time.monotonic() - started
+        print(f"Sent {sent} messages in {elapsed:.1f}s ({sent / elapsed if elapsed else 0:.0f}/s), "
+              f"failed={failed + sink.errors} lateness {lateness.summary()}")
+
+
+# Main function
+def run():
+    # e.g. python3 replay.py generate --model industrial_robot --devices 1000 --duration 600 --seed 1 -o robots.rec
+    #      python3 replay.py replay robots.rec --to mqtt --speed 10
+    parser = argparse.ArgumentParser(description="Record sensor streams and replay them at 1x, Nx or max speed")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('generate', help="Write a seeded recording of simulated devices")
+    command.add_argument('--model', default="industrial_robot",
+                         help=f"Device model: {', '.join(models.MODELS)} or module:factory [industrial_robot]")
+    command.add_argument('--devices', type=int, default=1, help="Number of devices [1]")
+    command.add_argument('--device-prefix', default="MES_", help="Device ID prefix [MES_]")
+    command.add_argument('--first-device', type=int, default=123, help="Number of the first device [123]")
+    command.add_argument('--interval', type=float, default=1.0, help="Seconds between readings of a device [1]")
+    command.add_argument('--duration', type=float, default=60.0, help="Seconds of simulated time [60]")
+    command.add_argument('--start', type=float, help="Epoch seconds of the first reading [now]")
+    command.add_argument('--topic', help="Topic, '{device}' is replaced by the device ID [topic of the model]")
+    command.add_argument('--profile', choices=("uniform", "drift"), default="uniform", help="Payload profile [uniform]")
+    command.add_argument('--fault-rate', type=float, default=0.0, help="Probability of a faulty reading [0]")
+    command.add_argument('--seed', type=int, default=1, help="Random seed [1]")
+    command.add_argument('--trace', action='store_true',
+                         help="Add the trace fields seq and sent_at; sent_at is the simulated send time of "
+                              "the record, so subscribe.py latencies of a replay include the time since --start")
+    command.add_argument('--format', choices=encoding.FORMATS, default="json", help="Payload encoding [json]")
+    command.add_argument('--schema', help="Avro schema file [schema of the model]")
+    command.add_argument('-o', '--output', required=True, help="Recording file (appended to when it exists)")
+    command.set_defaults(handler=generate)
+
+    command = commands.add_parser('info', help="Show the metadata and time range of a recording")
+    command.add_argument('recording', help="Recording file")
+    command.set_defaults(handler=info)
+
+    command = commands.add_parser('replay', help="Publish a recording")
+    command.add_argument('recording', help="Recording file")
+    command.add_argument('--to', choices=("mqtt", "amqp", "kafka"), default="mqtt", help="Target [mqtt]")
+    command.add_argument('--host', default="localhost", help="MQTT broker or RabbitMQ host [localhost]")
+    command.add_argument('--port', type=int, help="Broker port [1883 for MQTT, 5672 for RabbitMQ]")
+    command.add_argument('--bootstrap-servers', default="localhost:9092", help="Kafka brokers [localhost:9092]")
+    command.add_argument('--username', help="Broker username")
+    command.add_argument('--password', help="Broker password")
+    command.add_argument('--qos', type=int, choices=[0, 1, 2], default=0, help="MQTT QoS level [0]")
+    command.add_argument('--topic', help="Publish to this topic (queue) instead of the recorded ones")
+    command.add_argument('--speed', type=float, default=1.0,
+                         help="1 = recorded pace, 10 = ten times faster, 0 = as fast as possible [1]")
+    command.add_argument('--loops', type=int, default=1, help="Replay this many times, 0 = forever [1]")
+    command.add_argument('--batch-size', type=int, default=1000, help="Largest batch per send [1000]")
+    command.add_argument('--report-interval', type=float, default=5.0,
+                         help="Seconds between progress reports, 0 = none [5]")
+    command.set_defaults(handler=replay)
+
+    args = parser.parse_args()
+    try:
+        args.handler(args)
+    except KeyboardInterrupt:
+        pass
+
+
+# Execute the main function
+if __name__ == '__main__':
+    run()
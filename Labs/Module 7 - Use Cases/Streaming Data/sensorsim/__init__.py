@@ -0,0 +1,24 @@
+"""
+Shared helpers for the streaming lab sensor simulators.
+
+The scripts in HiveMQ/ and RabbitMQ/ add the "Streaming Data" directory to
+sys.path and import from this package:
+
+    import os, sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from sensorsim import mqtt_load
+
+Modules:
+    pacing     - RatePacer: hold a target message rate without sleep() drift
+    stats      - LatencyHistogram: mergeable latency percentiles
+    payloads   - DeviceModel: vectorized (NumPy) readings with drift, noise and faults
+    models     - Device models of the simulator scripts, by name for scenario files
+    encoding   - JSON, MessagePack and Avro payload codecs (Avro schemas in schemas/)
+    mqtt_load  - Multi-device MQTT load generator used by MES_123.py and sensor.py
+    amqp_load  - Pipelined RabbitMQ publisher with confirms used by sensor_tv_room.py
+    ingest     - Bounded queue and batch writer (SQLite, CSV, Parquet) used by subscribe.py
+    tracing    - End-to-end latency, gaps and ordering of traced messages, Prometheus metrics
+    sinks      - MQTT, AMQP, Kafka, InfluxDB, file and recording sinks of the scenario simulator
+    scenario   - YAML scenarios: device groups on an asyncio scheduler, used by simulate.py
+    recording  - Append-only recordings (mmap reader), generation and replay, used by replay.py
+"""
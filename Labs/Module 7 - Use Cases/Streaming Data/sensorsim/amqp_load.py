@@ -0,0 +1,359 @@
+"""
+Pipelined RabbitMQ publisher with publisher confirms.
+
+BlockingConnection.basic_publish() with confirms waits for every single
+confirm, and without confirms nothing tells the sender whether the broker
+kept up. This publisher runs one asynchronous pika SelectConnection per
+worker thread with one or more confirm-mode channels each. Every channel
+keeps at most --window unconfirmed messages in flight; when all windows
+are full the publisher waits for confirms instead of buffering without
+bound. The main thread prints the achieved publish rate and the confirm
+latency percentiles of all workers.
+
+    model = DeviceModel([SensorField("temperature", 20, 100)])
+
+    parser = argparse.ArgumentParser()
+    amqp_load.add_arguments(parser, queue="tv_room")
+    amqp_load.run(parser.parse_args(), model)
+"""
+
+import collections
+import queue
+import threading
+import time
+
+import pika
+
+from . import encoding, payloads
+from .pacing import RatePacer
+from .stats import LatencyHistogram
+
+# Seconds to wait for outstanding confirms when stopping
+DRAIN_TIMEOUT = 5.0
+
+
+def add_arguments(parser, queue, rate=1.0, print_messages=False, schema=None):
+    """
+    Add the publisher options to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of the simulator script
+        queue (str): Default queue name
+        rate (float): Default aggregate messages per second
+        print_messages (bool): Print every message by default
+        schema (Optional[str]): Avro schema file of the device model (in sensorsim/schemas)
+    """
+    group = parser.add_argument_group("publishing")
+    group.add_argument('--host', default="localhost", help="RabbitMQ host [localhost]")
+    group.add_argument('--port', type=int, default=5672, help="RabbitMQ AMQP port [5672]")
+    group.add_argument('--username', default="guest", help="RabbitMQ username [guest]")
+    group.add_argument('--password', default="guest", help="RabbitMQ password [guest]")
+    group.add_argument('--virtual-host', default="/", help="RabbitMQ virtual host [/]")
+    group.add_argument('--queue', default=queue, help=f"Queue name [{queue}]")
+    group.add_argument('--rate', type=float, default=rate,
+                       help=f"Aggregate messages per second, 0 = as fast as possible [{rate}]")
+    group.add_argument('--duration', type=float, default=0, help="Stop after this many seconds, 0 = run forever [0]")
+    group.add_argument('--connections', type=int, default=1,
+                       help="Connections, each served by its own worker thread and sending as its own "
+                            "device (<queue>-<n>, the queue name with one connection) [1]")
+    group.add_argument('--channels', type=int, default=1, help="Confirm-mode channels per connection [1]")
+    group.add_argument('--window', type=int, default=1000,
+                       help="Unconfirmed messages in flight per channel [1000]")
+    group.add_argument('--durable', action='store_true',
+                       help="Declare a durable queue and publish persistent messages (delivery mode 2)")
+    group.add_argument('--lazy', action='store_true',
+                       help="Declare a lazy queue (x-queue-mode=lazy), messages go to disk early")
+    group.add_argument('--report-interval', type=float, default=5.0,
+                       help="Seconds between rate/latency reports [5]")
+    group.add_argument('--print', dest='print_messages', action='store_true', default=print_messages,
+                       help="Print every published message")
+    group.add_argument('--quiet', dest='print_messages', action='store_false',
+                       help="Do not print every published message")
+
+    payloads.add_arguments(parser)
+    encoding.add_arguments(parser, schema)
+
+
+class ConfirmChannel:
+    """
+    A confirm-mode channel and its unconfirmed messages.
+
+    Delivery tags count up from 1 per channel, so pending is ordered by tag
+    and a multiple=True confirm releases a prefix of it.
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.next_tag = 1
+        self.pending = collections.OrderedDict()
+
+    def publish(self, exchange, routing_key, body, properties):
+        self.channel.basic_publish(exchange, routing_key, body, properties)
+        self.pending[self.next_tag] = time.perf_counter()
+        self.next_tag += 1
+
+    def confirm(self, delivery_tag, multiple):
+        """
+        Remove confirmed messages.
+
+        Returns:
+            list: Send times of the confirmed messages
+        """
+        if not multiple:
+            sent_at = self.pending.pop(delivery_tag, None)
+            return [] if sent_at is None else [sent_at]
+        confirmed = []
+        while self.pending:
+            tag = next(iter(self.pending))
+            if tag > delivery_tag:
+                break
+            confirmed.append(self.pending.popitem(last=False)[1])
+        return confirmed
+
+
+class ConfirmPublisher:
+    """
+    Publishes over one SelectConnection; run() blocks in the pika ioloop.
+
+    Attributes:
+        published (int): Messages sent
+        confirmed (int): Messages acknowledged by the broker
+        nacked (int): Messages rejected by the broker
+        blocked (int): Pacing steps cut short because every window was full
+    """
+
+    def __init__(self, index, args, model, rate, reports, stop):
+        self.index = index
+        self.args = args
+        self.reports = reports
+        self.stop = stop
+        # One device per connection, so traced streams (device, seq) do not collide
+        device = args.queue if args.connections <= 1 else f"{args.queue}-{index}"
+        self.generator = model.generator([device], seed_offset=index)
+        self.codec = encoding.create_codec(args)
+        self.pacer = RatePacer(rate)
+        self.histogram = LatencyHistogram()
+        self.channels = []
+        self.published = self.confirmed = self.nacked = self.blocked = 0
+        self.scheduled = False
+        self.waiting = False
+        self.draining_since = None
+        self.next_report = time.monotonic() + args.report_interval
+        self.properties = pika.BasicProperties(content_type=encoding.CONTENT_TYPES[args.format],
+                                               delivery_mode=2 if args.durable else 1)
+        self.connection = None
+
+    def run(self):
+        """Connect and publish until the stop event is set."""
+        credentials = pika.PlainCredentials(self.args.username, self.args.password)
+        parameters = pika.ConnectionParameters(host=self.args.host, port=self.args.port,
+                                               virtual_host=self.args.virtual_host, credentials=credentials)
+        self.connection = pika.SelectConnection(parameters, on_open_callback=self.on_connection_open,
+                                                on_open_error_callback=self.on_connection_error,
+                                                on_close_callback=self.on_connection_closed)
+        try:
+            self.connection.ioloop.start()
+        finally:
+            self.send_report()
+
+    # ========== Connection and channel setup ==========
+
+    def on_connection_open(self, connection):
+        for _ in range(max(1, self.args.channels)):
+            connection.channel(on_open_callback=self.on_channel_open)
+
+    def on_connection_error(self, connection, error):
+        print(f"Connection {self.index} to {self.args.host}:{self.args.port} failed: {error}")
+        self.stop.set()
+        connection.ioloop.stop()
+
+    def on_connection_closed(self, connection, reason):
+        if not self.stop.is_set() and self.draining_since is None:
+            print(f"Connection {self.index} closed: {reason}")
+        connection.ioloop.stop()
+
+    def on_channel_open(self, channel):
+        state = ConfirmChannel(channel)
+        channel.confirm_delivery(lambda frame: self.on_confirm(state, frame))
+
+        arguments = {"x-queue-mode": "lazy"} if self.args.lazy else None
+        channel.queue_declare(self.args.queue, durable=self.args.durable, arguments=arguments,
+                              callback=lambda frame: self.on_queue_declared(state))
+
+    def on_queue_declared(self, state):
+        self.channels.append(state)
+        self.schedule(0)
+
+    # ========== Publishing ==========
+
+    def schedule(self, delay):
+        if not self.scheduled:
+            self.scheduled = True
+            self.connection.ioloop.call_later(delay, self.pump)
+
+    def on_confirm(self, state, frame):
+        method = frame.method
+        sent = state.confirm(method.delivery_tag, method.multiple)
+        if isinstance(method, pika.spec.Basic.Ack):
+            now = time.perf_counter()
+            for sent_at in sent:
+                self.histogram.record(now - sent_at)
+            self.confirmed += len(sent)
+        else:
+            self.nacked += len(sent)
+
+        self.resume()
+
+    def resume(self):
+        """Continue a publisher that stopped on full windows."""
+        if self.waiting:
+            self.waiting = False
+            self.schedule(0)
+
+    def pump(self):
+        """Publish the messages due now, as far as the windows allow, and reschedule."""
+        self.scheduled = False
+
+        if self.stop.is_set():
+            self.drain()
+            return
+
+        due = self.pacer.due()
+        room = [(state, self.args.window - len(state.pending)) for state in self.channels]
+        capacity = sum(max(0, free) for _, free in room)
+        count = min(due, capacity)
+
+        if count:
+            _, rows = self.generator.generate(count)
+            position = 0
+            for state, free in room:
+                for message in rows[position:position + max(0, free)]:
+                    body = self.codec.encode(message)
+                    state.publish("", self.args.queue, body, self.properties)
+                    if self.args.print_messages:
+                        print(f"Sent sensor data: {encoding.printable(self.codec, message, body)}")
+                position += max(0, free)
+                if position >= count:
+                    break
+            self.published += count
+            self.pacer.issue(count)
+
+        if time.monotonic() >= self.next_report:
+            self.send_report()
+            self.next_report += self.args.report_interval
+
+        if count < due:
+            # Every window is full: continue on the next confirm (or after a second, to notice stop)
+            self.blocked += 1
+            self.waiting = True
+            self.connection.ioloop.call_later(1.0, self.resume)
+        elif self.pacer.rate > 0:
+            self.schedule(max(0.0, self.pacer.start + self.pacer.issued / self.pacer.rate - time.perf_counter()))
+        else:
+            self.schedule(0)
+
+    def drain(self):
+        """Wait (up to DRAIN_TIMEOUT) for outstanding confirms, then close the connection."""
+        if self.draining_since is None:
+            self.draining_since = time.monotonic()
+        outstanding = sum(len(state.pending) for state in self.channels)
+        if outstanding and time.monotonic() - self.draining_since < DRAIN_TIMEOUT:
+            self.connection.ioloop.call_later(0.05, self.drain)
+        elif self.connection.is_open:
+            self.connection.close()
+
+    def send_report(self):
+        self.reports.put((self.index, self.published, self.confirmed, self.nacked, self.blocked,
+                          self.histogram.to_state()))
+
+
+def report(totals, started, previous):
+    """
+    Print the aggregated rate and confirm latency of all workers.
+
+    Args:
+        totals (dict): Worker index -> latest report
+        started (float): monotonic() start time
+        previous (tuple): (time, published) of the previous report
+
+    Returns:
+        tuple: (time, published) for the next report
+    """
+    now = time.monotonic()
+    published, confirmed, nacked, blocked = (sum(entry[n] for entry in totals.values()) for n in range(4))
+
+    histogram = LatencyHistogram()
+    for entry in totals.values():
+        histogram.merge(LatencyHistogram.from_state(entry[4]))
+
+    interval_rate = (published - previous[1]) / (now - previous[0]) if now > previous[0] else 0.0
+    average_rate = published / (now - started) if now > started else 0.0
+    print(f"published={published} confirmed={confirmed} nacked={nacked} window-full={blocked} "
+          f"rate={interval_rate:.0f}/s avg={average_rate:.0f}/s confirm latency {histogram.summary()}")
+    return now, published
+
+
+def run(args, model):
+    """
+    Run the publisher until stopped, --duration expires or Ctrl+C.
+
+    Args:
+        args (argparse.Namespace): Options from add_arguments()
+        model (DeviceModel): Model of the simulated sensor
+    """
+    model.configure(args)
+    connections = max(1, args.connections)
+    rate = args.rate / connections if args.rate > 0 else 0
+    durability = "durable" if args.durable else "transient"
+    if args.lazy:
+        durability += ", lazy"
+
+    print(f"Publishing to queue '{args.queue}' ({durability}) at {args.rate or 'max'} msg/s over "
+          f"{connections} connection(s) x {args.channels} channel(s), window {args.window}, "
+          f"on {args.host}:{args.port}")
+
+    reports, stop = queue.Queue(), threading.Event()
+    workers = [threading.Thread(target=ConfirmPublisher(index, args, model, rate, reports, stop).run, daemon=True)
+               for index in range(connections)]
+    for thread in workers:
+        thread.start()
+
+    started = time.monotonic()
+    deadline = started + args.duration if args.duration > 0 else None
+    previous = (started, 0)
+    totals = {}
+    reported = set()
+
+    try:
+        while any(thread.is_alive() for thread in workers):
+            if deadline and time.monotonic() >= deadline:
+                break
+            try:
+                entry = reports.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            totals[entry[0]] = entry[1:]
+
+            # Print once every worker has sent its report for this interval
+            reported.add(entry[0])
+            if len(reported) == len(workers):
+                previous = report(totals, started, previous)
+                reported.clear()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for thread in workers:
+            thread.join(timeout=DRAIN_TIMEOUT + 5)
+
+    # Final reports sent by the workers on exit
+    while True:
+        try:
+            entry = reports.get_nowait()
+        except queue.Empty:
+            break
+        totals[entry[0]] = entry[1:]
+
+    if totals:
+        print("Final:")
+        report(totals, started, (started, 0))
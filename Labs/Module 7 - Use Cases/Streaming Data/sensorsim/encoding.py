@@ -0,0 +1,321 @@
+"""
+Payload encodings for the simulators and subscribe.py.
+
+JSON repeats every field name in every message and is slow to parse. The
+binary formats cut the message size and the decode cost:
+
+    json    - Default, readable (orjson when installed)
+    msgpack - Same structure as JSON in a compact binary form (requires msgpack)
+    avro    - Schema-based binary without field names (requires fastavro)
+    text    - "temperature=21.5,humidity=40.1" (flat messages, sensor_influx.py)
+
+Avro messages need the writer's schema to be decoded. Without a Schema
+Registry, producer and consumer both use the schema file (--schema, see
+schemas/). With --schema-registry the simulator registers the schema and
+prefixes every message with the Confluent wire format header (magic byte 0
+plus the 4-byte schema ID), so Kafka consumers using the Confluent Avro
+deserializer (and the composer's Schema Registry) can read the messages
+after the MQTT bridge forwarded them; subscribe.py looks the IDs up in the
+same registry.
+
+The schema is registered under the subject --schema-subject, by default
+the full record name (RecordNameStrategy, e.g. "sensorsim.TvRoomSensor"),
+because MQTT topics are not valid subject names in URLs.
+
+Usage:
+    codec = create_codec(args)
+    payload = codec.encode({"temperature": 21.5})
+    message = codec.decode(payload)
+"""
+
+import io
+import json
+import os
+import struct
+import urllib.request
+
+from .payloads import encode_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMATS = ("json", "msgpack", "avro")
+TEXT_FORMAT = "text"
+
+# MIME types, e.g. for the AMQP content_type property
+CONTENT_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+    "avro": "avro/binary",
+    "text": "text/plain",
+}
+
+# Schema files of the simulators
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas")
+
+# Confluent wire format: magic byte 0 and the big-endian schema ID
+CONFLUENT_HEADER = struct.Struct(">bI")
+
+
+def add_arguments(parser, schema=None, formats=FORMATS):
+    """
+    Add the payload format options to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of the simulator script
+        schema (Optional[str]): Default Avro schema file (name in schemas/ or path)
+        formats (tuple): Selectable formats, the first is the default
+    """
+    group = parser.add_argument_group("payload format")
+    group.add_argument('--format', choices=formats, default=formats[0],
+                       help=f"Payload encoding [{formats[0]}]")
+    group.add_argument('--schema', default=schema,
+                       help=f"Avro schema file for --format avro [{schema}]")
+    group.add_argument('--schema-registry', metavar='URL',
+                       help="Schema Registry URL (e.g. http://localhost:8081); Avro messages then carry "
+                            "the Confluent wire format header with the registered schema ID")
+    group.add_argument('--schema-subject',
+                       help="Subject to register the Avro schema under [full record name of the schema]")
+
+
+def schema_path(schema):
+    """Resolve a schema name in schemas/ or a path to a schema file."""
+    if schema and not os.path.exists(schema) and os.path.exists(os.path.join(SCHEMA_DIR, schema)):
+        return os.path.join(SCHEMA_DIR, schema)
+    return schema
+
+
+def load_schema(schema):
+    """
+    Load an Avro schema file.
+
+    Args:
+        schema (str): Name of a file in schemas/ (e.g. "tv_room.avsc") or path
+
+    Returns:
+        dict: Schema as JSON
+    """
+    with open(schema_path(schema)) as schema_file:
+        return json.load(schema_file)
+
+
+def avro_schema(model, name, namespace="sensorsim"):
+    """
+    Derive an Avro schema from a DeviceModel (inline scenario models, or to write a new schema file).
+
+    Numeric readings are nullable doubles, because dropout faults send null.
+    Traced models get the optional trace fields (see payloads.py).
+
+    Args:
+        model (DeviceModel): Device model
+        name (str): Record name
+        namespace (str): Record namespace
+
+    Returns:
+        dict: Avro record schema
+    """
+    nullable = ["null", "double"]
+    fields = []
+    if model.id_field:
+        fields.append({"name": model.id_field, "type": "string"})
+
+    for field in model.fields:
+        if field.choices is not None:
+            fields.append({"name": field.name, "type": "string"})
+        elif field.keys:
+            fields.append({"name": field.name, "type": {
+                "type": "record",
+                "name": field.name.title().replace("_", ""),
+                "fields": [{"name": key, "type": nullable, "default": None} for key in field.keys]
+            }})
+        elif field.size:
+            fields.append({"name": field.name, "type": {"type": "array", "items": nullable}})
+        else:
+            fields.append({"name": field.name, "type": nullable, "default": None})
+
+    if model.trace:
+        if not model.id_field:
+            fields.append({"name": "device", "type": ["null", "string"], "default": None})
+        fields.append({"name": "seq", "type": ["null", "long"], "default": None})
+        fields.append({"name": "sent_at", "type": nullable, "default": None})
+
+    return {"type": "record", "name": name, "namespace": namespace, "fields": fields}
+
+
+def printable(codec, message, payload):
+    """
+    Format a sent message for printing: JSON as sent, binary formats as the message and the payload size.
+
+    Returns:
+        str: Printable message
+    """
+    if codec.format in ("json", TEXT_FORMAT):
+        return payload.decode() if isinstance(payload, bytes) else payload
+    return f"{message} ({len(payload)} bytes {codec.format})"
+
+
+def register_schema(registry, subject, schema):
+    """
+    Register a schema with a Schema Registry (returns the existing ID if it is already registered).
+
+    Args:
+        registry (str): Schema Registry URL
+        subject (str): Subject name (e.g. "sensorsim.TvRoomSensor")
+        schema (dict): Avro schema
+
+    Returns:
+        int: Schema ID
+    """
+    request = urllib.request.Request(f"{registry.rstrip('/')}/subjects/{subject}/versions",
+                                     data=json.dumps({"schema": json.dumps(schema)}).encode(),
+                                     headers={"Content-Type": "application/vnd.schemaregistry.v1+json"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)["id"]
+
+
+def fetch_schema(registry, schema_id):
+    """
+    Look up a schema by ID in a Schema Registry.
+
+    Returns:
+        dict: Avro schema
+    """
+    with urllib.request.urlopen(f"{registry.rstrip('/')}/schemas/ids/{schema_id}", timeout=10) as response:
+        return json.loads(json.load(response)["schema"])
+
+
+class JsonCodec:
+    format = "json"
+
+    def encode(self, message):
+        return encode_json(message)
+
+    def decode(self, payload):
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+
+class MsgpackCodec:
+    format = "msgpack"
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError:
+            raise SystemExit("--format msgpack requires msgpack: pip3 install msgpack")
+        self.packer = msgpack.Packer()
+        self.unpackb = msgpack.unpackb
+
+    def encode(self, message):
+        return self.packer.pack(message)
+
+    def decode(self, payload):
+        return self.unpackb(payload, raw=False)
+
+
+class TextCodec:
+    """key=value pairs separated by commas, for flat numeric messages."""
+
+    format = "text"
+
+    def encode(self, message):
+        return ",".join(f"{key}={value}" for key, value in message.items()).encode()
+
+    def decode(self, payload):
+        message = {}
+        for pair in payload.decode().split(","):
+            key, _, value = pair.partition("=")
+            try:
+                message[key.strip()] = float(value)
+            except ValueError:
+                message[key.strip()] = value
+        return message
+
+
+class AvroCodec:
+    """
+    Schemaless Avro records, optionally in the Confluent wire format.
+
+    Encoding needs the schema (file); decoding uses the schema file, or the
+    registry schema of the ID in each message header when a registry is set.
+    """
+
+    format = "avro"
+
+    def __init__(self, schema=None, registry=None, subject=None):
+        try:
+            import fastavro
+        except ImportError:
+            raise SystemExit("--format avro requires fastavro: pip3 install fastavro")
+        self.fastavro = fastavro
+        self.registry = registry
+        self.schema = fastavro.parse_schema(schema) if schema else None
+        self.header = None
+        self.schemas = {}
+
+        if registry and schema:
+            subject = subject or f"{schema.get('namespace', '')}.{schema['name']}".lstrip(".")
+            self.header = CONFLUENT_HEADER.pack(0, register_schema(registry, subject, schema))
+
+    def encode(self, message):
+        buffer = io.BytesIO()
+        if self.header:
+            buffer.write(self.header)
+        self.fastavro.schemaless_writer(buffer, self.schema, message)
+        return buffer.getvalue()
+
+    def decode(self, payload):
+        buffer = io.BytesIO(payload)
+        schema = self.schema
+        if self.registry:
+            magic, schema_id = CONFLUENT_HEADER.unpack(buffer.read(CONFLUENT_HEADER.size))
+            if magic != 0:
+                raise ValueError(f"Unknown magic byte {magic}")
+            schema = self.schemas.get(schema_id)
+            if schema is None:
+                schema = self.schemas[schema_id] = self.fastavro.parse_schema(fetch_schema(self.registry, schema_id))
+        return self.fastavro.schemaless_reader(buffer, schema)
+
+
+def create_codec(args):
+    """
+    Create the codec selected by add_arguments().
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+
+    Returns:
+        Codec with encode(message) -> bytes and decode(payload) -> message
+    """
+    return codec_for(args.format, args.schema, args.schema_registry, getattr(args, 'schema_subject', None))
+
+
+def codec_for(format, schema=None, registry=None, subject=None):
+    """
+    Create a codec by format name (e.g. for the device groups of a scenario).
+
+    Args:
+        format (str): One of FORMATS or TEXT_FORMAT
+        schema (Optional[Union[str, dict]]): Avro schema file (name in schemas/ or path) or schema
+        registry (Optional[str]): Schema Registry URL
+        subject (Optional[str]): Schema Registry subject
+
+    Returns:
+        Codec with encode(message) -> bytes and decode(payload) -> message
+    """
+    if format == "msgpack":
+        return MsgpackCodec()
+    if format == "avro":
+        if isinstance(schema, str):
+            schema = load_schema(schema)
+        if schema is None and not registry:
+            raise SystemExit("--format avro requires --schema or --schema-registry")
+        return AvroCodec(schema, registry, subject)
+    if format == TEXT_FORMAT:
+        return TextCodec()
+    if format != "json":
+        raise ValueError(f"Unknown payload format '{format}'")
+    return JsonCodec()
@@ -0,0 +1,267 @@
+"""
+Batched persistence for the subscribers.
+
+Printing or writing every message inside the MQTT on_message callback
+stalls the client's network thread, and the broker starts dropping or
+queueing messages. The callback only puts the raw message into a bounded
+queue (counting drops when it is full); an IngestWorker thread decodes
+the payloads and writes them to a local store in batches.
+
+Stores:
+    sqlite  - One table, one column per field; new fields add columns (WAL
+              mode, so several subscriber processes can share the file)
+    csv     - Header from the first batch, later fields not in it are dropped
+    parquet - Row groups per batch via pyarrow (optional dependency), schema
+              from the first batch
+
+Nested payload fields are flattened ("position.x", "position.0"). Every
+row also has received_at (epoch seconds) and topic.
+
+Usage:
+    buffer = queue.Queue(maxsize=100000)
+    worker = IngestWorker(buffer, open_store("sqlite", "sensor_data.db"), batch_size=5000)
+    worker.start()
+    ...
+    worker.stop()
+"""
+
+import csv
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from .encoding import JsonCodec
+
+STORES = ("none", "sqlite", "csv", "parquet")
+# File extension of each store's output
+EXTENSIONS = {"sqlite": ".db", "csv": ".csv", "parquet": ".parquet"}
+
+
+def flatten(message, prefix=""):
+    """
+    Flatten nested dicts and lists into dotted column names.
+
+    Args:
+        message (dict): Decoded payload
+        prefix (str): Prefix of the column names
+
+    Returns:
+        dict: e.g. {"temperature": 21.5, "position.x": 1.0}
+    """
+    row = {}
+    for key, value in message.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(flatten(value, f"{name}."))
+        elif isinstance(value, list):
+            row.update(flatten(dict(enumerate(value)), f"{name}."))
+        else:
+            row[name] = value
+    return row
+
+
+class SQLiteStore:
+    """Appends rows to an SQLite table, one transaction per batch."""
+
+    def __init__(self, path, table="sensor_data"):
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.table = table
+        self.connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (received_at REAL, topic TEXT)')
+        self.columns = [row[1] for row in self.connection.execute(f'PRAGMA table_info("{table}")')]
+
+    def write(self, rows):
+        known = set(self.columns)
+        for row in rows:
+            for name in row:
+                if name not in known:
+                    self.connection.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{name}"')
+                    self.columns.append(name)
+                    known.add(name)
+
+        names = ", ".join(f'"{name}"' for name in self.columns)
+        placeholders = ", ".join("?" * len(self.columns))
+        with self.connection:
+            self.connection.executemany(f'INSERT INTO "{self.table}" ({names}) VALUES ({placeholders})',
+                                        [tuple(row.get(name) for name in self.columns) for row in rows])
+
+    def close(self):
+        self.connection.close()
+
+
+class CSVStore:
+    """Appends rows to a CSV file; the header is written once."""
+
+    def __init__(self, path):
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, "a", newline="")
+        self.writer = None
+        if exists:
+            with open(path, newline="") as existing:
+                header = next(csv.reader(existing), None)
+            if header:
+                self.writer = csv.DictWriter(self.file, header, extrasaction="ignore")
+
+    def write(self, rows):
+        if self.writer is None:
+            fields = list(dict.fromkeys(name for row in rows for name in row))
+            self.writer = csv.DictWriter(self.file, fields, extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetStore:
+    """Writes one Parquet row group per batch (requires pyarrow)."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("The parquet store requires pyarrow: pip3 install pyarrow")
+        self.pyarrow = pyarrow
+        self.path = path
+        self.writer = None
+        self.schema = None
+
+    def write(self, rows):
+        pyarrow = self.pyarrow
+        if self.writer is None:
+            self.schema = pyarrow.Table.from_pylist(rows).schema
+            self.writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+        columns = {name: [row.get(name) for row in rows] for name in self.schema.names}
+        self.writer.write_table(pyarrow.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class NullStore:
+    """Discards rows (decode and count only)."""
+
+    def write(self, rows):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_store(kind, path):
+    """
+    Open a store by name.
+
+    Args:
+        kind (str): One of STORES
+        path (str): Output file; "{pid}" is replaced by the process ID, so
+            several subscriber processes can write separate files
+
+    Returns:
+        Store with write(rows) and close()
+    """
+    path = path.replace("{pid}", str(os.getpid())) if path else path
+    if kind == "sqlite":
+        return SQLiteStore(path)
+    if kind == "csv":
+        return CSVStore(path)
+    if kind == "parquet":
+        return ParquetStore(path)
+    return NullStore()
+
+
+class IngestWorker(threading.Thread):
+    """
+    Decodes queued messages and writes them in batches.
+
+    The queue holds (received_at, topic, payload) tuples. A batch is written
+    when it reaches batch_size or flush_interval seconds after its first row.
+
+    Attributes:
+        written (int): Rows written to the store
+        errors (int): Payloads that could not be decoded
+    """
+
+    def __init__(self, buffer, store, batch_size=5000, flush_interval=1.0, decode=None, print_messages=False,
+                 recorder=None, tracer=None):
+        super().__init__(daemon=True)
+        self.buffer = buffer
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Payload decoder (see encoding.py), JSON by default
+        self.decode = decode or JsonCodec().decode
+        self.print_messages = print_messages
+        # Optional RecordingWriter (see recording.py) receiving the raw payloads
+        self.recorder = recorder
+        # Optional TraceStats (see tracing.py) receiving the decoded messages
+        self.tracer = tracer
+        self.written = 0
+        self.errors = 0
+        self.stopping = threading.Event()
+
+    def run(self):
+        batch = []
+        deadline = None
+        try:
+            while True:
+                timeout = 0.1 if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    received_at, topic, payload = self.buffer.get(timeout=timeout)
+                except queue.Empty:
+                    if self.recorder is not None:
+                        self.recorder.flush()
+                    if batch and time.monotonic() >= deadline:
+                        self.flush(batch)
+                        batch, deadline = [], None
+                    if self.stopping.is_set() and self.buffer.empty():
+                        break
+                    continue
+
+                if self.recorder is not None:
+                    self.recorder.write(received_at, topic, payload)
+
+                try:
+                    message = self.decode(payload)
+                except Exception:
+                    self.errors += 1
+                else:
+                    if self.tracer is not None:
+                        self.tracer.observe(received_at, topic, message)
+
+                    if self.print_messages:
+                        print(f"Received `{message}` from `{topic}` topic")
+
+                    row = {"received_at": received_at, "topic": topic}
+                    row.update(flatten(message) if isinstance(message, dict) else {"value": message})
+                    batch.append(row)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+
+                # Checked for every message: under continuous load the queue is never empty
+                if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                    self.flush(batch)
+                    batch, deadline = [], None
+        finally:
+            if batch:
+                self.flush(batch)
+            self.store.close()
+            if self.recorder is not None:
+                self.recorder.close()
+
+    def flush(self, batch):
+        self.store.write(batch)
+        self.written += len(batch)
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    def stop(self, timeout=30):
+        """Write the queued messages and close the store."""
+        self.stopping.set()
+        self.join(timeout)
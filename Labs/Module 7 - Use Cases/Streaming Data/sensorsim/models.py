@@ -0,0 +1,122 @@
+"""
+Device models of the streaming lab simulators.
+
+Every simulator script used to define its own readings; the models are
+collected here so the scripts and scenario files (see scenario.py) share
+them. MODELS maps the names used in scenario files to factory functions
+(each call returns a new DeviceModel, because configure() changes it),
+SCHEMAS to the Avro schema of each model in schemas/ and TOPICS to the
+topic or queue its script publishes to.
+
+Scenario files can also name a factory in another module
+("mypackage.devices:press") or list the fields inline.
+"""
+
+import importlib
+
+from .payloads import DeviceModel, SensorField
+
+
+def industrial_robot():
+    """Industrial robot of MES_123.py."""
+    return DeviceModel([
+        SensorField("temperature", 20, 30, decimals=2),  # Temperature in Celsius
+        SensorField("loading_factor", 0, 1, decimals=2),  # Loading factor (0-1)
+        SensorField("force_torque", -10, 10, decimals=2),  # Force-torque readings (Nm)
+        SensorField("vibration", 0, 1, decimals=2),  # Vibration (0-1)
+        SensorField("position", -100, 100, decimals=2, size=3),  # Position (x, y, z) in mm
+        SensorField("lidar_detection", choices=["obstacle", "none"]),  # LIDAR detection
+    ], id_field="robot_id")
+
+
+def robot_sensor():
+    """Robot temperature and position sensor of sensor.py."""
+    return DeviceModel([
+        SensorField("temperature", 20.0, 100.0),  # Simulate temperature sensor data
+        SensorField("position", -10.0, 10.0, keys=("x", "y", "z")),  # Simulate position sensor data
+    ])
+
+
+def tv_room():
+    """TV room sensor of sensor_tv_room.py."""
+    return DeviceModel([
+        SensorField("temperature", 20.0, 100.0),
+        SensorField("pressure", 800.0, 1200.0),
+        SensorField("humidity", 30.0, 80.0),
+    ])
+
+
+def temperature_humidity():
+    """DHT22 temperature/humidity sensor of sensor_influx.py."""
+    return DeviceModel([
+        SensorField("temperature", 20, 30, decimals=2),
+        SensorField("humidity", 20, 30, decimals=2),
+    ])
+
+
+MODELS = {
+    "industrial_robot": industrial_robot,
+    "robot_sensor": robot_sensor,
+    "tv_room": tv_room,
+    "temperature_humidity": temperature_humidity,
+}
+
+SCHEMAS = {
+    "industrial_robot": "industrial_robot.avsc",
+    "robot_sensor": "robot_sensor.avsc",
+    "tv_room": "tv_room.avsc",
+    "temperature_humidity": "temperature_humidity.avsc",
+}
+
+
+# Default topics (MQTT topic or RabbitMQ queue) of the simulator scripts
+TOPICS = {
+    "industrial_robot": "industrial_robot/sensor_data",
+    "robot_sensor": "industrial/robot/sensor",
+    "tv_room": "tv_room",
+    "temperature_humidity": "sensors/temperature-humidity",
+}
+
+
+def field_from_config(config):
+    """
+    Create a SensorField from a scenario entry.
+
+    Args:
+        config (dict): e.g. {"name": "temperature", "low": 20, "high": 30, "decimals": 2}
+
+    Returns:
+        SensorField: Field definition
+    """
+    options = dict(config)
+    try:
+        name = options.pop("name")
+    except KeyError:
+        raise ValueError(f"Field without name: {config}")
+    unknown = set(options) - {"low", "high", "decimals", "size", "keys", "choices"}
+    if unknown:
+        raise ValueError(f"Unknown option(s) {', '.join(sorted(unknown))} of field '{name}'")
+    return SensorField(name, **options)
+
+
+def load_model(name=None, fields=None, id_field=None):
+    """
+    Get a device model by name, import path or inline field list.
+
+    Args:
+        name (Optional[str]): Name in MODELS or "module:factory"
+        fields (Optional[list]): Inline field entries (see field_from_config)
+        id_field (Optional[str]): Payload field holding the device ID (inline models)
+
+    Returns:
+        DeviceModel: New model instance
+    """
+    if fields:
+        return DeviceModel([field_from_config(field) for field in fields], id_field=id_field)
+    if name in MODELS:
+        return MODELS[name]()
+    if name and ":" in name:
+        module, _, attribute = name.partition(":")
+        factory = getattr(importlib.import_module(module), attribute)
+        return factory() if callable(factory) else factory
+    raise ValueError(f"Unknown device model '{name}', expected one of {', '.join(MODELS)} or 'module:factory'")
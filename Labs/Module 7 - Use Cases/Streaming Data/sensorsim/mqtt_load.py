@@ -0,0 +1,338 @@
+"""
+Multi-device MQTT load generator.
+
+Simulates N devices publishing at a target aggregate rate, spread over one
+or more worker processes (one MQTT connection each). Each worker paces its
+share of the rate with RatePacer and measures the broker acknowledgement
+latency (PUBACK/PUBCOMP for QoS 1/2; for QoS 0 only the time until the
+message is written to the socket). The main process prints the achieved
+publish rate and latency percentiles of all workers.
+
+The simulator scripts supply the device model (see payloads.py); readings
+are generated in NumPy batches, one batch per pacing step, and encoded as
+JSON, MessagePack or Avro (--format, see encoding.py):
+
+    model = DeviceModel([SensorField("temperature", 20, 30, decimals=2)], id_field="robot_id")
+
+    parser = argparse.ArgumentParser()
+    mqtt_load.add_arguments(parser, topic="industrial_robot/sensor_data", device_prefix="MES_", first_device=123)
+    mqtt_load.run(parser.parse_args(), model)
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from paho.mqtt import client as mqtt_client
+
+from . import encoding, payloads
+from .pacing import RatePacer
+from .stats import LatencyHistogram
+
+
+def add_arguments(parser, topic, device_prefix, first_device=1, rate=1.0, print_messages=False, schema=None):
+    """
+    Add the load generator options to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of the simulator script
+        topic (str): Default topic; "{device}" is replaced by the device ID
+        device_prefix (str): Device ID prefix (e.g. "MES_")
+        first_device (int): Number of the first device (e.g. 123 for MES_123)
+        rate (float): Default aggregate messages per second
+        print_messages (bool): Print every message by default
+        schema (Optional[str]): Avro schema file of the device model (in sensorsim/schemas)
+    """
+    group = parser.add_argument_group("load generation")
+    group.add_argument('--broker', default="localhost", help="MQTT broker host [localhost]")
+    group.add_argument('--port', type=int, default=1883, help="MQTT broker port [1883]")
+    group.add_argument('--username', help="MQTT username")
+    group.add_argument('--password', help="MQTT password")
+    group.add_argument('--topic', default=topic,
+                       help=f"Topic, '{{device}}' is replaced by the device ID [{topic}]")
+    group.add_argument('--devices', type=int, default=1, help="Number of simulated devices [1]")
+    group.add_argument('--device-prefix', default=device_prefix, help=f"Device ID prefix [{device_prefix}]")
+    group.add_argument('--first-device', type=int, default=first_device,
+                       help=f"Number of the first device [{first_device}]")
+    group.add_argument('--rate', type=float, default=rate,
+                       help=f"Aggregate messages per second over all devices, 0 = as fast as possible [{rate}]")
+    group.add_argument('--duration', type=float, default=0, help="Stop after this many seconds, 0 = run forever [0]")
+    group.add_argument('--qos', type=int, choices=[0, 1, 2], default=0, help="MQTT QoS level [0]")
+    group.add_argument('--payload-size', type=int, default=0,
+                       help="Pad every payload to at least this many bytes [0]")
+    group.add_argument('--fanout', type=int, default=1,
+                       help="Publish every reading to this many topics (<topic>/0 .. <topic>/N-1) [1]")
+    group.add_argument('--processes', type=int, default=1,
+                       help="Worker processes, each with its own MQTT connection [1]")
+    group.add_argument('--max-inflight', type=int, default=1000,
+                       help="Unacknowledged QoS 1/2 messages per connection [1000]")
+    group.add_argument('--report-interval', type=float, default=5.0,
+                       help="Seconds between rate/latency reports [5]")
+    group.add_argument('--print', dest='print_messages', action='store_true', default=print_messages,
+                       help="Print every published message")
+    group.add_argument('--quiet', dest='print_messages', action='store_false',
+                       help="Do not print every published message")
+
+    payloads.add_arguments(parser)
+    encoding.add_arguments(parser, schema)
+
+
+def device_ids(args):
+    """
+    Get the simulated device IDs.
+
+    Returns:
+        list: Device IDs, e.g. ["MES_123", "MES_124"]
+    """
+    return [f"{args.device_prefix}{args.first_device + number}" for number in range(args.devices)]
+
+
+def create_client(client_id):
+    """
+    Create an MQTT client with version 1 callbacks (paho-mqtt 1.x and 2.x).
+
+    Args:
+        client_id (str): MQTT client ID
+
+    Returns:
+        paho.mqtt.client.Client: Unconnected client
+    """
+    if hasattr(mqtt_client, "CallbackAPIVersion"):
+        return mqtt_client.Client(client_id=client_id, callback_api_version=mqtt_client.CallbackAPIVersion.VERSION1)
+    return mqtt_client.Client(client_id=client_id)
+
+
+def pad_message(message, payload_size, codec):
+    """
+    Encode a message, padded to at least payload_size bytes.
+
+    Args:
+        message (dict): Message fields
+        payload_size (int): Minimum payload size in bytes
+        codec: Payload codec (see encoding.py)
+
+    Returns:
+        bytes or str: Payload
+    """
+    payload = codec.encode(message)
+    missing = payload_size - len(payload)
+    if missing > 0 and codec.format != "avro":
+        # ', "padding": ""' adds at most 15 bytes besides the padding itself (JSON);
+        # Avro has no room for fields outside the schema and is sent unpadded
+        message = dict(message, padding="x" * max(0, missing - 15))
+        payload = codec.encode(message)
+    return payload
+
+
+class PublishTracker:
+    """
+    Matches publish acknowledgements to send times.
+
+    on_publish can run on the network thread before publish() has returned
+    the message ID, so acknowledgements for unknown IDs are kept until the
+    sender registers the send time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent_at = {}
+        self.early_acks = {}
+        self.histogram = LatencyHistogram()
+        self.acked = 0
+
+    def sent(self, mid, sent_at):
+        with self.lock:
+            acked_at = self.early_acks.pop(mid, None)
+            if acked_at is None:
+                self.sent_at[mid] = sent_at
+            else:
+                self._record(acked_at - sent_at)
+
+    def on_publish(self, client, userdata, mid, *extra):
+        now = time.perf_counter()
+        with self.lock:
+            sent_at = self.sent_at.pop(mid, None)
+            if sent_at is None:
+                self.early_acks[mid] = now
+            else:
+                self._record(now - sent_at)
+
+    def _record(self, latency):
+        self.histogram.record(latency)
+        self.acked += 1
+
+
+def worker(index, args, model, devices, rate, reports, stop):
+    """
+    Publish the messages of a group of devices over one MQTT connection.
+
+    Args:
+        index (int): Worker number
+        args (argparse.Namespace): Load generator options
+        model (DeviceModel): Model of the simulated devices
+        devices (list): Device IDs handled by this worker
+        rate (float): Messages per second for this worker (0 = unlimited)
+        reports (queue): Receives (index, published, acked, failed, histogram state) snapshots
+        stop (Event): Set to stop publishing
+    """
+    tracker = PublishTracker()
+
+    client = create_client(f"sensorsim-{os.getpid()}-{index}")
+    if args.username:
+        client.username_pw_set(args.username, args.password)
+    client.on_publish = tracker.on_publish
+    client.max_inflight_messages_set(args.max_inflight)
+    # Bound the client-side queue; publish() reports MQTT_ERR_QUEUE_SIZE when it is full
+    client.max_queued_messages_set(max(args.max_inflight * 10, 10000))
+    client.connect(args.broker, args.port)
+    client.loop_start()
+
+    # Topics per device, with fan-out copies
+    topics = {}
+    for device in devices:
+        topic = args.topic.replace("{device}", device)
+        topics[device] = [topic] if args.fanout <= 1 else [f"{topic}/{n}" for n in range(args.fanout)]
+
+    # The rate counts published messages, so readings are paced at rate / fanout
+    pacer = RatePacer(rate / max(1, args.fanout))
+    generator = model.generator(devices, seed_offset=index)
+    codec = encoding.create_codec(args)
+    published = failed = 0
+    next_report = time.monotonic() + args.report_interval
+
+    try:
+        while not stop.is_set():
+            due = pacer.due()
+            if not due:
+                pacer.sleep()
+                continue
+
+            for device, message in zip(*generator.generate(due)):
+                payload = pad_message(message, args.payload_size, codec) if args.payload_size else \
+                    codec.encode(message)
+
+                for topic in topics[device]:
+                    sent_at = time.perf_counter()
+                    result = client.publish(topic, payload, qos=args.qos)
+                    if result.rc == mqtt_client.MQTT_ERR_SUCCESS:
+                        tracker.sent(result.mid, sent_at)
+                        published += 1
+                    else:
+                        failed += 1
+
+                if args.print_messages:
+                    print(f"Sent `{encoding.printable(codec, message, payload)}` to topic `{topics[device][0]}`")
+
+            pacer.issue(due)
+
+            if time.monotonic() >= next_report:
+                with tracker.lock:
+                    reports.put((index, published, tracker.acked, failed, tracker.histogram.to_state()))
+                next_report += args.report_interval
+    finally:
+        client.loop_stop()
+        client.disconnect()
+        with tracker.lock:
+            reports.put((index, published, tracker.acked, failed, tracker.histogram.to_state()))
+
+
+def report(totals, started, previous):
+    """
+    Print the aggregated rate and latency of all workers.
+
+    Args:
+        totals (dict): Worker index -> latest report
+        started (float): monotonic() start time
+        previous (tuple): (time, published) of the previous report
+
+    Returns:
+        tuple: (time, published) for the next report
+    """
+    now = time.monotonic()
+    published = sum(entry[0] for entry in totals.values())
+    acked = sum(entry[1] for entry in totals.values())
+    failed = sum(entry[2] for entry in totals.values())
+
+    histogram = LatencyHistogram()
+    for entry in totals.values():
+        histogram.merge(LatencyHistogram.from_state(entry[3]))
+
+    interval_rate = (published - previous[1]) / (now - previous[0]) if now > previous[0] else 0.0
+    average_rate = published / (now - started) if now > started else 0.0
+    print(f"published={published} acked={acked} failed={failed} "
+          f"rate={interval_rate:.0f}/s avg={average_rate:.0f}/s ack latency {histogram.summary()}")
+    return now, published
+
+
+def run(args, model):
+    """
+    Run the load generator until stopped, --duration expires or Ctrl+C.
+
+    Args:
+        args (argparse.Namespace): Options from add_arguments()
+        model (DeviceModel): Model of the simulated devices
+    """
+    model.configure(args)
+    devices = device_ids(args)
+    processes = max(1, min(args.processes, len(devices)))
+    rate = args.rate / processes if args.rate > 0 else 0
+
+    print(f"Simulating {len(devices)} device(s) at {args.rate or 'max'} msg/s "
+          f"(QoS {args.qos}, {processes} connection(s)) to {args.broker}:{args.port}")
+
+    # One worker per process; a single worker runs in a thread of this process
+    if processes == 1:
+        reports, stop = queue.Queue(), threading.Event()
+        workers = [threading.Thread(target=worker, args=(0, args, model, devices, rate, reports, stop),
+                                    daemon=True)]
+    else:
+        reports, stop = multiprocessing.Queue(), multiprocessing.Event()
+        workers = [multiprocessing.Process(target=worker,
+                                           args=(index, args, model, devices[index::processes], rate,
+                                                 reports, stop))
+                   for index in range(processes)]
+
+    for process in workers:
+        process.start()
+
+    started = time.monotonic()
+    deadline = started + args.duration if args.duration > 0 else None
+    previous = (started, 0)
+    totals = {}
+    reported = set()
+
+    try:
+        while any(process.is_alive() for process in workers):
+            if deadline and time.monotonic() >= deadline:
+                break
+            try:
+                index, published, acked, failed, state = reports.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            totals[index] = (published, acked, failed, state)
+
+            # Print once every worker has sent its report for this interval
+            reported.add(index)
+            if len(reported) == len(workers):
+                previous = report(totals, started, previous)
+                reported.clear()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for process in workers:
+            process.join(timeout=10)
+
+    # Final reports sent by the workers on exit
+    while True:
+        try:
+            index, published, acked, failed, state = reports.get(timeout=0.5)
+        except queue.Empty:
+            break
+        totals[index] = (published, acked, failed, state)
+
+    if totals:
+        print("Final:")
+        report(totals, started, (started, 0))
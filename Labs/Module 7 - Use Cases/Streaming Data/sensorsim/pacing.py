@@ -0,0 +1,99 @@
+"""
+Rate pacing for the simulators.
+
+time.sleep(1) after every message drifts (the publish time adds up) and
+cannot express rates above a few hundred messages per second. RatePacer
+instead tracks how many events should have been issued since the start
+and lets the caller send them in small bursts, sleeping only when it is
+ahead of schedule.
+
+Usage:
+    pacer = RatePacer(5000)           # 5000 events/s, 0 = as fast as possible
+    while running:
+        due = pacer.due()
+        if not due:
+            pacer.sleep()
+            continue
+        for _ in range(due):
+            publish()
+        pacer.issue(due)
+"""
+
+import time
+
+# Events returned per due() call when the rate is unlimited
+UNLIMITED_BATCH = 100
+
+
+class RatePacer:
+    """
+    Keeps an event stream at a target rate.
+
+    Attributes:
+        rate (float): Target events per second (0 = unlimited)
+        issued (int): Events issued so far
+        skipped (int): Events dropped from the schedule because the caller fell
+            more than max_lag seconds behind
+    """
+
+    def __init__(self, rate, max_lag=1.0):
+        """
+        Args:
+            rate (float): Target events per second (0 = unlimited)
+            max_lag (float): Largest backlog in seconds that is caught up with
+                a burst; older backlog is skipped instead
+        """
+        self.rate = rate
+        self.max_lag = max_lag
+        self.start = time.perf_counter()
+        self.issued = 0
+        self.skipped = 0
+
+    def due(self):
+        """
+        Get the number of events due now.
+
+        Returns:
+            int: Events to issue before calling due() again
+        """
+        if self.rate <= 0:
+            return UNLIMITED_BATCH
+
+        target = int((time.perf_counter() - self.start) * self.rate) + 1
+        backlog = target - self.issued
+
+        # Too far behind (e.g. broker stalled): skip the backlog instead of bursting
+        max_backlog = max(1, int(self.rate * self.max_lag))
+        if backlog > max_backlog:
+            self.skipped += backlog - max_backlog
+            self.issued = target - max_backlog
+            backlog = max_backlog
+
+        return max(0, backlog)
+
+    def issue(self, count=1):
+        """
+        Record issued events.
+
+        Args:
+            count (int): Number of events issued
+        """
+        self.issued += count
+
+    def sleep(self):
+        """Sleep until the next event is due."""
+        if self.rate <= 0:
+            return
+        delay = self.start + self.issued / self.rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def achieved_rate(self):
+        """
+        Get the achieved rate since the start.
+
+        Returns:
+            float: Issued events per second
+        """
+        elapsed = time.perf_counter() - self.start
+        return self.issued / elapsed if elapsed > 0 else 0.0
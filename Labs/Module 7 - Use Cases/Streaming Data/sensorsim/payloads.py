@@ -0,0 +1,315 @@
+"""
+Vectorized sensor payload generation.
+
+Calling random.uniform() a few times per message and json.dumps() on every
+dict makes the simulator, not the broker, the bottleneck at high rates.
+A DeviceModel describes the fields of a device once; its BatchGenerator
+draws whole blocks of readings with NumPy and turns them into message
+dicts column by column.
+
+Profiles:
+    uniform - Independent uniform readings in [low, high] (the original scripts)
+    drift   - Every device wanders around the middle of the range (random walk)
+              with Gaussian noise on top, so consecutive readings are related
+
+Fault injection (--fault-rate) replaces readings with spikes far outside
+the range, stuck values (the previous reading repeated) or dropouts (null).
+
+Tracing (on by default, --no-trace for the original payloads) appends
+"seq", a per-device sequence number counting up from 0, and "sent_at",
+the wall-clock time (epoch seconds) the batch was generated right before
+sending, plus "device" when the model has no ID field. subscribe.py turns
+them into end-to-end latency, gap and out-of-order statistics (tracing.py).
+
+Usage:
+    model = DeviceModel([
+        SensorField("temperature", 20, 30, decimals=2),
+        SensorField("position", -100, 100, decimals=2, size=3),
+        SensorField("lidar_detection", choices=["obstacle", "none"]),
+    ], id_field="robot_id", profile="drift")
+
+    generator = model.generator(["MES_123", "MES_124"])
+    devices, rows = generator.generate(10000)
+    payloads = [encode_json(row) for row in rows]
+"""
+
+import json
+import time
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PROFILES = ("uniform", "drift")
+FAULTS = ("spike", "stuck", "dropout")
+
+# Fields added to traced messages ("device" only for models without an ID field)
+TRACE_FIELDS = ("device", "seq", "sent_at")
+
+
+def encode_json(message):
+    """
+    Encode a message as JSON.
+
+    Uses orjson when it is installed (several times faster, compact
+    separators); otherwise json.dumps with the original formatting.
+
+    Args:
+        message (dict): Message fields
+
+    Returns:
+        bytes or str: JSON payload
+    """
+    if orjson is not None:
+        return orjson.dumps(message)
+    return json.dumps(message)
+
+
+class SensorField:
+    """
+    One field of a device reading.
+
+    Attributes:
+        name (str): Field name in the payload
+        low (float): Lower bound of the normal range
+        high (float): Upper bound of the normal range
+        decimals (Optional[int]): Round readings to this many decimals
+        size (Optional[int]): Number of components for list fields (e.g. 3 for x, y, z)
+        keys (Optional[tuple]): Component names for dict fields (e.g. ("x", "y", "z"))
+        choices (Optional[list]): Values of a categorical field, chosen uniformly
+    """
+
+    __slots__ = ("name", "low", "high", "decimals", "size", "keys", "choices")
+
+    def __init__(self, name, low=0.0, high=1.0, decimals=None, size=None, keys=None, choices=None):
+        self.name = name
+        self.low = low
+        self.high = high
+        self.decimals = decimals
+        self.size = len(keys) if keys else size
+        self.keys = tuple(keys) if keys else None
+        self.choices = list(choices) if choices else None
+
+    @property
+    def width(self):
+        """int: Number of numeric columns of the field"""
+        return self.size or 1
+
+
+class DeviceModel:
+    """
+    Description of a simulated device type.
+
+    Attributes:
+        fields (list): SensorField definitions, in payload order
+        id_field (Optional[str]): Payload field holding the device ID
+        profile (str): "uniform" or "drift"
+        noise (float): Noise standard deviation as a fraction of the range (drift profile)
+        drift (float): Random walk step as a fraction of the range (drift profile)
+        fault_rate (float): Probability that a numeric reading is faulty
+        seed (Optional[int]): Random seed for reproducible streams
+        trace (bool): Add sequence numbers and send timestamps (TRACE_FIELDS)
+    """
+
+    def __init__(self, fields, id_field=None, profile="uniform", noise=0.02, drift=0.005, fault_rate=0.0,
+                 seed=None, trace=True):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', expected one of {', '.join(PROFILES)}")
+        self.fields = fields
+        self.id_field = id_field
+        self.profile = profile
+        self.noise = noise
+        self.drift = drift
+        self.fault_rate = fault_rate
+        self.seed = seed
+        self.trace = trace
+
+    def configure(self, args):
+        """
+        Apply the options added by add_arguments().
+
+        Args:
+            args (argparse.Namespace): Parsed arguments
+
+        Returns:
+            DeviceModel: self
+        """
+        self.profile = args.profile
+        self.noise = args.noise
+        self.drift = args.drift
+        self.fault_rate = args.fault_rate
+        self.seed = args.seed
+        self.trace = args.trace
+        return self
+
+    def generator(self, device_ids, seed_offset=0):
+        """
+        Create a batch generator for a group of devices.
+
+        Args:
+            device_ids (list): IDs of the simulated devices
+            seed_offset (int): Added to the seed, so parallel workers draw different streams
+
+        Returns:
+            BatchGenerator: Generator with its own per-device state
+        """
+        return BatchGenerator(self, device_ids, seed_offset)
+
+
+class BatchGenerator:
+    """
+    Draws readings for a group of devices in NumPy blocks.
+
+    Devices take turns (round-robin), so generate(n) returns one reading for
+    each of the next n devices.
+    """
+
+    def __init__(self, model, device_ids, seed_offset=0):
+        self.model = model
+        self.device_ids = list(device_ids)
+        seed = None if model.seed is None else model.seed + seed_offset
+        self.rng = np.random.default_rng(seed)
+        self.cursor = 0
+        # Readings generated so far; with round-robin turns position // devices is the sequence number
+        self.position = 0
+
+        # Numeric columns of all fields side by side: field -> slice of the column axis
+        self.numeric = [field for field in model.fields if field.choices is None]
+        self.columns = {}
+        start = 0
+        for field in self.numeric:
+            self.columns[field.name] = slice(start, start + field.width)
+            start += field.width
+
+        self.low = np.concatenate([np.full(f.width, f.low, dtype=float) for f in self.numeric]) \
+            if self.numeric else np.zeros(0)
+        self.high = np.concatenate([np.full(f.width, f.high, dtype=float) for f in self.numeric]) \
+            if self.numeric else np.zeros(0)
+        self.span = self.high - self.low
+
+        # Per-device state: random walk offset from the middle of the range, and the last reading
+        devices = len(self.device_ids)
+        self.offset = np.zeros((devices, len(self.low)))
+        self.last = np.tile((self.low + self.high) / 2, (devices, 1))
+
+    def draw(self, count):
+        """
+        Draw the numeric readings of the next count devices.
+
+        Args:
+            count (int): Number of readings
+
+        Returns:
+            tuple: (device index array, readings array of shape (count, columns), dropout mask or None)
+        """
+        model = self.model
+        devices = (self.cursor + np.arange(count)) % len(self.device_ids)
+        self.cursor = (self.cursor + count) % len(self.device_ids)
+        columns = len(self.low)
+
+        if model.profile == "uniform":
+            values = self.rng.uniform(self.low, self.high, (count, columns))
+        else:
+            # Random walk per device; np.add.at handles devices drawn more than once
+            steps = self.rng.normal(0.0, model.drift, (count, columns)) * self.span
+            np.add.at(self.offset, devices, steps)
+            np.clip(self.offset, -self.span / 2, self.span / 2, out=self.offset)
+            values = (self.low + self.high) / 2 + self.offset[devices] + \
+                self.rng.normal(0.0, model.noise, (count, columns)) * self.span
+            np.clip(values, self.low, self.high, out=values)
+
+        dropout = None
+        if model.fault_rate > 0 and columns:
+            faulty = self.rng.random((count, columns)) < model.fault_rate
+            if faulty.any():
+                kind = self.rng.integers(0, len(FAULTS), (count, columns))
+                spike = faulty & (kind == 0)
+                stuck = faulty & (kind == 1)
+                dropout = faulty & (kind == 2)
+                values = np.where(spike, self.high + self.span * self.rng.uniform(0.5, 2.0, (count, columns)),
+                                  values)
+                values = np.where(stuck, self.last[devices], values)
+                if not dropout.any():
+                    dropout = None
+
+        self.last[devices] = values
+        return devices, values, dropout
+
+    def generate(self, count):
+        """
+        Generate the next count readings as message dicts.
+
+        Args:
+            count (int): Number of readings
+
+        Returns:
+            tuple: (list of device IDs, list of message dicts)
+        """
+        devices, values, dropout = self.draw(count)
+        device_ids = [self.device_ids[index] for index in devices.tolist()]
+
+        names = []
+        columns = []
+        if self.model.id_field:
+            names.append(self.model.id_field)
+            columns.append(device_ids)
+
+        for field in self.model.fields:
+            names.append(field.name)
+
+            if field.choices is not None:
+                picks = self.rng.integers(0, len(field.choices), count).tolist()
+                columns.append([field.choices[pick] for pick in picks])
+                continue
+
+            block = values[:, self.columns[field.name]]
+            if field.decimals is not None:
+                block = np.round(block, field.decimals)
+            rows = block.tolist()
+
+            if dropout is not None:
+                missing = dropout[:, self.columns[field.name]]
+                for row, column in zip(*np.nonzero(missing)):
+                    rows[row][column] = None
+
+            if field.keys:
+                rows = [dict(zip(field.keys, row)) for row in rows]
+            elif not field.size:
+                rows = [row[0] for row in rows]
+            columns.append(rows)
+
+        if self.model.trace:
+            if not self.model.id_field:
+                names.append("device")
+                columns.append(device_ids)
+            names += ["seq", "sent_at"]
+            columns.append(((self.position + np.arange(count)) // len(self.device_ids)).tolist())
+            columns.append([time.time()] * count)
+        self.position += count
+
+        return device_ids, [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def add_arguments(parser):
+    """
+    Add the payload profile options to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of the simulator script
+    """
+    group = parser.add_argument_group("payload")
+    group.add_argument('--profile', choices=PROFILES, default="uniform",
+                       help="uniform: independent random readings, drift: per-device random walk with noise "
+                            "[uniform]")
+    group.add_argument('--noise', type=float, default=0.02,
+                       help="Noise standard deviation as a fraction of the range (drift profile) [0.02]")
+    group.add_argument('--drift', type=float, default=0.005,
+                       help="Random walk step as a fraction of the range (drift profile) [0.005]")
+    group.add_argument('--fault-rate', type=float, default=0.0,
+                       help="Probability of a faulty reading: spike, stuck value or dropout (null) [0]")
+    group.add_argument('--seed', type=int, help="Random seed for reproducible readings")
+    group.add_argument('--no-trace', dest='trace', action='store_false',
+                       help="Do not add the trace fields seq and sent_at (and device) to the payloads")
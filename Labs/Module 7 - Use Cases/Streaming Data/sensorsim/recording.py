@@ -0,0 +1,309 @@
+"""
+Recordings of sensor streams for repeatable load tests.
+
+A recording is an append-only file of encoded messages with their
+timestamps, written by the "record" scenario sink, subscribe.py --record
+or replay.py generate, and published again by replay.py at the original
+pace, N times faster or as fast as possible.
+
+File layout (little-endian):
+
+    magic       8 bytes  b"SSIMREC1"
+    meta length u32      length of the metadata JSON
+    metadata    JSON     {"format": "json", "created": <epoch seconds>, ...}
+    records     repeated:
+        length      u32  size of the record after this header
+        timestamp   f64  epoch seconds (send or receive time)
+        topic size  u16
+        key size    u16  (device ID; 0 when unknown)
+        topic, key, payload bytes
+
+The length prefix lets a reader skip records without parsing them, and the
+reader maps the file with mmap, so opening a large recording reads nothing
+up front and records are unpacked straight from the page cache. A record
+cut short by a crash of the writer ends the recording; a writer appending
+to the file cuts it off first.
+
+Usage:
+    with RecordingReader("robots.rec") as reader:
+        sink = create_sink("mqtt", {"type": "mqtt", "broker": "localhost"})
+        sink.open()
+        replay(reader, sink, speed=10)
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+
+MAGIC = b"SSIMREC1"
+META_LENGTH = struct.Struct("<I")
+RECORD_HEADER = struct.Struct("<IdHH")
+
+
+class RecordingWriter:
+    """
+    Appends messages to a recording.
+
+    Usage:
+        with RecordingWriter("robots.rec", format="avro") as writer:
+            writer.write(time.time(), "industrial_robot/sensor_data", payload, key="MES_123")
+    """
+
+    def __init__(self, path, format="json", **meta):
+        """
+        Args:
+            path (str): Recording file, appended to when it exists (after an
+                incomplete last record, left by a crash, is removed)
+            format (str): Payload format of all records (see encoding.py)
+            **meta: Further metadata, e.g. the device model ("created" defaults to now)
+        """
+        self.path = path
+        self.count = 0
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            existing = RecordingReader(path)
+            end = existing.end()
+            existing.close()
+            if existing.meta.get("format") != format:
+                raise ValueError(f"{path} holds {existing.meta.get('format')} payloads, not {format}")
+            self.meta = existing.meta
+            # New records must start where the last complete one ends
+            if end < os.path.getsize(path):
+                os.truncate(path, end)
+        else:
+            self.meta = dict({"created": time.time()}, **meta, format=format)
+        self.file = open(path, "ab", buffering=1 << 20)
+        if not exists:
+            header = json.dumps(self.meta).encode()
+            self.file.write(MAGIC + META_LENGTH.pack(len(header)) + header)
+
+    def write(self, timestamp, topic, payload, key=None):
+        """
+        Append a message.
+
+        Args:
+            timestamp (float): Epoch seconds
+            topic (str): Topic, queue or Kafka topic
+            payload (bytes or str): Encoded message
+            key (Optional[str]): Device ID (Kafka message key on replay)
+        """
+        topic = topic.encode()
+        key = key.encode() if key else b""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        self.file.write(RECORD_HEADER.pack(len(topic) + len(key) + len(payload), timestamp, len(topic), len(key)))
+        self.file.write(topic)
+        self.file.write(key)
+        self.file.write(payload)
+        self.count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordingReader:
+    """
+    Reads a recording through mmap.
+
+    Iterating yields (timestamp, topic, key, payload) tuples; topic and key
+    are str (key None when not recorded), payload is bytes.
+
+    Attributes:
+        meta (dict): Metadata written with the recording (at least "format")
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        if size < len(MAGIC) + META_LENGTH.size:
+            self.file.close()
+            raise ValueError(f"{path} is not a recording")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a recording")
+        (length,) = META_LENGTH.unpack_from(self.map, len(MAGIC))
+        start = len(MAGIC) + META_LENGTH.size
+        self.meta = json.loads(self.map[start:start + length])
+        self.start = start + length
+
+    def __iter__(self):
+        data = self.map
+        end = len(data)
+        offset = self.start
+        header = RECORD_HEADER
+        while offset + header.size <= end:
+            length, timestamp, topic_size, key_size = header.unpack_from(data, offset)
+            body = offset + header.size
+            offset = body + length
+            if offset > end:
+                # Incomplete last record
+                break
+            topic = data[body:body + topic_size].decode()
+            key = data[body + topic_size:body + topic_size + key_size].decode() if key_size else None
+            yield timestamp, topic, key, data[body + topic_size + key_size:offset]
+
+    def timestamps(self):
+        """
+        Get the timestamps of all records without reading the payloads.
+
+        Returns:
+            list: Epoch seconds per record
+        """
+        return self._scan()[0]
+
+    def end(self):
+        """
+        Get the offset just after the last complete record.
+
+        Returns:
+            int: File size without an incomplete last record
+        """
+        return self._scan()[1]
+
+    def _scan(self):
+        """Walk the record headers; returns (timestamps, end of the last complete record)."""
+        data = self.map
+        end = len(data)
+        offset = self.start
+        timestamps = []
+        while offset + RECORD_HEADER.size <= end:
+            length, timestamp, _, _ = RECORD_HEADER.unpack_from(data, offset)
+            if offset + RECORD_HEADER.size + length > end:
+                break
+            offset += RECORD_HEADER.size + length
+            timestamps.append(timestamp)
+        return timestamps, offset
+
+    def close(self):
+        if getattr(self, "map", None) is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def generate(writer, model, device_ids, interval, duration, topic, codec, start=None, block_size=10000):
+    """
+    Write the readings of a device group to a recording without waiting (like scenario.py schedules them).
+
+    Device i sends at start + i * interval / len(device_ids) + k * interval,
+    so a seeded model gives the same recording on every run. The trace field
+    sent_at, if the model adds it, is set to that simulated send time rather
+    than the generation time.
+
+    Args:
+        writer (RecordingWriter): Destination
+        model (DeviceModel): Device model (see models.py)
+        device_ids (list): Device IDs
+        interval (float): Seconds between two readings of a device
+        duration (float): Seconds of simulated time
+        topic (str): Topic, "{device}" is replaced by the device ID
+        codec: Payload codec (see encoding.py)
+        start (Optional[float]): Epoch seconds of the first reading [now]
+
+    Returns:
+        int: Messages written
+    """
+    start = time.time() if start is None else start
+    step = interval / len(device_ids)
+    total = int(duration / step)
+    generator = model.generator(device_ids)
+    topics = {device: topic.replace("{device}", device) for device in device_ids}
+    written = 0
+    while written < total:
+        devices, messages = generator.generate(min(block_size, total - written))
+        for device, message in zip(devices, messages):
+            timestamp = start + written * step
+            if "sent_at" in message:
+                message["sent_at"] = timestamp
+            writer.write(timestamp, topics[device], codec.encode(message), device)
+            written += 1
+    return written
+
+
+def replay(reader, sink, speed=1.0, topic=None, loops=1, batch_size=1000, tick=0.002, report_interval=5.0):
+    """
+    Publish a recording through a sink (see sinks.py), keeping the relative timing.
+
+    Records due within the next tick are sent together; at speed 0 batches
+    of batch_size records are sent as fast as the sink takes them.
+
+    Args:
+        reader (RecordingReader): Recording
+        sink (Sink): Opened mqtt, amqp, kafka or record sink
+        speed (float): 1 = original pace, 10 = ten times faster, 0 = as fast as possible
+        topic (Optional[str]): Publish every record to this topic instead of the recorded one
+        loops (int): Replay the recording this many times (0 = forever)
+        batch_size (int): Largest batch handed to the sink
+        tick (float): Seconds a record may be sent early, to batch records due close together
+        report_interval (float): Seconds between progress reports (0 = none)
+
+    Returns:
+        tuple: (records sent, records failed, lateness histogram)
+    """
+    from .stats import LatencyHistogram
+
+    format = reader.meta["format"]
+    lateness = LatencyHistogram()
+    sent = failed = 0
+    started = time.monotonic()
+    next_report = started + report_interval if report_interval else None
+    previous = (started, 0)
+    loop = 0
+
+    while loops == 0 or loop < loops:
+        loop += 1
+        first = None
+        began = time.perf_counter()
+        batch = []
+        for timestamp, record_topic, key, payload in reader:
+            if speed > 0:
+                if first is None:
+                    first = timestamp
+                due = began + (timestamp - first) / speed
+                if due - time.perf_counter() > tick:
+                    if batch:
+                        failed += sink.send_payloads(batch, format)
+                        sent += len(batch)
+                        batch = []
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                lateness.record(max(0.0, time.perf_counter() - due))
+
+            batch.append((topic or record_topic, key, payload))
+            if len(batch) >= batch_size:
+                failed += sink.send_payloads(batch, format)
+                sent += len(batch)
+                batch = []
+
+            if next_report and time.monotonic() >= next_report:
+                now = time.monotonic()
+                print(f"loop {loop}: sent={sent} rate={(sent - previous[1]) / (now - previous[0]):.0f}/s "
+                      f"failed={failed} lateness {lateness.summary()}")
+                previous = (now, sent)
+                next_report += report_interval
+
+        if batch:
+            failed += sink.send_payloads(batch, format)
+            sent += len(batch)
+
+    return sent, failed, lateness
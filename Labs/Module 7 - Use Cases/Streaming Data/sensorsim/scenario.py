@@ -0,0 +1,268 @@
+"""
+Scenario simulator: many device groups, several protocols, one process.
+
+A YAML scenario lists the sinks (brokers, databases, files; see sinks.py)
+and the device groups publishing to them:
+
+    duration: 60            # seconds, 0 = until Ctrl+C
+    report_interval: 5
+    sinks:
+      hivemq: {type: mqtt, broker: localhost, port: 1883}
+      rabbitmq: {type: amqp, host: localhost}
+    devices:
+      - name: robots
+        model: industrial_robot       # see models.py, "module:factory" or inline fields
+        count: 20000
+        prefix: MES_
+        first: 123
+        interval: 1.0                 # seconds between two readings of a device
+        sink: hivemq
+        topic: industrial_robot/sensor_data
+        format: avro
+        profile: drift
+      - name: tv_room
+        model: tv_room
+        sink: rabbitmq
+        topic: tv_room                # queue name for AMQP sinks
+
+Scheduling: one asyncio task per group spreads the devices evenly over the
+interval (device i is due at start + i * interval / count + k * interval)
+and wakes up at most every --tick seconds to generate and send all devices
+due by then as one NumPy batch. Deadlines are absolute, so send time does
+not accumulate as drift; the report shows how late the batches started
+(p99 is about the tick when the process keeps up). A group that falls more
+than a second behind skips readings instead of bursting. Sending runs on
+one thread per sink, so a slow sink delays only its own groups.
+"""
+
+import asyncio
+import time
+
+from . import encoding, models
+from .pacing import RatePacer
+from .sinks import create_sink
+from .stats import LatencyHistogram
+
+# Seconds between wake-ups of a group when readings are due more often
+DEFAULT_TICK = 0.005
+
+GROUP_OPTIONS = {"name", "model", "fields", "id_field", "count", "prefix", "first", "interval", "sink", "topic",
+                 "format", "schema", "schema_registry", "schema_subject", "profile", "noise", "drift",
+                 "fault_rate", "seed", "trace"}
+SCENARIO_OPTIONS = {"duration", "report_interval", "tick", "seed", "sinks", "devices"}
+
+
+def load_scenario(path):
+    """
+    Read a scenario file.
+
+    Args:
+        path (str): YAML file
+
+    Returns:
+        dict: Scenario
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise SystemExit("Scenario files require PyYAML: pip3 install pyyaml")
+    with open(path) as scenario_file:
+        scenario = yaml.safe_load(scenario_file) or {}
+
+    unknown = set(scenario) - SCENARIO_OPTIONS
+    if unknown:
+        raise ValueError(f"Unknown scenario option(s): {', '.join(sorted(unknown))}")
+    if not scenario.get("devices"):
+        raise ValueError("The scenario has no device groups")
+    sinks = scenario.get("sinks") or {}
+    for index, group in enumerate(scenario["devices"]):
+        name = group.get("name", f"group-{index + 1}")
+        unknown = set(group) - GROUP_OPTIONS
+        if unknown:
+            raise ValueError(f"Unknown option(s) {', '.join(sorted(unknown))} of device group '{name}'")
+        if group.get("sink") not in sinks:
+            raise ValueError(f"Device group '{name}' uses unknown sink '{group.get('sink')}'")
+        if group.get("interval", 1.0) <= 0:
+            raise ValueError(f"Device group '{name}' needs an interval > 0")
+    return scenario
+
+
+class DeviceGroup:
+    """
+    Devices of one model publishing to one sink.
+
+    Attributes:
+        name (str): Group name
+        devices (list): Device IDs
+        interval (float): Seconds between two readings of a device
+        topic (str): Topic, queue or measurement; "{device}" is replaced by the device ID
+            (default: the topic of the model's script, or the group name)
+        sink (Sink): Destination
+        codec: Payload codec (see encoding.py)
+        sent (int): Messages handed to the sink
+        failed (int): Messages the sink rejected
+        lateness (LatencyHistogram): Delay between the due time and the start of each batch
+    """
+
+    def __init__(self, config, sink, index, seed=None):
+        self.name = config.get("name", f"group-{index + 1}")
+        model_name = config.get("model")
+        self.model = models.load_model(model_name, config.get("fields"), config.get("id_field"))
+        self.model.profile = config.get("profile", self.model.profile)
+        self.model.noise = config.get("noise", self.model.noise)
+        self.model.drift = config.get("drift", self.model.drift)
+        self.model.fault_rate = config.get("fault_rate", self.model.fault_rate)
+        self.model.seed = config.get("seed", seed)
+        self.model.trace = config.get("trace", self.model.trace)
+
+        prefix = config.get("prefix", f"{self.name}-")
+        first = config.get("first", 1)
+        self.devices = [f"{prefix}{first + number}" for number in range(config.get("count", 1))]
+        self.interval = float(config.get("interval", 1.0))
+        self.topic = config.get("topic", models.TOPICS.get(model_name, self.name))
+        self.topics = {}
+        self.sink = sink
+        format = config.get("format", "json")
+        schema = config.get("schema", models.SCHEMAS.get(model_name))
+        if format == "avro" and schema is None:
+            # Inline models have no schema file, the record is named after the group
+            schema = encoding.avro_schema(self.model, self.name.title().replace("_", "").replace("-", ""))
+        self.codec = encoding.codec_for(format, schema, config.get("schema_registry"), config.get("schema_subject"))
+        self.generator = self.model.generator(self.devices, seed_offset=index)
+        self.pacer = None
+        self.sent = self.failed = 0
+        self.lateness = LatencyHistogram()
+
+    @property
+    def rate(self):
+        """float: Messages per second of the whole group"""
+        return len(self.devices) / self.interval
+
+    def topic_for(self, device):
+        topic = self.topics.get(device)
+        if topic is None:
+            topic = self.topics[device] = self.topic.replace("{device}", device)
+        return topic
+
+
+class Scheduler:
+    """
+    Runs the device groups of a scenario on one asyncio loop.
+
+    Usage:
+        scheduler = Scheduler(load_scenario("plant.yaml"))
+        asyncio.run(scheduler.run())
+    """
+
+    def __init__(self, scenario, duration=None, tick=None, report_interval=None):
+        self.duration = scenario.get("duration", 0) if duration is None else duration
+        self.tick = tick or scenario.get("tick", DEFAULT_TICK)
+        self.report_interval = report_interval or scenario.get("report_interval", 5.0)
+        self.sinks = {name: create_sink(name, config) for name, config in scenario["sinks"].items()}
+        self.groups = [DeviceGroup(config, self.sinks[config["sink"]], index, scenario.get("seed"))
+                       for index, config in enumerate(scenario["devices"])]
+        self.stopping = None
+
+    def describe(self):
+        """Print the device groups and their rates."""
+        for group in self.groups:
+            print(f"{group.name}: {len(group.devices)} device(s) every {group.interval:g}s = {group.rate:.0f} msg/s "
+                  f"({group.codec.format}) -> {group.sink.name} ({group.sink.config['type']}) '{group.topic}'")
+        print(f"Total: {sum(len(group.devices) for group in self.groups)} device(s), "
+              f"{sum(group.rate for group in self.groups):.0f} msg/s")
+
+    async def run(self):
+        """Open the sinks, run the groups until the duration expires or the task is cancelled, close the sinks."""
+        loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        used = {group.sink.name: group.sink for group in self.groups}
+        await asyncio.gather(*(loop.run_in_executor(sink.executor, sink.open) for sink in used.values()))
+
+        tasks = [asyncio.ensure_future(self.run_group(group)) for group in self.groups]
+        reporter = asyncio.ensure_future(self.report_loop())
+        started = time.monotonic()
+        done = ()
+        try:
+            # Groups only finish on errors; re-raised once the sinks are closed
+            done, _ = await asyncio.wait(tasks, timeout=self.duration or None, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            self.stopping.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            reporter.cancel()
+            await asyncio.gather(*(loop.run_in_executor(sink.executor, sink.close) for sink in used.values()),
+                                 return_exceptions=True)
+            for sink in self.sinks.values():
+                sink.executor.shutdown()
+            print("Final:")
+            self.report(time.monotonic() - started, None)
+        for task in done:
+            task.result()
+
+    async def run_group(self, group):
+        """Generate and send the readings of a group on schedule."""
+        loop = asyncio.get_running_loop()
+        pacer = group.pacer = RatePacer(group.rate)
+        while not self.stopping.is_set():
+            due = pacer.due()
+            if due:
+                # The oldest reading of the batch was due when the previously issued one was plus one step
+                group.lateness.record(max(0.0, time.perf_counter() - (pacer.start + pacer.issued / pacer.rate)))
+                devices, messages = group.generator.generate(due)
+                pacer.issue(due)
+                group.failed += await loop.run_in_executor(group.sink.executor, group.sink.send, group, devices,
+                                                           messages)
+                group.sent += due
+
+            delay = pacer.start + pacer.issued / pacer.rate - time.perf_counter()
+            # Wake up at most every tick (larger batches), and at least twice a second to notice stop
+            await asyncio.sleep(min(max(delay, self.tick), 0.5))
+
+    async def report_loop(self):
+        previous = {group.name: 0 for group in self.groups}
+        while True:
+            await asyncio.sleep(self.report_interval)
+            previous = self.report(self.report_interval, previous)
+
+    def report(self, elapsed, previous):
+        """
+        Print the rate, failures and schedule lateness of every group.
+
+        Args:
+            elapsed (float): Seconds since the previous report (or the start, for the final report)
+            previous (Optional[dict]): Group name -> messages sent at the previous report
+
+        Returns:
+            dict: Group name -> messages sent, for the next report
+        """
+        sent = {}
+        for group in self.groups:
+            sent[group.name] = group.sent
+            count = group.sent - (previous or {}).get(group.name, 0)
+            skipped = group.pacer.skipped if group.pacer else 0
+            print(f"{group.name}: sent={group.sent} rate={count / elapsed if elapsed else 0:.0f}/s "
+                  f"failed={group.failed} skipped={skipped} lateness {group.lateness.summary()}")
+        errors = [f"{sink.name}={sink.errors}" for sink in self.sinks.values() if sink.errors]
+        if errors:
+            print(f"Sink errors: {' '.join(errors)}")
+        return sent
+
+
+def run(path, duration=None, tick=None, report_interval=None, dry_run=False):
+    """
+    Run a scenario file until its duration expires or Ctrl+C.
+
+    Args:
+        path (str): YAML scenario
+        duration (Optional[float]): Overrides the scenario duration (0 = run forever)
+        tick (Optional[float]): Overrides the scheduling tick
+        report_interval (Optional[float]): Overrides the report interval
+        dry_run (bool): Only print the device groups
+    """
+    scheduler = Scheduler(load_scenario(path), duration, tick, report_interval)
+    scheduler.describe()
+    if dry_run:
+        return
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        pass
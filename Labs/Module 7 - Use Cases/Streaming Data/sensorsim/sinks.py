@@ -0,0 +1,299 @@
+"""
+Message sinks of the scenario simulator (see scenario.py).
+
+A sink delivers the message batches of one or more device groups to a
+broker, database or file. The scheduler calls open(), send() and close()
+on a single worker thread per sink (Sink.executor), so blocking client
+libraries never stall the asyncio loop that keeps the device timing, and
+the sinks need no locking.
+
+Sinks:
+    mqtt   - paho-mqtt; topic per group, "{device}" is replaced by the device ID
+    amqp   - pika; the topic is the queue name (default exchange), declared on first use
+    kafka  - confluent-kafka; the device ID is the message key
+    influx - influxdb-client batching write API; the topic is the measurement,
+             the device ID the "device" tag and every numeric field a field
+    file   - JSON lines with time, topic and message (e.g. to inspect a scenario)
+    record - Recording for replay.py (see recording.py), all groups in one format
+
+The client libraries are only imported by the sinks that use them.
+"""
+
+import concurrent.futures
+import time
+
+from .encoding import CONTENT_TYPES
+from .ingest import flatten
+from .payloads import encode_json
+
+SINK_TYPES = ("mqtt", "amqp", "kafka", "influx", "file", "record")
+
+
+class Sink:
+    """
+    Base class of the sinks.
+
+    Attributes:
+        name (str): Sink name in the scenario
+        config (dict): Sink options from the scenario
+        errors (int): Messages reported as failed after send() returned
+            (delivery callbacks, background writes)
+    """
+
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.errors = 0
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sink-{name}")
+
+    def open(self):
+        """Connect (called on the sink thread)."""
+
+    def send(self, group, devices, messages):
+        """
+        Deliver a batch of messages.
+
+        Args:
+            group (DeviceGroup): Group that generated the messages (topic, codec)
+            devices (list): Device ID of every message
+            messages (list): Message dicts
+
+        Returns:
+            int: Messages that could not be sent
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and disconnect (called on the sink thread)."""
+
+    def send_payloads(self, records, format):
+        """
+        Deliver encoded messages (replay.py; mqtt, amqp, kafka and record sinks).
+
+        Args:
+            records (list): (topic, key, payload) tuples
+            format (str): Payload format, for the AMQP content type
+
+        Returns:
+            int: Messages that could not be sent
+        """
+        raise ValueError(f"Sink '{self.name}' ({self.config['type']}) cannot send encoded payloads")
+
+    def encoded(self, group, devices, messages):
+        """Encode a batch of a device group as (topic, key, payload) tuples."""
+        encode = group.codec.encode
+        return [(group.topic_for(device), device, encode(message)) for device, message in zip(devices, messages)]
+
+
+class MqttSink(Sink):
+    def open(self):
+        from .mqtt_load import create_client, mqtt_client
+
+        self.client = create_client(self.config.get("client_id", f"sensorsim-{self.name}"))
+        if self.config.get("username"):
+            self.client.username_pw_set(self.config["username"], self.config.get("password"))
+        max_inflight = self.config.get("max_inflight", 1000)
+        self.client.max_inflight_messages_set(max_inflight)
+        self.client.max_queued_messages_set(max(max_inflight * 10, 10000))
+        self.client.connect(self.config.get("broker", "localhost"), self.config.get("port", 1883))
+        self.client.loop_start()
+        self.qos = self.config.get("qos", 0)
+        self.success = mqtt_client.MQTT_ERR_SUCCESS
+
+    def send(self, group, devices, messages):
+        return self.send_payloads(self.encoded(group, devices, messages), group.codec.format)
+
+    def send_payloads(self, records, format):
+        failed = 0
+        for topic, _, payload in records:
+            if self.client.publish(topic, payload, qos=self.qos).rc != self.success:
+                failed += 1
+        return failed
+
+    def close(self):
+        self.client.loop_stop()
+        self.client.disconnect()
+
+
+class AmqpSink(Sink):
+    def open(self):
+        try:
+            import pika
+        except ImportError:
+            raise SystemExit(f"Sink '{self.name}' requires pika: pip3 install pika")
+        self.pika = pika
+        credentials = pika.PlainCredentials(self.config.get("username", "guest"), self.config.get("password", "guest"))
+        parameters = pika.ConnectionParameters(host=self.config.get("host", "localhost"),
+                                               port=self.config.get("port", 5672),
+                                               virtual_host=self.config.get("virtual_host", "/"),
+                                               credentials=credentials)
+        self.connection = pika.BlockingConnection(parameters)
+        self.channel = self.connection.channel()
+        self.declared = set()
+        self.properties = {}
+
+    def send(self, group, devices, messages):
+        return self.send_payloads(self.encoded(group, devices, messages), group.codec.format)
+
+    def send_payloads(self, records, format):
+        properties = self.properties.get(format)
+        if properties is None:
+            properties = self.properties[format] = self.pika.BasicProperties(
+                content_type=CONTENT_TYPES[format], delivery_mode=2 if self.config.get("durable", False) else 1)
+
+        for queue_name, _, payload in records:
+            if queue_name not in self.declared:
+                self.channel.queue_declare(queue=queue_name, durable=self.config.get("durable", False))
+                self.declared.add(queue_name)
+            self.channel.basic_publish("", queue_name, payload, properties)
+        # Serve heartbeats and flow control between batches
+        self.connection.process_data_events(0)
+        return 0
+
+    def close(self):
+        if self.connection.is_open:
+            self.connection.close()
+
+
+class KafkaSink(Sink):
+    def open(self):
+        try:
+            from confluent_kafka import Producer
+        except ImportError:
+            raise SystemExit(f"Sink '{self.name}' requires confluent-kafka: pip3 install confluent-kafka")
+        config = {
+            "bootstrap.servers": self.config.get("bootstrap_servers", "localhost:9092"),
+            "linger.ms": self.config.get("linger_ms", 20),
+            "compression.type": self.config.get("compression", "lz4"),
+        }
+        config.update(self.config.get("producer", {}))
+        self.producer = Producer(config)
+
+    def on_delivery(self, error, message):
+        if error is not None:
+            self.errors += 1
+
+    def send(self, group, devices, messages):
+        return self.send_payloads(self.encoded(group, devices, messages), group.codec.format)
+
+    def send_payloads(self, records, format):
+        for topic, key, payload in records:
+            while True:
+                try:
+                    self.producer.produce(topic, payload, key=key, on_delivery=self.on_delivery)
+                    break
+                except BufferError:
+                    # Local queue full: wait for deliveries instead of dropping
+                    self.producer.poll(0.05)
+        self.producer.poll(0)
+        return 0
+
+    def close(self):
+        self.errors += self.producer.flush(30)
+
+
+class InfluxSink(Sink):
+    def open(self):
+        try:
+            from influxdb_client import InfluxDBClient, WriteOptions
+        except ImportError:
+            raise SystemExit(f"Sink '{self.name}' requires influxdb-client: pip3 install influxdb-client")
+        self.client = InfluxDBClient(url=self.config.get("url", "http://localhost:8086"),
+                                     token=self.config.get("token"), org=self.config.get("org"))
+        write_options = WriteOptions(batch_size=self.config.get("batch_size", 5000),
+                                     flush_interval=self.config.get("flush_interval", 1000))
+        self.write_api = self.client.write_api(write_options=write_options, error_callback=self.on_error)
+        self.bucket = self.config.get("bucket", "sensors")
+
+    def on_error(self, conf, data, exception):
+        self.errors += data.count(b"\n" if isinstance(data, bytes) else "\n") + 1
+
+    @staticmethod
+    def escape(value):
+        return str(value).replace(",", r"\,").replace(" ", r"\ ").replace("=", r"\=")
+
+    def send(self, group, devices, messages):
+        measurement = self.escape(group.topic)
+        timestamp = time.time_ns()
+        lines = []
+        for device, message in zip(devices, messages):
+            fields = ",".join(f"{self.escape(name)}={value}" for name, value in flatten(message).items()
+                              if isinstance(value, (int, float)) and not isinstance(value, bool))
+            if fields:
+                lines.append(f"{measurement},device={self.escape(device)} {fields} {timestamp}")
+        if lines:
+            self.write_api.write(self.bucket, self.config.get("org"), lines)
+        return 0
+
+    def close(self):
+        self.write_api.close()
+        self.client.close()
+
+
+class FileSink(Sink):
+    def open(self):
+        self.file = open(self.config.get("path", f"{self.name}.jsonl"), "ab")
+
+    def send(self, group, devices, messages):
+        now = time.time()
+        lines = []
+        for device, message in zip(devices, messages):
+            line = encode_json({"time": now, "topic": group.topic_for(device), "message": message})
+            lines.append(line if isinstance(line, bytes) else line.encode())
+        self.file.write(b"\n".join(lines) + b"\n")
+        return 0
+
+    def close(self):
+        self.file.close()
+
+
+class RecordSink(Sink):
+    def open(self):
+        from .recording import RecordingWriter
+
+        self.writer_class = RecordingWriter
+        self.writer = None
+
+    def send(self, group, devices, messages):
+        return self.send_payloads(self.encoded(group, devices, messages), group.codec.format)
+
+    def send_payloads(self, records, format):
+        if self.writer is None:
+            self.writer = self.writer_class(self.config.get("path", f"{self.name}.rec"), format)
+        elif self.writer.meta["format"] != format:
+            raise ValueError(f"Sink '{self.name}' records {self.writer.meta['format']} payloads, not {format}")
+        now = time.time()
+        for topic, key, payload in records:
+            self.writer.write(now, topic, payload, key)
+        return 0
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+SINKS = {
+    "mqtt": MqttSink,
+    "amqp": AmqpSink,
+    "kafka": KafkaSink,
+    "influx": InfluxSink,
+    "file": FileSink,
+    "record": RecordSink,
+}
+
+
+def create_sink(name, config):
+    """
+    Create a sink from its scenario entry.
+
+    Args:
+        name (str): Sink name
+        config (dict): Sink options, "type" selects the sink class
+
+    Returns:
+        Sink: Unopened sink
+    """
+    kind = config.get("type")
+    if kind not in SINKS:
+        raise ValueError(f"Sink '{name}' has unknown type '{kind}', expected one of {', '.join(SINK_TYPES)}")
+    return SINKS[kind](name, config)
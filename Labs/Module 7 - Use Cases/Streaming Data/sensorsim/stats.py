@@ -0,0 +1,121 @@
+"""
+Latency statistics for the simulators.
+
+LatencyHistogram stores latencies in logarithmic buckets (about 9% wide),
+so recording costs O(1) with constant memory regardless of the message
+count, and histograms from several threads or processes can be merged.
+"""
+
+import math
+
+# Buckets per power of two (2 ** (1/8) = 9% bucket width)
+BUCKETS_PER_OCTAVE = 8
+# 1 microsecond .. ~1000 seconds
+BUCKET_COUNT = 30 * BUCKETS_PER_OCTAVE
+
+
+class LatencyHistogram:
+    """
+    Logarithmic latency histogram.
+
+    Attributes:
+        counts (list): Number of samples per bucket
+        count (int): Total number of samples
+        total (float): Sum of all samples in seconds
+        max (float): Largest sample in seconds
+    """
+
+    def __init__(self, counts=None):
+        self.counts = list(counts) if counts else [0] * BUCKET_COUNT
+        self.count = sum(self.counts)
+        self.total = 0.0
+        self.max = 0.0
+
+    @staticmethod
+    def bucket(seconds):
+        """Get the bucket index of a latency."""
+        micros = seconds * 1e6
+        if micros < 1:
+            return 0
+        return min(int(math.log2(micros) * BUCKETS_PER_OCTAVE) + 1, BUCKET_COUNT - 1)
+
+    @staticmethod
+    def bucket_limit(index):
+        """Get the upper bound of a bucket in seconds."""
+        return 2 ** (index / BUCKETS_PER_OCTAVE) / 1e6
+
+    def record(self, seconds):
+        """
+        Add a latency sample.
+
+        Args:
+            seconds (float): Latency in seconds
+        """
+        self.counts[self.bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """
+        Add the samples of another histogram.
+
+        Args:
+            other (LatencyHistogram): Histogram to add
+        """
+        for index, value in enumerate(other.counts):
+            self.counts[index] += value
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        """
+        Get a latency percentile.
+
+        Args:
+            percent (float): Percentile, e.g. 99
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, in seconds
+        """
+        if not self.count:
+            return 0.0
+        rank = self.count * percent / 100.0
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                return min(self.bucket_limit(index), self.max)
+        return self.max
+
+    def mean(self):
+        """Get the mean latency in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def to_state(self):
+        """Get a picklable snapshot (for sending between processes)."""
+        return self.counts[:], self.count, self.total, self.max
+
+    @classmethod
+    def from_state(cls, state):
+        """Create a histogram from a to_state() snapshot."""
+        counts, count, total, maximum = state
+        histogram = cls(counts)
+        histogram.count = count
+        histogram.total = total
+        histogram.max = maximum
+        return histogram
+
+    def summary(self, unit="ms"):
+        """
+        Format count, mean and percentiles.
+
+        Returns:
+            str: e.g. "n=1200 mean=1.2ms p50=1.0ms p95=2.9ms p99=4.1ms max=9.8ms"
+        """
+        scale = 1000.0 if unit == "ms" else 1.0
+        values = [("mean", self.mean())] + [(f"p{p}", self.percentile(p)) for p in (50, 95, 99)] + \
+                 [("max", self.max)]
+        return f"n={self.count} " + " ".join(f"{name}={value * scale:.2f}{unit}" for name, value in values)
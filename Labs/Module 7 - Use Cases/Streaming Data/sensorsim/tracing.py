@@ -0,0 +1,193 @@
+"""
+End-to-end latency and loss of traced sensor messages.
+
+The simulators stamp every message with a per-device sequence number
+("seq") and the send time ("sent_at", see payloads.py). A TraceStats
+object fed with the decoded messages on the consumer side measures
+
+    latency      - receive time - sent_at (publisher and consumer clocks must
+                   be in sync, e.g. by NTP, or run on the same host)
+    gaps         - sequence numbers skipped per device (lost messages, or
+                   messages that arrive later out of order)
+    out of order - messages with a sequence number below the highest seen
+    restarts     - publishers that started over at seq 0
+    lost         - gaps not filled by late messages (gaps - out of order)
+
+Devices are told apart by the "device" trace field or the ID field of the
+model ("robot_id"), per topic. Messages without trace fields are counted
+as untraced.
+
+The statistics are printed with the subscriber's rate reports and can be
+scraped by Prometheus (MetricsServer serves /metrics in the text format).
+"""
+
+import bisect
+import http.server
+import threading
+
+from .stats import LatencyHistogram
+
+# Payload fields identifying the sending device, in order of preference
+SOURCE_FIELDS = ("device", "robot_id")
+
+# Upper bounds (seconds) of the Prometheus latency histogram buckets
+PROMETHEUS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class TraceStats:
+    """
+    Latency, gap and ordering statistics of traced messages.
+
+    observe() runs on the ingest worker thread; the reports and the metrics
+    server only read the counters.
+
+    Attributes:
+        traced (int): Messages with trace fields
+        untraced (int): Messages without trace fields
+        gaps (int): Skipped sequence numbers
+        out_of_order (int): Messages older than the newest one of their device
+        restarts (int): Devices that started over at seq 0
+        skewed (int): Messages received before they were sent (clock skew)
+        histogram (LatencyHistogram): End-to-end latencies
+    """
+
+    def __init__(self, source_fields=SOURCE_FIELDS):
+        self.source_fields = source_fields
+        self.last_seq = {}
+        self.traced = self.untraced = 0
+        self.gaps = self.out_of_order = self.restarts = self.skewed = 0
+        self.histogram = LatencyHistogram()
+        self.buckets = [0] * (len(PROMETHEUS_BUCKETS) + 1)
+
+    def observe(self, received_at, topic, message):
+        """
+        Add a received message.
+
+        Args:
+            received_at (float): Epoch seconds when the message arrived
+            topic (str): Topic or queue
+            message (dict): Decoded payload
+        """
+        seq = message.get("seq") if isinstance(message, dict) else None
+        sent_at = message.get("sent_at") if seq is not None else None
+        if seq is None or sent_at is None:
+            self.untraced += 1
+            return
+        self.traced += 1
+
+        latency = received_at - sent_at
+        if latency < 0:
+            self.skewed += 1
+            latency = 0.0
+        self.histogram.record(latency)
+        self.buckets[bisect.bisect_left(PROMETHEUS_BUCKETS, latency)] += 1
+
+        device = None
+        for field in self.source_fields:
+            device = message.get(field)
+            if device is not None:
+                break
+        source = (topic, device)
+        last = self.last_seq.get(source)
+        if last is None:
+            self.last_seq[source] = seq
+        elif seq > last:
+            self.gaps += seq - last - 1
+            self.last_seq[source] = seq
+        elif seq == 0:
+            self.restarts += 1
+            self.last_seq[source] = seq
+        else:
+            self.out_of_order += 1
+
+    @property
+    def lost(self):
+        """int: Skipped sequence numbers not made up by out-of-order arrivals (estimate of lost messages)"""
+        return max(0, self.gaps - self.out_of_order)
+
+    def summary(self):
+        """
+        Format the statistics for the rate report.
+
+        Returns:
+            str: e.g. "devices=10 lost=0 gaps=0 out-of-order=0 latency n=... p99=..."
+        """
+        text = (f"devices={len(self.last_seq)} lost={self.lost} gaps={self.gaps} "
+                f"out-of-order={self.out_of_order} restarts={self.restarts} latency {self.histogram.summary()}")
+        if self.skewed:
+            text += f" clock-skewed={self.skewed}"
+        if self.untraced:
+            text += f" untraced={self.untraced}"
+        return text
+
+    def prometheus(self, counters=None):
+        """
+        Format the statistics in the Prometheus text format.
+
+        Args:
+            counters (Optional[dict]): Further counters, name -> (help, value)
+
+        Returns:
+            str: Metrics page
+        """
+        lines = []
+
+        def counter(name, text, value):
+            lines.extend([f"# HELP {name} {text}", f"# TYPE {name} counter", f"{name} {value}"])
+
+        for name, (text, value) in (counters or {}).items():
+            counter(name, text, value)
+        counter("sensorsim_traced_messages_total", "Messages with sequence number and send time", self.traced)
+        counter("sensorsim_untraced_messages_total", "Messages without trace fields", self.untraced)
+        counter("sensorsim_sequence_gaps_total", "Skipped sequence numbers (lost or late messages)", self.gaps)
+        lines.extend(["# HELP sensorsim_lost_messages Estimated lost messages (gaps - out of order)",
+                      "# TYPE sensorsim_lost_messages gauge", f"sensorsim_lost_messages {self.lost}"])
+        counter("sensorsim_out_of_order_total", "Messages older than the newest one of their device",
+                self.out_of_order)
+        counter("sensorsim_publisher_restarts_total", "Devices that started over at sequence number 0",
+                self.restarts)
+        counter("sensorsim_clock_skewed_total", "Messages received before their send time", self.skewed)
+
+        name = "sensorsim_end_to_end_latency_seconds"
+        lines.extend([f"# HELP {name} Time from sending to receiving a message", f"# TYPE {name} histogram"])
+        cumulative = 0
+        for bound, count in zip(PROMETHEUS_BUCKETS, self.buckets):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.histogram.count}')
+        lines.append(f"{name}_sum {self.histogram.total}")
+        lines.append(f"{name}_count {self.histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer(threading.Thread):
+    """
+    Serves the metrics page of a callable on http://<host>:<port>/metrics.
+
+    Usage:
+        MetricsServer(9105, lambda: stats.prometheus()).start()
+    """
+
+    def __init__(self, port, render, host=""):
+        super().__init__(daemon=True)
+        render_page = render
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_page().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+
+    def run(self):
+        self.server.serve_forever()
@@ -0,0 +1,39 @@
+# python 3.10
+# Note: requires numpy and pyyaml, plus the client library of every sink used in the
+# scenario (paho-mqtt, pika, confluent-kafka, influxdb-client)
+# pip3 install numpy pyyaml paho-mqtt pika confluent-kafka influxdb-client
+
+import argparse
+import os
+import sys
+
+# Shared simulator helpers live in "Streaming Data/sensorsim"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from sensorsim import scenario
+
+# Scenario used without a file argument
+default_scenario = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios", "plant.yaml")
+
+
+# Main function
+def run():
+    # e.g. python3 simulate.py scenarios/plant.yaml --duration 60
+    parser = argparse.ArgumentParser(description="Run a YAML plant scenario: device groups publishing to MQTT, "
+                                                 "RabbitMQ, Kafka, InfluxDB and files from one process")
+    parser.add_argument('scenario', nargs='?', default=default_scenario,
+                        help="Scenario file [scenarios/plant.yaml]")
+    parser.add_argument('--duration', type=float, help="Stop after this many seconds, 0 = run forever "
+                                                        "[duration of the scenario]")
+    parser.add_argument('--tick', type=float,
+                        help=f"Seconds between two batches of a device group [{scenario.DEFAULT_TICK}]")
+    parser.add_argument('--report-interval', type=float, help="Seconds between reports [5]")
+    parser.add_argument('--dry-run', action='store_true', help="Only print the device groups and rates")
+    args = parser.parse_args()
+
+    scenario.run(args.scenario, duration=args.duration, tick=args.tick, report_interval=args.report_interval,
+                 dry_run=args.dry_run)
+
+
+# Execute the main function
+if __name__ == '__main__':
+    run()
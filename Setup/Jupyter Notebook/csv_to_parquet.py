@@ -0,0 +1,279 @@
+# =============================================================================
+# CSV TO PARQUET - Columnar copies of the PDI output
+# =============================================================================
+#
+# Purpose:
+#   Converts each new sales_*.csv in pdi-output/ into Parquet, partitioned
+#   by order month, so the notebook and other tools read only the columns
+#   (and months) they need from compressed, typed files instead of parsing
+#   the text again on every run. file_watcher.py calls convert_files() for
+#   every batch of new files before the notebook runs.
+#
+# Layout (hive-style partitions, readable by pandas, pyarrow, Spark, DuckDB):
+#   pdi-output/parquet/
+#     _schemas/sales_detailed.arrow          cached schema of the dataset
+#     sales_detailed/
+#       order_month=2024-01/sales_detailed_20250218-0.parquet
+#       order_month=2024-02/sales_detailed_20250218-0.parquet
+#   The dataset name is the file name without a trailing timestamp
+#   (sales_detailed_20250218.csv -> sales_detailed); the Parquet files keep
+#   the CSV name, and converting a CSV again replaces its earlier files.
+#   A conversion writes into a hidden folder (.<csv name>-*) next to the
+#   datasets and moves the files into place only when the whole CSV has been
+#   converted, so a failed conversion leaves no partial copy behind.
+#
+# How a file is converted:
+#   - pyarrow's streaming CSV reader parses the file block by block and every
+#     block is written out before the next one is read, so memory use does
+#     not grow with the file size.
+#   - The column types of a dataset are inferred from its first file and
+#     cached in _schemas/; later files are parsed with the cached types (no
+#     inference, and every file of a dataset gets the same types). Columns
+#     the cache does not know yet are inferred and added to it.
+#   - When several files arrive together, they are converted in parallel
+#     by a process pool (one file per process).
+#
+# Prerequisites:
+#   - pyarrow (optional for file_watcher.py:  pip install pyarrow)
+#
+# Usage:
+#   python csv_to_parquet.py ~/Jupyter-Notebook/pdi-output/sales_*.csv
+# =============================================================================
+
+import argparse
+import concurrent.futures
+import csv
+import glob
+import os
+import re
+import shutil
+import tempfile
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+
+# =============================================================================
+# CONVERSION SETTINGS
+# =============================================================================
+PARQUET_DIR_NAME = "parquet"
+SCHEMA_DIR_NAME = "_schemas"
+# Column the partitions are derived from, and the partition column name
+DATE_COLUMN = "order_date"
+PARTITION_COLUMN = "order_month"
+# Bytes of CSV parsed per record batch
+BLOCK_SIZE = 4 << 20
+COMPRESSION = "zstd"
+
+
+def available():
+    """True if pyarrow is installed."""
+    return pa is not None
+
+
+# =============================================================================
+# FUNCTION: dataset_name
+# =============================================================================
+# sales_detailed_20250218.csv -> sales_detailed, sales_detailed.csv ->
+# sales_detailed
+# =============================================================================
+def dataset_name(csv_path):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return re.sub(r"_\d[\d_-]*$", "", stem) or stem
+
+
+def read_header(csv_path):
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        return [name.strip() for name in next(csv.reader(f), [])]
+
+
+def open_reader(csv_path, column_types=None):
+    return pa_csv.open_csv(csv_path, read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE),
+                           convert_options=pa_csv.ConvertOptions(column_types=column_types or {}))
+
+
+# =============================================================================
+# FUNCTION: cached_schema
+# =============================================================================
+# Returns the column types for a CSV: the cached schema of its dataset,
+# extended by (and saved with) the inferred types of columns it does not
+# contain yet. Called in the watcher process only, so the cache has a
+# single writer.
+# =============================================================================
+def cached_schema(csv_path, output_dir):
+    schema_path = os.path.join(output_dir, SCHEMA_DIR_NAME, dataset_name(csv_path) + ".arrow")
+    schema = None
+    if os.path.exists(schema_path):
+        with open(schema_path, "rb") as f:
+            schema = pa.ipc.read_schema(pa.py_buffer(f.read()))
+        if all(name in schema.names for name in read_header(csv_path)):
+            return schema
+
+    # First file of the dataset, or new columns: infer from the first block
+    reader = open_reader(csv_path, {field.name: field.type for field in schema} if schema else None)
+    inferred = reader.schema
+    reader.close()
+    if schema is None:
+        schema = inferred
+    else:
+        for field in inferred:
+            if field.name not in schema.names:
+                schema = schema.append(field)
+
+    os.makedirs(os.path.dirname(schema_path), exist_ok=True)
+    temp_path = schema_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(schema.serialize().to_pybytes())
+    os.replace(temp_path, schema_path)
+    return schema
+
+
+# =============================================================================
+# FUNCTION: convert
+# =============================================================================
+# Streams one CSV into its dataset's partitions. The files are written to a
+# temporary folder first and replace the files of an earlier conversion only
+# on success; on failure nothing is left behind and the CSV stays the only
+# copy (the notebook reads it instead).
+#
+# Returns:
+#   dict: rows, files (Parquet files written), bytes (their total size),
+#         seconds
+# =============================================================================
+def convert(csv_path, output_dir, schema=None):
+    started = time.monotonic()
+    schema = schema or cached_schema(csv_path, output_dir)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    dataset_dir = os.path.join(output_dir, dataset_name(csv_path))
+
+    header = read_header(csv_path)
+    reader = open_reader(csv_path, {name: schema.field(name).type for name in header if name in schema.names})
+    partitioned = DATE_COLUMN in reader.schema.names
+    rows = [0]
+
+    def batches():
+        for batch in reader:
+            rows[0] += batch.num_rows
+            if partitioned:
+                dates = pc.cast(batch.column(DATE_COLUMN), pa.timestamp("s"))
+                months = pc.strftime(dates, format="%Y-%m")
+                batch = pa.RecordBatch.from_arrays(batch.columns + [months],
+                                                   names=batch.schema.names + [PARTITION_COLUMN])
+            yield batch
+
+    # Hidden (dot) folder: skipped by dataset readers and the notebook's glob
+    os.makedirs(output_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix=f".{stem}-", dir=output_dir)
+    temp_files = []
+    output_schema = reader.schema.append(pa.field(PARTITION_COLUMN, pa.string())) if partitioned else reader.schema
+    try:
+        ds.write_dataset(
+            batches(), temp_dir, schema=output_schema, format="parquet",
+            partitioning=ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive")
+            if partitioned else None,
+            basename_template=stem + "-{i}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=ds.ParquetFileFormat().make_write_options(compression=COMPRESSION),
+            file_visitor=lambda written_file: temp_files.append(written_file.path))
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    finally:
+        reader.close()
+
+    # Replace the files of an earlier conversion of the same CSV
+    for old_file in glob.glob(os.path.join(glob.escape(dataset_dir), "**", glob.escape(stem) + "-*.parquet"),
+                              recursive=True):
+        os.remove(old_file)
+
+    written = []
+    for temp_file in temp_files:
+        path = os.path.join(dataset_dir, os.path.relpath(temp_file, temp_dir))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_file, path)
+        written.append(path)
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {"rows": rows[0], "files": len(written), "bytes": sum(os.path.getsize(path) for path in written),
+            "seconds": time.monotonic() - started}
+
+
+# =============================================================================
+# FUNCTION: convert_files
+# =============================================================================
+# Converts a batch of CSVs, in parallel processes when there is more than
+# one. The schemas are resolved first, in this process, and handed to the
+# workers.
+#
+# Returns:
+#   list: (csv_path, result dict or exception) per file, in input order
+# =============================================================================
+def convert_files(csv_paths, output_dir, max_workers=None):
+    jobs = []
+    for csv_path in csv_paths:
+        try:
+            jobs.append((csv_path, cached_schema(csv_path, output_dir)))
+        except Exception as e:
+            jobs.append((csv_path, e))
+
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    results = []
+    if workers <= 1:
+        for csv_path, schema in jobs:
+            if isinstance(schema, Exception):
+                results.append((csv_path, schema))
+                continue
+            try:
+                results.append((csv_path, convert(csv_path, output_dir, schema)))
+            except Exception as e:
+                results.append((csv_path, e))
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [schema if isinstance(schema, Exception) else pool.submit(convert, csv_path, output_dir, schema)
+                   for csv_path, schema in jobs]
+        for (csv_path, _), future in zip(jobs, futures):
+            if isinstance(future, Exception):
+                results.append((csv_path, future))
+                continue
+            try:
+                results.append((csv_path, future.result()))
+            except Exception as e:
+                results.append((csv_path, e))
+    return results
+
+
+# =============================================================================
+# FUNCTION: main
+# =============================================================================
+# Convert files by hand, e.g. PDI output written before the watcher did it.
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Convert PDI sales CSVs to partitioned Parquet")
+    parser.add_argument("files", nargs="+", help="sales_*.csv files")
+    parser.add_argument("--output", help=f"Parquet folder [<folder of the first file>/{PARQUET_DIR_NAME}]")
+    parser.add_argument("--workers", type=int, help="Parallel conversions [number of CPUs]")
+    args = parser.parse_args()
+
+    if not available():
+        raise SystemExit("csv_to_parquet.py requires pyarrow: pip install pyarrow")
+    output_dir = args.output or os.path.join(os.path.dirname(os.path.abspath(args.files[0])), PARQUET_DIR_NAME)
+    for csv_path, result in convert_files(args.files, output_dir, args.workers):
+        if isinstance(result, Exception):
+            print(f"{os.path.basename(csv_path)}: failed: {result}")
+        else:
+            print(f"{os.path.basename(csv_path)}: {result['rows']} row(s) -> {result['files']} Parquet file(s), "
+                  f"{result['bytes'] / 1024:.0f} KiB, {result['seconds']:.2f}s")
+
+
+# =============================================================================
+# SCRIPT ENTRY POINT
+# =============================================================================
+if __name__ == "__main__":
+    main()
@@ -34,43 +34,628 @@
 #   file into pdi-output/, the script prints a notification.
 #   Press Ctrl+C to stop.
 #
+#   Options:
+#     --require-done-marker   Only process a CSV once its .done marker exists
+#     --stable-checks N       Unchanged size/mtime polls before a file counts
+#                             as complete (default 2)
+#     --max-poll-delay SEC    Upper bound of the polling backoff (default 2)
+#     --quiet-period SEC      Time a file must stay unchanged before the
+#                             size/mtime checks complete it (default 2)
+#     --debounce SEC          Quiet time after the last new file before the
+#                             notebook runs (default 3)
+#     --max-batch-wait SEC    Longest wait for a quiet moment while files keep
+#                             arriving (default 30)
+#     --runner-url URL        Notebook runner in the container (default
+#                             http://localhost:8889; "" = always docker exec)
+#     --index FILE            Processed-files index (default
+#                             <Jupyter-Notebook>/processed_files.db)
+#     --retention-days N      Forget processed files after N days (default 30)
+#     --rollups FILE          Sales rollup database (default
+#                             <Jupyter-Notebook>/reports/sales_rollups.db;
+#                             "" = no rollups)
+#     --parquet DIR           Parquet copies of the new files (default
+#                             <pdi-output>/parquet; "" = none; needs pyarrow)
+#     --parquet-workers N     Parallel Parquet conversions (default: CPUs)
+#
+# Write-completion detection:
+#   PDI creates the output file first and then writes it row by row, so a
+#   "created" event does not mean the file is ready. A file counts as
+#   complete as soon as one of these happens:
+#     1. The writer closes it (IN_CLOSE_WRITE via watchdog's on_closed;
+#        Linux with watchdog 2.1 or later)
+#     2. It is renamed into pdi-output/ (write to a temp name, then rename)
+#     3. A marker file "<name>.done" (e.g. sales_detailed_1.csv.done) or
+#        "<name without .csv>.done" appears; with --require-done-marker this
+#        is the only signal that counts
+#     4. Its size and modification time stay the same over --stable-checks
+#        polls and it has not been written for --quiet-period seconds; the
+#        poll interval starts at 0.2s and doubles up to --max-poll-delay
+#        while the file keeps changing, and the confirming polls keep the
+#        longer interval (Windows, macOS, network shares without close
+#        events). Where close events are available, a writer pause is not
+#        taken for the end of the file: the checks only complete a file
+#        after 30s without writes (e.g. a writer that never closes it).
+#   The checks run on a separate thread, and the notebook runs on another
+#   one, so the watchdog observer thread only queues events and a burst of
+#   PDI outputs is picked up without waiting for earlier files.
+#
+# Notebook runs:
+#   Completed files are collected by a run queue instead of starting one
+#   notebook execution each. The notebook runs once no new file has arrived
+#   for --debounce seconds (or --max-batch-wait seconds after the first file
+#   of a batch at the latest), with the whole batch: the container paths of
+#   the new files are passed in the PDI_NEW_FILES environment variable
+#   (comma-separated). Only one execution runs at a time; files completed
+#   while it runs form a single follow-up run. Every run logs its number of
+#   files, duration and the files waiting for the next run.
+#
+#   The notebook is executed by notebook_runner.py, which post-start.sh
+#   starts in the container: it keeps a Python kernel with pandas and
+#   matplotlib loaded and receives the files of a run over HTTP. When the
+#   runner cannot be reached, the watcher falls back to
+#   'docker exec ... jupyter nbconvert --execute' (new kernel per run).
+#
+# Processed files:
+#   Files are recorded in a SQLite index once the notebook has run
+#   successfully with them, by path, size, modification time and SHA-256 of
+#   the content. A file counts as processed when its path, size and mtime
+#   match a record, or, if only the mtime changed (copied, touched), its path,
+#   size and content hash. On startup the watcher scans pdi-output/ and
+#   queues every sales CSV of the last --retention-days days that is not in
+#   the index, so files written while it was not running (or whose run
+#   failed) are analysed too. Records older than --retention-days are
+#   deleted on startup and after every run.
+#
+# Sales rollups:
+#   Before each notebook run, the new files are added to the running totals
+#   per day, category and product in reports/sales_rollups.db (see
+#   sales_rollups.py). Only the new files are parsed, so the history section
+#   of the notebook, which reads these totals, takes the same time however
+#   many PDI outputs came before.
+#
+# Parquet copies:
+#   If pyarrow is installed, the new files are also converted to Parquet in
+#   pdi-output/parquet/, partitioned by order month (see csv_to_parquet.py),
+#   before the notebook runs; the notebook then reads the typed columns it
+#   needs from Parquet instead of parsing the CSV. The CSV is streamed, the
+#   column types are cached per dataset, and the files of a batch are
+#   converted in parallel processes. Without pyarrow this step is skipped.
+#
 # Notes:
 #   - The script runs on the HOST machine (not inside the Docker container).
-#   - Each detected file is only processed once (tracked via a set).
-#   - A 2-second delay is added after file creation to ensure the file has
-#     been fully written before processing.
+#   - Each file version is only processed once, also across restarts.
 # =============================================================================
 
+import argparse
+import hashlib
+import heapq
+import json
 import os
+import queue
+import sqlite3
 import sys
 import platform
+import threading
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import subprocess
 import logging
+import urllib.error
+import urllib.request
+
+import csv_to_parquet
+import sales_rollups
+
+
+# =============================================================================
+# WRITE-COMPLETION SETTINGS
+# =============================================================================
+# First and largest delay (seconds) between two size/mtime checks of a file
+POLL_INITIAL_DELAY = 0.2
+POLL_MAX_DELAY = 2.0
+# Consecutive unchanged checks before a file counts as completely written
+STABLE_CHECKS = 2
+# Seconds without writes before unchanged checks complete a file, without
+# and with close events (which normally complete the file first)
+QUIET_PERIOD = 2.0
+CLOSE_EVENT_QUIET_PERIOD = 30.0
+# Suffix of the marker files that flag a finished output file
+DONE_MARKER_SUFFIX = ".done"
+
+
+# =============================================================================
+# NOTEBOOK RUN SETTINGS
+# =============================================================================
+# Quiet time (seconds) after the last completed file before the notebook runs
+DEBOUNCE_SECONDS = 3.0
+# Longest wait (seconds) after the first file of a batch while files keep coming
+MAX_BATCH_WAIT = 30.0
+# Timeout (seconds) of one notebook execution
+NOTEBOOK_TIMEOUT = 120
+# Folder mounted from the host's pdi-output/ in the Docker container
+CONTAINER_PDI_OUTPUT = "/home/jovyan/pdi-output"
+# notebook_runner.py in the container (port published by docker-compose.yml)
+RUNNER_URL = "http://localhost:8889"
+
+
+# =============================================================================
+# PROCESSED-FILES INDEX SETTINGS
+# =============================================================================
+INDEX_FILE_NAME = "processed_files.db"
+# Rollup database in the reports folder (see sales_rollups.py)
+ROLLUPS_FILE_NAME = "sales_rollups.db"
+# Days after which processed files are forgotten (and not caught up either)
+RETENTION_DAYS = 30
+# Bytes read at a time when hashing a file
+HASH_CHUNK_SIZE = 1 << 20
+
+
+# =============================================================================
+# FUNCTION: is_sales_csv
+# =============================================================================
+# True for PDI output files handled by the watcher ("sales_*.csv").
+# =============================================================================
+def is_sales_csv(path):
+    name = os.path.basename(path)
+    return name.endswith('.csv') and 'sales_' in name
+
+
+# =============================================================================
+# FUNCTION: marked_file
+# =============================================================================
+# Maps a marker file to the data file it flags as complete:
+#   sales_detailed_1.csv.done -> sales_detailed_1.csv
+#   sales_detailed_1.done     -> sales_detailed_1.csv
+# =============================================================================
+def marked_file(marker_path):
+    data_path = marker_path[:-len(DONE_MARKER_SUFFIX)]
+    if not data_path.endswith('.csv'):
+        data_path += '.csv'
+    return data_path
+
+
+# =============================================================================
+# FUNCTION: close_events_supported
+# =============================================================================
+# True if the watchdog observer reports closed files (inotify on Linux,
+# watchdog 2.1 or later).
+# =============================================================================
+def close_events_supported():
+    try:
+        from watchdog.events import FileClosedEvent  # noqa: F401
+    except ImportError:
+        return False
+    return Observer.__name__ == "InotifyObserver"
+
+
+# =============================================================================
+# CLASS: WriteCompletionMonitor
+# =============================================================================
+# Background thread that decides when a new file has been completely
+# written. The watchdog handler only hands it events (submit() never
+# blocks); the monitor tracks every pending file, polls size and mtime with
+# exponential backoff, and calls on_complete(path) once per file from its
+# own thread.
+# =============================================================================
+class WriteCompletionMonitor(threading.Thread):
+    def __init__(self, on_complete, require_marker=False, stable_checks=STABLE_CHECKS,
+                 initial_delay=POLL_INITIAL_DELAY, max_delay=POLL_MAX_DELAY, quiet_period=QUIET_PERIOD,
+                 close_events=False):
+        """
+        Args:
+            on_complete (callable): Called with the path of every completed file
+            require_marker (bool): Only a .done marker completes a file
+            stable_checks (int): Unchanged polls needed to complete a file
+            initial_delay (float): First poll delay in seconds
+            max_delay (float): Largest poll delay in seconds
+            quiet_period (float): Seconds without writes needed to complete a
+                                  file by polling
+            close_events (bool): The observer reports closed files; polling
+                                 then waits CLOSE_EVENT_QUIET_PERIOD instead
+        """
+        super().__init__(name="write-completion", daemon=True)
+        self.on_complete = on_complete
+        self.require_marker = require_marker
+        self.stable_checks = stable_checks
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.quiet_period = max(quiet_period, CLOSE_EVENT_QUIET_PERIOD) if close_events else quiet_period
+        self.events = queue.Queue()
+        # path -> {"size", "mtime", "stable", "delay", "changed", "due"} of files
+        # still being written ("changed": monotonic time of the last write seen)
+        self.pending = {}
+        # (due time, path) poll schedule; stale entries are skipped
+        self.schedule = []
+        self.stopping = threading.Event()
+
+    def submit(self, kind, path):
+        """
+        Queue a filesystem event (called on the watchdog observer thread).
+
+        Args:
+            kind (str): "created", "modified", "closed", "moved" or "marker"
+            path (str): File the event is about
+        """
+        self.events.put((kind, path))
+
+    def stop(self):
+        self.stopping.set()
+        self.events.put(None)
+
+    def run(self):
+        while not self.stopping.is_set():
+            timeout = max(0.0, self.schedule[0][0] - time.monotonic()) if self.schedule else None
+            try:
+                event = self.events.get(timeout=timeout)
+            except queue.Empty:
+                event = None
+            if event is not None:
+                self.handle(*event)
+            self.poll_due()
+
+    def handle(self, kind, path):
+        if kind == "marker":
+            self.complete(marked_file(path), "done marker")
+        elif self.require_marker:
+            # Only the marker counts; nothing to poll
+            return
+        elif kind == "closed":
+            self.complete(path, "closed after writing")
+        elif kind == "moved":
+            self.complete(path, "renamed into the folder")
+        elif path in self.pending:
+            # Still being written: the quiet period starts over, the poll
+            # already scheduled keeps its backed-off delay
+            entry = self.pending[path]
+            entry["stable"] = 0
+            entry["changed"] = time.monotonic()
+        else:
+            # Compare the first poll against the file as it is now
+            try:
+                stat = os.stat(path)
+                size, mtime = stat.st_size, stat.st_mtime_ns
+            except FileNotFoundError:
+                size = mtime = None
+            self.pending[path] = {"size": size, "mtime": mtime, "stable": 0, "delay": self.initial_delay,
+                                  "changed": time.monotonic()}
+            self.reschedule(path)
+
+    def reschedule(self, path, delay=None):
+        entry = self.pending[path]
+        entry["due"] = time.monotonic() + (entry["delay"] if delay is None else delay)
+        heapq.heappush(self.schedule, (entry["due"], path))
+
+    def poll_due(self):
+        now = time.monotonic()
+        while self.schedule and self.schedule[0][0] <= now:
+            due, path = heapq.heappop(self.schedule)
+            entry = self.pending.get(path)
+            if entry is None or entry["due"] != due:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Temporary file renamed or deleted before it was complete
+                del self.pending[path]
+                continue
+
+            if stat.st_size > 0 and (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime"]):
+                entry["stable"] += 1
+                # Time since the last write: by mtime, or since the watcher
+                # saw the last change if the file's clock is ahead
+                quiet = max(time.time() - stat.st_mtime_ns / 1e9, now - entry["changed"])
+                if entry["stable"] >= self.stable_checks and quiet >= self.quiet_period:
+                    self.complete(path, f"unchanged for {quiet:.1f}s")
+                    continue
+                # Confirm at the backed-off interval: a writer that paused
+                # once is likely to pause again
+                self.reschedule(path)
+            else:
+                entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime_ns
+                entry["stable"] = 0
+                entry["changed"] = now
+                entry["delay"] = min(entry["delay"] * 2, self.max_delay)
+                self.reschedule(path)
+
+    def complete(self, path, reason):
+        self.pending.pop(path, None)
+        if not os.path.isfile(path):
+            return
+        logging.info(f"{os.path.basename(path)} complete ({reason})")
+        try:
+            self.on_complete(path)
+        except Exception as e:
+            logging.error(f"Error handling {path}: {e}")
+
+
+# =============================================================================
+# CLASS: ProcessedFilesIndex
+# =============================================================================
+# Persistent record of the files the notebook has been run with, stored in a
+# SQLite database next to pdi-output/. One row per file version: path, size,
+# mtime and content hash. seen() checks the cheap stat fields first and only
+# hashes the file when they do not match. The methods are called from the
+# monitor, run-queue and main threads, so access is serialised by a lock.
+# =============================================================================
+class ProcessedFilesIndex:
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path (str): SQLite database file, created if missing
+        """
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        # path -> (size, mtime_ns, sha256) computed by seen(), reused by record()
+        self.digests = {}
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS processed_files ("
+                " path TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+                " sha256 TEXT NOT NULL, processed_at REAL NOT NULL,"
+                " PRIMARY KEY (path, size, mtime_ns, sha256))")
+            self.db.execute("CREATE INDEX IF NOT EXISTS processed_files_age ON processed_files (processed_at)")
+
+    @staticmethod
+    def content_hash(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def fingerprint(self, path):
+        """Return (size, mtime_ns, sha256) of a file, hashing it only once per version."""
+        stat = os.stat(path)
+        cached = self.digests.get(path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached
+        fingerprint = (stat.st_size, stat.st_mtime_ns, self.content_hash(path))
+        self.digests[path] = fingerprint
+        return fingerprint
+
+    def seen(self, path):
+        """
+        Check whether the notebook has already run with this version of a file.
+
+        Returns:
+            bool: True if path and content match a record (False for missing files)
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        with self.lock:
+            if self.db.execute("SELECT 1 FROM processed_files WHERE path = ? AND size = ? AND mtime_ns = ?",
+                               (path, stat.st_size, stat.st_mtime_ns)).fetchone():
+                return True
+        try:
+            size, mtime_ns, sha256 = self.fingerprint(path)
+        except FileNotFoundError:
+            return False
+        with self.lock:
+            if not self.db.execute("SELECT 1 FROM processed_files WHERE path = ? AND size = ? AND sha256 = ?",
+                                   (path, size, sha256)).fetchone():
+                return False
+            # Same content with a new mtime: remember it so the next check is cheap
+            with self.db:
+                self.db.execute("INSERT OR REPLACE INTO processed_files VALUES (?, ?, ?, ?, ?)",
+                                (path, size, mtime_ns, sha256, time.time()))
+        return True
+
+    def record(self, paths):
+        """Mark the current versions of files as processed."""
+        rows = []
+        for path in paths:
+            try:
+                rows.append((path,) + self.fingerprint(path) + (time.time(),))
+            except FileNotFoundError:
+                pass
+            self.digests.pop(path, None)
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO processed_files VALUES (?, ?, ?, ?, ?)", rows)
+
+    def prune(self, retention_days):
+        """
+        Delete records older than the retention period.
+
+        Returns:
+            int: Number of deleted records
+        """
+        with self.lock, self.db:
+            cursor = self.db.execute("DELETE FROM processed_files WHERE processed_at < ?",
+                                     (time.time() - retention_days * 86400,))
+        return cursor.rowcount
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+# =============================================================================
+# CLASS: NotebookRunQueue
+# =============================================================================
+# Background thread that coalesces completed files into notebook runs. add()
+# queues a file and never blocks; the thread waits until the queue has been
+# quiet for the debounce window, then calls run_batch(files) with everything
+# queued so far. Files added while a run is in progress wait for the next
+# run, so at most one execution is in flight and a burst during a run leads
+# to exactly one follow-up run.
+# =============================================================================
+class NotebookRunQueue(threading.Thread):
+    def __init__(self, run_batch, debounce=DEBOUNCE_SECONDS, max_wait=MAX_BATCH_WAIT):
+        """
+        Args:
+            run_batch (callable): Called with the list of queued file paths
+            debounce (float): Seconds without new files before a run starts
+            max_wait (float): Seconds after the first queued file after which
+                              a run starts even if files keep arriving
+        """
+        super().__init__(name="notebook-runs", daemon=True)
+        self.run_batch = run_batch
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.condition = threading.Condition()
+        self.files = []
+        self.first_added = self.last_added = None
+        self.runs = 0
+        self.stopping = False
+
+    def add(self, path):
+        """Queue a completed file for the next run."""
+        with self.condition:
+            now = time.monotonic()
+            self.files.append(path)
+            if self.first_added is None:
+                self.first_added = now
+            self.last_added = now
+            self.condition.notify()
+        logging.info(f"Queued {os.path.basename(path)} (queue depth {len(self.files)})")
+
+    def stop(self):
+        """Stop after the current run; files still queued are not run."""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            if batch is None:
+                return
+            files, waited = batch
+            self.runs += 1
+            logging.info(f"Run {self.runs}: {len(files)} file(s), first one queued {waited:.1f}s ago")
+            started = time.monotonic()
+            try:
+                self.run_batch(files)
+            except Exception as e:
+                logging.error(f"Run {self.runs} failed: {e}")
+            with self.condition:
+                depth = len(self.files)
+            logging.info(f"Run {self.runs} finished in {time.monotonic() - started:.1f}s; "
+                         f"queue depth {depth}" + (" (follow-up run pending)" if depth else ""))
+
+    def next_batch(self):
+        """
+        Wait for a quiet moment and take all queued files.
+
+        Returns:
+            tuple: (files, seconds since the first one was queued), or None
+                   when the queue is stopping
+        """
+        with self.condition:
+            while not self.stopping:
+                if self.files:
+                    now = time.monotonic()
+                    start_at = min(self.last_added + self.debounce, self.first_added + self.max_wait)
+                    if now >= start_at:
+                        files, self.files = self.files, []
+                        waited = now - self.first_added
+                        self.first_added = self.last_added = None
+                        return files, waited
+                    self.condition.wait(start_at - now)
+                else:
+                    self.condition.wait()
+            if self.files:
+                logging.warning(f"Stopping with {len(self.files)} queued file(s) not analysed")
+            return None
 
 
 # =============================================================================
 # CLASS: PDIOutputHandler
 # =============================================================================
 # Custom filesystem event handler that inherits from watchdog's
-# FileSystemEventHandler. It listens for new files and triggers analysis
-# when a matching CSV file is detected.
+# FileSystemEventHandler. Its event methods run on the watchdog observer
+# thread and only pass matching events to the WriteCompletionMonitor; the
+# monitor calls process() once a file is complete, and the NotebookRunQueue
+# runs the notebook once per burst of completed files. The files of a run
+# are added to the SalesRollups and converted to Parquet first, and
+# recorded in the ProcessedFilesIndex after a successful run.
 # =============================================================================
 class PDIOutputHandler(FileSystemEventHandler):
-    def __init__(self, notebook_path):
+    def __init__(self, notebook_path, require_marker=False, stable_checks=STABLE_CHECKS,
+                 max_poll_delay=POLL_MAX_DELAY, quiet_period=QUIET_PERIOD, debounce=DEBOUNCE_SECONDS,
+                 max_batch_wait=MAX_BATCH_WAIT, runner_url=RUNNER_URL, index=None, retention_days=RETENTION_DAYS, rollups=None,
+                 parquet_dir=None, parquet_workers=None):
         """
         Initialise the handler with the path to the analysis notebook.
 
         Args:
             notebook_path (str): Full path to the sales_analysis.ipynb file
                                  on the host filesystem.
+            require_marker (bool): Only process files flagged by a .done marker
+            stable_checks (int): Unchanged size/mtime polls before a file
+                                 counts as complete
+            max_poll_delay (float): Largest delay between two polls
+            quiet_period (float): Seconds without writes before unchanged
+                                  polls complete a file
+            debounce (float): Quiet seconds before the notebook runs
+            max_batch_wait (float): Longest wait for a quiet moment
+            runner_url (str): Base URL of notebook_runner.py ("" = none)
+            index (ProcessedFilesIndex): Files processed before (default:
+                                        in-memory, not kept across restarts)
+            retention_days (float): Age after which processed files are
+                                    forgotten
+            rollups (SalesRollups): Running sales totals to update, or None
+            parquet_dir (str): Folder for the Parquet copies, or None
+            parquet_workers (int): Parallel conversions (default: CPUs)
         """
         self.notebook_path = notebook_path
-        # Keep track of files that have already been processed so we don't
-        # trigger duplicate notifications for the same file.
-        self.processed_files = set()
+        self.runner_url = runner_url.rstrip("/")
+        self.index = index or ProcessedFilesIndex(":memory:")
+        self.retention_days = retention_days
+        self.rollups = rollups
+        self.parquet_dir = parquet_dir
+        self.parquet_workers = parquet_workers
+        # Files queued or being analysed; the index only holds finished runs
+        self.queued_files = set()
+        self.lock = threading.Lock()
+        self.monitor = WriteCompletionMonitor(self.process, require_marker=require_marker,
+                                              stable_checks=stable_checks, max_delay=max_poll_delay,
+                                              quiet_period=quiet_period, close_events=close_events_supported())
+        self.runs = NotebookRunQueue(self.run_batch, debounce=debounce, max_wait=max_batch_wait)
+
+    def start(self):
+        self.monitor.start()
+        self.runs.start()
+
+    def stop(self):
+        self.monitor.stop()
+        self.monitor.join()
+        self.runs.stop()
+        self.runs.join()
+        self.index.close()
+        if self.rollups:
+            self.rollups.close()
+
+    def catch_up(self, watch_folder):
+        """
+        Queue the sales CSVs of the retention period that are not in the
+        index (written while the watcher was not running, or whose run
+        failed). They go through the write-completion checks like new files.
+        """
+        cutoff = time.time() - self.retention_days * 86400
+        candidates = []
+        for name in os.listdir(watch_folder):
+            path = os.path.join(watch_folder, name)
+            if is_sales_csv(path) and os.path.isfile(path) and os.path.getmtime(path) >= cutoff:
+                candidates.append(path)
+
+        unseen = 0
+        for path in sorted(candidates, key=os.path.getmtime):
+            if self.index.seen(path):
+                continue
+            unseen += 1
+            if not self.monitor.require_marker:
+                self.monitor.submit("created", path)
+                continue
+            for marker in (path + DONE_MARKER_SUFFIX, path[:-len('.csv')] + DONE_MARKER_SUFFIX):
+                if os.path.exists(marker):
+                    self.monitor.submit("marker", marker)
+                    break
+        logging.info(f"Catch-up: {unseen} of {len(candidates)} sales file(s) in {watch_folder} not processed yet")
 
     def on_created(self, event):
         """
@@ -82,37 +667,175 @@ class PDIOutputHandler(FileSystemEventHandler):
           - Files ending with .csv
           - Filenames containing 'sales_' (matches PDI output pattern
             like sales_detailed_20240118.csv)
+          - .done marker files
 
-        A 2-second delay ensures the file has been completely written before
-        we process it (PDI may still be flushing data to disk).
+        The file is usually still being written, so it is handed to the
+        write-completion monitor instead of being processed right away.
         """
+        self.dispatch_file(event, "created", event.src_path)
+
+    def on_modified(self, event):
+        """Data is still being written: the monitor restarts its checks."""
+        self.dispatch_file(event, "modified", event.src_path)
+
+    def on_closed(self, event):
+        """The writer closed the file (inotify IN_CLOSE_WRITE, Linux only)."""
+        self.dispatch_file(event, "closed", event.src_path)
+
+    def on_moved(self, event):
+        """A file renamed into the folder has been written completely."""
+        self.dispatch_file(event, "moved", event.dest_path)
+
+    def dispatch_file(self, event, kind, path):
         if event.is_directory:
             return
+        if path.endswith(DONE_MARKER_SUFFIX):
+            if kind in ("created", "moved") and is_sales_csv(marked_file(path)):
+                self.monitor.submit("marker", path)
+        elif is_sales_csv(path) and path not in self.queued_files:
+            self.monitor.submit(kind, path)
+
+    def process(self, file_path):
+        """
+        Called by the monitor when a new sales CSV is complete. Queues the
+        file for the next notebook run unless this version of it was
+        processed before.
+        """
+        with self.lock:
+            if file_path in self.queued_files:
+                return
+            self.queued_files.add(file_path)
+        if self.index.seen(file_path):
+            logging.info(f"{os.path.basename(file_path)} was processed before, skipping")
+            with self.lock:
+                self.queued_files.discard(file_path)
+            return
+        self.runs.add(file_path)
+
+    def run_batch(self, file_paths):
+        """
+        Called by the run queue: update the rollups and the Parquet copies,
+        run the notebook and
+        record the files in the index if it succeeded. Failed files are
+        retried by the next startup's catch-up scan or when they change
+        (ingesting a file again replaces its earlier totals).
+        """
+        try:
+            if self.rollups:
+                self.update_rollups(file_paths)
+            if self.parquet_dir:
+                self.convert_to_parquet(file_paths)
+            if self.trigger_analysis(file_paths):
+                self.index.record(file_paths)
+                pruned = self.index.prune(self.retention_days)
+                if pruned:
+                    logging.info(f"Pruned {pruned} record(s) older than {self.retention_days:g} days from the index")
+        finally:
+            with self.lock:
+                self.queued_files.difference_update(file_paths)
 
-        if event.src_path.endswith('.csv') and 'sales_' in event.src_path:
-            time.sleep(2)  # Wait for file to be fully written
+    def update_rollups(self, file_paths):
+        started = time.monotonic()
+        rows = 0
+        for file_path in file_paths:
+            try:
+                result = self.rollups.ingest(file_path)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                logging.error(f"Could not add {os.path.basename(file_path)} to the sales rollups: {e}")
+                continue
+            rows += result["rows"]
+            if result["rejected"]:
+                logging.warning(f"{os.path.basename(file_path)}: {result['rejected']} row(s) with invalid values "
+                                f"left out of the rollups")
+        logging.info(f"Sales rollups: {rows} row(s) from {len(file_paths)} file(s) added in "
+                     f"{time.monotonic() - started:.2f}s")
 
-            if event.src_path not in self.processed_files:
-                self.processed_files.add(event.src_path)
-                self.trigger_analysis(event.src_path)
+    def convert_to_parquet(self, file_paths):
+        started = time.monotonic()
+        rows = written = 0
+        results = csv_to_parquet.convert_files(file_paths, self.parquet_dir, self.parquet_workers)
+        for file_path, result in results:
+            if isinstance(result, Exception):
+                # The notebook falls back to the CSV for this file
+                logging.error(f"Could not convert {os.path.basename(file_path)} to Parquet: {result}")
+                continue
+            rows += result["rows"]
+            written += result["bytes"]
+        logging.info(f"Parquet: {rows} row(s) from {len(file_paths)} file(s) converted in "
+                     f"{time.monotonic() - started:.2f}s ({written / 1024:.0f} KiB)")
 
-    def trigger_analysis(self, file_path):
+    def run_with_runner(self, container_files):
         """
-        Called when a new sales CSV is detected. Attempts to auto-execute
-        the sales_analysis.ipynb notebook inside the Docker container using
-        'docker exec' and 'jupyter nbconvert --execute'. If auto-execution
-        fails (e.g. Docker not running, container not found), falls back to
+        Execute the notebook through notebook_runner.py in the container.
+
+        Args:
+            container_files (list): Container paths of the new files
+
+        Returns:
+            bool or None: Whether the notebook ran successfully; None if the
+                          runner could not be reached (use docker exec)
+        """
+        request = urllib.request.Request(self.runner_url + "/run",
+                                         data=json.dumps({"files": container_files}).encode(),
+                                         headers={"Content-Type": "application/json"})
+        print("Executing sales_analysis.ipynb in the notebook runner's warm kernel...")
+        try:
+            with urllib.request.urlopen(request, timeout=NOTEBOOK_TIMEOUT) as response:
+                result = json.load(response)
+        except urllib.error.HTTPError as e:
+            # The runner answered, but the notebook failed
+            try:
+                result = json.load(e)
+            except ValueError:
+                result = {"error": f"HTTP {e.code}"}
+            print(f"Notebook execution failed: {result.get('error')}")
+            print("\nYou can still run it manually in Jupyter Lab.")
+            return False
+        except (urllib.error.URLError, ConnectionError) as e:
+            logging.warning(f"Notebook runner not reachable at {self.runner_url} ({e}); using docker exec")
+            return None
+        except OSError as e:
+            # Timed out: the runner keeps executing the notebook
+            print(f"No answer from the notebook runner after {NOTEBOOK_TIMEOUT} seconds ({e}).")
+            print("The notebook may still be running. Check Jupyter Lab.")
+            return False
+
+        print(f"Notebook executed successfully in {result.get('seconds', 0):.1f}s!")
+        print("Check ~/Jupyter-Notebook/reports/ for the new Excel report.")
+        print("Open http://localhost:8888 to view the updated notebook.")
+        return True
+
+    def trigger_analysis(self, file_paths):
+        """
+        Called by the run queue with a batch of new sales CSVs. Executes the
+        sales_analysis.ipynb notebook through notebook_runner.py, or, when
+        the runner is not available, inside the Docker container using
+        'docker exec' and 'jupyter nbconvert --execute'. The files are passed
+        in the PDI_NEW_FILES environment variable. If auto-execution fails
+        (e.g. Docker not running, container not found), falls back to
         printing a manual instruction.
 
         Args:
-            file_path (str): Full path to the newly detected CSV file.
+            file_paths (list): Full paths of the newly detected CSV files.
+
+        Returns:
+            bool: True if the notebook was executed successfully.
         """
         try:
             print(f"\n{'='*60}")
-            print(f"New sales data detected: {os.path.basename(file_path)}")
-            print(f"Full path: {file_path}")
+            print(f"New sales data detected: {len(file_paths)} file(s)")
+            for file_path in file_paths:
+                print(f"  {file_path}")
             print(f"{'='*60}")
 
+            # Paths of the files as the notebook sees them in the container
+            container_files = [CONTAINER_PDI_OUTPUT + "/" + os.path.basename(file_path)
+                               for file_path in file_paths]
+            if self.runner_url:
+                executed = self.run_with_runner(container_files)
+                if executed is not None:
+                    return executed
+
             # Attempt to auto-execute the notebook inside the Docker container.
             # 'jupyter nbconvert --execute' runs all cells and overwrites the
             # notebook in place so results are visible when the user opens it
@@ -120,7 +843,9 @@ class PDIOutputHandler(FileSystemEventHandler):
             print("Auto-executing sales_analysis.ipynb in the Docker container...")
             result = subprocess.run(
                 [
-                    "docker", "exec", "jupyter-datascience",
+                    "docker", "exec",
+                    "-e", f"PDI_NEW_FILES={','.join(container_files)}",
+                    "jupyter-datascience",
                     "jupyter", "nbconvert",
                     "--to", "notebook",
                     "--execute",
@@ -129,13 +854,14 @@ class PDIOutputHandler(FileSystemEventHandler):
                 ],
                 capture_output=True,
                 text=True,
-                timeout=120  # 2-minute timeout for notebook execution
+                timeout=NOTEBOOK_TIMEOUT
             )
 
             if result.returncode == 0:
                 print("Notebook executed successfully!")
                 print("Check ~/Jupyter-Notebook/reports/ for the new Excel report.")
                 print("Open http://localhost:8888 to view the updated notebook.")
+                return True
             else:
                 print(f"Notebook execution returned exit code {result.returncode}")
                 if result.stderr:
@@ -146,7 +872,7 @@ class PDIOutputHandler(FileSystemEventHandler):
                 print("\nYou can still run it manually in Jupyter Lab.")
 
         except subprocess.TimeoutExpired:
-            print("Notebook execution timed out after 120 seconds.")
+            print(f"Notebook execution timed out after {NOTEBOOK_TIMEOUT} seconds.")
             print("The notebook may still be running. Check Jupyter Lab.")
         except FileNotFoundError:
             # Docker CLI not found on the system
@@ -158,6 +884,7 @@ class PDIOutputHandler(FileSystemEventHandler):
         except Exception as e:
             logging.error(f"Error triggering analysis: {e}")
             print("Please run the sales_analysis.ipynb notebook manually.")
+        return False
 
 
 # =============================================================================
@@ -191,7 +918,36 @@ def get_paths():
 # the watch folder exists, then starts the filesystem observer loop.
 # =============================================================================
 def main():
-    logging.basicConfig(level=logging.INFO)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Watch pdi-output/ and run the sales analysis notebook")
+    parser.add_argument("--require-done-marker", action="store_true",
+                        help="Only process a CSV once its .done marker file exists")
+    parser.add_argument("--stable-checks", type=int, default=STABLE_CHECKS,
+                        help=f"Unchanged size/mtime polls before a file counts as complete [{STABLE_CHECKS}]")
+    parser.add_argument("--max-poll-delay", type=float, default=POLL_MAX_DELAY,
+                        help=f"Largest delay in seconds between two polls of a file [{POLL_MAX_DELAY}]")
+    parser.add_argument("--quiet-period", type=float, default=QUIET_PERIOD,
+                        help=f"Seconds a file must stay unwritten before unchanged polls complete it "
+                             f"[{QUIET_PERIOD:g}; {CLOSE_EVENT_QUIET_PERIOD:g} where close events are reported]")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS,
+                        help=f"Seconds without new files before the notebook runs [{DEBOUNCE_SECONDS:g}]")
+    parser.add_argument("--max-batch-wait", type=float, default=MAX_BATCH_WAIT,
+                        help=f"Longest wait in seconds for a quiet moment while files keep arriving "
+                             f"[{MAX_BATCH_WAIT:g}]")
+    parser.add_argument("--runner-url", default=RUNNER_URL,
+                        help=f'URL of notebook_runner.py in the container, "" to always use docker exec '
+                             f'[{RUNNER_URL}]')
+    parser.add_argument("--index", help=f"Processed-files index [<Jupyter-Notebook folder>/{INDEX_FILE_NAME}]")
+    parser.add_argument("--retention-days", type=float, default=RETENTION_DAYS,
+                        help=f"Days after which processed files are forgotten [{RETENTION_DAYS}]")
+    parser.add_argument("--rollups",
+                        help=f'Sales rollup database, "" for none [<Jupyter-Notebook folder>/reports/{ROLLUPS_FILE_NAME}]')
+    parser.add_argument("--parquet",
+                        help=f'Folder for Parquet copies of the new files, "" for none '
+                             f'[<pdi-output>/{csv_to_parquet.PARQUET_DIR_NAME}]')
+    parser.add_argument("--parquet-workers", type=int, help="Parallel Parquet conversions [number of CPUs]")
+    args = parser.parse_args()
 
     # Determine the correct paths for this operating system
     watch_folder, notebook_path = get_paths()
@@ -202,8 +958,42 @@ def main():
         print("Run the copy-jupyter setup script first to create the environment.")
         sys.exit(1)
 
+    # Open the index of processed files and forget the expired ones
+    index = ProcessedFilesIndex(args.index or os.path.join(os.path.dirname(watch_folder), INDEX_FILE_NAME))
+    pruned = index.prune(args.retention_days)
+    logging.info(f"Processed-files index: {index.db_path}" + (f" ({pruned} expired record(s) pruned)"
+                                                              if pruned else ""))
+
+    # Open the sales rollups the notebook's history section reads
+    rollups = None
+    if args.rollups is None:
+        args.rollups = os.path.join(os.path.dirname(watch_folder), "reports", ROLLUPS_FILE_NAME)
+    if args.rollups:
+        os.makedirs(os.path.dirname(os.path.abspath(args.rollups)), exist_ok=True)
+        rollups = sales_rollups.SalesRollups(args.rollups)
+        logging.info(f"Sales rollups: {args.rollups}")
+
+    # Parquet copies for the notebook (optional, needs pyarrow)
+    if args.parquet is None:
+        args.parquet = os.path.join(watch_folder, csv_to_parquet.PARQUET_DIR_NAME)
+        if not csv_to_parquet.available():
+            logging.info("pyarrow is not installed, no Parquet copies (pip install pyarrow)")
+            args.parquet = ""
+    elif args.parquet and not csv_to_parquet.available():
+        print("Error: --parquet requires pyarrow: pip install pyarrow")
+        sys.exit(1)
+    if args.parquet:
+        logging.info(f"Parquet copies: {args.parquet}")
+
     # Create the event handler and filesystem observer
-    event_handler = PDIOutputHandler(notebook_path)
+    event_handler = PDIOutputHandler(notebook_path, require_marker=args.require_done_marker,
+                                     stable_checks=args.stable_checks, max_poll_delay=args.max_poll_delay,
+                                     quiet_period=args.quiet_period,
+                                     debounce=args.debounce, max_batch_wait=args.max_batch_wait,
+                                     runner_url=args.runner_url, index=index,
+                                     retention_days=args.retention_days, rollups=rollups,
+                                     parquet_dir=args.parquet or None, parquet_workers=args.parquet_workers)
+    event_handler.start()
     observer = Observer()
 
     # Schedule the observer to watch the pdi-output directory.
@@ -216,6 +1006,10 @@ def main():
     print(f"Watching folder: {watch_folder}")
     print("Press Ctrl+C to stop...")
 
+    # Pick up files written while the watcher was not running. The observer
+    # is already running, so files arriving during the scan are not missed.
+    event_handler.catch_up(watch_folder)
+
     # Keep the main thread alive; the observer runs in a daemon thread.
     # Ctrl+C triggers KeyboardInterrupt which cleanly stops the observer.
     try:
@@ -225,8 +1019,10 @@ def main():
         observer.stop()
         print("File watcher stopped")
 
-    # Wait for the observer thread to fully terminate before exiting
+    # Wait for the observer thread to fully terminate before exiting,
+    # then let a running notebook execution finish
     observer.join()
+    event_handler.stop()
 
 
 # =============================================================================
@@ -44,6 +44,9 @@
 # Related scripts:
 #   run-docker-jupyter.sh   Starts / stops the Jupyter Docker container
 #   file_watcher.py         Watches pdi-output/ for new CSV files from PDI
+#   notebook_runner.py      Executes the analysis notebook in a warm kernel
+#   sales_rollups.py        Running sales totals, updated by file_watcher.py
+#   csv_to_parquet.py       Parquet copies of the PDI output, for the notebook
 # =============================================================================
 
 # Exit immediately if any command fails
@@ -239,6 +242,11 @@ copy_file "$SCRIPT_DIR/../welcome.ipynb" "$DEST_DIR/notebooks"
 # --- Scripts: Docker Compose, run helper, and Python file watcher ------------
 echo -e "${CYAN}Copying script files...${NC}"
 copy_file "$SCRIPT_DIR/../file_watcher.py" "$DEST_DIR/scripts"
+copy_file "$SCRIPT_DIR/../sales_rollups.py" "$DEST_DIR/scripts"
+copy_file "$SCRIPT_DIR/../csv_to_parquet.py" "$DEST_DIR/scripts"
+
+# Copy the notebook runner (mounted into the container, see docker-compose.yml)
+copy_file "$SCRIPT_DIR/../notebook_runner.py" "$DEST_DIR/scripts"
 
 # Copy the Linux docker-compose.yml into the scripts directory
 copy_file "$SCRIPT_DIR/docker-compose.yml" "$DEST_DIR/scripts"
@@ -0,0 +1,252 @@
+# =============================================================================
+# NOTEBOOK RUNNER - Warm-kernel execution of the analysis notebook
+# =============================================================================
+#
+# Purpose:
+#   Runs INSIDE the Jupyter Docker container and executes sales_analysis.ipynb
+#   on request, in a Python kernel that stays alive between runs. The
+#   file_watcher.py script on the host calls it over HTTP instead of starting
+#   'jupyter nbconvert --execute' (a new process and a new kernel that
+#   imports pandas, matplotlib and seaborn again) for every batch of files.
+#
+# How it works:
+#   1. At startup a kernel is started and the notebook's first code cell
+#      (the imports) is executed once, so the libraries are loaded before
+#      the first PDI file arrives.
+#   2. POST /run with {"files": ["/home/jovyan/pdi-output/sales_...csv"]}
+#      executes all code cells of the notebook in that kernel. The files are
+#      passed as a parameter: a cell injected in front of the notebook clears
+#      the variables of the previous run ('%reset -f'; the imported modules
+#      stay loaded) and sets the PDI_NEW_FILES environment variable that the
+#      notebook reads.
+#   3. The executed notebook is saved in place without the injected cell, so
+#      it looks the same as after 'jupyter nbconvert --execute --inplace'.
+#   GET /health reports whether the kernel is alive. Runs are serialised; a
+#   kernel that died (or did not answer within the cell timeout and could
+#   not be interrupted) is replaced by a new one for the next run.
+#
+# Prerequisites:
+#   - nbclient, nbformat and ipykernel (included in jupyter/scipy-notebook)
+#
+# Usage:
+#   Started in the background by post-start.sh when the container starts:
+#     python /usr/local/bin/notebook_runner.py \
+#         /home/jovyan/notebooks/sales_analysis.ipynb --port 8889
+#
+#   Port 8889 is published on 127.0.0.1 only (see docker-compose.yml); the
+#   runner has no authentication.
+# =============================================================================
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import nbformat
+from jupyter_client.manager import AsyncKernelManager
+from nbclient import NotebookClient
+from nbclient.exceptions import CellExecutionError, DeadKernelError
+from nbclient.util import run_sync
+
+
+# =============================================================================
+# RUNNER SETTINGS
+# =============================================================================
+DEFAULT_PORT = 8889
+# Seconds a single cell may run before the kernel is interrupted
+CELL_TIMEOUT = 120
+# Tag of the parameter cell injected for each run (papermill convention)
+PARAMETERS_TAG = "injected-parameters"
+
+
+# =============================================================================
+# FUNCTION: parameters_cell
+# =============================================================================
+# Builds the cell injected in front of the notebook for one run. It clears
+# the namespace of the previous run and hands over the new files.
+# =============================================================================
+def parameters_cell(files):
+    source = "\n".join([
+        "# Parameters injected by notebook_runner.py",
+        "%reset -f",
+        "import os",
+        f"os.environ['PDI_NEW_FILES'] = {','.join(files)!r}",
+    ])
+    return nbformat.v4.new_code_cell(source, metadata={"tags": [PARAMETERS_TAG]})
+
+
+# =============================================================================
+# CLASS: WarmNotebook
+# =============================================================================
+# Executes one notebook repeatedly in the same kernel. The kernel manager is
+# handed to every NotebookClient, which then reuses its kernel instead of
+# starting (and shutting down) one per execution.
+# =============================================================================
+class WarmNotebook:
+    def __init__(self, notebook_path, kernel_name="python3", timeout=CELL_TIMEOUT):
+        """
+        Args:
+            notebook_path (str): Notebook to execute and save in place
+            kernel_name (str): Jupyter kernel spec
+            timeout (int): Seconds per cell
+        """
+        self.notebook_path = notebook_path
+        self.kernel_name = kernel_name
+        self.timeout = timeout
+        self.km = None
+        self.lock = threading.Lock()
+        self.runs = 0
+
+    def execute(self, nb):
+        """Execute a notebook on the shared kernel."""
+        if self.km is None:
+            self.km = AsyncKernelManager(kernel_name=self.kernel_name)
+        client = NotebookClient(nb, km=self.km, kernel_name=self.kernel_name, timeout=self.timeout,
+                                resources={"metadata": {"path": os.path.dirname(self.notebook_path)}})
+        try:
+            client.execute()
+        finally:
+            # The client does not own the kernel, so it leaves its channels
+            # (sockets and the heartbeat thread) open; close them per run
+            if client.kc is not None:
+                client.kc.stop_channels()
+
+    def alive(self):
+        return self.km is not None and self.km.has_kernel
+
+    def discard_kernel(self):
+        """Shut down the kernel after a failure; the next run starts a new one."""
+        if self.km is not None:
+            try:
+                run_sync(self.km.shutdown_kernel)(now=True)
+            except Exception as e:
+                logging.warning(f"Could not shut down the kernel: {e}")
+            self.km = None
+
+    def warm_up(self):
+        """Start the kernel and execute the first code cell (the imports)."""
+        with self.lock:
+            started = time.monotonic()
+            nb = nbformat.read(self.notebook_path, as_version=4)
+            imports = [cell for cell in nb.cells if cell.cell_type == "code"][:1]
+            self.execute(nbformat.v4.new_notebook(cells=imports, metadata=nb.metadata))
+            logging.info(f"Kernel ready in {time.monotonic() - started:.1f}s")
+
+    def run(self, files):
+        """
+        Execute the whole notebook with the given files and save it.
+
+        Args:
+            files (list): Container paths of the new PDI output files
+
+        Returns:
+            dict: {"status": "ok" or "error", "seconds": ..., "error": "<exception>: <message>"}
+        """
+        with self.lock:
+            self.runs += 1
+            started = time.monotonic()
+            nb = nbformat.read(self.notebook_path, as_version=4)
+            nb.cells = [cell for cell in nb.cells if PARAMETERS_TAG not in cell.metadata.get("tags", [])]
+            nb.cells.insert(0, parameters_cell(files))
+            result = {"status": "ok"}
+            try:
+                self.execute(nb)
+            except CellExecutionError as e:
+                # The kernel is fine; the notebook is saved with the error output
+                result = {"status": "error", "error": f"{e.ename}: {e.evalue}"}
+            except (DeadKernelError, TimeoutError, RuntimeError) as e:
+                self.discard_kernel()
+                result = {"status": "error", "error": f"{type(e).__name__}: {str(e).splitlines()[0]}"}
+            finally:
+                nb.cells = nb.cells[1:]
+                nbformat.write(nb, self.notebook_path)
+            result["seconds"] = round(time.monotonic() - started, 2)
+            logging.info(f"Run {self.runs}: {len(files)} file(s), {result['status']} in {result['seconds']}s")
+            return result
+
+
+# =============================================================================
+# FUNCTION: create_server
+# =============================================================================
+# HTTP front end of a WarmNotebook. HTTPServer handles one request at a
+# time, so runs never overlap.
+# =============================================================================
+def create_server(notebook, port=DEFAULT_PORT, host="0.0.0.0"):
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self.reply(404, {"error": "not found"})
+                return
+            self.reply(200, {"kernel": "alive" if notebook.alive() else "stopped", "runs": notebook.runs})
+
+        def do_POST(self):
+            if self.path != "/run":
+                self.reply(404, {"error": "not found"})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                files = [str(path) for path in request.get("files", [])]
+            except (ValueError, AttributeError, TypeError):
+                self.reply(400, {"error": 'expected {"files": [...]}'})
+                return
+            try:
+                result = notebook.run(files)
+            except Exception as e:
+                logging.error(f"Run failed: {e}")
+                result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+            self.reply(200 if result["status"] == "ok" else 500, result)
+
+        def log_message(self, format, *args):
+            pass
+
+    return HTTPServer((host, port), Handler)
+
+
+# =============================================================================
+# FUNCTION: main
+# =============================================================================
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Execute a notebook on request in a warm kernel")
+    parser.add_argument("notebook", help="Notebook to execute, e.g. /home/jovyan/notebooks/sales_analysis.ipynb")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"HTTP port [{DEFAULT_PORT}]")
+    parser.add_argument("--timeout", type=int, default=CELL_TIMEOUT,
+                        help=f"Seconds a cell may run [{CELL_TIMEOUT}]")
+    args = parser.parse_args()
+
+    notebook = WarmNotebook(args.notebook, timeout=args.timeout)
+    try:
+        notebook.warm_up()
+    except Exception as e:
+        # The first run starts the kernel instead
+        logging.warning(f"Warm-up failed: {e}")
+        notebook.discard_kernel()
+
+    server = create_server(notebook, args.port)
+    logging.info(f"Notebook runner listening on port {args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        notebook.discard_kernel()
+
+
+# =============================================================================
+# SCRIPT ENTRY POINT
+# =============================================================================
+if __name__ == "__main__":
+    main()
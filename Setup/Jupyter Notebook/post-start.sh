@@ -12,6 +12,11 @@
 # Packages installed:
 #   watchdog    - Filesystem monitoring (used by file_watcher.py on the host)
 #   xlsxwriter  - Excel file generation (used by sales_analysis.ipynb)
+#   pyarrow     - Reads the Parquet copies of the PDI output (sales_analysis.ipynb)
+#
+# Background services:
+#   notebook_runner.py - Executes sales_analysis.ipynb in a warm kernel when
+#                        file_watcher.py reports new PDI output (port 8889)
 #
 # Usage:
 #   This script is NOT run directly. It is referenced in docker-compose.yml:
@@ -24,7 +29,10 @@
 # =============================================================================
 
 echo "Installing required Python packages..."
-pip install --quiet watchdog xlsxwriter 2>/dev/null
+pip install --quiet watchdog xlsxwriter pyarrow 2>/dev/null
+
+echo "Starting the notebook runner on port 8889..."
+python /usr/local/bin/notebook_runner.py /home/jovyan/notebooks/sales_analysis.ipynb --port 8889 &
 
 echo "Starting Jupyter Lab..."
 exec start-notebook.sh \
@@ -0,0 +1,232 @@
+# =============================================================================
+# SALES ROLLUPS - Incremental aggregation of PDI sales output
+# =============================================================================
+#
+# Purpose:
+#   Keeps running totals of all PDI sales outputs in a small SQLite database
+#   (reports/sales_rollups.db), so reports over the whole history read a few
+#   pre-aggregated rows instead of re-parsing every CSV that PDI ever wrote.
+#   file_watcher.py calls ingest() for each new sales_*.csv before the
+#   notebook runs; sales_analysis.ipynb reads the daily_sales table.
+#
+# Tables:
+#   daily_sales    One row per day, product category and product with
+#                  orders, quantity, revenue, cost and the sum of the profit
+#                  margins (for averages). The PDI output has no region
+#                  column, so category and product are the dimensions.
+#   file_sales     The same aggregates per source file, used to take a file
+#                  back out of daily_sales when it is ingested again.
+#   ingested_files Size, mtime, row counts and time of every ingested file.
+#
+# How a file is ingested:
+#   1. The CSV is streamed with the csv module; only the columns needed for
+#      the rollups are converted (COLUMN_TYPES), and rows are folded into
+#      per-(day, category, product) totals as they are read, so memory use
+#      depends on the number of groups, not on the file size.
+#   2. In one transaction, the totals the same file name contributed before
+#      (PDI overwrote it) are subtracted, and the new totals are added.
+#   The cost of an ingest therefore depends only on the new file, and
+#   ingesting a file twice does not count it twice. Files with different
+#   names are treated as separate batches of orders.
+#
+# Usage:
+#   python sales_rollups.py ~/Jupyter-Notebook/pdi-output/sales_detailed_1.csv
+#   (normally called by file_watcher.py; only needs the standard library)
+# =============================================================================
+
+import argparse
+import csv
+import datetime
+import os
+import sqlite3
+import time
+
+
+# =============================================================================
+# ROLLUP SETTINGS
+# =============================================================================
+# Conversions of the columns read from the PDI output (other columns are
+# not converted). total_amount, total_cost and profit_margin are computed
+# like in sales_analysis.ipynb when a file does not contain them.
+COLUMN_TYPES = {
+    "order_date": str,
+    "product_category": str,
+    "product_name": str,
+    "quantity": int,
+    "unit_price": float,
+    "cost": float,
+    "total_amount": float,
+    "total_cost": float,
+    "profit_margin": float,
+}
+REQUIRED_COLUMNS = ("order_date", "product_category", "product_name", "quantity")
+# Columns of the aggregates, in table order after the dimensions
+MEASURES = ("orders", "quantity", "revenue", "cost", "margin_sum")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_sales (
+    day TEXT NOT NULL, product_category TEXT NOT NULL, product_name TEXT NOT NULL,
+    orders INTEGER NOT NULL, quantity INTEGER NOT NULL, revenue REAL NOT NULL,
+    cost REAL NOT NULL, margin_sum REAL NOT NULL,
+    PRIMARY KEY (day, product_category, product_name));
+CREATE TABLE IF NOT EXISTS file_sales (
+    file TEXT NOT NULL, day TEXT NOT NULL, product_category TEXT NOT NULL, product_name TEXT NOT NULL,
+    orders INTEGER NOT NULL, quantity INTEGER NOT NULL, revenue REAL NOT NULL,
+    cost REAL NOT NULL, margin_sum REAL NOT NULL,
+    PRIMARY KEY (file, day, product_category, product_name));
+CREATE TABLE IF NOT EXISTS ingested_files (
+    file TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,
+    rows INTEGER NOT NULL, rejected INTEGER NOT NULL, ingested_at REAL NOT NULL);
+"""
+
+
+# =============================================================================
+# FUNCTION: aggregate_csv
+# =============================================================================
+# Streams one sales CSV and returns its totals per (day, category, product).
+#
+# Returns:
+#   tuple: (totals, rows, rejected)
+#     totals   - {(day, category, product): [orders, quantity, revenue,
+#                 cost, margin_sum]}
+#     rows     - Rows aggregated
+#     rejected - Rows skipped because a value could not be converted
+# =============================================================================
+def aggregate_csv(csv_path):
+    totals = {}
+    days = {}
+    rows = rejected = 0
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"{os.path.basename(csv_path)} has no {', '.join(missing)} column(s)")
+        # (name, position, conversion) of the columns the rollups need
+        columns = [(name, header.index(name), convert) for name, convert in COLUMN_TYPES.items() if name in header]
+
+        for record in reader:
+            if not record:
+                continue
+            try:
+                row = {name: convert(record[position].strip()) for name, position, convert in columns}
+                # Dates repeat a lot: validate each distinct value once
+                day = days.get(row["order_date"])
+                if day is None:
+                    day = days[row["order_date"]] = datetime.datetime.strptime(
+                        row["order_date"][:10], "%Y-%m-%d").date().isoformat()
+                quantity = row["quantity"]
+                revenue = row["total_amount"] if "total_amount" in row else quantity * row["unit_price"]
+                cost = row["total_cost"] if "total_cost" in row else quantity * row["cost"]
+                margin = row["profit_margin"] if "profit_margin" in row else (
+                    (revenue - cost) / revenue if revenue else 0.0)
+            except (ValueError, IndexError, KeyError):
+                rejected += 1
+                continue
+
+            key = (day, row["product_category"], row["product_name"])
+            group = totals.get(key)
+            if group is None:
+                group = totals[key] = [0, 0, 0.0, 0.0, 0.0]
+            group[0] += 1
+            group[1] += quantity
+            group[2] += revenue
+            group[3] += cost
+            group[4] += margin
+            rows += 1
+    return totals, rows, rejected
+
+
+# =============================================================================
+# CLASS: SalesRollups
+# =============================================================================
+# The rollup database. One instance is used by one thread at a time (the
+# file watcher's run queue), but it may be created on another thread.
+# =============================================================================
+class SalesRollups:
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path (str): SQLite database file, created if missing
+        """
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def ingest(self, csv_path):
+        """
+        Add the totals of a sales CSV to the rollups, replacing those of an
+        earlier file with the same name.
+
+        Args:
+            csv_path (str): PDI output file
+
+        Returns:
+            dict: rows, rejected, groups, replaced (bool) and seconds
+        """
+        started = time.monotonic()
+        stat = os.stat(csv_path)
+        totals, rows, rejected = aggregate_csv(csv_path)
+        name = os.path.basename(csv_path)
+        measures = ", ".join(MEASURES)
+        subtract = ", ".join(f"{measure} = {measure} - ?" for measure in MEASURES)
+        add = ", ".join(f"{measure} = {measure} + ?" for measure in MEASURES)
+        key = "day = ? AND product_category = ? AND product_name = ?"
+
+        with self.db:
+            previous = self.db.execute(
+                f"SELECT {measures}, day, product_category, product_name FROM file_sales WHERE file = ?",
+                (name,)).fetchall()
+            if previous:
+                self.db.executemany(f"UPDATE daily_sales SET {subtract} WHERE {key}", previous)
+                self.db.execute("DELETE FROM file_sales WHERE file = ?", (name,))
+
+            new_rows = [key_values + tuple(values) for key_values, values in totals.items()]
+            self.db.executemany(f"INSERT INTO file_sales VALUES (?, ?, ?, ?, {', '.join('?' * len(MEASURES))})",
+                                [(name,) + row for row in new_rows])
+            self.db.executemany("INSERT OR IGNORE INTO daily_sales VALUES (?, ?, ?, 0, 0, 0, 0, 0)",
+                                list(totals))
+            self.db.executemany(f"UPDATE daily_sales SET {add} WHERE {key}",
+                                [tuple(values) + key_values for key_values, values in totals.items()])
+            if previous:
+                self.db.execute("DELETE FROM daily_sales WHERE orders <= 0")
+            self.db.execute("INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?, ?, ?)",
+                            (name, stat.st_size, stat.st_mtime_ns, rows, rejected, time.time()))
+
+        return {"rows": rows, "rejected": rejected, "groups": len(totals), "replaced": bool(previous),
+                "seconds": time.monotonic() - started}
+
+    def close(self):
+        self.db.close()
+
+
+# =============================================================================
+# FUNCTION: main
+# =============================================================================
+# Ingest files by hand, e.g. to build the rollups from existing PDI output.
+# =============================================================================
+def main():
+    base = r"C:\Jupyter-Notebook" if os.name == "nt" else os.path.expanduser("~/Jupyter-Notebook")
+    default_db = os.path.join(base, "reports", "sales_rollups.db")
+
+    parser = argparse.ArgumentParser(description="Add PDI sales outputs to the sales rollups")
+    parser.add_argument("files", nargs="+", help="sales_*.csv files")
+    parser.add_argument("--db", default=default_db, help=f"Rollup database [{default_db}]")
+    args = parser.parse_args()
+
+    rollups = SalesRollups(args.db)
+    try:
+        for csv_path in args.files:
+            result = rollups.ingest(csv_path)
+            print(f"{os.path.basename(csv_path)}: {result['rows']} row(s) into {result['groups']} group(s)"
+                  f"{' (replaced)' if result['replaced'] else ''}, {result['rejected']} rejected, "
+                  f"{result['seconds']:.2f}s")
+    finally:
+        rollups.close()
+
+
+# =============================================================================
+# SCRIPT ENTRY POINT
+# =============================================================================
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,9 @@
 # Related scripts:
 #   run-docker-jupyter.ps1  Starts / stops the Jupyter Docker container
 #   file_watcher.py         Watches pdi-output\ for new CSV files from PDI
+#   notebook_runner.py      Executes the analysis notebook in a warm kernel
+#   sales_rollups.py        Running sales totals, updated by file_watcher.py
+#   csv_to_parquet.py       Parquet copies of the PDI output, for the notebook
 # =============================================================================
 
 param(
@@ -136,33 +139,41 @@ function Copy-NotebookFile {
 # =============================================================================
 # HELPER FUNCTION: Copy-ScriptFile
 # =============================================================================
-# Copies the file_watcher.py script from the source directory to the
-# destination scripts directory. This Python script monitors the pdi-output\
-# directory for new CSV files and notifies the user to run the notebook.
+# Copies the Python scripts from the source directory to the destination
+# scripts directory:
+#   file_watcher.py     Monitors the pdi-output\ directory for new CSV files
+#                       and runs the analysis notebook
+#   sales_rollups.py    Running sales totals, updated by file_watcher.py
+#   csv_to_parquet.py   Parquet copies of the PDI output, for the notebook
+#   notebook_runner.py  Executes the notebook in a warm kernel inside the
+#                       container (mounted by docker-compose.yml)
 #
 # Parameters:
-#   -SourcePath       The directory containing the source file
-#   -DestinationPath  The directory to copy the file into
+#   -SourcePath       The directory containing the source files
+#   -DestinationPath  The directory to copy the files into
 # =============================================================================
 function Copy-ScriptFile {
     param([string]$SourcePath, [string]$DestinationPath)
 
-    $sourceFile = Join-Path $SourcePath "file_watcher.py"
-    $destFile = Join-Path $DestinationPath "file_watcher.py"
-
-    if (Test-Path $sourceFile) {
-        try {
-            Copy-Item -Path $sourceFile -Destination $destFile -Force -ErrorAction Stop
-            Write-Host "  Copied file_watcher.py to $destFile" -ForegroundColor Green
-            return $true
-        } catch {
-            Write-Host "  Failed to copy file_watcher.py: $_" -ForegroundColor Red
-            return $false
+    $copied = $true
+    foreach ($fileName in @("file_watcher.py", "sales_rollups.py", "csv_to_parquet.py", "notebook_runner.py")) {
+        $sourceFile = Join-Path $SourcePath $fileName
+        $destFile = Join-Path $DestinationPath $fileName
+
+        if (Test-Path $sourceFile) {
+            try {
+                Copy-Item -Path $sourceFile -Destination $destFile -Force -ErrorAction Stop
+                Write-Host "  Copied $fileName to $destFile" -ForegroundColor Green
+            } catch {
+                Write-Host "  Failed to copy ${fileName}: $_" -ForegroundColor Red
+                $copied = $false
+            }
+        } else {
+            Write-Host "  Source file not found: $sourceFile" -ForegroundColor Yellow
+            $copied = $false
         }
-    } else {
-        Write-Host "  Source file not found: $sourceFile" -ForegroundColor Yellow
-        return $false
     }
+    return $copied
 }
 
 # =============================================================================
@@ -172,7 +183,8 @@ function Copy-ScriptFile {
 # container, then copies the required workshop files into each directory:
 #   - datasets\     <- sales_data.csv
 #   - notebooks\    <- sales_analysis.ipynb, welcome.ipynb
-#   - scripts\      <- file_watcher.py
+#   - scripts\      <- file_watcher.py, sales_rollups.py, csv_to_parquet.py,
+#                    notebook_runner.py
 #   - pdi-output\   <- README.md (created inline)
 #   - reports\      (empty, receives output from notebooks)
 #   - workshop-data\ (empty, general workspace)
@@ -21,12 +21,15 @@ CONTROL_CENTER_NEXT_GEN_RELEASE = "2.3.0"
 CONFLUENT_REPOSITORY = "confluentinc"
 CONFLUENT_CONTAINER = "cp-server"  # Confluent Server (includes Kafka + additional features)
 CONFLUENT_KAFKA_CLUSTER_CMD = "/usr/bin/kafka-cluster"  # Path to kafka-cluster command in Confluent images
+CONFLUENT_MIRROR_MAKER_CMD = "/usr/bin/connect-mirror-maker"  # Path to MirrorMaker 2 in Confluent images
+CONFLUENT_CLUSTER_LINKS_CMD = "/usr/bin/kafka-cluster-links"  # Path to kafka-cluster-links command (Confluent only)
 
 # ========== Apache Kafka (OSK) Configuration ==========
 # Docker repository and image names for Open Source Kafka
 APACHE_REPOSITORY = "apache"
 APACHE_CONTAINER = "kafka"
 OSK_KAFKA_CLUSTER_CMD = "/opt/kafka/bin/kafka-cluster.sh"  # Path to kafka-cluster command in Apache images
+OSK_MIRROR_MAKER_CMD = "/opt/kafka/bin/connect-mirror-maker.sh"  # Path to MirrorMaker 2 in Apache images
 
 # ========== Local Build Configuration ==========
 # Repository name for locally-built images with traffic control enabled
@@ -65,6 +68,39 @@ BROKER_JMX_CONFIG = "kafka_config.yml"
 CONTROLLER_JMX_CONFIG = "kafka_controller.yml"
 SCHEMA_REGISTRY_JMX_CONFIG = "schema-registry.yml"
 CONNECT_JMX_CONFIG = "kafka_connect.yml"
+MIRROR_MAKER_JMX_CONFIG = "mirror_maker.yml"
+
+# ========== Multi-Cluster Configuration ==========
+# Service names of every cluster except a single one are prefixed (e.g. "cluster2-kafka-1")
+CLUSTER_NAME_PREFIX = "cluster"
+
+# Fixed service ports (Schema Registry, Connect, ksqlDB, ZooKeeper) are shifted by this
+# amount for each additional cluster so host ports never overlap
+CLUSTER_PORT_OFFSET = 100
+
+# Generated replication configuration files (written below the volumes directory)
+MIRROR_MAKER_CONFIG = "mm2.properties"
+CLUSTER_LINK_CONFIG_DIR = "cluster-links"
+
+# ========== MQTT Bridge Configuration ==========
+# The bridge (mqtt_bridge.py) runs in a plain Python image; its dependencies are installed on start
+MQTT_BRIDGE_IMAGE = "python:3.11-slim"
+MQTT_BRIDGE_SCRIPT = "mqtt_bridge.py"
+MQTT_BRIDGE_PACKAGES = "paho-mqtt confluent-kafka"
+
+# MQTT broker of the streaming labs (HiveMQ/Mosquitto publishes port 1883 on the Docker host)
+MQTT_BRIDGE_BROKER = "host.docker.internal:1883"
+# Docker Desktop resolves host.docker.internal itself; Docker Engine on Linux
+# needs this /etc/hosts entry (host-gateway = address of the Docker host)
+DOCKER_HOST_ALIAS = "host.docker.internal"
+DOCKER_HOST_GATEWAY = f"{DOCKER_HOST_ALIAS}:host-gateway"
+
+# ========== Docker Swarm Configuration ==========
+# Overlay network connecting the services across all Swarm nodes
+SWARM_OVERLAY_NETWORK = "kafka-net"
+
+# Swarm service template resolving to the hostname of the node a task runs on
+SWARM_NODE_HOSTNAME = "{{.Node.Hostname}}"
 
 # ========== Service Port Numbers ==========
 # Default port for ZooKeeper client connections
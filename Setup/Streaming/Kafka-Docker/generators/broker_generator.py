@@ -11,6 +11,7 @@ The generator supports both:
 
 from .broker_controller_generator import BrokerControllerGenerator
 from constants import *
+from topology import PortMapping, Service, Volume
 
 
 class BrokerGenerator(BrokerControllerGenerator):
@@ -48,7 +49,7 @@ class BrokerGenerator(BrokerControllerGenerator):
         - Health check configuration
 
         Returns:
-            list: List of broker service dictionaries
+            list: List of broker Service objects
         """
         base = self.base
         rack = 0  # Starting rack ID for round-robin distribution
@@ -74,33 +75,33 @@ class BrokerGenerator(BrokerControllerGenerator):
             internal_port = base.next_internal_broker_port()  # Port for inter-broker communication
             node_id = base.next_node_id()  # Unique node ID (used in KRaft mode)
 
-            broker = {}
-
             # ========== Service Naming ==========
             # Create service name (e.g., "kafka-1", "kafka-2")
             name = base.create_name("kafka", broker_id)
-            broker["name"] = name
-            broker["hostname"] = name
-            broker["container_name"] = name
 
             # Add this broker as a Prometheus scraping target
             targets.append(f"{name}:{JMX_PORT}")
 
             # ========== Docker Image Configuration ==========
-            broker["image"] = f"{base.repository}/{base.args.kafka_container}{base.tc}:" + base.args.release
+            broker = Service(
+                name=name,
+                hostname=name,
+                container_name=name,
+                image=f"{base.repository}/{base.args.kafka_container}{base.tc}:" + base.args.release
+            )
 
             # ========== Service Dependencies ==========
             # Brokers depend on either controllers (KRaft) or ZooKeeper (legacy)
-            broker["depends_on"] = base.controller_containers[:] if base.use_kraft else base.zookeeper_containers[:]
+            broker.depends_on = base.controller_containers[:] if base.use_kraft else base.zookeeper_containers[:]
             # If using next-gen Control Center, also depend on Prometheus
             if base.args.control_center_next_gen:
-                broker["depends_on"].append("prometheus")
+                broker.depends_on.append("prometheus")
 
             # Allocate JMX port for remote monitoring
             jmx_port = base.next_jmx_external_port()
 
             # ========== Broker Environment Variables ==========
-            broker["environment"] = {
+            broker.environment = {
                 # Network listeners: PLAINTEXT for internal, EXTERNAL for client connections
                 "KAFKA_LISTENERS": f"PLAINTEXT://{name}:{internal_port}, EXTERNAL://0.0.0.0:{port}",
 
@@ -108,7 +109,9 @@ class BrokerGenerator(BrokerControllerGenerator):
                 "KAFKA_LISTENER_SECURITY_PROTOCOL_MAP": "PLAINTEXT:PLAINTEXT,EXTERNAL:PLAINTEXT",
 
                 # Advertised listeners: what clients and other brokers use to connect
-                "KAFKA_ADVERTISED_LISTENERS": f"PLAINTEXT://{name}:{internal_port}, EXTERNAL://localhost:{port}",
+                # (localhost, or the node's hostname when deploying to Docker Swarm)
+                "KAFKA_ADVERTISED_LISTENERS": f"PLAINTEXT://{name}:{internal_port}, "
+                                              f"EXTERNAL://{base.advertised_host(rack)}:{port}",
 
                 # Which listener to use for inter-broker communication
                 "KAFKA_INTER_BROKER_LISTENER_NAME": "PLAINTEXT",
@@ -130,20 +133,22 @@ class BrokerGenerator(BrokerControllerGenerator):
                 "KAFKA_MIN_INSYNC_REPLICAS": base.min_insync_replicas(),
 
                 # Confluent-specific features (only enabled if replication factor >= 3)
-                "KAFKA_CONFLUENT_CLUSTER_LINK_ENABLE": base.replication_factor() >= 3,
+                # Cluster Linking is always enabled when it replicates between generated clusters
+                "KAFKA_CONFLUENT_CLUSTER_LINK_ENABLE": base.replication_factor() >= 3
+                                                      or base.args.cluster_replication == "cluster-link",
                 "KAFKA_CONFLUENT_REPORTERS_TELEMETRY_AUTO_ENABLE": base.replication_factor() >= 3,
             }
 
             # ========== Confluent Platform Specific Configuration ==========
             # Add Confluent-specific settings (not needed for OSK/Apache Kafka)
             if not base.args.osk:
-                broker["environment"]["KAFKA_CONFLUENT_LICENSE_TOPIC_REPLICATION_FACTOR"] = base.replication_factor()
-                broker["environment"]["KAFKA_METRIC_REPORTERS"] = "io.confluent.metrics.reporter.ConfluentMetricsReporter"
+                broker.environment["KAFKA_CONFLUENT_LICENSE_TOPIC_REPLICATION_FACTOR"] = base.replication_factor()
+                broker.environment["KAFKA_METRIC_REPORTERS"] = "io.confluent.metrics.reporter.ConfluentMetricsReporter"
 
             # ========== Next-Gen Control Center Configuration ==========
             # Add additional environment variables for next-gen Control Center integration
             if base.args.control_center_next_gen:
-                self.generate_c3plusplus(broker["environment"])
+                self.generate_c3plusplus(broker.environment)
 
             # ========== KRaft vs ZooKeeper Configuration ==========
             # Different configuration depending on cluster mode
@@ -152,14 +157,14 @@ class BrokerGenerator(BrokerControllerGenerator):
             if base.use_kraft:
                 # KRaft mode configuration (ZooKeeper-less)
                 controller_dict["KAFKA_NODE_ID"] = node_id
-                controller_dict["CLUSTER_ID"] = base.args.uuid  # Cluster UUID required for KRaft
+                controller_dict["CLUSTER_ID"] = base.cluster_uuid  # Cluster UUID required for KRaft
                 controller_dict["KAFKA_CONTROLLER_QUORUM_VOTERS"] = base.quorum_voters  # List of controller nodes
                 controller_dict["KAFKA_PROCESS_ROLES"] = 'broker'  # This node only acts as a broker
                 controller_dict["KAFKA_CONTROLLER_LISTENER_NAMES"] = "CONTROLLER"
 
                 # Add CONTROLLER protocol to security map
                 controller_dict["KAFKA_LISTENER_SECURITY_PROTOCOL_MAP"] = \
-                    "CONTROLLER:PLAINTEXT" + "," + broker["environment"]["KAFKA_LISTENER_SECURITY_PROTOCOL_MAP"]
+                    "CONTROLLER:PLAINTEXT" + "," + broker.environment["KAFKA_LISTENER_SECURITY_PROTOCOL_MAP"]
             else:
                 # ZooKeeper mode configuration (legacy)
                 controller_dict["KAFKA_DEFAULT_REPLICATION_FACTOR"] = base.replication_factor()
@@ -168,34 +173,34 @@ class BrokerGenerator(BrokerControllerGenerator):
                 controller_dict["KAFKA_CONFLUENT_METRICS_REPORTER_TOPIC_REPLICAS"] = base.replication_factor()
 
             # Merge KRaft/ZooKeeper specific settings into environment
-            broker["environment"].update(controller_dict)
+            broker.environment.update(controller_dict)
 
             # ========== Container Capabilities ==========
             # NET_ADMIN capability allows traffic control (tc) commands
             # Required if using --with-tc flag for network simulation
-            broker["cap_add"] = [
+            broker.cap_add = [
                 "NET_ADMIN"
             ]
 
             # ========== Port Mappings ==========
             # Map container ports to host ports
-            broker["ports"] = {
-                port: port,  # Kafka client port (external)
-                jmx_port: jmx_port,  # JMX remote monitoring port
-                base.next_agent_port(): JMX_PORT,  # Prometheus JMX exporter port
-                base.next_http_port(): 8090  # HTTP/REST port
-            }
+            broker.ports = [
+                PortMapping(port, port),  # Kafka client port (external)
+                PortMapping(jmx_port, jmx_port),  # JMX remote monitoring port
+                PortMapping(base.next_agent_port(), JMX_PORT),  # Prometheus JMX exporter port
+                PortMapping(base.next_http_port(), 8090)  # HTTP/REST port
+            ]
 
             # ========== Volume Mounts ==========
             # Mount JMX exporter JAR and configuration files
-            broker["volumes"] = [
-                LOCAL_VOLUMES + JMX_JAR_FILE + ":/tmp/" + JMX_JAR_FILE,
-                LOCAL_VOLUMES + BROKER_JMX_CONFIG + ":/tmp/" + BROKER_JMX_CONFIG
+            broker.volumes = [
+                Volume(LOCAL_VOLUMES + JMX_JAR_FILE, "/tmp/" + JMX_JAR_FILE),
+                Volume(LOCAL_VOLUMES + BROKER_JMX_CONFIG, "/tmp/" + BROKER_JMX_CONFIG)
             ]
 
             # ========== Health Check Configuration ==========
             # Docker will use this to determine if the broker is healthy
-            broker["healthcheck"] = {
+            broker.healthcheck = {
                 "test": f"{base.healthcheck_command} cluster-id --bootstrap-server localhost:{port} || exit 1",
                 "interval": "10s",  # Check every 10 seconds
                 "retries": "10",  # Retry 10 times before marking unhealthy
@@ -220,15 +225,15 @@ class BrokerGenerator(BrokerControllerGenerator):
             base.bootstrap_servers = ",".join(bootstrap_servers)
 
         # Save broker container names for dependency management
-        base.broker_containers = [b["name"] for b in brokers]
+        base.broker_containers = [b.name for b in brokers]
 
         # ========== Configure Metrics Reporter Bootstrap Servers ==========
         # Set bootstrap servers for metrics reporting on all brokers
         for broker in brokers:
-            broker["environment"]["KAFKA_CONFLUENT_METRICS_REPORTER_BOOTSTRAP_SERVERS"] = base.bootstrap_servers
+            broker.environment["KAFKA_CONFLUENT_METRICS_REPORTER_BOOTSTRAP_SERVERS"] = base.bootstrap_servers
 
         # Also update controllers if they exist (for KRaft mode)
         for controller in base.controllers:
-            controller["environment"]["KAFKA_CONFLUENT_METRICS_REPORTER_BOOTSTRAP_SERVERS"] = base.bootstrap_servers
+            controller.environment["KAFKA_CONFLUENT_METRICS_REPORTER_BOOTSTRAP_SERVERS"] = base.bootstrap_servers
 
         return brokers
@@ -0,0 +1,83 @@
+import json
+
+from .replication_generator import ReplicationGenerator
+from constants import *
+from topology import Service, Volume
+
+
+class ClusterLinkGenerator(ReplicationGenerator):
+    """
+    Generator for Confluent Cluster Linking between generated clusters.
+
+    Cluster links live inside the destination brokers, so no long-running
+    service is needed. A one-shot "cluster-link-init" container creates one
+    link per replication flow once all brokers are healthy. Mirror topics are
+    created automatically and prefixed with the source cluster name. Topics
+    carrying the prefix of any generated cluster are mirror topics and are
+    never mirrored again, which keeps active-active setups of three or more
+    clusters free of replication loops.
+
+    Replication lag is exported by the brokers themselves
+    (kafka.server.link metrics in kafka_config.yml).
+    """
+
+    def __init__(self, base):
+        super().__init__(base)
+
+    def generate(self):
+        base = self.base
+        name = "cluster-link-init"
+
+        depends_on = []
+        commands = []
+
+        for source, target in self.replication_flows():
+            link_name = f"{source['name']}-to-{target['name']}"
+            config_file = f"{CLUSTER_LINK_CONFIG_DIR}/{link_name}.properties"
+
+            # Mirror only the source's own topics: a topic prefixed with any cluster
+            # name is itself a mirror and would be passed on around the ring
+            topic_filters = {"topicFilters": [
+                {"name": "*", "patternType": "LITERAL", "filterType": "INCLUDE"}
+            ] + [
+                {"name": f"{cluster['name']}.", "patternType": "PREFIXED", "filterType": "EXCLUDE"}
+                for cluster in base.clusters
+            ]}
+            group_filters = {"groupFilters": [
+                {"name": "*", "patternType": "LITERAL", "filterType": "INCLUDE"}
+            ]}
+
+            base.replication_configs.append((
+                "cluster-link.j2",
+                "volumes/" + config_file,
+                {
+                    "link_name": link_name,
+                    "source": source["name"],
+                    "target": target["name"],
+                    "bootstrap_servers": source["bootstrap_servers"],
+                    "topic_filters": json.dumps(topic_filters),
+                    "group_filters": json.dumps(group_filters)
+                }
+            ))
+
+            commands.append(f"{CONFLUENT_CLUSTER_LINKS_CMD} --bootstrap-server {target['bootstrap_servers']}"
+                            f" --create --link {link_name} --config-file /tmp/{config_file}")
+
+            for cluster in (source, target):
+                for container in self.cluster_depends_on(cluster):
+                    if container not in depends_on:
+                        depends_on.append(container)
+
+        cluster_link_init = Service(
+            name=name,
+            hostname=name,
+            container_name=name,
+            image=f"{base.repository}/{base.args.kafka_container}{base.tc}:" + base.args.release,
+            depends_on_condition=depends_on,
+            command=json.dumps(["bash", "-c", " && ".join(commands)]),
+            volumes=[
+                Volume(LOCAL_VOLUMES + CLUSTER_LINK_CONFIG_DIR, "/tmp/" + CLUSTER_LINK_CONFIG_DIR)
+            ]
+        )
+
+        return [cluster_link_init]
@@ -1,5 +1,6 @@
 from .generator import Generator
 from constants import *
+from topology import PortMapping, Service, Volume
 
 class ConnectGenerator(Generator):
     def __init__(self, base):
@@ -18,18 +19,18 @@ class ConnectGenerator(Generator):
         }
 
         for connect_id in range(1, base.args.connect_instances + 1):
-            port = 8082 + connect_id
+            port = 8082 + base.port_offset + connect_id
 
             name = base.create_name("kafka-connect", connect_id)
             plugin_dirname = "connect-plugin-jars"
 
-            connect = {
-                "name": name,
-                "hostname": name,
-                "container_name": name,
-                "image": f"{base.repository}/cp-server-connect{base.tc}:" + base.args.release,
-                "depends_on_condition": base.generate_depends_on(),
-                "environment": {
+            connect = Service(
+                name=name,
+                hostname=name,
+                container_name=name,
+                image=f"{base.repository}/cp-server-connect{base.tc}:" + base.args.release,
+                depends_on_condition=base.generate_depends_on(),
+                environment={
                     "CONNECT_REST_ADVERTISED_PORT": port,
                     "CONNECT_REST_PORT": port,
                     "CONNECT_LISTENERS": f"http://0.0.0.0:{port}",
@@ -51,24 +52,21 @@ class ConnectGenerator(Generator):
                                            f"/data/{plugin_dirname}",
                     "KAFKA_OPTS": JMX_PROMETHEUS_JAVA_AGENT + CONNECT_JMX_CONFIG
                 },
-                "capability": [
-                    "NET_ADMIN"
+                ports=[
+                    PortMapping(port, port)
                 ],
-                "ports": {
-                    port: port
-                },
-                "healthcheck": {
+                healthcheck={
                     "test": f"curl -fail --silent http://{name}:{port}/connectors --output /dev/null || exit 1",
                     "interval": "10s",
                     "retries": "20",
                     "start_period": "20s"
                 },
-                "volumes": [
-                    LOCAL_VOLUMES + JMX_JAR_FILE + ":/tmp/" + JMX_JAR_FILE,
-                    LOCAL_VOLUMES + CONNECT_JMX_CONFIG + ":/tmp/" + CONNECT_JMX_CONFIG,
-                    LOCAL_VOLUMES + f"{plugin_dirname}:/data/{plugin_dirname}"
+                volumes=[
+                    Volume(LOCAL_VOLUMES + JMX_JAR_FILE, "/tmp/" + JMX_JAR_FILE),
+                    Volume(LOCAL_VOLUMES + CONNECT_JMX_CONFIG, "/tmp/" + CONNECT_JMX_CONFIG),
+                    Volume(LOCAL_VOLUMES + plugin_dirname, f"/data/{plugin_dirname}")
                 ]
-            }
+            )
 
             targets.append(f"{name}:{JMX_PORT}")
             connects.append(connect)
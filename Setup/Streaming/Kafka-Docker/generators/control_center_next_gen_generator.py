@@ -1,5 +1,6 @@
 from .generator import Generator
 from constants import *
+from topology import PortMapping, Service, Volume
 
 class ControlCenterNextGenerationGenerator(Generator):
     def __init__(self, base):
@@ -12,13 +13,13 @@ class ControlCenterNextGenerationGenerator(Generator):
         # No base.tc, since the underlying image cannot be built
 
         if base.args.control_center_next_gen:
-            control_center = {
-                "name": "control-center",
-                "hostname": "control-center",
-                "container_name": "control-center",
-                "image": f"confluentinc/cp-enterprise-control-center-next-gen:" + base.args.control_center_next_gen_release,
-                "depends_on_condition": base.generate_depends_on() + base.connect_containers + base.ksqldb_containers,
-                "environment": {
+            control_center = Service(
+                name="control-center",
+                hostname="control-center",
+                container_name="control-center",
+                image=f"confluentinc/cp-enterprise-control-center-next-gen:" + base.args.control_center_next_gen_release,
+                depends_on_condition=base.generate_depends_on() + base.connect_containers + base.ksqldb_containers,
+                environment={
                     "CONTROL_CENTER_BOOTSTRAP_SERVERS": base.bootstrap_servers,
                     "CONTROL_CENTER_SCHEMA_REGISTRY_URL": base.schema_registry_urls,
                     "CONTROL_CENTER_REPLICATION_FACTOR": base.replication_factor(),
@@ -32,17 +33,13 @@ class ControlCenterNextGenerationGenerator(Generator):
                     "CONTROL_CENTER_ALERTMANAGER_CONFIG_FILE": "/mnt/config/alertmanager.yml",
                     "CONTROL_CENTER_CMF_URL": "http://control-center:9021"
                 },
-                "capability": [
-                    "NET_ADMIN"
+                volumes=[
+                    Volume(LOCAL_VOLUMES + "config", "/mnt/config")
                 ],
-                "volumes": [
-                    LOCAL_VOLUMES + "config:/mnt/config"
-                ],
-                "ports": {
-                    9021: 9021
-                }
-
-            }
+                ports=[
+                    PortMapping(9021, 9021)
+                ]
+            )
 
             control_centers.append(control_center)
 
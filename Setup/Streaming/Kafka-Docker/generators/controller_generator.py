@@ -1,5 +1,6 @@
 from .broker_controller_generator import BrokerControllerGenerator
 from constants import *
+from topology import PortMapping, Service, Volume
 
 class ControllerGenerator(BrokerControllerGenerator):
     def __init__(self, base):
@@ -11,6 +12,7 @@ class ControllerGenerator(BrokerControllerGenerator):
 
         controllers = []
         quorum_voters = []
+        bootstrap_servers = []
 
         targets = []
         job = {
@@ -23,20 +25,20 @@ class ControllerGenerator(BrokerControllerGenerator):
             port = base.next_internal_broker_port()
             node_id = base.next_controller_node_id()
 
-            controller = {}
-
             name = base.create_name("controller", counter)
-            controller["name"] = name
-            controller["hostname"] = name
-            controller["container_name"] = name
 
             targets.append(f"{name}:{JMX_PORT}")
 
-            controller["image"] = f"{base.repository}/{base.args.kafka_container}{base.tc}:" + base.args.release
+            controller = Service(
+                name=name,
+                hostname=name,
+                container_name=name,
+                image=f"{base.repository}/{base.args.kafka_container}{base.tc}:" + base.args.release
+            )
 
-            controller["environment"] = {
+            controller.environment = {
                 "KAFKA_NODE_ID": node_id,
-                "CLUSTER_ID": base.args.uuid,
+                "CLUSTER_ID": base.cluster_uuid,
                 "KAFKA_PROCESS_ROLES": "controller,broker" if base.args.shared_mode else "controller",
                 "KAFKA_LISTENERS": f"CONTROLLER://{name}:{port}",
                 "KAFKA_LISTENER_SECURITY_PROTOCOL_MAP": "CONTROLLER:PLAINTEXT",
@@ -54,65 +56,67 @@ class ControllerGenerator(BrokerControllerGenerator):
             }
 
             if not base.args.osk:
-                controller["environment"]["KAFKA_CONFLUENT_LICENSE_TOPIC_REPLICATION_FACTOR"] = base.replication_factor()
-                controller["environment"]["KAFKA_METRIC_REPORTERS"] = "io.confluent.metrics.reporter.ConfluentMetricsReporter"
-                controller["environment"]["KAFKA_CONFLUENT_METRICS_REPORTER_TOPIC_REPLICAS"] = base.replication_factor()
+                controller.environment["KAFKA_CONFLUENT_LICENSE_TOPIC_REPLICATION_FACTOR"] = base.replication_factor()
+                controller.environment["KAFKA_METRIC_REPORTERS"] = "io.confluent.metrics.reporter.ConfluentMetricsReporter"
+                controller.environment["KAFKA_CONFLUENT_METRICS_REPORTER_TOPIC_REPLICAS"] = base.replication_factor()
 
 
             if base.args.control_center_next_gen:
-                self.generate_c3plusplus(controller["environment"])
+                self.generate_c3plusplus(controller.environment)
 
             if base.args.shared_mode:
                 internal_port = base.next_internal_broker_port()
                 external_port = base.next_external_broker_port()
 
-                controller["environment"]["KAFKA_ADVERTISED_LISTENERS"] = \
-                    f"PLAINTEXT://{name}:{internal_port}, EXTERNAL://localhost:{external_port}"
-                controller["environment"]["KAFKA_LISTENERS"] = \
+                controller.environment["KAFKA_ADVERTISED_LISTENERS"] = \
+                    f"PLAINTEXT://{name}:{internal_port}, EXTERNAL://{base.advertised_host(rack)}:{external_port}"
+                controller.environment["KAFKA_LISTENERS"] = \
                     f"CONTROLLER://{name}:{port},PLAINTEXT://{name}:{internal_port},EXTERNAL://0.0.0.0:{external_port}"
-                controller["environment"]["KAFKA_LISTENER_SECURITY_PROTOCOL_MAP"] = \
+                controller.environment["KAFKA_LISTENER_SECURITY_PROTOCOL_MAP"] = \
                     "CONTROLLER:PLAINTEXT,PLAINTEXT:PLAINTEXT,EXTERNAL:PLAINTEXT"
-                controller["environment"]["KAFKA_INTER_BROKER_LISTENER_NAME"] = "PLAINTEXT"
+                controller.environment["KAFKA_INTER_BROKER_LISTENER_NAME"] = "PLAINTEXT"
 
-                controller["healthcheck"] = {
+                controller.healthcheck = {
                     "test": f"{base.healthcheck_command} cluster-id --bootstrap-controller {name}:{port} || exit 1",
                     "interval": "10s",
                     "retries": "10",
                     "start_period": "20s"
                 }
 
-                if base.bootstrap_servers != "":
-                    base.bootstrap_servers += ','
-                base.bootstrap_servers += f"{name}:{internal_port}"
+                bootstrap_servers.append(f"{name}:{internal_port}")
 
             if base.args.control_center_next_gen:
-                controller["depends_on"] = ["prometheus"]
+                controller.depends_on = ["prometheus"]
 
                 # end for
 
-            controller["volumes"] = [
-                LOCAL_VOLUMES + JMX_JAR_FILE + ":/tmp/" + JMX_JAR_FILE,
-                LOCAL_VOLUMES + CONTROLLER_JMX_CONFIG + ":/tmp/" + CONTROLLER_JMX_CONFIG
+            controller.volumes = [
+                Volume(LOCAL_VOLUMES + JMX_JAR_FILE, "/tmp/" + JMX_JAR_FILE),
+                Volume(LOCAL_VOLUMES + CONTROLLER_JMX_CONFIG, "/tmp/" + CONTROLLER_JMX_CONFIG)
             ]
 
-            controller["cap_add"] = [
+            controller.cap_add = [
                 "NET_ADMIN"
             ]
 
-            controller["ports"] = {
-                port: port
-            }
+            controller.ports = [
+                PortMapping(port, port)
+            ]
 
             controllers.append(controller)
             quorum_voters.append(f"{node_id}@{name}:{port}")
 
             rack = base.next_rack(rack, base.args.racks)
 
-        base.controller_containers = [b["name"] for b in controllers]
+        base.controller_containers = [b.name for b in controllers]
         base.quorum_voters = ",".join(quorum_voters)
 
+        # Shared-mode controllers are the bootstrap servers until brokers are generated
+        if bootstrap_servers:
+            base.bootstrap_servers = ",".join(bootstrap_servers)
+
         for controller in controllers:
-            controller["environment"]["KAFKA_CONTROLLER_QUORUM_VOTERS"] = base.quorum_voters
+            controller.environment["KAFKA_CONTROLLER_QUORUM_VOTERS"] = base.quorum_voters
 
         if base.args.controllers > 0:
             base.prometheus_jobs.append(job)
@@ -1,5 +1,6 @@
 from .generator import Generator
 from constants import *
+from topology import PortMapping, Service, Volume
 
 class KSQLDBGenerator(Generator):
     def __init__(self, base):
@@ -18,19 +19,19 @@ class KSQLDBGenerator(Generator):
         }
 
         for ksqldb_id in range(1, base.args.ksqldb_instances + 1):
-            port = 8087 + ksqldb_id
+            port = 8087 + base.port_offset + ksqldb_id
 
             name = base.create_name("ksqldb", ksqldb_id)
 
             # No base.tc since the underlying image cannot be built
 
-            ksqldb = {
-                'name': name,
-                "hostname": name,
-                "container_name": name,
-                "image": f"confluentinc/cp-ksqldb-server:" + base.args.release,
-                "depends_on_condition": base.generate_depends_on(),
-                "environment": {
+            ksqldb = Service(
+                name=name,
+                hostname=name,
+                container_name=name,
+                image=f"confluentinc/cp-ksqldb-server:" + base.args.release,
+                depends_on_condition=base.generate_depends_on(),
+                environment={
                     "KSQL_LISTENERS": f"http://0.0.0.0:{port}",
                     "KSQL_BOOTSTRAP_SERVERS": base.bootstrap_servers,
                     "KSQL_KSQL_LOGGING_PROCESSING_STREAM_AUTO_CREATE": "true",
@@ -42,22 +43,19 @@ class KSQLDBGenerator(Generator):
                     "KSQL_KSQL_INTERNAL_TOPICS_REPLICAS": base.replication_factor(),
                     "KSQL_KSQL_LOGGING_PROCESSING_TOPIC_REPLICATION_FACTOR": base.replication_factor(),
                 },
-                "capability": [
-                    "NET_ADMIN"
+                ports=[
+                    PortMapping(port, port)
                 ],
-                "ports": {
-                    port: port
-                },
-                "healthcheck": {
+                healthcheck={
                     "test": f"curl -fail --silent http://{name}:{port}/healthcheck --output /dev/null || exit 1",
                     "interval": "10s",
                     "retries": "20",
                     "start_period": "20s"
                 },
-                "volumes": [
-                    LOCAL_VOLUMES + JMX_JAR_FILE + ":/tmp/" + JMX_JAR_FILE
+                volumes=[
+                    Volume(LOCAL_VOLUMES + JMX_JAR_FILE, "/tmp/" + JMX_JAR_FILE)
                 ]
-            }
+            )
 
             ksqldbs.append(ksqldb)
             ksqldb_hosts.append(f"http://{name}:{port}")
@@ -0,0 +1,78 @@
+import json
+
+from .replication_generator import ReplicationGenerator
+from constants import *
+from topology import PortMapping, Service, Volume
+
+
+class MirrorMakerGenerator(ReplicationGenerator):
+    """
+    Generator for a dedicated MirrorMaker 2 service replicating between clusters.
+
+    A single MirrorMaker 2 process handles every replication flow. Its
+    properties file is rendered from mirror-maker.j2 into the volumes
+    directory, and a Prometheus JMX exporter exposes replication latency,
+    record age and throughput per topic.
+    """
+
+    def __init__(self, base):
+        super().__init__(base)
+
+    def generate(self):
+        base = self.base
+        name = "mirror-maker"
+
+        flows = self.replication_flows()
+
+        depends_on = []
+        for cluster in base.clusters:
+            depends_on += self.cluster_depends_on(cluster)
+
+        # ========== MirrorMaker 2 Configuration File ==========
+        base.replication_configs.append((
+            "mirror-maker.j2",
+            "volumes/" + MIRROR_MAKER_CONFIG,
+            {
+                "clusters": base.clusters,
+                "flows": [(source["name"], target["name"]) for source, target in flows],
+                "replication_factor": base.replication_factor(),
+                # One task per broker lets partitions be copied in parallel
+                "tasks_max": max(1, base.args.brokers)
+            }
+        ))
+
+        base.prometheus_jobs.append({
+            "name": name,
+            "scrape_interval": "5s",
+            "targets": [f"{name}:{JMX_PORT}"]
+        })
+
+        mirror_maker_command = OSK_MIRROR_MAKER_CMD if base.args.osk else CONFLUENT_MIRROR_MAKER_CMD
+
+        mirror_maker = Service(
+            name=name,
+            hostname=name,
+            container_name=name,
+            image=f"{base.repository}/{base.args.kafka_container}{base.tc}:" + base.args.release,
+            depends_on_condition=depends_on,
+            environment={
+                "KAFKA_OPTS": JMX_PROMETHEUS_JAVA_AGENT + MIRROR_MAKER_JMX_CONFIG
+            },
+            command=json.dumps([mirror_maker_command, "/tmp/" + MIRROR_MAKER_CONFIG]),
+            cap_add=[
+                "NET_ADMIN"
+            ],
+            ports=[
+                PortMapping(base.next_agent_port(), JMX_PORT)
+            ],
+            volumes=[
+                Volume(LOCAL_VOLUMES + JMX_JAR_FILE, "/tmp/" + JMX_JAR_FILE),
+                Volume(LOCAL_VOLUMES + MIRROR_MAKER_JMX_CONFIG, "/tmp/" + MIRROR_MAKER_JMX_CONFIG),
+                Volume(LOCAL_VOLUMES + MIRROR_MAKER_CONFIG, "/tmp/" + MIRROR_MAKER_CONFIG)
+            ]
+        )
+
+        # MirrorMaker 2 runs on the Connect runtime, so it uses the Connect resource limits
+        base.add_resource_limits(mirror_maker, 'connect')
+
+        return [mirror_maker]
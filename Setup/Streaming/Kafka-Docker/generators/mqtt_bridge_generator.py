@@ -0,0 +1,82 @@
+"""
+MQTT Bridge Generator Module
+
+This module generates the optional MQTT-to-Kafka bridge service. The bridge
+(mqtt_bridge.py) subscribes to the topics of the HiveMQ sensor simulators and
+produces the messages to the cluster with a batched, compressed and
+idempotent producer, so PDI can consume a Kafka topic instead of polling MQTT.
+
+The service runs the script from the project directory in a plain Python
+image and is configured through MQTT_BRIDGE_* environment variables. When
+the MQTT broker is addressed as host.docker.internal (the default), the
+service maps that name to the Docker host, which Docker Engine on Linux
+does not do by itself.
+"""
+
+import json
+
+from .generator import Generator
+from constants import *
+from topology import Service, Volume
+
+
+class MqttBridgeGenerator(Generator):
+    """
+    Generator for the MQTT-to-Kafka bridge service.
+
+    The bridge attaches to the (primary) cluster; it is only generated with
+    --mqtt-bridge.
+    """
+
+    def __init__(self, base):
+        """
+        Initialize the MqttBridgeGenerator.
+
+        Args:
+            base: DockerComposeGenerator instance containing shared configuration
+        """
+        super().__init__(base)
+
+    def generate(self):
+        """
+        Generate the bridge service.
+
+        Returns:
+            list: List containing the bridge service definition (or empty if not enabled)
+        """
+        base = self.base
+        args = base.args
+
+        if not getattr(args, 'mqtt_bridge', False):
+            return []
+
+        mqtt_broker = getattr(args, 'mqtt_bridge_broker', MQTT_BRIDGE_BROKER)
+        environment = {
+            "MQTT_BRIDGE_MQTT_BROKER": mqtt_broker,
+            "MQTT_BRIDGE_BOOTSTRAP_SERVERS": base.bootstrap_servers,
+            "MQTT_BRIDGE_COMPRESSION": getattr(args, 'mqtt_bridge_compression', "lz4"),
+            "PYTHONUNBUFFERED": 1
+        }
+
+        # Without --mqtt-bridge-map the bridge uses its built-in mappings of the lab simulators;
+        # "$" (e.g. the "$topic" key field) is escaped from docker compose variable interpolation
+        mappings = getattr(args, 'mqtt_bridge_map', None)
+        if mappings:
+            environment["MQTT_BRIDGE_MAPPINGS"] = json.dumps(";".join(mappings).replace("$", "$$"))
+
+        install = f"pip install --quiet --no-cache-dir {MQTT_BRIDGE_PACKAGES}"
+        bridge = Service(
+            name="mqtt-bridge",
+            hostname="mqtt-bridge",
+            container_name="mqtt-bridge",
+            image=MQTT_BRIDGE_IMAGE,
+            depends_on_condition=base.generate_depends_on(),
+            environment=environment,
+            extra_hosts=[DOCKER_HOST_GATEWAY] if mqtt_broker.split(":")[0] == DOCKER_HOST_ALIAS else None,
+            command=json.dumps(["sh", "-c", f"{install} && exec python /opt/bridge/{MQTT_BRIDGE_SCRIPT}"]),
+            volumes=[
+                Volume(f"$PWD/{MQTT_BRIDGE_SCRIPT}", f"/opt/bridge/{MQTT_BRIDGE_SCRIPT}")
+            ]
+        )
+
+        return [bridge]
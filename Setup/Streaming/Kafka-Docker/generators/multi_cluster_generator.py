@@ -0,0 +1,72 @@
+"""
+Multi-Cluster Generator Module
+
+This module generates several independent Kafka clusters into a single
+docker-compose file, plus the replication services between them. It is used
+for disaster recovery and geo-replication tests (replication lag and
+throughput across clusters).
+
+Every generated cluster gets:
+- Prefixed service names (cluster1-kafka-1, cluster2-kafka-1, ...)
+- Its own KRaft cluster UUID derived from --uuid
+- Host ports that do not overlap with the other clusters
+- Prometheus jobs labelled with the cluster name
+"""
+
+from .generator import Generator
+from .cluster_link_generator import ClusterLinkGenerator
+from .mirror_maker_generator import MirrorMakerGenerator
+
+
+class MultiClusterGenerator(Generator):
+    """
+    Generator for multiple Kafka clusters and the replication between them.
+
+    The per-cluster generators all share the DockerComposeGenerator instance,
+    so the clusters are generated one after the other: the shared state is
+    reset with start_cluster() and captured with save_cluster_state().
+    """
+
+    def __init__(self, base):
+        """
+        Initialize the MultiClusterGenerator.
+
+        Args:
+            base: DockerComposeGenerator instance containing shared configuration
+        """
+        super().__init__(base)
+
+    def generate(self):
+        """
+        Generate all clusters and their replication services.
+
+        Returns:
+            list: List of Service objects for all clusters
+        """
+        base = self.base
+        services = []
+
+        # ========== Generate Each Cluster ==========
+        for index in range(1, base.args.clusters + 1):
+            base.start_cluster(index)
+            first_job = len(base.prometheus_jobs)
+
+            services += base.generate_cluster_services()
+
+            # Prometheus job names must be unique, label them with the cluster as well
+            for job in base.prometheus_jobs[first_job:]:
+                job["name"] = base.cluster_prefix + job["name"]
+                job["labels"] = {"cluster": base.cluster_name}
+
+            base.clusters.append(base.save_cluster_state())
+
+        # ========== Replication Between Clusters ==========
+        if base.args.cluster_replication == "mirror-maker":
+            services += base.run_generator(MirrorMakerGenerator(base))
+        elif base.args.cluster_replication == "cluster-link":
+            services += base.run_generator(ClusterLinkGenerator(base))
+
+        # Shared services (Control Center, ...) attach to the primary cluster
+        base.restore_cluster_state(base.clusters[0])
+
+        return services
@@ -0,0 +1,44 @@
+from .generator import Generator
+
+
+class ReplicationGenerator(Generator):
+    """
+    Common base for generators that replicate data between generated clusters.
+
+    Subclasses read the cluster snapshots collected in base.clusters
+    (see DockerComposeGenerator.save_cluster_state).
+    """
+
+    def __init__(self, base):
+        super().__init__(base)
+
+    def replication_flows(self):
+        """
+        Get the (source, target) cluster pairs to replicate.
+
+        active-passive replicates the first cluster into every other cluster,
+        active-active replicates between every ordered pair of clusters.
+
+        Returns:
+            list: List of (source, target) cluster snapshot tuples
+        """
+        clusters = self.base.clusters
+
+        if self.base.args.replication_flow == "active-active":
+            return [(source, target) for source in clusters for target in clusters if source is not target]
+
+        return [(clusters[0], target) for target in clusters[1:]]
+
+    def cluster_depends_on(self, cluster):
+        """
+        Get the containers of a cluster that must be healthy before replication starts.
+
+        Args:
+            cluster (dict): Cluster snapshot
+
+        Returns:
+            list: Broker container names (plus controllers in shared mode)
+        """
+        if self.base.args.shared_mode:
+            return cluster["controller_containers"] + cluster["broker_containers"]
+        return cluster["broker_containers"][:]
@@ -1,5 +1,6 @@
 from .generator import Generator
 from constants import *
+from topology import PortMapping, Service, Volume
 
 class SchemaRegistryGenerator(Generator):
     def __init__(self,base):
@@ -19,39 +20,36 @@ class SchemaRegistryGenerator(Generator):
         }
 
         for schema_id in range(1, base.args.schema_registries + 1):
-            port = 8080 + schema_id
+            port = 8080 + base.port_offset + schema_id
 
             name = base.create_name("schema-registry", schema_id)
 
-            schema_registry = {
-                "name": name,
-                "hostname": name,
-                "container_name": name,
-                "image": f"{base.repository}/cp-schema-registry{base.tc}:" + base.args.release,
-                "depends_on_condition": base.generate_depends_on(),
-                "environment": {
+            schema_registry = Service(
+                name=name,
+                hostname=name,
+                container_name=name,
+                image=f"{base.repository}/cp-schema-registry{base.tc}:" + base.args.release,
+                depends_on_condition=base.generate_depends_on(),
+                environment={
                     "SCHEMA_REGISTRY_HOST_NAME": name,
                     "SCHEMA_REGISTRY_KAFKASTORE_BOOTSTRAP_SERVERS": base.bootstrap_servers,
                     "SCHEMA_REGISTRY_LISTENERS": f"http://0.0.0.0:{port}",
                     "SCHEMA_REGISTRY_OPTS": JMX_PROMETHEUS_JAVA_AGENT + SCHEMA_REGISTRY_JMX_CONFIG
                 },
-                "capability": [
-                    "NET_ADMIN"
+                ports=[
+                    PortMapping(port, port)
                 ],
-                "ports": {
-                    port: port
-                },
-                "healthcheck": {
+                healthcheck={
                     "test": f"curl -fail --silent http://{name}:{port}/subjects --output /dev/null || exit 1",
                     "interval": "10s",
                     "retries": "20",
                     "start_period": "20s"
                 },
-                "volumes": [
-                    LOCAL_VOLUMES + JMX_JAR_FILE + ":/tmp/" + JMX_JAR_FILE,
-                    LOCAL_VOLUMES + SCHEMA_REGISTRY_JMX_CONFIG + ":/tmp/" + SCHEMA_REGISTRY_JMX_CONFIG
+                volumes=[
+                    Volume(LOCAL_VOLUMES + JMX_JAR_FILE, "/tmp/" + JMX_JAR_FILE),
+                    Volume(LOCAL_VOLUMES + SCHEMA_REGISTRY_JMX_CONFIG, "/tmp/" + SCHEMA_REGISTRY_JMX_CONFIG)
                 ]
-            }
+            )
 
             targets.append(f"{name}:{JMX_PORT}")
 
@@ -0,0 +1,202 @@
+"""
+Docker Swarm Generator Module
+
+This module turns the generated services into a Docker Swarm stack, so a
+cluster can be spread across several machines with `docker stack deploy`.
+
+In Swarm mode:
+- Racks (KAFKA_BROKER_RACK) are mapped to placement constraints: with
+  --swarm-hosts each rack is pinned to one host, otherwise to the nodes
+  labelled with that rack (docker node update --label-add rack=rack-0 <node>)
+- Brokers advertise the hostname of the node they run on instead of localhost
+- Ports are published in host mode, bypassing the ingress routing mesh, so a
+  client always reaches the broker it was directed to
+- All services join an attachable overlay network
+- Files bind-mounted from the local directory ($PWD/volumes/..., the
+  component configs, mqtt_bridge.py) become Swarm configs, which Swarm
+  copies to whichever node a task is scheduled on. Directories
+  (connect-plugin-jars, Grafana dashboards) and jar files (the JMX agent
+  exceeds the 500 KB limit of a config) stay bind mounts; validate_swarm()
+  warns that they must exist on every node
+- Options Swarm ignores (container_name, depends_on) are dropped
+"""
+
+import os
+
+from topology import ConfigMount
+from .generator import Generator
+
+# Prefix of bind mounts from the directory the stack is deployed from
+LOCAL_PATH_PREFIX = "$PWD/"
+# Files kept as bind mounts: Swarm configs hold at most 500 KB
+BIND_MOUNTED_EXTENSIONS = (".jar",)
+
+
+class SwarmGenerator(Generator):
+    """
+    Generator adding Swarm deploy and network sections to generated services.
+
+    Unlike the component generators it does not create services; apply()
+    adapts the complete service list before it is rendered.
+    """
+
+    def __init__(self, base):
+        """
+        Initialize the SwarmGenerator.
+
+        Args:
+            base: DockerComposeGenerator instance containing shared configuration
+        """
+        super().__init__(base)
+        # Config name -> {"file": source path}, filled by apply()
+        self.config_definitions = {}
+
+    def apply(self, services):
+        """
+        Add Swarm deploy settings and the overlay network to every service,
+        and turn its local file mounts into configs.
+
+        Args:
+            services (list): Service objects produced by the generators
+
+        Returns:
+            list: The same services, adapted for Swarm
+        """
+        network = self.base.args.overlay_network
+
+        for service in services:
+            # ========== Unsupported Options ==========
+            # Swarm schedules tasks itself and names containers <stack>_<service>.<n>.<id>
+            service.container_name = None
+            service.depends_on = None
+            service.depends_on_condition = None
+
+            service.networks = [network]
+
+            # ========== Deploy Section ==========
+            # Keep resource limits that add_resource_limits() may already have set
+            if service.deploy is None:
+                service.deploy = {}
+            deploy = service.deploy
+            deploy["replicas"] = 1
+            deploy["restart_policy"] = {"condition": "on-failure"}
+
+            # ========== Local Files ==========
+            self.convert_local_files(service)
+
+            # ========== Rack Placement ==========
+            rack = (service.environment or {}).get("KAFKA_BROKER_RACK")
+            if rack is not None:
+                deploy["placement"] = {"constraints": [self.placement_constraint(rack)]}
+
+        return services
+
+    def convert_local_files(self, service):
+        """
+        Replace the bind mounts of local files by Swarm configs.
+
+        A bind mount only works on the node that has the file, while a
+        config is distributed by the Swarm managers (up to 500 KB each).
+        Mounts of directories and jar files are left unchanged.
+
+        Args:
+            service (Service): Service to adapt
+        """
+        if not service.volumes:
+            return
+
+        volumes = []
+        for volume in service.volumes:
+            if not self.is_local_file(volume.source):
+                volumes.append(volume)
+                continue
+            if service.configs is None:
+                service.configs = []
+            service.configs.append(ConfigMount(self.config_name(volume.source), volume.target))
+
+        service.volumes = volumes or None
+
+    @staticmethod
+    def is_local_file(source):
+        """
+        Check whether a volume source is a file in the local directory.
+
+        Generated files (prometheus.yml, mm2.properties) may not exist yet,
+        so files are told from directories by their extension. Jar files
+        (BIND_MOUNTED_EXTENSIONS) are too large for a config and do not count.
+
+        Args:
+            source (str): Volume source
+
+        Returns:
+            bool: True for "$PWD/volumes/kafka_config.yml", False for
+                  named volumes, directories and jar files
+        """
+        extension = os.path.splitext(source)[1]
+        return source.startswith(LOCAL_PATH_PREFIX) and bool(extension) and \
+            extension not in BIND_MOUNTED_EXTENSIONS
+
+    def config_name(self, source):
+        """
+        Get the config name for a local file, defining the config on first use.
+
+        Args:
+            source (str): Local file path (e.g., "$PWD/volumes/kafka_config.yml")
+
+        Returns:
+            str: Config name, the file name unless another file already uses it
+        """
+        for name, definition in self.config_definitions.items():
+            if definition["file"] == source:
+                return name
+
+        name = os.path.basename(source)
+        stem, extension = os.path.splitext(name)
+        number = 2
+        while name in self.config_definitions:
+            name = f"{stem}-{number}{extension}"
+            number += 1
+
+        self.config_definitions[name] = {"file": source}
+        return name
+
+    def configs(self):
+        """
+        Get the top-level config definitions of the stack.
+
+        Returns:
+            dict: Config name -> definition, None if no file was converted
+        """
+        return self.config_definitions or None
+
+    def placement_constraint(self, rack):
+        """
+        Get the placement constraint for a rack.
+
+        Args:
+            rack (str): Rack label (e.g., "rack-1")
+
+        Returns:
+            str: Swarm placement constraint
+        """
+        hosts = self.base.swarm_hosts()
+        if hosts:
+            rack_index = int(rack.rsplit("-", 1)[1])
+            return f"node.hostname == {hosts[rack_index % len(hosts)]}"
+
+        return f"node.labels.rack == {rack}"
+
+    def networks(self):
+        """
+        Get the top-level network definitions of the stack.
+
+        Returns:
+            dict: Overlay network definition, attachable so that test clients
+                  can be started with docker run --network
+        """
+        return {
+            self.base.args.overlay_network: {
+                "driver": "overlay",
+                "attachable": "true"
+            }
+        }
@@ -1,5 +1,6 @@
 from .generator import Generator
 from constants import *
+from topology import PortMapping, Service, Volume
 
 import sys
 
@@ -42,20 +43,20 @@ class ZooKeeperGenerator(Generator):
         }
 
         for zk in range(1, base.args.zookeepers + 1):
-            zookeeper_external_port = 2180 + zk
-
-            zookeeper = {}
+            zookeeper_external_port = 2180 + base.port_offset + zk
 
             name = base.create_name("zookeeper", zk)
-            zookeeper["name"] = name
-            zookeeper["hostname"] = name
-            zookeeper["container_name"] = name
 
             targets.append(f"{name}:{JMX_PORT}")
 
             zookeeper_servers.append(name + ":2888:3888")
 
-            zookeeper["image"] = f"{base.repository}/cp-zookeeper{base.tc}:" + base.args.release
+            zookeeper = Service(
+                name=name,
+                hostname=name,
+                container_name=name,
+                image=f"{base.repository}/cp-zookeeper{base.tc}:" + base.args.release
+            )
 
             jmx_port = base.next_jmx_external_port()
 
@@ -71,33 +72,33 @@ class ZooKeeperGenerator(Generator):
             if base.args.zookeeper_groups > 1:
                 environment["ZOOKEEPER_GROUPS"] = zookeeper_groups
 
-            zookeeper["environment"] = environment
+            zookeeper.environment = environment
 
-            zookeeper["volumes"] = [
-                LOCAL_VOLUMES + JMX_JAR_FILE + ":/tmp/" + JMX_JAR_FILE,
-                LOCAL_VOLUMES + ZOOKEEPER_JMX_CONFIG + ":/tmp/" + ZOOKEEPER_JMX_CONFIG,
-                LOCAL_VOLUMES + "jline-2.14.6.jar" + ":/usr/share/java/kafka/jline-2.14.6.jar"
+            zookeeper.volumes = [
+                Volume(LOCAL_VOLUMES + JMX_JAR_FILE, "/tmp/" + JMX_JAR_FILE),
+                Volume(LOCAL_VOLUMES + ZOOKEEPER_JMX_CONFIG, "/tmp/" + ZOOKEEPER_JMX_CONFIG),
+                Volume(LOCAL_VOLUMES + "jline-2.14.6.jar", "/usr/share/java/kafka/jline-2.14.6.jar")
             ]
 
-            zookeeper["cap_add"] = [
+            zookeeper.cap_add = [
                 "NET_ADMIN"
             ]
 
-            zookeeper["ports"] = {
-                zookeeper_external_port: ZOOKEEPER_PORT,
-                jmx_port: jmx_port,
-                base.next_agent_port(): JMX_PORT
-            }
+            zookeeper.ports = [
+                PortMapping(zookeeper_external_port, ZOOKEEPER_PORT),
+                PortMapping(jmx_port, jmx_port),
+                PortMapping(base.next_agent_port(), JMX_PORT)
+            ]
 
             zookeepers.append(zookeeper)
 
         zk_servers = ";".join(zookeeper_servers)
         for zk in zookeepers:
-            zk["environment"]["ZOOKEEPER_SERVERS"] = zk_servers
+            zk.environment["ZOOKEEPER_SERVERS"] = zk_servers
 
-        base.zookeepers = ",".join([z["name"] + ":" + ZOOKEEPER_PORT for z in zookeepers])
+        base.zookeepers = ",".join([z.name + ":" + ZOOKEEPER_PORT for z in zookeepers])
 
-        base.zookeeper_containers = [z["name"] for z in zookeepers]
+        base.zookeeper_containers = [z.name for z in zookeepers]
 
         if base.args.zookeepers > 0:
             base.prometheus_jobs.append(job)
@@ -15,7 +15,10 @@ Example:
 """
 
 import argparse
+import base64
+import os
 import sys
+import uuid
 
 import configparser
 
@@ -28,6 +31,9 @@ from generators.control_center_generator import ControlCenterGenerator
 from generators.control_center_next_gen_generator import ControlCenterNextGenerationGenerator
 from generators.controller_generator import ControllerGenerator
 from generators.ksqldb_generator import KSQLDBGenerator
+from generators.mqtt_bridge_generator import MqttBridgeGenerator
+from generators.multi_cluster_generator import MultiClusterGenerator
+from generators.swarm_generator import SwarmGenerator
 from generators.schema_registry_generator import SchemaRegistryGenerator
 from generators.zookeeper_generator import ZooKeeperGenerator
 
@@ -35,7 +41,8 @@ from generators.zookeeper_generator import ZooKeeperGenerator
 from constants import *
 
 # Import logging and validation modules
-from logger import setup_logging, get_logger
+from logger import setup_logging, get_logger, span, format_timing_summary, timings
+from topology import PortMapping, Service, Topology, Volume, diff_topologies
 from validator import validate_configuration, ValidationError, ValidationWarning
 
 class Generator:
@@ -89,7 +96,25 @@ class DockerComposeGenerator:
         controller_node_id: Counter for controller node IDs
         internal_port: Counter for internal broker ports
         external_port: Counter for external broker ports
+        cluster_index: Index of the cluster currently being generated (1-based)
+        cluster_prefix: Service name prefix of the current cluster ("" in single-cluster mode)
+        cluster_uuid: KRaft cluster UUID of the current cluster
+        port_offset: Offset applied to fixed service ports of the current cluster
+        clusters: Snapshots of all generated clusters (multi-cluster mode only)
+        replication_configs: Replication config files to render (template, output file, variables)
     """
+
+    # Attributes describing a single cluster. They are reset by start_cluster() and
+    # captured by save_cluster_state() so several clusters can share one generator.
+    CLUSTER_STATE_ATTRIBUTES = (
+        "cluster_index", "cluster_prefix", "cluster_uuid", "port_offset",
+        "zookeepers", "quorum_voters", "bootstrap_servers", "schema_registries",
+        "schema_registry_urls", "connect_urls", "ksqldb_urls", "controllers",
+        "controller_containers", "zookeeper_containers", "broker_containers",
+        "connect_containers", "schema_registry_containers", "ksqldb_containers",
+        "node_id", "controller_node_id",
+    )
+
     def __init__(self, arguments):
         """
         Initialize the DockerComposeGenerator with command-line arguments.
@@ -164,6 +189,150 @@ class DockerComposeGenerator:
         # Get resource profile
         self.resource_profile = self._get_resource_profile()
 
+        # Initialize multi-cluster state
+        # A single cluster keeps unprefixed names ("kafka-1") and the configured UUID
+        self.cluster_index = 1
+        self.cluster_prefix = ""
+        self.cluster_uuid = self.args.uuid
+        self.port_offset = 0
+        self.clusters = []
+
+        # Replication config files registered by the replication generators
+        self.replication_configs = []
+
+    @property
+    def cluster_name(self):
+        """
+        Get the name of the cluster currently being generated.
+
+        Returns:
+            str: Cluster name (e.g., "cluster1")
+        """
+        return f"{CLUSTER_NAME_PREFIX}{self.cluster_index}"
+
+    def start_cluster(self, index):
+        """
+        Reset the per-cluster state before generating another cluster.
+
+        Port counters are deliberately NOT reset, so brokers, controllers and JMX
+        exporters of different clusters never share a host port. Node IDs restart
+        because every cluster has its own KRaft quorum.
+
+        Args:
+            index (int): 1-based index of the cluster to generate
+        """
+        self.cluster_index = index
+        self.cluster_prefix = f"{CLUSTER_NAME_PREFIX}{index}-"
+        self.cluster_uuid = self.derive_cluster_uuid(self.args.uuid, index)
+        self.port_offset = (index - 1) * CLUSTER_PORT_OFFSET
+
+        self.zookeepers = ""
+        self.quorum_voters = ""
+        self.bootstrap_servers = ""
+        self.schema_registries = ""
+        self.schema_registry_urls = ""
+        self.connect_urls = ""
+        self.ksqldb_urls = ""
+
+        self.controllers = []
+        self.controller_containers = []
+        self.zookeeper_containers = []
+        self.broker_containers = []
+        self.connect_containers = []
+        self.schema_registry_containers = []
+        self.ksqldb_containers = []
+
+        self.node_id = 0
+        self.controller_node_id = 1000
+
+    def save_cluster_state(self):
+        """
+        Capture the state of the cluster that was just generated.
+
+        Returns:
+            dict: Cluster attributes (see CLUSTER_STATE_ATTRIBUTES) plus its "name"
+        """
+        state = {attribute: getattr(self, attribute) for attribute in self.CLUSTER_STATE_ATTRIBUTES}
+        state["name"] = self.cluster_name
+        return state
+
+    def restore_cluster_state(self, state):
+        """
+        Make a previously generated cluster the current one again.
+
+        Args:
+            state (dict): Snapshot returned by save_cluster_state()
+        """
+        for attribute in self.CLUSTER_STATE_ATTRIBUTES:
+            setattr(self, attribute, state[attribute])
+
+    @staticmethod
+    def derive_cluster_uuid(base_uuid, index):
+        """
+        Derive a stable KRaft cluster UUID for an additional cluster.
+
+        The first cluster keeps the configured UUID. Further clusters get a
+        deterministic UUID (22 characters, URL-safe base64 of 16 bytes, the
+        format expected by kafka-storage) so regenerating the file does not
+        change cluster identities.
+
+        Args:
+            base_uuid (str): UUID passed with --uuid
+            index (int): 1-based cluster index
+
+        Returns:
+            str: Cluster UUID
+        """
+        if index <= 1:
+            return base_uuid
+        digest = uuid.uuid5(uuid.NAMESPACE_OID, f"{base_uuid}/{index}").bytes
+        return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+    def cluster_prefixes(self):
+        """
+        Get the service name prefixes of all generated clusters.
+
+        Returns:
+            list: [""] in single-cluster mode, otherwise ["cluster1-", "cluster2-", ...]
+        """
+        if self.args.clusters <= 1:
+            return [""]
+        return [f"{CLUSTER_NAME_PREFIX}{index}-" for index in range(1, self.args.clusters + 1)]
+
+    def swarm_hosts(self):
+        """
+        Get the hostnames given with --swarm-hosts.
+
+        Returns:
+            list: Hostnames (one per rack, assigned round-robin), or an empty list
+        """
+        if not self.args.swarm_hosts:
+            return []
+        return [host.strip() for host in self.args.swarm_hosts.split(",") if host.strip()]
+
+    def advertised_host(self, rack):
+        """
+        Get the hostname a broker advertises on its EXTERNAL listener.
+
+        Single-host deployments advertise localhost. In Swarm mode brokers
+        advertise the host their rack is pinned to, or the hostname of the
+        node the task is scheduled on when no hosts are given.
+
+        Args:
+            rack (int): Rack ID of the broker or controller
+
+        Returns:
+            str: Hostname for KAFKA_ADVERTISED_LISTENERS
+        """
+        if not self.args.swarm:
+            return "localhost"
+
+        hosts = self.swarm_hosts()
+        if hosts:
+            return hosts[rack % len(hosts)]
+
+        return SWARM_NODE_HOSTNAME
+
     def next_jmx_external_port(self):
         """
         Get the next available JMX external port number.
@@ -260,7 +429,7 @@ class DockerComposeGenerator:
         Add resource limits to a service configuration.
 
         Args:
-            service (dict): Service configuration dictionary
+            service (Service): Service configuration
             component_type (str): Type of component (broker, controller, zookeeper, etc.)
 
         Returns:
@@ -275,7 +444,7 @@ class DockerComposeGenerator:
 
         if memory_key in self.resource_profile:
             # Add deploy section for resource limits
-            service["deploy"] = {
+            service.deploy = {
                 "resources": {
                     "limits": {
                         "memory": self.resource_profile[memory_key]
@@ -288,16 +457,16 @@ class DockerComposeGenerator:
 
             # Add CPU limits if available
             if cpu_key in self.resource_profile:
-                service["deploy"]["resources"]["limits"]["cpus"] = self.resource_profile[cpu_key]
+                service.deploy["resources"]["limits"]["cpus"] = self.resource_profile[cpu_key]
                 # Reserve 50% of CPU limit
                 cpu_reservation = float(self.resource_profile[cpu_key]) * 0.5
-                service["deploy"]["resources"]["reservations"]["cpus"] = str(cpu_reservation)
+                service.deploy["resources"]["reservations"]["cpus"] = str(cpu_reservation)
 
             # Add heap size to environment if applicable
-            if heap_key in self.resource_profile and "environment" in service:
+            if heap_key in self.resource_profile and service.environment is not None:
                 heap_size = self.resource_profile[heap_key]
-                if "KAFKA_HEAP_OPTS" not in service["environment"]:
-                    service["environment"]["KAFKA_HEAP_OPTS"] = f"-Xmx{heap_size} -Xms{heap_size}"
+                if "KAFKA_HEAP_OPTS" not in service.environment:
+                    service.environment["KAFKA_HEAP_OPTS"] = f"-Xmx{heap_size} -Xms{heap_size}"
 
         return service
 
@@ -307,8 +476,10 @@ class DockerComposeGenerator:
 
         This is the main entry point that orchestrates the generation process.
         """
-        self.generate_services()
-        self.generate_prometheus()
+        with span("generate"):
+            self.generate_services()
+            self.generate_prometheus()
+            self.generate_replication_configs()
 
     def replication_factor(self):
         """
@@ -337,62 +508,147 @@ class DockerComposeGenerator:
         """
         return max(1, self.replication_factor() - 1)
 
-    def generate_services(self):
+    def generate_cluster_services(self):
         """
-        Generate all Kafka-related services and create the docker-compose.yml file.
+        Generate the services that make up one Kafka cluster.
 
-        This method orchestrates the creation of all service configurations by:
-        1. Instantiating all component generators
-        2. Collecting service definitions from each generator
-        3. Adding monitoring services (Prometheus, Grafana, AlertManager)
-        4. Rendering the Jinja2 template with all services
-        5. Writing the final docker-compose.yml file
+        This covers ZooKeeper or controllers, brokers, Schema Registry, Connect
+        and ksqlDB. In multi-cluster mode it is called once per cluster.
+
+        Returns:
+            list: List of Service objects for the current cluster
         """
         services = []
 
-        # Instantiate all component generators
+        # Instantiate the per-cluster component generators
         zookeeper_generator = ZooKeeperGenerator(self)
         controller_generator = ControllerGenerator(self)
         broker_generator = BrokerGenerator(self)
         schema_registry_generator = SchemaRegistryGenerator(self)
         connect_generator = ConnectGenerator(self)
         ksqldb_generator = KSQLDBGenerator(self)
-        control_center_generator = ControlCenterGenerator(self)
-        control_center_next_gen_generator = ControlCenterNextGenerationGenerator(self)
 
         # Generate service configurations from each generator
         # Note: Each generator returns an empty list if the component is not requested
-        services += zookeeper_generator.generate()
-        services += controller_generator.generate()
-        services += broker_generator.generate()
-        services += schema_registry_generator.generate()
-        services += connect_generator.generate()
-        services += ksqldb_generator.generate()
-        services += control_center_generator.generate()
-        services += control_center_next_gen_generator.generate()
+        services += self.run_generator(zookeeper_generator)
+        services += self.run_generator(controller_generator)
+        services += self.run_generator(broker_generator)
+        services += self.run_generator(schema_registry_generator)
+        services += self.run_generator(connect_generator)
+        services += self.run_generator(ksqldb_generator)
+
+        return services
+
+    def run_generator(self, generator):
+        """
+        Run a component generator inside a timing span.
+
+        The span is named after the generator class (e.g. "generate.BrokerGenerator"),
+        so the timing summary shows which components dominate generation time.
+
+        Args:
+            generator (Generator): Component generator to run
+
+        Returns:
+            list: Service objects returned by the generator
+        """
+        with span("generate." + type(generator).__name__, cluster=self.cluster_name) as fields:
+            services = generator.generate()
+            fields["services"] = len(services)
+        return services
+
+    def collect_services(self):
+        """
+        Collect the service definitions of the complete deployment.
+
+        Returns:
+            list: List of all Service objects, in docker-compose order
+        """
+        services = []
+
+        # Kafka clusters (several clusters plus replication services in multi-cluster mode)
+        if self.args.clusters > 1:
+            services += MultiClusterGenerator(self).generate()
+        else:
+            services += self.generate_cluster_services()
+
+        # Control Center is shared and attaches to the (primary) cluster
+        services += self.run_generator(ControlCenterGenerator(self))
+        services += self.run_generator(ControlCenterNextGenerationGenerator(self))
+
+        # The MQTT bridge feeds the sensor simulators into the (primary) cluster
+        services += self.run_generator(MqttBridgeGenerator(self))
 
         # Add monitoring and management services
         services += self.generate_prometheus_service()
         services += self.generate_grafana_service()
         services += self.generate_alertmanager_service()
 
+        return services
+
+    def build_topology(self):
+        """
+        Build the typed topology of the complete deployment.
+
+        This method orchestrates the creation of all service configurations by:
+        1. Collecting service definitions from each generator (collect_services)
+        2. Adding Docker volumes if persistence is enabled
+        3. Adding Swarm deploy sections, the overlay network and configs in Swarm mode
+        4. Checking that every depends_on reference names a generated service
+
+        Returns:
+            Topology: Services, volumes, networks and configs of the deployment
+
+        Raises:
+            ValueError: If a service depends on a service that was not generated
+        """
+        with span("collect_services"):
+            services = self.collect_services()
+
         # Generate Docker volumes if persistence is enabled
         volumes = self.generate_volumes() if self.args.persistent_volumes else None
 
-        # Prepare template variables
-        variables = {
-            "docker_compose_version": "3.8",
-            "services": services,
-            "volumes": volumes
-        }
+        # Adapt the services for a multi-host Swarm deployment
+        networks = configs = None
+        if self.args.swarm:
+            swarm_generator = SwarmGenerator(self)
+            services = swarm_generator.apply(services)
+            networks = swarm_generator.networks()
+            configs = swarm_generator.configs()
+
+        topology = Topology(services, volumes, networks, self.args.swarm, configs)
+        with span("resolve_dependencies", services=len(services)):
+            topology.resolve_dependencies()
+        return topology
+
+    def render_compose(self):
+        """
+        Render the docker-compose file content.
 
-        # Render the docker-compose template
-        template = self.env.get_template('docker-compose.j2')
-        result = template.render(variables)
+        Returns:
+            str: Rendered docker-compose YAML
+        """
+        topology = self.build_topology()
+
+        with span("render.docker-compose", services=len(topology.services)):
+            return topology.to_compose_yaml()
+
+    def generate_services(self):
+        """
+        Generate all Kafka-related services and create the docker-compose.yml file.
+
+        The topology is streamed into the file service by service
+        (Topology.write_compose_yaml) instead of being rendered into one
+        string first.
+        """
+        topology = self.build_topology()
 
         # Write the generated docker-compose.yml file
-        with open(self.args.docker_compose_file, "w") as yaml_file:
-            yaml_file.write(result)
+        with span("render.docker-compose", file=self.args.docker_compose_file,
+                  services=len(topology.services)) as fields:
+            with open(self.args.docker_compose_file, "w") as yaml_file:
+                topology.write_compose_yaml(yaml_file)
+                fields["bytes"] = yaml_file.tell()
 
     def generate_volumes(self):
         """
@@ -403,20 +659,22 @@ class DockerComposeGenerator:
         """
         volumes = {}
 
-        # Create volumes for each broker
-        for broker_id in range(1, self.args.brokers + 1):
-            volumes[f"kafka-{broker_id}-data"] = {"driver": self.args.volume_driver}
-            volumes[f"kafka-{broker_id}-logs"] = {"driver": self.args.volume_driver}
+        # Volumes are created per cluster (a single empty prefix in single-cluster mode)
+        for prefix in self.cluster_prefixes():
+            # Create volumes for each broker
+            for broker_id in range(1, self.args.brokers + 1):
+                volumes[f"{prefix}kafka-{broker_id}-data"] = {"driver": self.args.volume_driver}
+                volumes[f"{prefix}kafka-{broker_id}-logs"] = {"driver": self.args.volume_driver}
 
-        # Create volumes for each controller (KRaft mode)
-        for controller_id in range(1, self.args.controllers + 1):
-            volumes[f"controller-{controller_id}-data"] = {"driver": self.args.volume_driver}
-            volumes[f"controller-{controller_id}-logs"] = {"driver": self.args.volume_driver}
+            # Create volumes for each controller (KRaft mode)
+            for controller_id in range(1, self.args.controllers + 1):
+                volumes[f"{prefix}controller-{controller_id}-data"] = {"driver": self.args.volume_driver}
+                volumes[f"{prefix}controller-{controller_id}-logs"] = {"driver": self.args.volume_driver}
 
-        # Create volumes for each ZooKeeper
-        for zk_id in range(1, self.args.zookeepers + 1):
-            volumes[f"zookeeper-{zk_id}-data"] = {"driver": self.args.volume_driver}
-            volumes[f"zookeeper-{zk_id}-logs"] = {"driver": self.args.volume_driver}
+            # Create volumes for each ZooKeeper
+            for zk_id in range(1, self.args.zookeepers + 1):
+                volumes[f"{prefix}zookeeper-{zk_id}-data"] = {"driver": self.args.volume_driver}
+                volumes[f"{prefix}zookeeper-{zk_id}-logs"] = {"driver": self.args.volume_driver}
 
         # Prometheus and Grafana data
         if self.args.prometheus:
@@ -438,25 +696,45 @@ class DockerComposeGenerator:
         variables = {
             "jobs": self.prometheus_jobs
         }
-        result = template.render(variables)
+        with span("render.prometheus", jobs=len(self.prometheus_jobs)):
+            result = template.render(variables)
 
         # Write the Prometheus configuration file
-        with open('volumes/prometheus.yml', "w") as yaml_file:
-            yaml_file.write(result)
+        with span("write", file='volumes/prometheus.yml', bytes=len(result)):
+            with open('volumes/prometheus.yml', "w") as yaml_file:
+                yaml_file.write(result)
 
-    @staticmethod
-    def create_name(basename, counter):
+    def generate_replication_configs(self):
+        """
+        Generate the configuration files used by cross-cluster replication.
+
+        The MirrorMaker 2 and Cluster Linking generators register the files
+        they need in replication_configs; nothing is written in single-cluster mode.
+        """
+        for template_name, output_file, variables in self.replication_configs:
+            with span("render." + template_name.rsplit(".", 1)[0]):
+                template = self.env.get_template(template_name)
+                result = template.render(variables)
+
+            with span("write", file=output_file, bytes=len(result)):
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+                with open(output_file, "w") as config_file:
+                    config_file.write(result)
+
+    def create_name(self, basename, counter):
         """
         Create a service name by combining a base name with a counter.
 
+        In multi-cluster mode the name is prefixed with the current cluster.
+
         Args:
             basename (str): Base name for the service (e.g., "kafka", "controller")
             counter (int): Numeric suffix for the service
 
         Returns:
-            str: Formatted service name (e.g., "kafka-1", "controller-2")
+            str: Formatted service name (e.g., "kafka-1", "cluster2-controller-2")
         """
-        return f"{basename}-{counter}"
+        return f"{self.cluster_prefix}{basename}-{counter}"
 
     def generate_depends_on(self):
         """
@@ -488,25 +766,25 @@ class DockerComposeGenerator:
         if self.args.prometheus:
             volumes = [
                 # Mount the generated Prometheus configuration
-                "$PWD/volumes/prometheus.yml:/etc/confluent-control-center/prometheus-generated.yml",
+                Volume("$PWD/volumes/prometheus.yml", "/etc/confluent-control-center/prometheus-generated.yml"),
                 # Mount volumes directory for persistent data
-                "$PWD/volumes/"
+                Volume("", "$PWD/volumes/")
             ]
 
             # Add persistent volume for Prometheus data if enabled
             if self.args.persistent_volumes:
-                volumes.append("prometheus-data:/prometheus")
-
-            prometheus = {
-                "name": "prometheus",
-                "hostname": "prometheus",
-                "container_name": "prometheus",
-                "image": "confluentinc/cp-enterprise-prometheus:" + self.args.control_center_next_gen_release,
-                "ports": {
-                    9090: 9090  # Prometheus web UI and API port
-                },
-                "volumes": volumes
-            }
+                volumes.append(Volume("prometheus-data", "/prometheus"))
+
+            prometheus = Service(
+                name="prometheus",
+                hostname="prometheus",
+                container_name="prometheus",
+                image="confluentinc/cp-enterprise-prometheus:" + self.args.control_center_next_gen_release,
+                ports=[
+                    PortMapping(9090, 9090)  # Prometheus web UI and API port
+                ],
+                volumes=volumes
+            )
             proms.append(prometheus)
 
         return proms
@@ -525,33 +803,33 @@ class DockerComposeGenerator:
         if self.args.prometheus:
             volumes = [
                 # Mount Grafana provisioning configuration (data sources, dashboards)
-                "$PWD/volumes/provisioning:/etc/grafana/provisioning",
+                Volume("$PWD/volumes/provisioning", "/etc/grafana/provisioning"),
                 # Mount dashboard JSON files
-                "$PWD/volumes/dashboards:/var/lib/grafana/dashboards",
+                Volume("$PWD/volumes/dashboards", "/var/lib/grafana/dashboards"),
                 # Mount Grafana configuration file
-                "$PWD/volumes/config.ini:/etc/grafana/config.ini"
+                Volume("$PWD/volumes/config.ini", "/etc/grafana/config.ini")
             ]
 
             # Add persistent volume for Grafana data if enabled
             if self.args.persistent_volumes:
-                volumes.append("grafana-data:/var/lib/grafana")
-
-            grafana = {
-                "name": "grafana",
-                "hostname": "grafana",
-                "container_name": "grafana",
-                "image": "grafana/grafana",
-                "depends_on": [
+                volumes.append(Volume("grafana-data", "/var/lib/grafana"))
+
+            grafana = Service(
+                name="grafana",
+                hostname="grafana",
+                container_name="grafana",
+                image="grafana/grafana",
+                depends_on=[
                     "prometheus"  # Grafana needs Prometheus as a data source
                 ],
-                "ports": {
-                    3000: 3000  # Grafana web UI port
-                },
-                "volumes": volumes,
-                "environment": {
+                ports=[
+                    PortMapping(3000, 3000)  # Grafana web UI port
+                ],
+                volumes=volumes,
+                environment={
                     "GF_PATHS_CONFIG": "/etc/grafana/config.ini"
                 }
-            }
+            )
             grafanas.append(grafana)
 
         return grafanas
@@ -569,22 +847,22 @@ class DockerComposeGenerator:
         """
         alertmanagers = []
         if self.args.control_center_next_gen:
-            alertmanager = {
-                "name": "alertmanager",
-                "hostname": "cp-enterprise-alertmanager",
-                "container_name": "alertmanager",
-                "image": f"{self.args.repository}/cp-enterprise-alertmanager:" + self.args.control_center_next_gen_release,
-                "depends_on": [
+            alertmanager = Service(
+                name="alertmanager",
+                hostname="cp-enterprise-alertmanager",
+                container_name="alertmanager",
+                image=f"{self.args.repository}/cp-enterprise-alertmanager:" + self.args.control_center_next_gen_release,
+                depends_on=[
                     "prometheus"  # AlertManager receives alerts from Prometheus
                 ],
-                "ports" : {
-                    29093 : 9093  # AlertManager web UI and API port
-                },
-                "volumes": {
+                ports=[
+                    PortMapping(29093, 9093)  # AlertManager web UI and API port
+                ],
+                volumes=[
                     # Mount configuration directory for alert routing rules
-                    LOCAL_VOLUMES + "config:/mnt/config"
-                }
-            }
+                    Volume(LOCAL_VOLUMES + "config", "/mnt/config")
+                ]
+            )
             alertmanagers.append(alertmanager)
 
         return alertmanagers
@@ -705,16 +983,49 @@ if __name__ == '__main__':
     parser.add_argument('-p', '--prometheus', default=False, action='store_true',
                         help="Include Prometheus and Grafana for metrics monitoring [default: False]")
 
+    # ========== MQTT Bridge ==========
+
+    parser.add_argument('--mqtt-bridge', default=False, action='store_true',
+                        help="Include the MQTT-to-Kafka bridge for the streaming lab sensors [default: False]")
+    parser.add_argument('--mqtt-bridge-broker', default=MQTT_BRIDGE_BROKER,
+                        help=f"MQTT broker host:port as seen from the bridge container [{MQTT_BRIDGE_BROKER}]")
+    parser.add_argument('--mqtt-bridge-map', action='append', metavar='MQTT_FILTER=KAFKA_TOPIC[:KEY_FIELD]',
+                        help="Topic mapping, repeatable (e.g. 'industrial_robot/#=robot-data:robot_id') "
+                             "[default: the lab simulator topics]")
+    parser.add_argument('--mqtt-bridge-compression', choices=['none', 'gzip', 'snappy', 'lz4', 'zstd'],
+                        default='lz4', help="Compression of the bridge's Kafka batches [default: lz4]")
+
     # ========== Cluster Configuration Options ==========
 
     parser.add_argument('--uuid', type=str, default=RANDOM_UUID,
                         help=f"Cluster UUID for KRaft mode [{RANDOM_UUID}]")
 
+    parser.add_argument('--clusters', type=int, default=1,
+                        help="Number of independent Kafka clusters to generate [default: 1]")
+    parser.add_argument('--cluster-replication', choices=['none', 'mirror-maker', 'cluster-link'],
+                        default='none',
+                        help="Replication between clusters: MirrorMaker 2 or Confluent Cluster Linking [default: none]")
+    parser.add_argument('--replication-flow', choices=['active-passive', 'active-active'],
+                        default='active-passive',
+                        help="Replicate from the first cluster to all others, or between every pair "
+                             "[default: active-passive]")
+
     parser.add_argument('--racks', type=int, default=1,
                         help="Number of racks for broker distribution (rack awareness) [default: 1]")
     parser.add_argument('--zookeeper-groups', type=int, default=1,
                         help="Number of ZooKeeper groups in hierarchical setup [default: 1]")
 
+    # ========== Multi-Host Deployment ==========
+
+    parser.add_argument('--swarm', default=False, action='store_true',
+                        help="Generate a Docker Swarm stack (docker stack deploy) spreading brokers across hosts "
+                             "[default: False]")
+    parser.add_argument('--swarm-hosts', type=str,
+                        help="Comma-separated Swarm hostnames, one per rack (round-robin). Without it, racks are "
+                             "placed on nodes labelled rack=rack-N")
+    parser.add_argument('--overlay-network', default=SWARM_OVERLAY_NETWORK,
+                        help=f"Name of the Swarm overlay network [{SWARM_OVERLAY_NETWORK}]")
+
     # ========== Output Configuration ==========
 
     parser.add_argument('--docker-compose-file', default=DOCKER_COMPOSE_FILE,
@@ -723,6 +1034,10 @@ if __name__ == '__main__':
     parser.add_argument('--config',
                         help="Path to properties config file (command-line arguments override config file values)")
 
+    parser.add_argument('--diff', metavar='COMPOSE_FILE',
+                        help="Compare the configuration with an existing generated compose file instead of writing "
+                             "files; exits with status 1 if services would change")
+
     # ========== Data Persistence Options ==========
 
     parser.add_argument('--persistent-volumes', default=False, action='store_true',
@@ -748,6 +1063,11 @@ if __name__ == '__main__':
                         help="Write logs to specified file")
     parser.add_argument('--no-color', default=False, action='store_true',
                         help="Disable colored log output")
+    parser.add_argument('--log-format', choices=['text', 'json'], default='text',
+                        help="Console log format; json writes one JSON object per line for batch pipelines "
+                             "[default: text]")
+    parser.add_argument('--timings', default=False, action='store_true',
+                        help="Log a summary of where generation time was spent [default: False]")
 
     # Parse command-line arguments
     args = parser.parse_args()
@@ -756,7 +1076,8 @@ if __name__ == '__main__':
     logger = setup_logging(
         verbose=args.verbose,
         log_file=args.log_file,
-        color=not args.no_color
+        color=not args.no_color,
+        json_format=args.log_format == 'json'
     )
 
     # ========== Apply OSK (Open Source Kafka) Configuration ==========
@@ -799,12 +1120,19 @@ if __name__ == '__main__':
         logger.error("Choose either --control-center OR --control-center-next-gen")
         validation_failed = True
 
+    # Next-gen Control Center reads its metrics from the Prometheus service
+    if args.control_center_next_gen and not args.prometheus:
+        logger.error("Next-gen Control Center requires Prometheus")
+        logger.error("Add -p/--prometheus to --control-center-next-gen")
+        validation_failed = True
+
     if validation_failed:
         sys.exit(2)
 
     # Advanced validation
     try:
-        errors, warnings = validate_configuration(args)
+        with span("validate"):
+            errors, warnings = validate_configuration(args)
 
         # Display warnings
         if warnings:
@@ -839,6 +1167,8 @@ if __name__ == '__main__':
     logger.info("Kafka Docker Composer - Configuration Summary")
     logger.info("=" * 60)
     logger.info(f"Mode: {'KRaft' if args.controllers > 0 else 'ZooKeeper' if args.zookeepers > 0 else 'Standalone'}")
+    if args.clusters > 1:
+        logger.info(f"Clusters: {args.clusters} (replication: {args.cluster_replication}, {args.replication_flow})")
     logger.info(f"Brokers: {args.brokers}")
     if args.controllers > 0:
         logger.info(f"Controllers: {args.controllers}")
@@ -848,19 +1178,55 @@ if __name__ == '__main__':
         logger.info(f"Schema Registries: {args.schema_registries}")
     if args.connect_instances > 0:
         logger.info(f"Connect Instances: {args.connect_instances}")
+    if args.mqtt_bridge:
+        logger.info(f"MQTT Bridge: {args.mqtt_bridge_broker} -> Kafka")
     if args.prometheus:
         logger.info("Monitoring: Prometheus + Grafana enabled")
     if args.persistent_volumes:
         logger.info("Persistence: Docker volumes enabled")
+    if args.swarm:
+        logger.info(f"Deployment: Docker Swarm ({args.swarm_hosts or 'nodes labelled by rack'})")
     if args.resource_profile != 'none':
         logger.info(f"Resource Profile: {args.resource_profile}")
     logger.info("=" * 60)
 
+    generator = DockerComposeGenerator(args)
+
+    # ========== Compare With an Existing Compose File ==========
+    # Nothing is written; the exit status tells CI whether the deployment would change
+    if args.diff:
+        logger.info(f"Comparing with: {args.diff}")
+        topology = generator.build_topology()
+        try:
+            with span("diff"):
+                diff = diff_topologies(Topology.load(args.diff), topology)
+        except (OSError, ValueError) as e:
+            logger.error(f"Cannot read {args.diff}: {e}")
+            sys.exit(2)
+
+        if not diff:
+            logger.info("No changes")
+            sys.exit(0)
+
+        for line in diff.format_lines():
+            logger.info(line)
+        logger.info(f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed")
+        logger.info(f"Services to (re)create: {' '.join(diff.services_to_restart())}")
+        sys.exit(1)
+
     # ========== Generate Docker Compose Configuration ==========
     logger.info("Generating docker-compose configuration...")
-    generator = DockerComposeGenerator(args)
     generator.generate()
 
+    # Where did the time go? Slowest spans first, one structured record per span
+    if args.timings:
+        logger.info("Generation timings:")
+        for line, row in zip(format_timing_summary(), [None] + timings.summary()):
+            logger.info(line, extra=row or {})
+
     # Print success message
     logger.info(f"Successfully generated: {args.docker_compose_file}")
-    logger.info("To start the cluster, run: docker compose up -d")
+    if args.swarm:
+        logger.info(f"To deploy the stack, run: docker stack deploy -c {args.docker_compose_file} kafka")
+    else:
+        logger.info("To start the cluster, run: docker compose up -d")
@@ -10,6 +10,8 @@ Features:
 - File logging with detailed format
 - TTY detection for automatic color disabling
 - Configurable verbosity
+- JSON-lines output for batch pipelines
+- Lightweight timing spans with a per-phase summary
 
 Usage:
     from logger import setup_logging, get_logger
@@ -23,11 +25,21 @@ Usage:
     logger.debug("Debug information")
     logger.warning("Warning message")
     logger.error("Error occurred")
+
+    # Time a phase; durations are logged (DEBUG) and collected for a summary
+    with span("render", services=len(services)):
+        result = template.render(variables)
+
+    for line in format_timing_summary():
+        logger.info(line)
 """
 
+import json
 import logging
 import sys
-from typing import Optional
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
 
 
 class ColoredFormatter(logging.Formatter):
@@ -93,7 +105,54 @@ class ColoredFormatter(logging.Formatter):
         return result
 
 
-def setup_logging(verbose: bool = False, log_file: Optional[str] = None, color: bool = True) -> logging.Logger:
+class JsonFormatter(logging.Formatter):
+    """
+    Log formatter that writes one JSON object per line (JSON Lines).
+
+    Intended for machine consumption when the composer runs inside batch
+    pipelines. Every line contains the timestamp, level, logger name and
+    message. Fields passed with ``extra=`` (such as the span name and
+    duration written by span()) are added as top-level keys.
+
+    Example output:
+        {"ts": "2024-02-21T10:15:02.123Z", "level": "DEBUG", "logger": "kafka_docker_composer.timing",
+         "message": "render took 4.21 ms", "span": "render", "duration_ms": 4.21}
+    """
+
+    # Attributes every LogRecord has; anything else was passed with extra=
+    RESERVED_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+    def format(self, record):
+        """
+        Format the log record as a single JSON line.
+
+        Args:
+            record: LogRecord object containing log information
+
+        Returns:
+            str: JSON encoded log record
+        """
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        # Structured fields passed with extra=
+        for key, value in vars(record).items():
+            if key not in self.RESERVED_ATTRIBUTES:
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        # default=str keeps unexpected field types from breaking the log line
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(verbose: bool = False, log_file: Optional[str] = None, color: bool = True,
+                  json_format: bool = False) -> logging.Logger:
     """
     Configure and initialize the logging system for the application.
 
@@ -108,6 +167,7 @@ def setup_logging(verbose: bool = False, log_file: Optional[str] = None, color:
     Console Output:
         - Colored output (if TTY and color=True): Simple format for readability
         - Non-colored output: Timestamped format for parsing
+        - JSON output (json_format=True): One JSON object per line, never colored
 
     File Output:
         - Always DEBUG level (captures everything)
@@ -118,6 +178,7 @@ def setup_logging(verbose: bool = False, log_file: Optional[str] = None, color:
         verbose (bool): Enable DEBUG level logging. Default is INFO level.
         log_file (Optional[str]): Path to log file. If None, no file logging.
         color (bool): Enable colored console output. Auto-disabled for non-TTY.
+        json_format (bool): Write console output as JSON lines (see JsonFormatter).
 
     Returns:
         logging.Logger: Configured root logger instance
@@ -156,8 +217,11 @@ def setup_logging(verbose: bool = False, log_file: Optional[str] = None, color:
     console_handler.setLevel(level)  # Console follows the same level as logger
 
     # ========== Choose Console Format ==========
-    # Different formats for colored vs non-colored output
-    if color and sys.stdout.isatty():
+    # Different formats for JSON, colored and non-colored output
+    if json_format:
+        # Machine-readable output for batch pipelines
+        console_formatter = JsonFormatter()
+    elif color and sys.stdout.isatty():
         # Colored format: Simple and clean for terminal viewing
         # sys.stdout.isatty() returns True only for actual terminals
         # This prevents ANSI codes from appearing in piped output
@@ -235,3 +299,133 @@ def get_logger(name: str = 'kafka_docker_composer') -> logging.Logger:
         create hierarchical loggers that inherit the root configuration.
     """
     return logging.getLogger(name)
+
+
+class TimingCollector:
+    """
+    Aggregates span durations by name to show where generation time goes.
+
+    Only a count, total and maximum are kept per span name, so collecting
+    timings for large topologies costs constant memory.
+
+    Attributes:
+        spans (dict): Span name -> [count, total seconds, max seconds]
+        depth (int): Current span nesting depth
+        root_total (float): Total seconds spent in top-level spans
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Discard all collected timings."""
+        self.spans: Dict[str, List[float]] = {}
+        self.depth = 0
+        self.root_total = 0.0
+
+    def record(self, name: str, duration: float, depth: int):
+        """
+        Add one span duration.
+
+        Args:
+            name (str): Span name
+            duration (float): Duration in seconds
+            depth (int): Nesting depth of the span (0 = top-level)
+        """
+        stats = self.spans.get(name)
+        if stats is None:
+            self.spans[name] = [1, duration, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+            if duration > stats[2]:
+                stats[2] = duration
+
+        if depth == 0:
+            self.root_total += duration
+
+    def summary(self) -> List[dict]:
+        """
+        Get the collected timings, slowest first.
+
+        Returns:
+            list: One dict per span name with count, total_ms, max_ms and
+                  share (fraction of the time spent in top-level spans)
+        """
+        rows = []
+        for name, (count, total, maximum) in self.spans.items():
+            rows.append({
+                "span": name,
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "max_ms": round(maximum * 1000, 3),
+                "share": round(total / self.root_total, 4) if self.root_total else 0.0,
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+
+# Process-wide collector used by span()
+timings = TimingCollector()
+
+
+@contextmanager
+def span(name: str, logger: Optional[logging.Logger] = None, **fields):
+    """
+    Time a block of code and record its duration.
+
+    The duration is added to the module-level TimingCollector and logged at
+    DEBUG level with the structured fields "span" and "duration_ms" (plus any
+    keyword arguments), which JsonFormatter writes as top-level keys. When
+    DEBUG logging is disabled only two perf_counter() calls and a dict update
+    are spent per span.
+
+    Args:
+        name (str): Span name, e.g. "render" or "generate.BrokerGenerator"
+        logger (Optional[logging.Logger]): Logger for the duration message.
+            Defaults to 'kafka_docker_composer.timing'.
+        **fields: Additional structured fields for the log record
+
+    Yields:
+        dict: The fields dictionary, so results known only at the end of the
+              block (e.g. a service count) can be added to the log record
+
+    Example:
+        with span("write", file=path):
+            yaml_file.write(result)
+    """
+    log = logger or logging.getLogger('kafka_docker_composer.timing')
+    depth = timings.depth
+    timings.depth += 1
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        duration = time.perf_counter() - start
+        timings.depth = depth
+        timings.record(name, duration, depth)
+
+        if log.isEnabledFor(logging.DEBUG):
+            duration_ms = round(duration * 1000, 3)
+            log.debug(f"{name} took {duration_ms} ms",
+                      extra=dict(fields, span=name, duration_ms=duration_ms))
+
+
+def format_timing_summary(collector: Optional[TimingCollector] = None) -> List[str]:
+    """
+    Format the collected timings as a human-readable table.
+
+    Args:
+        collector (Optional[TimingCollector]): Collector to summarize.
+            Defaults to the module-level collector used by span().
+
+    Returns:
+        list: Table lines, slowest span first
+    """
+    rows = (collector or timings).summary()
+
+    lines = [f"{'Span':<45} {'Count':>6} {'Total ms':>10} {'Max ms':>10} {'Share':>7}"]
+    for row in rows:
+        lines.append(f"{row['span']:<45} {row['count']:>6} {row['total_ms']:>10.2f} "
+                     f"{row['max_ms']:>10.2f} {row['share']:>7.1%}")
+    return lines
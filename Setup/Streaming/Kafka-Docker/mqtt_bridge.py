@@ -0,0 +1,405 @@
+"""
+MQTT to Kafka Bridge
+
+This module subscribes to MQTT topics (e.g. the HiveMQ/Mosquitto sensor
+simulators MES_123.py and sensor.py) and produces the messages to Kafka, so
+PDI and other consumers read a Kafka topic instead of polling MQTT.
+
+The producer is configured for throughput without giving up ordering or
+exactly-once delivery per partition:
+- Batching: messages are collected for linger.ms / up to batch.size bytes
+- Compression: whole batches are compressed (lz4 by default)
+- Idempotence: retries cannot duplicate or reorder messages (acks=all)
+
+Topic mapping rules have the form MQTT_FILTER=KAFKA_TOPIC[:KEY_FIELD]:
+
+    industrial_robot/#=industrial-robot-sensor-data:robot_id
+
+MQTT wildcards (+, #) are supported, the first matching rule wins. The
+Kafka message key is taken from the KEY_FIELD of the JSON payload (all
+messages of one robot land in the same partition and stay in order), or
+from the MQTT topic itself with the key field "$topic".
+
+Backpressure: when the producer's local queue is full (Kafka is slow or
+unreachable), the MQTT message callback waits for deliveries instead of
+dropping messages. This stalls the MQTT network thread, so the broker
+holds back further messages (QoS 1/2 messages queue up on the broker).
+
+Usage (the composer can add it as a service with --mqtt-bridge):
+    python3 mqtt_bridge.py --mqtt-broker localhost:1883 --bootstrap-servers localhost:9091 \\
+        --map "industrial_robot/#=industrial-robot-sensor-data:robot_id"
+
+Every option can also be set with an environment variable (MQTT_BRIDGE_*),
+see parse_arguments(). Requires paho-mqtt and confluent-kafka.
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("mqtt_bridge")
+
+# ========== Defaults ==========
+
+# Topics of the HiveMQ simulators (MES_123.py, sensor.py)
+DEFAULT_MAPPINGS = [
+    "industrial_robot/#=industrial-robot-sensor-data:robot_id",
+    "industrial/robot/#=industrial-robot-sensor:$topic",
+]
+
+# Key field that uses the MQTT topic as the message key
+TOPIC_KEY = "$topic"
+
+# Seconds the MQTT callback waits for deliveries per attempt while the producer queue is full
+BACKPRESSURE_POLL = 0.05
+
+
+class TopicMapping:
+    """
+    One MQTT-to-Kafka topic mapping rule.
+
+    Attributes:
+        mqtt_filter (str): MQTT topic filter, may contain + and # wildcards
+        kafka_topic (str): Target Kafka topic
+        key_field (Optional[str]): Payload field used as message key, or "$topic"
+    """
+
+    __slots__ = ("mqtt_filter", "kafka_topic", "key_field", "_levels")
+
+    def __init__(self, mqtt_filter, kafka_topic, key_field=None):
+        self.mqtt_filter = mqtt_filter
+        self.kafka_topic = kafka_topic
+        self.key_field = key_field or None
+        self._levels = mqtt_filter.split("/")
+
+    @classmethod
+    def parse(cls, rule):
+        """
+        Parse a MQTT_FILTER=KAFKA_TOPIC[:KEY_FIELD] rule.
+
+        Args:
+            rule (str): Mapping rule
+
+        Returns:
+            TopicMapping: Parsed rule
+
+        Raises:
+            ValueError: If the rule is malformed
+        """
+        mqtt_filter, separator, target = rule.partition("=")
+        kafka_topic, _, key_field = target.partition(":")
+        if not separator or not mqtt_filter.strip() or not kafka_topic.strip():
+            raise ValueError(f"Invalid topic mapping '{rule}', expected MQTT_FILTER=KAFKA_TOPIC[:KEY_FIELD]")
+        return cls(mqtt_filter.strip(), kafka_topic.strip(), key_field.strip())
+
+    def matches(self, topic):
+        """
+        Check whether an MQTT topic matches the filter.
+
+        Args:
+            topic (str): MQTT topic of a message
+
+        Returns:
+            bool: True if the topic matches
+        """
+        levels = topic.split("/")
+        for index, level in enumerate(self._levels):
+            if level == "#":
+                return True
+            if index >= len(levels) or (level != "+" and level != levels[index]):
+                return False
+        return len(levels) == len(self._levels)
+
+    def __str__(self):
+        target = f"{self.kafka_topic}:{self.key_field}" if self.key_field else self.kafka_topic
+        return f"{self.mqtt_filter}={target}"
+
+
+def subscription_filters(mappings, share=None):
+    """
+    Get the MQTT subscriptions of a set of mappings.
+
+    Args:
+        mappings (list): TopicMapping rules
+        share (Optional[str]): Shared subscription group, several bridges then split the messages
+
+    Returns:
+        list: Topic filters, e.g. ["$share/bridge/industrial_robot/#"]
+    """
+    filters = list(dict.fromkeys(mapping.mqtt_filter for mapping in mappings))
+    if share:
+        return [f"$share/{share}/{topic_filter}" for topic_filter in filters]
+    return filters
+
+
+def message_key(payload, topic, key_field):
+    """
+    Extract the Kafka message key.
+
+    Args:
+        payload (bytes): MQTT payload (JSON for payload fields)
+        topic (str): MQTT topic
+        key_field (Optional[str]): Payload field, "$topic" or None
+
+    Returns:
+        Optional[bytes]: Message key, None if there is no key
+    """
+    if not key_field:
+        return None
+    if key_field == TOPIC_KEY:
+        return topic.encode()
+    try:
+        message = orjson.loads(payload) if orjson is not None else json.loads(payload)
+    except ValueError:
+        return None
+    value = message.get(key_field) if isinstance(message, dict) else None
+    return None if value is None else str(value).encode()
+
+
+def producer_config(args):
+    """
+    Build the Kafka producer configuration (librdkafka properties).
+
+    Args:
+        args (argparse.Namespace): Bridge options
+
+    Returns:
+        dict: Producer configuration
+    """
+    return {
+        "bootstrap.servers": args.bootstrap_servers,
+        "client.id": "mqtt-bridge",
+        # Idempotent producer: acks=all, retries without duplicates or reordering
+        "enable.idempotence": True,
+        "acks": "all",
+        "max.in.flight.requests.per.connection": 5,
+        # Batching and compression
+        "compression.type": args.compression,
+        "linger.ms": args.linger_ms,
+        "batch.size": args.batch_size,
+        # Local queue; when it is full, produce() raises BufferError and the bridge applies backpressure
+        "queue.buffering.max.messages": args.buffer_messages,
+    }
+
+
+class BridgeStats:
+    """
+    Counters of the bridge.
+
+    Attributes:
+        received (int): MQTT messages received
+        unmapped (int): Messages without a matching mapping
+        delivered (int): Messages acknowledged by Kafka
+        failed (int): Messages Kafka could not store
+        stalls (int): produce() attempts rejected because the producer queue was full
+        stalled_seconds (float): Time the MQTT callback spent waiting for the producer
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.unmapped = 0
+        self.delivered = 0
+        self.failed = 0
+        self.stalls = 0
+        self.stalled_seconds = 0.0
+
+    def summary(self):
+        return (f"received={self.received} delivered={self.delivered} failed={self.failed} "
+                f"unmapped={self.unmapped} backpressure={self.stalls} ({self.stalled_seconds:.1f}s)")
+
+
+class KafkaBridge:
+    """
+    Forwards MQTT messages to a Kafka producer.
+
+    The producer is any object with the confluent_kafka.Producer methods
+    produce(), poll() and flush(), so tests can pass a local stand-in.
+    """
+
+    def __init__(self, producer, mappings):
+        """
+        Args:
+            producer: Kafka producer (confluent_kafka.Producer)
+            mappings (list): TopicMapping rules, the first match wins
+        """
+        self.producer = producer
+        self.mappings = mappings
+        self.stats = BridgeStats()
+        # Mapping per MQTT topic, topics repeat so the wildcard match runs once per topic
+        self._routes = {}
+
+    def route(self, topic):
+        """
+        Find the mapping of an MQTT topic.
+
+        Args:
+            topic (str): MQTT topic
+
+        Returns:
+            Optional[TopicMapping]: First matching rule, None if no rule matches
+        """
+        try:
+            return self._routes[topic]
+        except KeyError:
+            mapping = next((mapping for mapping in self.mappings if mapping.matches(topic)), None)
+            self._routes[topic] = mapping
+            return mapping
+
+    def forward(self, topic, payload):
+        """
+        Produce one MQTT message to Kafka, waiting while the producer queue is full.
+
+        Args:
+            topic (str): MQTT topic
+            payload (bytes): MQTT payload
+        """
+        self.stats.received += 1
+        mapping = self.route(topic)
+        if mapping is None:
+            self.stats.unmapped += 1
+            return
+
+        key = message_key(payload, topic, mapping.key_field)
+        started = None
+        while True:
+            try:
+                self.producer.produce(mapping.kafka_topic, payload, key, on_delivery=self.on_delivery)
+                break
+            except BufferError:
+                # Backpressure: serve delivery reports until the queue has room again
+                if started is None:
+                    started = time.monotonic()
+                self.stats.stalls += 1
+                self.producer.poll(BACKPRESSURE_POLL)
+
+        if started is not None:
+            self.stats.stalled_seconds += time.monotonic() - started
+        # Serve delivery callbacks of earlier messages without blocking
+        self.producer.poll(0)
+
+    def on_message(self, client, userdata, message):
+        """paho-mqtt on_message callback."""
+        self.forward(message.topic, message.payload)
+
+    def on_delivery(self, error, message):
+        """Kafka delivery report callback."""
+        if error is None:
+            self.stats.delivered += 1
+        else:
+            self.stats.failed += 1
+            logger.warning(f"Delivery to {message.topic()} failed: {error}")
+
+    def flush(self, timeout=30):
+        """
+        Wait for the outstanding messages.
+
+        Returns:
+            int: Messages still not delivered
+        """
+        return self.producer.flush(timeout)
+
+
+def parse_arguments(argv=None):
+    """
+    Parse the bridge options; defaults come from MQTT_BRIDGE_* environment variables.
+
+    Args:
+        argv (Optional[list]): Arguments, None for sys.argv
+
+    Returns:
+        argparse.Namespace: Options with the parsed mappings in args.mappings
+    """
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Forward MQTT messages to Kafka")
+    parser.add_argument('--mqtt-broker', default=env("MQTT_BRIDGE_MQTT_BROKER", "localhost:1883"),
+                        help="MQTT broker host:port [MQTT_BRIDGE_MQTT_BROKER or localhost:1883]")
+    parser.add_argument('--qos', type=int, choices=[0, 1, 2], default=int(env("MQTT_BRIDGE_QOS", "1")),
+                        help="MQTT subscription QoS [MQTT_BRIDGE_QOS or 1]")
+    parser.add_argument('--share', default=env("MQTT_BRIDGE_SHARE"),
+                        help="Shared subscription group, to split the topics between several bridges "
+                             "[MQTT_BRIDGE_SHARE]")
+    parser.add_argument('--bootstrap-servers', default=env("MQTT_BRIDGE_BOOTSTRAP_SERVERS", "localhost:9091"),
+                        help="Kafka bootstrap servers [MQTT_BRIDGE_BOOTSTRAP_SERVERS or localhost:9091]")
+    parser.add_argument('--map', dest='map', action='append',
+                        help="Topic mapping MQTT_FILTER=KAFKA_TOPIC[:KEY_FIELD], repeatable "
+                             "[MQTT_BRIDGE_MAPPINGS, separated by ';']")
+    parser.add_argument('--compression', choices=['none', 'gzip', 'snappy', 'lz4', 'zstd'],
+                        default=env("MQTT_BRIDGE_COMPRESSION", "lz4"),
+                        help="Batch compression [MQTT_BRIDGE_COMPRESSION or lz4]")
+    parser.add_argument('--linger-ms', type=int, default=int(env("MQTT_BRIDGE_LINGER_MS", "20")),
+                        help="Wait up to this long to fill a batch [MQTT_BRIDGE_LINGER_MS or 20]")
+    parser.add_argument('--batch-size', type=int, default=int(env("MQTT_BRIDGE_BATCH_SIZE", "262144")),
+                        help="Maximum batch size in bytes [MQTT_BRIDGE_BATCH_SIZE or 262144]")
+    parser.add_argument('--buffer-messages', type=int, default=int(env("MQTT_BRIDGE_BUFFER_MESSAGES", "100000")),
+                        help="Producer queue size before backpressure [MQTT_BRIDGE_BUFFER_MESSAGES or 100000]")
+    parser.add_argument('--report-interval', type=float, default=float(env("MQTT_BRIDGE_REPORT_INTERVAL", "10")),
+                        help="Seconds between statistics log lines [MQTT_BRIDGE_REPORT_INTERVAL or 10]")
+    args = parser.parse_args(argv)
+
+    rules = args.map or [rule for rule in env("MQTT_BRIDGE_MAPPINGS", "").split(";") if rule.strip()] \
+        or DEFAULT_MAPPINGS
+    args.mappings = [TopicMapping.parse(rule) for rule in rules]
+    return args
+
+
+def main(argv=None):
+    """
+    Run the bridge until SIGINT/SIGTERM, then flush the producer.
+
+    Args:
+        argv (Optional[list]): Arguments, None for sys.argv
+    """
+    from confluent_kafka import Producer
+    from paho.mqtt import client as mqtt_client
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_arguments(argv)
+    bridge = KafkaBridge(Producer(producer_config(args)), args.mappings)
+
+    host, _, port = args.mqtt_broker.partition(":")
+    topic_filters = subscription_filters(args.mappings, args.share)
+
+    if hasattr(mqtt_client, "CallbackAPIVersion"):
+        client = mqtt_client.Client(client_id=f"mqtt-bridge-{os.getpid()}",
+                                    callback_api_version=mqtt_client.CallbackAPIVersion.VERSION1)
+    else:
+        client = mqtt_client.Client(client_id=f"mqtt-bridge-{os.getpid()}")
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            logger.info(f"Connected to MQTT broker {args.mqtt_broker}, subscribing to {', '.join(topic_filters)}")
+            client.subscribe([(topic_filter, args.qos) for topic_filter in topic_filters])
+        else:
+            logger.error(f"MQTT connection failed, return code {rc}")
+
+    client.on_connect = on_connect
+    client.on_message = bridge.on_message
+    client.connect_async(host, int(port or 1883))
+    client.loop_start()
+
+    for mapping in args.mappings:
+        logger.info(f"Mapping {mapping}")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    while not stop.wait(args.report_interval):
+        logger.info(bridge.stats.summary())
+
+    client.loop_stop()
+    client.disconnect()
+    remaining = bridge.flush()
+    logger.info(bridge.stats.summary() + (f" undelivered={remaining}" if remaining else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Unit tests for logger.py module
+
+Tests the JSON log formatter and the timing spans.
+"""
+
+import json
+import logging
+import unittest
+
+from logger import JsonFormatter, TimingCollector, format_timing_summary, span, timings
+
+
+class ListHandler(logging.Handler):
+    """Handler keeping formatted records in a list"""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class TestJsonFormatter(unittest.TestCase):
+    """Test JSON-lines formatting"""
+
+    def setUp(self):
+        self.handler = ListHandler()
+        self.handler.setFormatter(JsonFormatter())
+        self.logger = logging.getLogger('test_logger.json')
+        self.logger.handlers = [self.handler]
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+
+    def test_one_object_per_line(self):
+        """Test that each record is a single JSON object with the standard keys"""
+        self.logger.info("Generated %d services", 7)
+
+        self.assertEqual(len(self.handler.lines), 1)
+        self.assertNotIn("\n", self.handler.lines[0])
+
+        entry = json.loads(self.handler.lines[0])
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "test_logger.json")
+        self.assertEqual(entry["message"], "Generated 7 services")
+        self.assertTrue(entry["ts"].endswith("Z"))
+
+    def test_extra_fields(self):
+        """Test that extra= fields become top-level keys"""
+        self.logger.info("write", extra={"file": "docker-compose.yml", "bytes": 1024})
+
+        entry = json.loads(self.handler.lines[0])
+        self.assertEqual(entry["file"], "docker-compose.yml")
+        self.assertEqual(entry["bytes"], 1024)
+        self.assertNotIn("levelno", entry)
+
+    def test_span_record(self):
+        """Test that spans log their name and duration as structured fields"""
+        with span("render", logger=self.logger, services=3) as fields:
+            fields["bytes"] = 42
+
+        entry = json.loads(self.handler.lines[0])
+        self.assertEqual(entry["span"], "render")
+        self.assertEqual(entry["services"], 3)
+        self.assertEqual(entry["bytes"], 42)
+        self.assertGreaterEqual(entry["duration_ms"], 0)
+
+
+class TestTimingCollector(unittest.TestCase):
+    """Test timing aggregation"""
+
+    def setUp(self):
+        timings.reset()
+
+    def tearDown(self):
+        timings.reset()
+
+    def test_aggregation_and_order(self):
+        """Test that durations are aggregated per name and sorted slowest first"""
+        collector = TimingCollector()
+        collector.record("generate", 1.0, 0)
+        collector.record("render", 0.2, 1)
+        collector.record("write", 0.3, 1)
+        collector.record("write", 0.4, 1)
+
+        rows = collector.summary()
+        self.assertEqual([row["span"] for row in rows], ["generate", "write", "render"])
+
+        write = rows[1]
+        self.assertEqual(write["count"], 2)
+        self.assertAlmostEqual(write["total_ms"], 700.0)
+        self.assertAlmostEqual(write["max_ms"], 400.0)
+        self.assertAlmostEqual(write["share"], 0.7)
+
+    def test_nested_spans_share_of_root(self):
+        """Test that only top-level spans count towards the total"""
+        with span("outer"):
+            with span("inner"):
+                pass
+
+        self.assertEqual(timings.spans["outer"][0], 1)
+        self.assertEqual(timings.spans["inner"][0], 1)
+        self.assertEqual(timings.depth, 0)
+        self.assertAlmostEqual(timings.root_total, timings.spans["outer"][1])
+
+    def test_span_records_on_exception(self):
+        """Test that a failing block is still timed and the error propagates"""
+        with self.assertRaises(ValueError):
+            with span("failing"):
+                raise ValueError("boom")
+
+        self.assertIn("failing", timings.spans)
+        self.assertEqual(timings.depth, 0)
+
+    def test_format_summary(self):
+        """Test the human-readable summary table"""
+        collector = TimingCollector()
+        collector.record("generate", 0.5, 0)
+
+        lines = format_timing_summary(collector)
+        self.assertEqual(len(lines), 2)
+        self.assertIn("Total ms", lines[0])
+        self.assertIn("generate", lines[1])
+        self.assertIn("100.0%", lines[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+"""
+Unit tests for mqtt_bridge.py module
+
+Tests topic mapping, key extraction and backpressure of the MQTT-to-Kafka
+bridge with a local producer stand-in (no MQTT broker or Kafka needed), and
+the bridge service generated by the composer.
+"""
+
+import json
+import unittest
+from types import SimpleNamespace
+
+from kafka_docker_composer import DockerComposeGenerator
+from mqtt_bridge import (KafkaBridge, TopicMapping, message_key, parse_arguments, producer_config,
+                         subscription_filters)
+from test_yaml_generator import create_args
+
+
+class FakeProducer:
+    """
+    Stand-in for confluent_kafka.Producer with a bounded local queue.
+
+    produce() raises BufferError when the queue is full; poll() delivers
+    up to deliver_per_poll queued messages, and nothing with timeout 0 when
+    slow is set (Kafka has not acknowledged anything yet).
+    """
+
+    def __init__(self, capacity=10, deliver_per_poll=3, slow=False):
+        self.capacity = capacity
+        self.deliver_per_poll = deliver_per_poll
+        self.slow = slow
+        self.queued = []
+        self.delivered = []
+
+    def produce(self, topic, value, key=None, on_delivery=None):
+        if len(self.queued) >= self.capacity:
+            raise BufferError("Local: Queue full")
+        self.queued.append((topic, value, key, on_delivery))
+
+    def poll(self, timeout=0):
+        if self.slow and not timeout:
+            return 0
+        count = 0
+        while self.queued and count < self.deliver_per_poll:
+            topic, value, key, on_delivery = self.queued.pop(0)
+            self.delivered.append((topic, value, key))
+            on_delivery(None, SimpleNamespace(topic=lambda: topic))
+            count += 1
+        return count
+
+    def flush(self, timeout=None):
+        while self.queued:
+            self.poll(1)
+        return 0
+
+
+class TestTopicMapping(unittest.TestCase):
+    """Test mapping rules and MQTT wildcard matching"""
+
+    def test_parse(self):
+        """Test rule parsing with and without key field"""
+        mapping = TopicMapping.parse("industrial_robot/#=robot-data:robot_id")
+        self.assertEqual((mapping.mqtt_filter, mapping.kafka_topic, mapping.key_field),
+                         ("industrial_robot/#", "robot-data", "robot_id"))
+        self.assertIsNone(TopicMapping.parse("a/b=topic").key_field)
+        self.assertEqual(str(mapping), "industrial_robot/#=robot-data:robot_id")
+
+    def test_parse_invalid(self):
+        """Test that malformed rules are rejected"""
+        for rule in ("no-target", "=topic", "a/b=", "a/b=:key"):
+            with self.subTest(rule=rule):
+                with self.assertRaises(ValueError):
+                    TopicMapping.parse(rule)
+
+    def test_wildcards(self):
+        """Test single-level (+) and multi-level (#) wildcards"""
+        self.assertTrue(TopicMapping("a/+/c", "t").matches("a/b/c"))
+        self.assertFalse(TopicMapping("a/+/c", "t").matches("a/b/d"))
+        self.assertFalse(TopicMapping("a/+", "t").matches("a/b/c"))
+        self.assertTrue(TopicMapping("a/#", "t").matches("a/b/c"))
+        self.assertTrue(TopicMapping("a/#", "t").matches("a"))
+        self.assertTrue(TopicMapping("a/b", "t").matches("a/b"))
+        self.assertFalse(TopicMapping("a/b", "t").matches("a/b/c"))
+
+    def test_shared_subscription(self):
+        """Test that shared subscriptions prefix every filter once"""
+        mappings = [TopicMapping("a/#", "t1"), TopicMapping("a/#", "t2"), TopicMapping("b", "t3")]
+        self.assertEqual(subscription_filters(mappings), ["a/#", "b"])
+        self.assertEqual(subscription_filters(mappings, "bridge"), ["$share/bridge/a/#", "$share/bridge/b"])
+
+
+class TestKafkaBridge(unittest.TestCase):
+    """Test forwarding, partition keys and backpressure"""
+
+    def test_message_key(self):
+        """Test key extraction from the payload and the topic"""
+        payload = json.dumps({"robot_id": "MES_123", "temperature": 21.5}).encode()
+        self.assertEqual(message_key(payload, "t", "robot_id"), b"MES_123")
+        self.assertEqual(message_key(payload, "robots/MES_124", "$topic"), b"robots/MES_124")
+        self.assertIsNone(message_key(payload, "t", "missing"))
+        self.assertIsNone(message_key(b"not json", "t", "robot_id"))
+        self.assertIsNone(message_key(payload, "t", None))
+
+    def test_forward(self):
+        """Test that messages go to the first matching Kafka topic with their key"""
+        producer = FakeProducer(capacity=100)
+        bridge = KafkaBridge(producer, [TopicMapping.parse("industrial_robot/#=robots:robot_id"),
+                                        TopicMapping.parse("industrial/#=sensors")])
+
+        bridge.forward("industrial_robot/sensor_data", b'{"robot_id": "MES_123"}')
+        bridge.forward("industrial/robot/sensor", b'{"temperature": 20}')
+        bridge.forward("other/topic", b'{}')
+        bridge.flush()
+
+        self.assertEqual(producer.delivered, [("robots", b'{"robot_id": "MES_123"}', b"MES_123"),
+                                              ("sensors", b'{"temperature": 20}', None)])
+        self.assertEqual((bridge.stats.received, bridge.stats.delivered, bridge.stats.unmapped), (3, 2, 1))
+
+    def test_backpressure(self):
+        """Test that a full producer queue delays messages instead of dropping them"""
+        producer = FakeProducer(capacity=5, deliver_per_poll=1, slow=True)
+        bridge = KafkaBridge(producer, [TopicMapping.parse("#=all")])
+
+        for number in range(50):
+            bridge.forward(f"robots/{number}", str(number).encode())
+        bridge.flush()
+
+        self.assertEqual([value for _, value, _ in producer.delivered], [str(n).encode() for n in range(50)])
+        self.assertEqual(bridge.stats.delivered, 50)
+        self.assertGreater(bridge.stats.stalls, 0)
+
+    def test_delivery_failure(self):
+        """Test that failed deliveries are counted"""
+        bridge = KafkaBridge(FakeProducer(), [])
+        bridge.on_delivery("broker down", SimpleNamespace(topic=lambda: "robots"))
+        self.assertEqual(bridge.stats.failed, 1)
+
+
+class TestBridgeOptions(unittest.TestCase):
+    """Test the bridge command line and producer settings"""
+
+    def test_producer_config(self):
+        """Test the idempotent, batched and compressed producer settings"""
+        config = producer_config(parse_arguments(["--bootstrap-servers", "kafka-1:19091", "--compression", "zstd"]))
+        self.assertEqual(config["bootstrap.servers"], "kafka-1:19091")
+        self.assertTrue(config["enable.idempotence"])
+        self.assertEqual(config["acks"], "all")
+        self.assertEqual(config["compression.type"], "zstd")
+        self.assertGreater(config["linger.ms"], 0)
+
+    def test_mappings_from_arguments(self):
+        """Test that --map replaces the built-in mappings"""
+        args = parse_arguments(["--map", "a/#=t1:id", "--map", "b=t2"])
+        self.assertEqual([str(mapping) for mapping in args.mappings], ["a/#=t1:id", "b=t2"])
+        self.assertEqual(len(parse_arguments([]).mappings), 2)
+
+
+class TestBridgeService(unittest.TestCase):
+    """Test the bridge service generated by the composer"""
+
+    def services_by_name(self, **kwargs):
+        generator = DockerComposeGenerator(create_args(**kwargs))
+        services = {service.name: service for service in generator.collect_services()}
+        self.bootstrap_servers = generator.bootstrap_servers
+        return services
+
+    def test_disabled_by_default(self):
+        """Test that no bridge is generated without --mqtt-bridge"""
+        self.assertNotIn("mqtt-bridge", self.services_by_name())
+
+    def test_bridge_service(self):
+        """Test that the bridge connects to the brokers and waits for them"""
+        services = self.services_by_name(mqtt_bridge=True, mqtt_bridge_broker="mosquitto:1883",
+                                         mqtt_bridge_map=["industrial_robot/#=robots:$topic"])
+        bridge = services["mqtt-bridge"]
+
+        self.assertEqual(bridge.environment["MQTT_BRIDGE_BOOTSTRAP_SERVERS"], self.bootstrap_servers)
+        self.assertTrue(self.bootstrap_servers.startswith("kafka-1:"))
+        self.assertEqual(bridge.environment["MQTT_BRIDGE_MQTT_BROKER"], "mosquitto:1883")
+        self.assertEqual(bridge.environment["MQTT_BRIDGE_MAPPINGS"], '"industrial_robot/#=robots:$$topic"')
+        self.assertEqual(bridge.depends_on_condition, ["kafka-1", "kafka-2", "kafka-3"])
+        self.assertIn("mqtt_bridge.py", json.loads(bridge.command)[-1])
+        self.assertIsNone(bridge.extra_hosts)
+
+    def test_docker_host_resolves(self):
+        """Test that the default broker address is mapped to the Docker host (Linux Docker Engine)"""
+        generator = DockerComposeGenerator(create_args(mqtt_bridge=True))
+        topology = generator.build_topology()
+
+        self.assertEqual(topology.service("mqtt-bridge").extra_hosts, ["host.docker.internal:host-gateway"])
+        self.assertIn("        extra_hosts:\n            - host.docker.internal:host-gateway\n",
+                      topology.to_compose_yaml())
+
+    def test_primary_cluster(self):
+        """Test that the bridge attaches to the first cluster in multi-cluster mode"""
+        services = self.services_by_name(mqtt_bridge=True, clusters=2)
+        self.assertTrue(services["mqtt-bridge"].environment["MQTT_BRIDGE_BOOTSTRAP_SERVERS"]
+                        .startswith("cluster1-kafka-1:"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+"""
+Unit tests for topology.py module
+
+Tests the typed topology model and the docker-compose serializer.
+"""
+
+import io
+import unittest
+
+from kafka_docker_composer import DockerComposeGenerator
+from test_yaml_generator import create_args
+from topology import Listener, PortMapping, Service, Topology, Volume, diff_topologies
+
+
+class TestModel(unittest.TestCase):
+    """Test the slotted model classes"""
+
+    def test_slots(self):
+        """Test that model instances have no per-instance dictionary"""
+        for instance in (PortMapping(9092, 9092), Volume("a", "/b"), Listener("PLAINTEXT", "kafka-1", 19092),
+                         Service(name="kafka-1", image="image", hostname="kafka-1")):
+            self.assertFalse(hasattr(instance, "__dict__"))
+
+        with self.assertRaises(AttributeError):
+            PortMapping(1, 2).protocol = "udp"
+
+    def test_defaults(self):
+        """Test that optional sections default to None"""
+        service = Service(name="kafka-1", image="image", hostname="kafka-1")
+        self.assertIsNone(service.ports)
+        self.assertIsNone(service.environment)
+        self.assertEqual(Topology([service]).to_compose_yaml().splitlines()[2:6],
+                         ["    kafka-1:", "        image: image", "        hostname: kafka-1", ""])
+
+    def test_volume_round_trip(self):
+        """Test volume specification parsing"""
+        for spec in ("$PWD/volumes/kafka_config.yml:/tmp/kafka_config.yml", "kafka-1-data:/var/lib/kafka/data:ro"):
+            self.assertEqual(str(Volume.parse(spec)), spec)
+
+        self.assertEqual(Volume.parse("data:/data:ro").mode, "ro")
+
+    def test_listeners(self):
+        """Test listener parsing from the advertised listeners"""
+        service = Service(name="kafka-1", image="image", hostname="kafka-1",
+                          environment={"KAFKA_ADVERTISED_LISTENERS": "PLAINTEXT://kafka-1:19091, EXTERNAL://localhost:9091"})
+
+        self.assertEqual(service.listeners(), [Listener("PLAINTEXT", "kafka-1", 19091),
+                                               Listener("EXTERNAL", "localhost", 9091)])
+        self.assertEqual(service.listeners(advertised=False), [])
+
+
+class TestTopology(unittest.TestCase):
+    """Test topology building and serialization"""
+
+    CONFIGURATIONS = [
+        dict(brokers=3, controllers=3, prometheus=True, schema_registries=2, connect_instances=2,
+             ksqldb_instances=1, control_center=True, resource_profile='small'),
+        dict(brokers=4, controllers=3, shared_mode=True, racks=2, persistent_volumes=True),
+        dict(brokers=3, zookeepers=3, control_center_next_gen=True, prometheus=True, mqtt_bridge=True),
+        dict(brokers=3, controllers=3, clusters=2, cluster_replication='mirror-maker', prometheus=True),
+        dict(brokers=3, controllers=3, racks=3, clusters=2, cluster_replication='cluster-link', swarm=True,
+             persistent_volumes=True, resource_profile='large'),
+    ]
+
+    def test_streamed_output(self):
+        """Test that writing to a stream produces the same text as to_compose_yaml()"""
+        for kwargs in self.CONFIGURATIONS:
+            with self.subTest(**kwargs):
+                topology = DockerComposeGenerator(create_args(**kwargs)).build_topology()
+
+                stream = io.StringIO()
+                topology.write_compose_yaml(stream)
+                self.assertEqual(stream.getvalue(), topology.to_compose_yaml())
+                self.assertTrue(stream.getvalue().startswith("---\nservices:\n"))
+
+    def test_resolve_dependencies(self):
+        """Test that depends_on references resolve to services"""
+        generator = DockerComposeGenerator(create_args(brokers=3, controllers=3, schema_registries=1))
+        topology = generator.build_topology()
+
+        dependencies = topology.resolve_dependencies()
+        self.assertEqual([service.name for service in dependencies["kafka-1"]],
+                         ["controller-1", "controller-2", "controller-3"])
+        self.assertIs(dependencies["kafka-1"][0], topology.service("controller-1"))
+
+    def test_unknown_dependency(self):
+        """Test that dangling references are reported"""
+        topology = Topology([Service(name="kafka-1", image="image", hostname="kafka-1", depends_on=["missing"])])
+
+        with self.assertRaises(ValueError) as context:
+            topology.resolve_dependencies()
+        self.assertIn("kafka-1 -> missing", str(context.exception))
+
+    def test_dangling_dependency_rejected(self):
+        """Test that build_topology() refuses services depending on missing ones"""
+        generator = DockerComposeGenerator(create_args(brokers=3, controllers=3, control_center_next_gen=True))
+
+        with self.assertRaises(ValueError) as context:
+            generator.build_topology()
+        self.assertIn("kafka-1 -> prometheus", str(context.exception))
+
+    def bootstrap_servers(self, topology, prefix):
+        # First advertised listener of every service with the given prefix
+        return [f"{service.listeners()[0].host}:{service.listeners()[0].port}"
+                for service in topology.services if service.name.startswith(prefix)]
+
+    def test_bootstrap_servers(self):
+        """Test that the bootstrap servers match the broker listeners"""
+        generator = DockerComposeGenerator(create_args(brokers=3, controllers=3))
+        topology = generator.build_topology()
+
+        self.assertEqual(",".join(self.bootstrap_servers(topology, "kafka-")), generator.bootstrap_servers)
+
+    def test_shared_mode_bootstrap_servers(self):
+        """Test that shared-mode controllers set the bootstrap servers once"""
+        generator = DockerComposeGenerator(create_args(brokers=0, controllers=3, shared_mode=True))
+        topology = generator.build_topology()
+
+        self.assertEqual(generator.bootstrap_servers.split(","), self.bootstrap_servers(topology, "controller-"))
+        self.assertEqual([address.split(":")[0] for address in generator.bootstrap_servers.split(",")],
+                         ["controller-1", "controller-2", "controller-3"])
+
+
+class TestComposeImport(unittest.TestCase):
+    """Test reading generated compose files back into the model"""
+
+    def test_round_trip(self):
+        """Test that a parsed compose file serializes to the same text"""
+        for kwargs in TestTopology.CONFIGURATIONS:
+            with self.subTest(**kwargs):
+                topology = DockerComposeGenerator(create_args(**kwargs)).build_topology()
+                text = topology.to_compose_yaml()
+
+                parsed = Topology.from_compose_yaml(text)
+                self.assertEqual(parsed.to_compose_yaml(), text)
+                self.assertEqual(parsed.swarm, topology.swarm)
+                self.assertFalse(diff_topologies(parsed, topology))
+
+    def test_parsed_values(self):
+        """Test the structure of a parsed service"""
+        text = DockerComposeGenerator(create_args(brokers=3, controllers=3)).build_topology().to_compose_yaml()
+        broker = Topology.from_compose_yaml(text).service("kafka-1")
+
+        self.assertEqual(broker.depends_on, ["controller-1", "controller-2", "controller-3"])
+        self.assertEqual(broker.environment["KAFKA_PROCESS_ROLES"], "broker")
+        self.assertIn(PortMapping(9091, 9091), broker.ports)
+        self.assertEqual(broker.listeners()[0].name, "PLAINTEXT")
+
+    def test_invalid_file(self):
+        """Test that text not written by the composer is rejected"""
+        with self.assertRaises(ValueError):
+            Topology.from_compose_yaml("services:\n    kafka-1:\n        image kafka\n")
+
+
+class TestTopologyDiff(unittest.TestCase):
+    """Test the structural diff between topologies"""
+
+    def diff(self, old_kwargs, new_kwargs):
+        old = DockerComposeGenerator(create_args(**old_kwargs)).build_topology()
+        new = DockerComposeGenerator(create_args(**new_kwargs)).build_topology()
+        return diff_topologies(Topology.from_compose_yaml(old.to_compose_yaml()), new)
+
+    def test_added_and_removed(self):
+        """Test added and removed services"""
+        diff = self.diff(dict(brokers=3, controllers=3), dict(brokers=4, controllers=3))
+        self.assertEqual(diff.added, ["kafka-4"])
+        self.assertEqual(diff.removed, [])
+
+        diff = self.diff(dict(brokers=3, controllers=3, schema_registries=1), dict(brokers=3, controllers=3))
+        self.assertEqual(diff.removed, ["schema-registry-1"])
+
+    def test_environment_and_resources(self):
+        """Test changed environment variables and resource limits"""
+        diff = self.diff(dict(brokers=3, controllers=3), dict(brokers=3, controllers=3, resource_profile='small'))
+
+        kafka = next(change for change in diff.changed if change.name == "kafka-1")
+        self.assertEqual(kafka.environment["KAFKA_HEAP_OPTS"][0], None)
+        self.assertIn("limits.memory", kafka.resources)
+        self.assertIn("kafka-1", diff.services_to_restart())
+        self.assertIn("    + limits.memory: 512m", diff.format_lines())
+
+    def test_ports(self):
+        """Test changed port mappings"""
+        old = Topology([Service(name="kafka-1", image="image", hostname="kafka-1", ports=[PortMapping(9091, 9091)])])
+        new = Topology([Service(name="kafka-1", image="image", hostname="kafka-1", ports=[PortMapping(9092, 9091)])])
+
+        change = diff_topologies(old, new).changed[0]
+        self.assertEqual(change.ports_added, ["9092:9091"])
+        self.assertEqual(change.ports_removed, ["9091:9091"])
+
+    def test_no_changes(self):
+        """Test that regenerating the same configuration yields an empty diff"""
+        diff = self.diff(dict(brokers=3, controllers=3, prometheus=True), dict(brokers=3, controllers=3, prometheus=True))
+        self.assertFalse(diff)
+        self.assertEqual(diff.format_lines(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,9 @@ import sys
 from argparse import Namespace
 from validator import (
     validate_configuration,
+    estimate_memory_usage,
+    validate_swarm,
+    validate_mqtt_bridge,
     ValidationError,
     ValidationWarning
 )
@@ -138,6 +141,124 @@ class TestResourceProfileValidation(unittest.TestCase):
             self.assertEqual(len(errors), 0, f"Profile {profile} should be valid")
 
 
+class TestMultiClusterValidation(unittest.TestCase):
+    """Test multi-cluster and cross-cluster replication validation"""
+
+    def create_args(self, **kwargs):
+        """Helper to create args object with defaults"""
+        defaults = {
+            'brokers': 3,
+            'controllers': 3,
+            'zookeepers': 0,
+            'schema_registries': 0,
+            'connect_instances': 0,
+            'ksqldb_instances': 0,
+            'replication_factor': 3,
+            'resource_profile': 'medium',
+            'available_memory': 8192,
+            'control_center': False,
+            'control_center_next_gen': False,
+            'prometheus': False,
+            'shared_mode': False,
+            'osk': False,
+            'clusters': 2,
+            'cluster_replication': 'mirror-maker',
+        }
+        defaults.update(kwargs)
+        return Namespace(**defaults)
+
+    def test_valid_mirror_maker(self):
+        """Test that two clusters with MirrorMaker 2 pass validation"""
+        errors, warnings = validate_configuration(self.create_args())
+        self.assertEqual(len(errors), 0)
+
+    def test_replication_requires_two_clusters(self):
+        """Test that replication with a single cluster is an error"""
+        errors, warnings = validate_configuration(self.create_args(clusters=1))
+        self.assertGreater(len(errors), 0)
+
+    def test_cluster_link_requires_confluent(self):
+        """Test that Cluster Linking is rejected for Open Source Kafka"""
+        errors, warnings = validate_configuration(self.create_args(cluster_replication='cluster-link', osk=True))
+        self.assertGreater(len(errors), 0)
+
+    def test_memory_scales_with_clusters(self):
+        """Test that the memory estimate counts every cluster"""
+        single = estimate_memory_usage(self.create_args(clusters=1, cluster_replication='none'))
+        double = estimate_memory_usage(self.create_args(clusters=2, cluster_replication='none'))
+        self.assertEqual(double, 2 * single)
+
+
+class TestSwarmValidation(unittest.TestCase):
+    """Test Docker Swarm deployment validation"""
+
+    def create_args(self, **kwargs):
+        """Helper to create args object with defaults"""
+        defaults = {
+            'brokers': 3,
+            'controllers': 3,
+            'zookeepers': 0,
+            'schema_registries': 0,
+            'connect_instances': 0,
+            'ksqldb_instances': 0,
+            'resource_profile': 'none',
+            'control_center': False,
+            'control_center_next_gen': False,
+            'prometheus': False,
+            'shared_mode': False,
+            'racks': 3,
+            'swarm': True,
+            'swarm_hosts': 'node-a,node-b,node-c',
+        }
+        defaults.update(kwargs)
+        return Namespace(**defaults)
+
+    def test_valid_swarm(self):
+        """Test that one host per rack passes without errors"""
+        errors, warnings = validate_configuration(self.create_args())
+        self.assertEqual(len(errors), 0)
+
+    def test_more_racks_than_hosts_warning(self):
+        """Test that racks sharing a host generate a warning"""
+        warnings = validate_swarm(self.create_args(racks=4))
+        # Plus the bind-mount warning every Swarm stack gets
+        self.assertEqual(len(warnings), 2)
+        self.assertIn("4 racks on 3 hosts", warnings[0].message)
+
+    def test_local_directories_warning(self):
+        """Test that bind-mounted directories and the JMX agent generate one warning naming them"""
+        warnings = validate_swarm(self.create_args(connect_instances=1, prometheus=True))
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("jmx_prometheus_javaagent", warnings[0].message)
+        self.assertIn("connect-plugin-jars", warnings[0].message)
+        self.assertIn("Grafana", warnings[0].message)
+
+    def test_hosts_without_swarm_warning(self):
+        """Test that --swarm-hosts without --swarm generates a warning"""
+        warnings = validate_swarm(self.create_args(swarm=False))
+        self.assertEqual(len(warnings), 1)
+
+
+class TestMqttBridgeValidation(unittest.TestCase):
+    """Test MQTT bridge validation"""
+
+    def test_valid_mappings(self):
+        """Test that well-formed mappings pass"""
+        errors, warnings = validate_mqtt_bridge(Namespace(mqtt_bridge=True, swarm=False,
+                                                          mqtt_bridge_map=["a/#=t:robot_id", "b/+=u"]))
+        self.assertEqual((len(errors), len(warnings)), (0, 0))
+
+    def test_invalid_mapping_error(self):
+        """Test that a malformed mapping is an error"""
+        errors, _ = validate_mqtt_bridge(Namespace(mqtt_bridge=True, swarm=False, mqtt_bridge_map=["a/#"]))
+        self.assertEqual(len(errors), 1)
+
+    def test_mappings_without_bridge_warning(self):
+        """Test that mappings without --mqtt-bridge generate a warning"""
+        _, warnings = validate_mqtt_bridge(Namespace(mqtt_bridge=False, swarm=False, mqtt_bridge_map=["a=t"]))
+        self.assertEqual(len(warnings), 1)
+
+
 class TestValidationExceptions(unittest.TestCase):
     """Test custom exception classes"""
 
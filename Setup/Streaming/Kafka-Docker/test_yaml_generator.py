@@ -2,8 +2,8 @@
 Kafka Docker Composer - Unit Tests
 
 This module contains unit tests for the DockerComposeGenerator class.
-Currently focuses on testing the rack assignment logic for distributing
-brokers across multiple racks.
+It covers the rack assignment logic for distributing brokers across
+multiple racks and the multi-cluster generation.
 
 Usage:
     python -m unittest test_yaml_generator.py
@@ -11,7 +11,9 @@ Usage:
     python -m pytest test_yaml_generator.py
 """
 
+import json
 import unittest
+from argparse import Namespace
 
 from kafka_docker_composer import DockerComposeGenerator
 
@@ -72,3 +74,206 @@ class TestNextRack(TestYamlGenerator):
         rack = 1
         next = DockerComposeGenerator.next_rack(rack, 2)
         self.assertEqual(next, 0)
+
+
+def create_args(**kwargs):
+    """Helper to create an args object with the command-line defaults"""
+    defaults = {
+        'release': '7.9.5',
+        'repository': 'confluentinc',
+        'kafka_container': 'cp-server',
+        'osk': False,
+        'with_tc': False,
+        'shared_mode': False,
+        'brokers': 3,
+        'zookeepers': 0,
+        'controllers': 3,
+        'schema_registries': 0,
+        'connect_instances': 0,
+        'ksqldb_instances': 0,
+        'control_center': False,
+        'control_center_next_gen': False,
+        'control_center_next_gen_release': '2.3.0',
+        'prometheus': False,
+        'uuid': 'Nk018hRAQFytWskYqtQduw',
+        'clusters': 1,
+        'cluster_replication': 'none',
+        'replication_flow': 'active-passive',
+        'swarm': False,
+        'swarm_hosts': None,
+        'overlay_network': 'kafka-net',
+        'racks': 1,
+        'zookeeper_groups': 1,
+        'docker_compose_file': 'docker-compose.yml',
+        'persistent_volumes': False,
+        'volume_driver': 'local',
+        'resource_profile': 'none',
+        'custom_broker_memory': None,
+        'custom_broker_cpus': None,
+    }
+    defaults.update(kwargs)
+    return Namespace(**defaults)
+
+
+class TestMultiCluster(TestYamlGenerator):
+    """
+    Test cases for generating several clusters into one docker-compose file.
+    """
+
+    def services_by_name(self, generator):
+        return {service.name: service for service in generator.collect_services()}
+
+    def testSingleClusterNamesUnchanged(self):
+        """A single cluster keeps the unprefixed service names and the configured UUID"""
+        generator = DockerComposeGenerator(create_args())
+        services = self.services_by_name(generator)
+        self.assertIn("kafka-1", services)
+        self.assertIn("controller-1", services)
+        self.assertEqual(services["kafka-1"].environment["CLUSTER_ID"], "Nk018hRAQFytWskYqtQduw")
+        self.assertEqual(generator.replication_configs, [])
+
+    def testClustersDoNotOverlap(self):
+        """Names, host ports and UUIDs are unique across clusters"""
+        generator = DockerComposeGenerator(create_args(clusters=2, schema_registries=1, connect_instances=1))
+        services = generator.collect_services()
+
+        names = [service.name for service in services]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertIn("cluster1-kafka-1", names)
+        self.assertIn("cluster2-kafka-1", names)
+
+        host_ports = [port.host for service in services for port in service.ports or []]
+        self.assertEqual(len(host_ports), len(set(host_ports)))
+
+        by_name = {service.name: service for service in services}
+        uuid_1 = by_name["cluster1-kafka-1"].environment["CLUSTER_ID"]
+        uuid_2 = by_name["cluster2-kafka-1"].environment["CLUSTER_ID"]
+        self.assertNotEqual(uuid_1, uuid_2)
+        self.assertEqual(len(uuid_2), 22)
+        self.assertIn("cluster2-controller-1", by_name["cluster2-kafka-1"].environment["KAFKA_CONTROLLER_QUORUM_VOTERS"])
+
+    def testDerivedUuidIsStable(self):
+        """Derived cluster UUIDs do not change between runs"""
+        self.assertEqual(DockerComposeGenerator.derive_cluster_uuid("abc", 1), "abc")
+        self.assertEqual(DockerComposeGenerator.derive_cluster_uuid("abc", 2),
+                         DockerComposeGenerator.derive_cluster_uuid("abc", 2))
+
+    def testPrometheusJobsPerCluster(self):
+        """Every cluster gets its own labelled Prometheus jobs"""
+        generator = DockerComposeGenerator(create_args(clusters=2))
+        generator.collect_services()
+        job_names = [job["name"] for job in generator.prometheus_jobs]
+        self.assertIn("cluster1-kafka-broker", job_names)
+        self.assertIn("cluster2-kafka-broker", job_names)
+        self.assertEqual(len(job_names), len(set(job_names)))
+
+    def testMirrorMaker(self):
+        """MirrorMaker 2 depends on all brokers and replicates from the first cluster"""
+        generator = DockerComposeGenerator(create_args(clusters=3, cluster_replication="mirror-maker"))
+        services = self.services_by_name(generator)
+
+        mirror_maker = services["mirror-maker"]
+        self.assertIn("cluster3-kafka-3", mirror_maker.depends_on_condition)
+
+        template, output_file, variables = generator.replication_configs[0]
+        self.assertEqual(template, "mirror-maker.j2")
+        self.assertEqual(variables["flows"], [("cluster1", "cluster2"), ("cluster1", "cluster3")])
+
+    def testClusterLinkActiveActive(self):
+        """Cluster Linking creates one link per direction and enables linking on the brokers"""
+        generator = DockerComposeGenerator(create_args(brokers=1, controllers=1, clusters=2,
+                                                       cluster_replication="cluster-link",
+                                                       replication_flow="active-active"))
+        services = self.services_by_name(generator)
+
+        self.assertTrue(services["cluster2-kafka-1"].environment["KAFKA_CONFLUENT_CLUSTER_LINK_ENABLE"])
+        command = services["cluster-link-init"].command
+        self.assertIn("--link cluster1-to-cluster2", command)
+        self.assertIn("--link cluster2-to-cluster1", command)
+        self.assertEqual(len(generator.replication_configs), 2)
+
+    def testClusterLinkFiltersStopLoops(self):
+        """With three active-active clusters no link mirrors a topic that is already a mirror"""
+        generator = DockerComposeGenerator(create_args(brokers=1, controllers=1, clusters=3,
+                                                       cluster_replication="cluster-link",
+                                                       replication_flow="active-active"))
+        generator.collect_services()
+        self.assertEqual(len(generator.replication_configs), 6)
+
+        for template, output_file, variables in generator.replication_configs:
+            rendered = generator.env.get_template(template).render(variables)
+            filters_line = next(line for line in rendered.splitlines()
+                                if line.startswith("auto.create.mirror.topics.filters="))
+            filters = json.loads(filters_line.split("=", 1)[1])["topicFilters"]
+
+            excluded = [f["name"] for f in filters if f["filterType"] == "EXCLUDE" and f["patternType"] == "PREFIXED"]
+            self.assertEqual(excluded, ["cluster1.", "cluster2.", "cluster3."], output_file)
+
+    def testSharedServicesUsePrimaryCluster(self):
+        """Control Center attaches to the first cluster"""
+        generator = DockerComposeGenerator(create_args(clusters=2, control_center=True))
+        services = self.services_by_name(generator)
+        bootstrap = services["control-center"].environment["CONTROL_CENTER_BOOTSTRAP_SERVERS"]
+        self.assertIn("cluster1-kafka-1", bootstrap)
+        self.assertNotIn("cluster2-", bootstrap)
+
+
+class TestSwarm(TestYamlGenerator):
+    """
+    Test cases for the Docker Swarm (multi-host) output, checked on the rendered file.
+    """
+
+    def testRacksPinnedToHosts(self):
+        """Each rack is pinned to one host, and brokers advertise that host"""
+        args = create_args(racks=2, swarm=True, swarm_hosts="node-a,node-b")
+        result = DockerComposeGenerator(args).render_compose()
+
+        self.assertIn("EXTERNAL://node-a:9091", result)
+        self.assertIn("EXTERNAL://node-b:9092", result)
+        self.assertIn("- node.hostname == node-a", result)
+        self.assertIn("- node.hostname == node-b", result)
+        self.assertNotIn("EXTERNAL://localhost", result)
+
+    def testRackLabelsWithoutHosts(self):
+        """Without hosts, racks map to node labels and brokers advertise the node hostname"""
+        result = DockerComposeGenerator(create_args(racks=3, swarm=True)).render_compose()
+
+        self.assertIn("- node.labels.rack == rack-2", result)
+        self.assertIn("EXTERNAL://{{.Node.Hostname}}:9091", result)
+
+    def testStackSections(self):
+        """Ports use host mode, services join the overlay network, container names are dropped"""
+        result = DockerComposeGenerator(create_args(swarm=True, prometheus=True)).render_compose()
+
+        self.assertIn("mode: host", result)
+        self.assertIn("networks:\n    kafka-net:\n        driver: overlay", result)
+        self.assertIn("            - kafka-net", result)
+        self.assertNotIn("container_name:", result)
+        self.assertNotIn("depends_on:", result)
+
+    def testLocalFilesBecomeConfigs(self):
+        """Locally mounted files are shipped as Swarm configs, directories stay bind mounts"""
+        result = DockerComposeGenerator(create_args(swarm=True, connect_instances=1, mqtt_bridge=True)).render_compose()
+
+        self.assertIn("            - source: kafka_config.yml\n              target: /tmp/kafka_config.yml", result)
+        self.assertIn("configs:\n    kafka_controller.yml:\n"
+                      "        file: $PWD/volumes/kafka_controller.yml", result)
+        self.assertIn("    mqtt_bridge.py:\n        file: $PWD/mqtt_bridge.py", result)
+        self.assertNotIn("- $PWD/volumes/kafka_config.yml:", result)
+        self.assertIn("- $PWD/volumes/connect-plugin-jars:/data/connect-plugin-jars", result)
+        # Jar files exceed the config size limit and stay bind mounts
+        self.assertIn("- $PWD/volumes/jmx_prometheus_javaagent-1.5.0.jar:/tmp/jmx_prometheus_javaagent-1.5.0.jar",
+                      result)
+        self.assertNotIn("source: jmx_prometheus_javaagent", result)
+        # Every file is defined once, however many services mount it
+        self.assertEqual(result.count("file: $PWD/volumes/kafka_config.yml"), 1)
+
+    def testComposeOutputUnchanged(self):
+        """Without --swarm the output keeps localhost and short port syntax"""
+        result = DockerComposeGenerator(create_args()).render_compose()
+
+        self.assertIn("EXTERNAL://localhost:9091", result)
+        self.assertIn("- 9091:9091", result)
+        self.assertIn("container_name: kafka-1", result)
+        self.assertNotIn("networks:", result)
+        self.assertNotIn("configs:", result)
@@ -0,0 +1,827 @@
+"""
+Topology Model Module
+
+This module provides a compact, typed model of a generated deployment and a
+serializer that writes it as docker-compose YAML.
+
+The generators build every service directly as a Service of the model
+below, where:
+- Services, listeners, port mappings and volume mounts are slotted
+  dataclasses, which use far less memory than per-service dictionaries
+  in topologies with thousands of services
+- Cross-references (depends_on) are resolved to Service objects once,
+  so a reference to a service that was not generated is caught before
+  the file is written
+- YAML is written directly by write_compose_yaml(), streamed to the
+  output file without the Jinja2 overhead
+- Compose files produced by the composer can be read back (load) and
+  compared with diff_topologies() to find the services a change affects
+
+Usage:
+    from topology import PortMapping, Service, Topology, diff_topologies
+
+    broker = Service(name="kafka-1", image=image, hostname="kafka-1", ports=[PortMapping(9091, 9091)])
+    topology = Topology([broker], volumes=volumes)
+    print(topology.service("kafka-1").listeners())
+    yaml_text = topology.to_compose_yaml()
+
+    diff = diff_topologies(Topology.load("docker-compose.yml"), topology)
+    for line in diff.format_lines():
+        print(line)
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional, Tuple
+
+
+def slotted(cls):
+    """
+    Rebuild a dataclass with __slots__.
+
+    dataclass(slots=True) requires Python 3.10, while the composer supports
+    Python 3.7+. Without a per-instance __dict__ each object only stores its
+    field values.
+
+    Args:
+        cls: Class already decorated with @dataclass
+
+    Returns:
+        type: Equivalent dataclass using __slots__
+    """
+    field_names = tuple(f.name for f in fields(cls))
+
+    # Class attributes holding field defaults would conflict with the slots;
+    # the generated __init__ keeps its own copy of the defaults
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in field_names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = field_names
+
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted_cls.__qualname__ = cls.__qualname__
+    return slotted_cls
+
+
+# ========== Model ==========
+
+@slotted
+@dataclass
+class PortMapping:
+    """
+    A published port.
+
+    Attributes:
+        host (int): Port on the Docker host (published port)
+        container (int): Port inside the container (target port)
+    """
+    host: int
+    container: int
+
+    def __str__(self):
+        return f"{self.host}:{self.container}"
+
+
+@slotted
+@dataclass
+class Volume:
+    """
+    A volume or bind mount of a service.
+
+    Attributes:
+        source (str): Named volume or host path (e.g., "./volumes/jmx_prometheus_javaagent.jar")
+        target (str): Path inside the container
+        mode (Optional[str]): Mount mode such as "ro", if any
+    """
+    source: str
+    target: str
+    mode: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Parse a short-syntax volume specification ("source:target[:mode]").
+
+        Args:
+            spec (str): Volume specification
+
+        Returns:
+            Volume: Parsed volume mount
+        """
+        parts = spec.split(":")
+        if len(parts) < 2:
+            return cls(source="", target=spec)
+        return cls(source=parts[0], target=parts[1], mode=parts[2] if len(parts) > 2 else None)
+
+    def __str__(self):
+        spec = f"{self.source}:{self.target}" if self.source else self.target
+        return f"{spec}:{self.mode}" if self.mode else spec
+
+
+@slotted
+@dataclass
+class ConfigMount:
+    """
+    A Swarm config mounted into a service.
+
+    Attributes:
+        source (str): Name of the top-level config
+        target (str): Path inside the container
+    """
+    source: str
+    target: str
+
+
+@slotted
+@dataclass
+class Listener:
+    """
+    A Kafka listener, as configured in KAFKA_LISTENERS or KAFKA_ADVERTISED_LISTENERS.
+
+    Attributes:
+        name (str): Listener name (e.g., "PLAINTEXT", "EXTERNAL", "CONTROLLER")
+        host (str): Host name or address
+        port (int): Listener port
+    """
+    name: str
+    host: str
+    port: int
+
+    @classmethod
+    def parse_all(cls, value):
+        """
+        Parse a comma-separated listener list.
+
+        Args:
+            value (str): Listeners, e.g. "PLAINTEXT://kafka-1:19092, EXTERNAL://localhost:9091"
+
+        Returns:
+            list: List of Listener objects
+        """
+        listeners = []
+        for entry in str(value).split(","):
+            name, _, address = entry.strip().partition("://")
+            if not address:
+                continue
+            host, _, port = address.rpartition(":")
+            listeners.append(cls(name=name, host=host, port=int(port)))
+        return listeners
+
+    @property
+    def address(self):
+        """str: host:port of the listener"""
+        return f"{self.host}:{self.port}"
+
+
+@slotted
+@dataclass
+class Service:
+    """
+    A docker-compose service.
+
+    Optional sections are None when the service does not define them and
+    are left out of the compose file.
+
+    Attributes:
+        name (str): Service name
+        image (str): Docker image
+        hostname (str): Container hostname
+        container_name (Optional[str]): Fixed container name (not used in Swarm mode)
+        healthcheck (Optional[dict]): Health check settings
+        depends_on (Optional[list]): Services that must be started first
+        depends_on_condition (Optional[list]): Services that must be healthy first
+        environment (Optional[dict]): Environment variables
+        cap_add (Optional[list]): Added Linux capabilities
+        extra_hosts (Optional[list]): Additional /etc/hosts entries ("name:address")
+        ports (Optional[list]): Published ports (PortMapping)
+        command (Optional[str]): Command override
+        volumes (Optional[list]): Volume mounts (Volume)
+        configs (Optional[list]): Swarm configs (ConfigMount)
+        networks (Optional[list]): Attached networks
+        deploy (Optional[dict]): Deploy section (replicas, restart_policy, placement, resources)
+    """
+    name: str
+    image: str
+    hostname: str
+    container_name: Optional[str] = None
+    healthcheck: Optional[Dict[str, object]] = None
+    depends_on: Optional[List[str]] = None
+    depends_on_condition: Optional[List[str]] = None
+    environment: Optional[Dict[str, object]] = None
+    cap_add: Optional[List[str]] = None
+    extra_hosts: Optional[List[str]] = None
+    ports: Optional[List[PortMapping]] = None
+    command: Optional[str] = None
+    volumes: Optional[List[Volume]] = None
+    configs: Optional[List[ConfigMount]] = None
+    networks: Optional[List[str]] = None
+    deploy: Optional[Dict[str, dict]] = None
+
+    def dependencies(self):
+        """
+        Get the names of all services this service depends on.
+
+        Returns:
+            list: Service names from depends_on and depends_on_condition
+        """
+        return (self.depends_on or []) + (self.depends_on_condition or [])
+
+    def listeners(self, advertised=True):
+        """
+        Get the Kafka listeners of the service.
+
+        Args:
+            advertised (bool): Use KAFKA_ADVERTISED_LISTENERS instead of KAFKA_LISTENERS
+
+        Returns:
+            list: Listener objects (empty for non-Kafka services)
+        """
+        key = "KAFKA_ADVERTISED_LISTENERS" if advertised else "KAFKA_LISTENERS"
+        value = (self.environment or {}).get(key)
+        return Listener.parse_all(value) if value else []
+
+
+@dataclass
+class Topology:
+    """
+    A complete deployment: services plus top-level volumes, networks and configs.
+
+    Attributes:
+        services (list): Services in docker-compose order
+        volumes (Optional[dict]): Top-level volume definitions
+        networks (Optional[dict]): Top-level network definitions
+        swarm (bool): Publish ports in Swarm (long) syntax
+        configs (Optional[dict]): Top-level Swarm config definitions
+    """
+    services: List[Service] = field(default_factory=list)
+    volumes: Optional[Dict[str, dict]] = None
+    networks: Optional[Dict[str, dict]] = None
+    swarm: bool = False
+    configs: Optional[Dict[str, dict]] = None
+
+    def __post_init__(self):
+        self._index = {service.name: service for service in self.services}
+
+    def service(self, name):
+        """
+        Look up a service by name.
+
+        Args:
+            name (str): Service name
+
+        Returns:
+            Optional[Service]: The service, or None if it does not exist
+        """
+        return self._index.get(name)
+
+    def resolve_dependencies(self):
+        """
+        Resolve every depends_on reference to its Service.
+
+        Returns:
+            dict: Service name -> list of Service objects it depends on
+
+        Raises:
+            ValueError: If a service depends on a service that does not exist
+        """
+        resolved = {}
+        missing = []
+        for service in self.services:
+            dependencies = []
+            for name in service.dependencies():
+                dependency = self._index.get(name)
+                if dependency is None:
+                    missing.append(f"{service.name} -> {name}")
+                else:
+                    dependencies.append(dependency)
+            resolved[service.name] = dependencies
+
+        if missing:
+            raise ValueError(f"Unknown service dependencies: {', '.join(missing)}")
+
+        return resolved
+
+    @classmethod
+    def from_compose_yaml(cls, text):
+        """
+        Parse a compose file produced by the composer (write_compose_yaml).
+
+        Only the YAML subset written by the composer is supported: block
+        mappings and sequences with unquoted scalar values. Values are kept
+        as strings, exactly as they appear in the file.
+
+        Args:
+            text (str): docker-compose YAML
+
+        Returns:
+            Topology: Parsed topology
+
+        Raises:
+            ValueError: If the text is not in the format written by the composer
+        """
+        document = _parse_block(_yaml_lines(text), [0], 0) or {}
+        if not isinstance(document, dict):
+            raise ValueError("Compose file must be a mapping")
+
+        swarm = False
+        services = []
+        for name, raw in (document.get("services") or {}).items():
+            service, swarm_ports = _service_from_yaml(name, raw or {})
+            swarm = swarm or swarm_ports
+            services.append(service)
+
+        return cls(services, document.get("volumes"), document.get("networks"), swarm, document.get("configs"))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a compose file produced by the composer.
+
+        Args:
+            path (str): Path to the docker-compose file
+
+        Returns:
+            Topology: Parsed topology
+        """
+        with open(path) as compose_file:
+            return cls.from_compose_yaml(compose_file.read())
+
+    def to_compose_yaml(self):
+        """
+        Serialize the topology as docker-compose YAML.
+
+        Returns:
+            str: docker-compose YAML
+        """
+        return "".join(self._compose_yaml_chunks())
+
+    def write_compose_yaml(self, stream):
+        """
+        Write the topology as docker-compose YAML.
+
+        The file is written service by service, so the complete YAML text is
+        never held in memory when writing to a file.
+
+        Args:
+            stream: Text file or other object with a writelines() method
+        """
+        stream.writelines(self._compose_yaml_chunks())
+
+    def _compose_yaml_chunks(self):
+        """Yield the docker-compose YAML text, one chunk per service."""
+        yield "---\nservices:\n"
+
+        for service in self.services:
+            lines = [f"    {service.name}:",
+                     f"        image: {service.image}",
+                     f"        hostname: {service.hostname}"]
+            append = lines.append
+            extend = lines.extend
+            if service.container_name is not None:
+                append(f"        container_name: {service.container_name}")
+            append("")
+
+            if service.healthcheck is not None:
+                append("        healthcheck:")
+                extend([f"            {key}: {value}" for key, value in service.healthcheck.items()])
+
+            if service.depends_on is not None:
+                append("        depends_on:")
+                extend([f"            - {depends}" for depends in service.depends_on])
+
+            if service.depends_on_condition is not None:
+                append("        depends_on:")
+                for depends in service.depends_on_condition:
+                    append(f"            {depends}:")
+                    append("                condition: service_healthy")
+
+            if service.environment is not None:
+                append("        environment:")
+                extend([f"            {key}: {value}" for key, value in service.environment.items()])
+
+            if service.cap_add is not None:
+                append("        cap_add:")
+                extend([f"            - {capability}" for capability in service.cap_add])
+
+            if service.extra_hosts is not None:
+                append("        extra_hosts:")
+                extend([f"            - {host}" for host in service.extra_hosts])
+
+            if service.ports is not None:
+                append("        ports:")
+                for port in service.ports:
+                    if self.swarm:
+                        append(f"            - target: {port.container}")
+                        append(f"              published: {port.host}")
+                        append("              protocol: tcp")
+                        append("              mode: host")
+                    else:
+                        append(f"            - {port.host}:{port.container}")
+
+            if service.command is not None:
+                append(f"        command: {service.command}")
+
+            if service.volumes is not None:
+                append("        volumes:")
+                extend([f"            - {volume}" for volume in service.volumes])
+
+            if service.configs is not None:
+                append("        configs:")
+                for config in service.configs:
+                    append(f"            - source: {config.source}")
+                    append(f"              target: {config.target}")
+
+            if service.networks is not None:
+                append("        networks:")
+                extend([f"            - {network}" for network in service.networks])
+
+            if service.deploy is not None:
+                self._append_deploy(lines, service.deploy)
+
+            append("\n")
+            yield "\n".join(lines)
+
+        lines = [""]
+
+        if self.networks:
+            lines.append("networks:")
+            self._append_definitions(lines, self.networks)
+
+        if self.volumes:
+            lines.append("volumes:")
+            self._append_definitions(lines, self.volumes)
+
+        if self.configs:
+            lines.append("configs:")
+            self._append_definitions(lines, self.configs)
+
+        yield "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _append_deploy(lines, deploy):
+        """Append the deploy section of a service."""
+        append = lines.append
+        append("        deploy:")
+
+        if "replicas" in deploy:
+            append(f"            replicas: {deploy['replicas']}")
+
+        if "restart_policy" in deploy:
+            append("            restart_policy:")
+            for key, value in deploy["restart_policy"].items():
+                append(f"                {key}: {value}")
+
+        if "placement" in deploy:
+            append("            placement:")
+            append("                constraints:")
+            for constraint in deploy["placement"]["constraints"]:
+                append(f"                    - {constraint}")
+
+        if "resources" in deploy:
+            append("            resources:")
+            for section in ("limits", "reservations"):
+                if section in deploy["resources"]:
+                    append(f"                {section}:")
+                    for key, value in deploy["resources"][section].items():
+                        append(f"                    {key}: {value}")
+
+    @staticmethod
+    def _append_definitions(lines, definitions):
+        """Append top-level network or volume definitions."""
+        append = lines.append
+        for name, config in definitions.items():
+            append(f"    {name}:")
+            for key, value in config.items():
+                append(f"        {key}: {value}")
+
+
+# ========== Compose File Parsing ==========
+
+def _yaml_lines(text):
+    """
+    Split YAML text into (indent, content, line number) tuples.
+
+    Blank lines, comments and document markers are skipped.
+    """
+    lines = []
+    for number, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#") or stripped == "---":
+            continue
+        # Trailing spaces are kept: "KEY: " is an empty value, "KEY:" starts a block
+        content = line.lstrip(" ")
+        lines.append((len(line) - len(content), content, number))
+    return lines
+
+
+def _split_pair(content):
+    """
+    Split "key: value" or "key:" into (key, value); value is None for nested blocks.
+
+    Returns None if the content is not a mapping entry.
+    """
+    if content.endswith(":") and " " not in content:
+        return content[:-1], None
+    key, separator, value = content.partition(": ")
+    if not separator or " " in key:
+        return None
+    return key, value
+
+
+def _parse_block(lines, position, indent):
+    """
+    Parse the mapping or sequence starting at lines[position[0]].
+
+    Args:
+        lines (list): Output of _yaml_lines()
+        position (list): Single-item list holding the current line index (advanced in place)
+        indent (int): Indentation of the block
+
+    Returns:
+        dict or list: Parsed block, or None if there is no nested block
+    """
+    if position[0] >= len(lines) or lines[position[0]][0] < indent:
+        return None
+
+    block_indent = lines[position[0]][0]
+    is_sequence = lines[position[0]][1].startswith("- ")
+    block = [] if is_sequence else {}
+
+    while position[0] < len(lines):
+        line_indent, content, number = lines[position[0]]
+        if line_indent < block_indent:
+            break
+        if line_indent > block_indent:
+            raise ValueError(f"Line {number}: unexpected indentation")
+
+        position[0] += 1
+
+        if is_sequence:
+            if not content.startswith("- "):
+                raise ValueError(f"Line {number}: expected a sequence item")
+            item = content[2:]
+            pair = _split_pair(item)
+
+            # "- target: 9092" followed by indented keys is a mapping item
+            if pair is not None and pair[1] is not None and " " not in pair[0] and \
+                    position[0] < len(lines) and lines[position[0]][0] == block_indent + 2:
+                mapping = {pair[0]: pair[1]}
+                mapping.update(_parse_block(lines, position, block_indent + 2))
+                block.append(mapping)
+            elif pair is not None and pair[1] is not None and item.split(": ", 1)[0].isidentifier():
+                block.append({pair[0]: pair[1]})
+            else:
+                block.append(item)
+        else:
+            pair = _split_pair(content)
+            if pair is None:
+                raise ValueError(f"Line {number}: expected 'key: value'")
+            key, value = pair
+            block[key] = _parse_block(lines, position, block_indent + 1) if value is None else value
+
+    return block
+
+
+def _service_from_yaml(name, raw):
+    """
+    Convert a parsed service mapping into a Service.
+
+    Returns:
+        tuple: (Service, True if ports use the Swarm long syntax)
+    """
+    swarm = False
+
+    ports = None
+    if "ports" in raw:
+        ports = []
+        for port in raw["ports"] or []:
+            if isinstance(port, dict):
+                swarm = True
+                ports.append(PortMapping(int(port["published"]), int(port["target"])))
+            else:
+                host, _, container = port.rpartition(":")
+                ports.append(PortMapping(int(host), int(container)))
+
+    # The template writes depends_on as a list, or as a mapping with health conditions
+    depends_on = depends_on_condition = None
+    if "depends_on" in raw:
+        dependencies = raw["depends_on"]
+        if isinstance(dependencies, dict):
+            depends_on_condition = list(dependencies)
+        else:
+            depends_on = dependencies or []
+
+    def section(key, empty):
+        if key not in raw:
+            return None
+        return raw[key] if raw[key] is not None else empty
+
+    volumes = section("volumes", [])
+    configs = section("configs", [])
+
+    service = Service(
+        name=name,
+        image=raw.get("image"),
+        hostname=raw.get("hostname"),
+        container_name=raw.get("container_name"),
+        healthcheck=section("healthcheck", {}),
+        depends_on=depends_on,
+        depends_on_condition=depends_on_condition,
+        environment=section("environment", {}),
+        cap_add=section("cap_add", []),
+        extra_hosts=section("extra_hosts", []),
+        ports=ports,
+        command=raw.get("command"),
+        volumes=None if volumes is None else [Volume.parse(volume) for volume in volumes],
+        configs=None if configs is None else [ConfigMount(config["source"], config["target"]) for config in configs],
+        networks=section("networks", []),
+        deploy=section("deploy", {})
+    )
+    return service, swarm
+
+
+# ========== Topology Diff ==========
+
+def _text(value):
+    """Normalize a value to the text written to the compose file."""
+    if isinstance(value, dict):
+        return {str(key): _text(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_text(item) for item in value]
+    return None if value is None else str(value)
+
+
+@slotted
+@dataclass
+class ServiceChange:
+    """
+    Differences of one service between two topologies.
+
+    Attributes:
+        name (str): Service name
+        image (Optional[tuple]): (old, new) image if it changed
+        environment (dict): Variable -> (old, new); old or new is None if added or removed
+        ports_added (list): Published ports only in the new topology ("host:container")
+        ports_removed (list): Published ports only in the old topology
+        resources (dict): Resource setting (e.g. "limits.memory") -> (old, new)
+        sections (list): Other changed sections (volumes, command, healthcheck, ...)
+    """
+    name: str
+    image: Optional[Tuple[str, str]] = None
+    environment: Dict[str, Tuple[Optional[str], Optional[str]]] = field(default_factory=dict)
+    ports_added: List[str] = field(default_factory=list)
+    ports_removed: List[str] = field(default_factory=list)
+    resources: Dict[str, Tuple[Optional[str], Optional[str]]] = field(default_factory=dict)
+    sections: List[str] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.image or self.environment or self.ports_added or self.ports_removed
+                    or self.resources or self.sections)
+
+
+@dataclass
+class TopologyDiff:
+    """
+    Structural differences between two topologies.
+
+    Attributes:
+        added (list): Services only in the new topology
+        removed (list): Services only in the old topology
+        changed (list): ServiceChange for every service present in both that differs
+    """
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[ServiceChange] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def services_to_restart(self):
+        """
+        Get the services that must be (re)created to apply the new topology.
+
+        Returns:
+            list: Changed services followed by added services, in new topology order
+        """
+        return [change.name for change in self.changed] + self.added
+
+    def format_lines(self):
+        """
+        Format the diff for display.
+
+        Returns:
+            list: Lines describing added, removed and changed services
+        """
+        lines = []
+        lines += [f"+ {name}" for name in self.added]
+        lines += [f"- {name}" for name in self.removed]
+
+        for change in self.changed:
+            lines.append(f"~ {change.name}")
+            if change.image:
+                lines.append(f"    image: {change.image[0]} -> {change.image[1]}")
+            _format_mapping_changes(lines, change.environment)
+            lines += [f"    + port {port}" for port in change.ports_added]
+            lines += [f"    - port {port}" for port in change.ports_removed]
+            _format_mapping_changes(lines, change.resources)
+            if change.sections:
+                lines.append(f"    ~ changed: {', '.join(change.sections)}")
+
+        return lines
+
+
+def _format_mapping_changes(lines, changes):
+    """Append added (+), removed (-) and changed (~) settings to lines."""
+    for key, (old, new) in changes.items():
+        if old is None:
+            lines.append(f"    + {key}: {new}")
+        elif new is None:
+            lines.append(f"    - {key}: {old}")
+        else:
+            lines.append(f"    ~ {key}: {old} -> {new}")
+
+
+def _diff_mapping(old, new):
+    """Compare two flat mappings of text values."""
+    changes = {}
+    for key, value in old.items():
+        if new.get(key) != value:
+            changes[key] = (value, new.get(key))
+    for key, value in new.items():
+        if key not in old:
+            changes[key] = (None, value)
+    return changes
+
+
+def _resources(deploy):
+    """Flatten deploy.resources into {"limits.memory": "1g", ...}."""
+    resources = (deploy or {}).get("resources") or {}
+    return {f"{section}.{key}": str(value)
+            for section, settings in resources.items() for key, value in (settings or {}).items()}
+
+
+def diff_services(old, new):
+    """
+    Compare two versions of a service.
+
+    Values are compared as written to the compose file, so a generated
+    service (integers, booleans) equals its parsed counterpart (strings).
+
+    Args:
+        old (Service): Service in the old topology
+        new (Service): Service in the new topology
+
+    Returns:
+        ServiceChange: Differences (false if the services are equal)
+    """
+    change = ServiceChange(name=new.name)
+
+    if old.image != new.image:
+        change.image = (old.image, new.image)
+
+    change.environment = _diff_mapping(_text(old.environment or {}), _text(new.environment or {}))
+
+    old_ports = [str(port) for port in old.ports or []]
+    new_ports = [str(port) for port in new.ports or []]
+    change.ports_added = [port for port in new_ports if port not in old_ports]
+    change.ports_removed = [port for port in old_ports if port not in new_ports]
+
+    change.resources = _diff_mapping(_resources(old.deploy), _resources(new.deploy))
+
+    for name in ("hostname", "container_name", "healthcheck", "depends_on", "depends_on_condition",
+                 "cap_add", "extra_hosts", "command", "volumes", "configs", "networks"):
+        if _text(getattr(old, name)) != _text(getattr(new, name)):
+            change.sections.append(name)
+
+    # Deploy settings other than resources (replicas, placement, ...)
+    old_deploy = {key: value for key, value in (old.deploy or {}).items() if key != "resources"}
+    new_deploy = {key: value for key, value in (new.deploy or {}).items() if key != "resources"}
+    if _text(old_deploy) != _text(new_deploy):
+        change.sections.append("deploy")
+
+    return change
+
+
+def diff_topologies(old, new):
+    """
+    Compare two topologies service by service.
+
+    Args:
+        old (Topology): Current topology (e.g. loaded from the deployed compose file)
+        new (Topology): Desired topology (e.g. freshly generated)
+
+    Returns:
+        TopologyDiff: Added, removed and changed services
+    """
+    diff = TopologyDiff()
+
+    for service in new.services:
+        previous = old.service(service.name)
+        if previous is None:
+            diff.added.append(service.name)
+            continue
+        change = diff_services(previous, service)
+        if change:
+            diff.changed.append(change)
+
+    diff.removed = [service.name for service in old.services if new.service(service.name) is None]
+
+    return diff
@@ -38,11 +38,16 @@ Validation Categories:
     3. Replication - Checks replication factor feasibility
     4. System Requirements - Verifies Docker and resources
     5. Resource Profiles - Validates profile appropriateness
+    6. Multi-Cluster - Validates cluster count and cross-cluster replication
+    7. Swarm Deployment - Checks multi-host placement settings
+    8. MQTT Bridge - Validates the topic mappings of the bridge service
 """
 
 import shutil
 from typing import List, Tuple
 from logger import get_logger
+from mqtt_bridge import TopicMapping
+from constants import JMX_JAR_FILE
 
 # Get module logger for validation logging
 logger = get_logger(__name__)
@@ -132,6 +137,9 @@ def validate_configuration(args) -> Tuple[List[ValidationError], List[Validation
         3. Replication settings validation
         4. System requirements check
         5. Resource profile validation (if profile is set)
+        6. Multi-cluster validation
+        7. Swarm deployment validation
+        8. MQTT bridge validation
 
     Args:
         args: Parsed command-line arguments containing cluster configuration
@@ -187,6 +195,23 @@ def validate_configuration(args) -> Tuple[List[ValidationError], List[Validation
         warnings_list = validate_resource_profile(args)
         warnings.extend(warnings_list)
 
+    # ========== Validate Multi-Cluster Setup ==========
+    # Checks: cluster count, replication mode vs. cluster count and distribution
+    errors_list, warnings_list = validate_multi_cluster(args)
+    errors.extend(errors_list)
+    warnings.extend(warnings_list)
+
+    # ========== Validate Swarm Deployment ==========
+    # Checks host placement settings (always warnings)
+    warnings_list = validate_swarm(args)
+    warnings.extend(warnings_list)
+
+    # ========== Validate MQTT Bridge ==========
+    # Checks: topic mapping syntax, options without --mqtt-bridge
+    errors_list, warnings_list = validate_mqtt_bridge(args)
+    errors.extend(errors_list)
+    warnings.extend(warnings_list)
+
     # Return complete validation results
     return errors, warnings
 
@@ -554,6 +579,189 @@ def validate_resource_profile(args) -> List[ValidationWarning]:
     return warnings
 
 
+def validate_multi_cluster(args) -> Tuple[List[ValidationError], List[ValidationWarning]]:
+    """
+    Validate the multi-cluster and cross-cluster replication configuration.
+
+    Several clusters can be generated into one docker-compose file, with
+    MirrorMaker 2 or Confluent Cluster Linking replicating between them.
+
+    Validation Rules:
+        - FATAL: Less than 1 cluster
+        - FATAL: Replication requested with a single cluster (nothing to replicate to)
+        - FATAL: Cluster Linking with Open Source Kafka (Confluent Server feature)
+        - WARNING: Several clusters without replication (independent clusters only)
+
+    Args:
+        args: Configuration arguments with 'clusters', 'cluster_replication' and 'osk'
+
+    Returns:
+        Tuple of (errors, warnings) lists for multi-cluster validation
+
+    Note:
+        The multi-cluster options were added later, so they default to a single
+        cluster without replication when absent from args.
+    """
+    errors = []
+    warnings = []
+
+    clusters = getattr(args, 'clusters', 1)
+    replication = getattr(args, 'cluster_replication', 'none')
+
+    # ========== Fatal Error: No Clusters ==========
+    if clusters < 1:
+        errors.append(ValidationError(
+            "At least 1 cluster is required",
+            suggestions=["Use --clusters with a value >= 1"]
+        ))
+
+    # ========== Fatal Error: Replication Without a Second Cluster ==========
+    if replication != 'none' and clusters < 2:
+        errors.append(ValidationError(
+            f"Replication mode '{replication}' requires at least 2 clusters",
+            suggestions=["Use --clusters 2 (or more)", "Or remove --cluster-replication"]
+        ))
+
+    # ========== Fatal Error: Cluster Linking on Open Source Kafka ==========
+    # Cluster Linking is built into Confluent Server only
+    if replication == 'cluster-link' and getattr(args, 'osk', False):
+        errors.append(ValidationError(
+            "Cluster Linking is not available in Open Source Apache Kafka",
+            suggestions=["Use --cluster-replication mirror-maker", "Or remove --osk"]
+        ))
+
+    # ========== Warning: Independent Clusters ==========
+    if clusters > 1 and replication == 'none':
+        warnings.append(ValidationWarning(
+            f"{clusters} clusters will be generated without replication between them",
+            "Use --cluster-replication mirror-maker or cluster-link to replicate data"
+        ))
+
+    return errors, warnings
+
+
+def validate_swarm(args) -> List[ValidationWarning]:
+    """
+    Validate the Docker Swarm (multi-host) deployment settings.
+
+    In Swarm mode every rack is placed on one host (--swarm-hosts) or on the
+    nodes labelled with that rack, and brokers advertise that hostname.
+    Local files are turned into Swarm configs, but local directories and
+    the JMX agent jar stay bind mounts and must exist on every node a
+    service may run on.
+
+    Validation Rules:
+        - WARNING: --swarm-hosts without --swarm (hosts are ignored)
+        - WARNING: More racks than hosts (several racks share a machine)
+        - WARNING: Locally built traffic-control images (not available on other nodes)
+        - WARNING: Persistent volumes with the local driver (data stays on one node)
+        - WARNING: Jar files and directories bind-mounted from the local volumes/
+          folder (JMX agent, Connect plugin jars, Grafana dashboards and provisioning)
+
+    Args:
+        args: Configuration arguments with 'swarm', 'swarm_hosts', 'racks',
+              'connect_instances', 'prometheus'
+
+    Returns:
+        List of ValidationWarning objects for Swarm validation
+    """
+    warnings = []
+
+    swarm = getattr(args, 'swarm', False)
+    hosts = [host for host in (getattr(args, 'swarm_hosts', None) or "").split(",") if host.strip()]
+
+    # ========== Warning: Hosts Without Swarm Mode ==========
+    if hosts and not swarm:
+        warnings.append(ValidationWarning(
+            "--swarm-hosts is ignored without --swarm",
+            "Add --swarm to generate a multi-host stack"
+        ))
+
+    if not swarm:
+        return warnings
+
+    # ========== Warning: Racks Sharing Hosts ==========
+    # Racks are assigned to hosts round-robin, so extra racks land on the same machine
+    racks = getattr(args, 'racks', 1)
+    if hosts and racks > len(hosts):
+        warnings.append(ValidationWarning(
+            f"{racks} racks on {len(hosts)} hosts - several racks share a machine",
+            "Use at least as many --swarm-hosts as --racks for real rack awareness"
+        ))
+
+    # ========== Warning: Local Images ==========
+    if getattr(args, 'with_tc', False):
+        warnings.append(ValidationWarning(
+            "Locally built traffic-control images only exist on the build machine",
+            "Push the localbuild images to a registry reachable by every Swarm node"
+        ))
+
+    # ========== Warning: Node-Local Volumes ==========
+    if getattr(args, 'persistent_volumes', False) and getattr(args, 'volume_driver', 'local') == 'local':
+        warnings.append(ValidationWarning(
+            "The local volume driver keeps data on the node a task was first scheduled on",
+            "Pin racks with --swarm-hosts or use a shared --volume-driver"
+        ))
+
+    # ========== Warning: Local Directories and Jar Files ==========
+    # Files become Swarm configs (SwarmGenerator); directories cannot, and the
+    # JMX agent jar, mounted by every Kafka service, exceeds the config size limit
+    mounts = ["volumes/" + JMX_JAR_FILE + " (JMX agent)"]
+    if getattr(args, 'connect_instances', 0) > 0:
+        mounts.append("volumes/connect-plugin-jars (Kafka Connect)")
+    if getattr(args, 'prometheus', False):
+        mounts.append("volumes/dashboards and volumes/provisioning (Grafana)")
+    warnings.append(ValidationWarning(
+        f"Bind-mounted files and directories must exist on every Swarm node: {', '.join(mounts)}",
+        "Copy the volumes folder to the same path on every node, or share it (e.g. NFS)"
+    ))
+
+    return warnings
+
+
+def validate_mqtt_bridge(args) -> Tuple[List[ValidationError], List[ValidationWarning]]:
+    """
+    Validate the MQTT-to-Kafka bridge settings.
+
+    Validation Rules:
+        - ERROR: Topic mapping not in the form MQTT_FILTER=KAFKA_TOPIC[:KEY_FIELD]
+        - WARNING: --mqtt-bridge-map without --mqtt-bridge (mappings are ignored)
+
+    Args:
+        args: Configuration arguments with 'mqtt_bridge', 'mqtt_bridge_map'
+
+    Returns:
+        Tuple of (errors, warnings) lists for the bridge validation
+    """
+    errors = []
+    warnings = []
+
+    enabled = getattr(args, 'mqtt_bridge', False)
+    mappings = getattr(args, 'mqtt_bridge_map', None) or []
+
+    # ========== Error: Malformed Topic Mappings ==========
+    for rule in mappings:
+        try:
+            TopicMapping.parse(rule)
+        except ValueError as e:
+            errors.append(ValidationError(
+                str(e),
+                suggestions=[
+                    "Example: --mqtt-bridge-map 'industrial_robot/#=industrial-robot-sensor-data:robot_id'",
+                    "Use the key field '$topic' to key messages by their MQTT topic"
+                ]
+            ))
+
+    # ========== Warning: Mappings Without the Bridge ==========
+    if mappings and not enabled:
+        warnings.append(ValidationWarning(
+            "--mqtt-bridge-map is ignored without --mqtt-bridge",
+            "Add --mqtt-bridge to generate the bridge service"
+        ))
+
+    return errors, warnings
+
+
 def estimate_memory_usage(args) -> int:
     """
     Estimate total memory usage in MB for the entire cluster.
@@ -574,6 +782,9 @@ def estimate_memory_usage(args) -> int:
         - Control Center: 2048MB (1GB heap + significant overhead)
         - Prometheus: 512MB (metrics storage + processing)
         - Grafana: 256MB (dashboard rendering)
+        - MirrorMaker 2: 512MB (Connect runtime, multi-cluster replication)
+
+    Kafka components are counted once per cluster when several clusters are generated.
 
     Args:
         args: Configuration arguments with service counts
@@ -625,6 +836,18 @@ def estimate_memory_usage(args) -> int:
     # 1GB minimum, production workloads often need 2-4GB+
     memory_mb += args.ksqldb_instances * 1024
 
+    # ========== Multiple Clusters ==========
+    # Every cluster repeats the Kafka components above (shared services such as
+    # Control Center and Prometheus are only counted once)
+    clusters = getattr(args, 'clusters', 1)
+    if clusters > 1:
+        memory_mb *= clusters
+
+    # ========== MirrorMaker 2 ==========
+    # Runs on the Connect runtime, comparable to a Connect worker
+    if getattr(args, 'cluster_replication', 'none') == 'mirror-maker':
+        memory_mb += 512
+
     # ========== Confluent Control Center ==========
     # Web UI for cluster management and monitoring
     # Very memory-intensive due to metrics collection and UI